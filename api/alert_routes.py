@@ -10,6 +10,7 @@ from fastapi import APIRouter, Depends, HTTPException
 
 from api.auth.routes import get_current_user
 from api.models import Alert, AlertCreate, AlertSeverity, Role, User
+from core.storage.io_executor import PendingWrite, write_json
 
 router = APIRouter()
 
@@ -36,8 +37,7 @@ def _load_alerts() -> Dict[str, Alert]:
     return alerts
 
 
-def _save_alerts(alerts: Dict[str, Alert]) -> None:
-    os.makedirs(os.path.dirname(ALERTS_DATA_PATH), exist_ok=True)
+def _save_alerts(alerts: Dict[str, Alert]) -> PendingWrite:
     raw = {
         aid: {
             "title": a.title,
@@ -50,8 +50,7 @@ def _save_alerts(alerts: Dict[str, Alert]) -> None:
         }
         for aid, a in alerts.items()
     }
-    with open(ALERTS_DATA_PATH, "w", encoding="utf-8") as f:
-        json.dump(raw, f, indent=2)
+    return write_json(ALERTS_DATA_PATH, raw, indent=2)
 
 
 def _seed_if_empty(alerts: Dict[str, Alert]) -> None:
@@ -133,5 +132,5 @@ async def create_alert(
         role=payload.role,
     )
     alerts[new_id] = alert
-    _save_alerts(alerts)
+    await _save_alerts(alerts)
     return alert
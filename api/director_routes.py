@@ -0,0 +1,234 @@
+# api/director_routes.py
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+
+from api.auth.routes import get_current_user
+from api.models import ForecastRequest, Role, SandboxRequest, ThresholdCreate, User
+from core.director.director_system.prophecy import thread_status
+from core.director.forecast import guild_forecast_async
+from core.director.history import DIRECTOR_HISTORY_DIR, FIELDS, query
+from core.director.replay import sandbox_async
+
+router = APIRouter()
+
+
+def _st_guild(
+    request: Request,
+    user: User,
+    guild_id: Optional[str],
+    action: str = "manage Director thresholds",
+) -> str:
+    if Role.st not in user.roles:
+        raise HTTPException(status_code=403, detail=f"Only ST can {action}")
+    gid = guild_id or getattr(request.app.state, "default_guild_id", None)
+    if gid is None:
+        raise HTTPException(status_code=400, detail="guild_id is required")
+    gid = str(gid)
+    if not gid.isdigit():
+        raise HTTPException(status_code=400, detail="guild_id must be numeric")
+    return gid
+
+
+@router.get("/api/director/history")
+async def director_history(
+    request: Request,
+    guild_id: Optional[str] = None,
+    since: Optional[float] = Query(None, description="Unix seconds; default until - 24h"),
+    until: Optional[float] = Query(None, description="Unix seconds; default now"),
+    resolution: str = Query("auto", description="auto, raw, hour or night"),
+    fields: Optional[str] = Query(None, description="Comma-separated; default all"),
+    user: User = Depends(get_current_user),
+):
+    """
+    Director pressure over time, for charts. ST only.
+
+    "auto" picks raw changes for spans up to 2 days, hourly rollups up to
+    ~2 months, nightly beyond. Rollup points carry last/min/max/mean per
+    field, so a month is ~720 pre-aggregated points.
+
+    Response:
+    {
+      "guild_id": str,
+      "resolution": "raw" | "hour" | "night",
+      "since": float, "until": float,
+      "fields": [str],
+      "points": [{"t": float, <field>: value} | {"t", "t_end", "n", <field>: {...}}]
+    }
+    """
+    gid = _st_guild(request, user, guild_id, "read Director history")
+
+    until = time.time() if until is None else until
+    since = until - 86400.0 if since is None else since
+    if since > until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+
+    wanted = None
+    if fields:
+        wanted = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in wanted if f not in FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    root = getattr(request.app.state, "director_history_dir", DIRECTOR_HISTORY_DIR)
+    try:
+        result = await asyncio.to_thread(query, root, gid, since, until, resolution, wanted)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(result)
+
+
+@router.post("/api/director/forecast")
+async def director_forecast(
+    body: ForecastRequest,
+    request: Request,
+    user: User = Depends(get_current_user),
+):
+    """
+    Monte Carlo forecast of the guild's Director state N nights ahead. ST only.
+
+    Rates come from the last `window_nights` of logged events (times
+    `scale`); `rates` overrides or adds event kinds. Runs in a worker
+    process. Response: percentile bands per field and for global threat,
+    plus per-field cap probability and the night it is typically reached.
+    """
+    gid = _st_guild(request, user, body.guild_id, "run forecasts")
+    if not (1 <= body.nights <= 3650 and 1 <= body.samples <= 50000):
+        raise HTTPException(status_code=400, detail="nights must be 1-3650 and samples 1-50000")
+
+    registry = getattr(request.app.state, "zone_registry", None)
+    zone_risks = {z.key: z.base_risk for z in registry.all()} if registry else {}
+    try:
+        result = await guild_forecast_async(
+            gid,
+            nights=body.nights,
+            samples=body.samples,
+            window_nights=body.window_nights,
+            rates=body.rates,
+            scale=body.scale,
+            zone_risks=zone_risks,
+            seed=body.seed,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(result)
+
+
+@router.post("/api/director/sandbox")
+async def director_sandbox(
+    body: SandboxRequest,
+    request: Request,
+    user: User = Depends(get_current_user),
+):
+    """
+    What-if replay of the guild's journaled Director events. ST only.
+
+    Starts from the recorded pressure at `since` and replays every event
+    and night tick through the current rules (baseline) and through each
+    variant (rule weights, clamps or a whole rules file). Runs in a worker
+    process on its own copy; live state is never touched. Response: the
+    baseline and per-variant curves per field and global threat, and per
+    variant the final / max / mean difference from the baseline.
+    """
+    gid = _st_guild(request, user, body.guild_id, "run the Director sandbox")
+    if not 0 < body.nights <= 366 or len(body.variants) > 8:
+        raise HTTPException(status_code=400, detail="nights must be 1-366 and at most 8 variants")
+
+    until = time.time() if body.until is None else body.until
+    since = until - body.nights * 86400.0 if body.since is None else body.since
+    root = getattr(request.app.state, "director_history_dir", DIRECTOR_HISTORY_DIR)
+    try:
+        result = await sandbox_async(
+            gid,
+            since=since,
+            until=until,
+            variants=[
+                {"name": v.name, "weights": v.weights, "clamps": v.clamps, "rules": v.rules}
+                for v in body.variants
+            ],
+            resolution=body.resolution,
+            root=root,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(result)
+
+
+async def _thresholds_op(request: Request, gid: str, action: str, **fields) -> dict:
+    try:
+        reply = await request.app.state.store_control.director_thresholds(gid, action, **fields)
+    except ConnectionError:
+        raise HTTPException(status_code=503, detail="Bot is not reachable")
+    if reply.get("error") == "invalid":
+        raise HTTPException(status_code=400, detail=reply.get("detail", "Invalid threshold"))
+    if reply.get("error") == "not_found":
+        raise HTTPException(status_code=404, detail="No such threshold")
+    if not reply.get("ok"):
+        raise HTTPException(status_code=500, detail=reply.get("detail", "Threshold update failed"))
+    return reply
+
+
+@router.get("/api/director/thresholds")
+async def list_director_thresholds(
+    request: Request,
+    guild_id: Optional[str] = Query(None),
+    user: User = Depends(get_current_user),
+):
+    """
+    The guild's Director thresholds with their current value and whether
+    each is armed. ST only. Crossings arrive as ST alerts, so there is no
+    need to poll this.
+    """
+    gid = _st_guild(request, user, guild_id)
+    reply = await _thresholds_op(request, gid, "list")
+    return JSONResponse({"guild_id": gid, "thresholds": reply["thresholds"]})
+
+
+@router.post("/api/director/thresholds")
+async def add_director_threshold(
+    body: ThresholdCreate,
+    request: Request,
+    user: User = Depends(get_current_user),
+):
+    """
+    Register a threshold. It fires once when crossed, then re-arms when
+    the value returns to `clear`. ST only.
+    """
+    gid = _st_guild(request, user, body.guild_id)
+    reply = await _thresholds_op(
+        request, gid, "add", spec=body.spec, clear=body.clear, severity=body.severity, label=body.label
+    )
+    return JSONResponse({"guild_id": gid, "threshold": reply["threshold"]}, status_code=201)
+
+
+@router.delete("/api/director/thresholds/{threshold_id}")
+async def remove_director_threshold(
+    threshold_id: str,
+    request: Request,
+    guild_id: Optional[str] = Query(None),
+    user: User = Depends(get_current_user),
+):
+    gid = _st_guild(request, user, guild_id)
+    await _thresholds_op(request, gid, "remove", id=threshold_id)
+    return JSONResponse({"guild_id": gid, "removed": threshold_id})
+
+
+@router.get("/api/director/prophecies")
+async def list_director_prophecies(
+    request: Request,
+    guild_id: Optional[str] = Query(None),
+    user: User = Depends(get_current_user),
+):
+    """
+    The guild's prophecy threads: status, stage reached, and what the
+    current stage is waiting on with live values. ST only. Stage changes
+    arrive as ST alerts.
+    """
+    gid = _st_guild(request, user, guild_id, "view prophecies")
+    state = request.app.state.directors.get(gid)
+    return JSONResponse({"guild_id": str(gid), "threads": thread_status(state)})
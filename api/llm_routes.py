@@ -0,0 +1,29 @@
+# api/llm_routes.py
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+from api.auth.routes import get_current_user
+from api.models import Role, User
+
+router = APIRouter()
+
+
+@router.get("/api/llm/stats")
+async def llm_scheduler_stats(
+    request: Request,
+    user: User = Depends(get_current_user),
+):
+    """
+    The bot's model call scheduler: queue depth and wait percentiles per
+    priority, in-flight calls against the adaptive limit, rate tokens,
+    429s and dropped requests. ST only.
+    """
+    if Role.st not in user.roles:
+        raise HTTPException(status_code=403, detail="Only ST can view scheduler metrics")
+    try:
+        reply = await request.app.state.store_control.llm_stats()
+    except ConnectionError:
+        raise HTTPException(status_code=503, detail="Bot is not reachable")
+    return JSONResponse(reply.get("llm", {}))
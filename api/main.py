@@ -1,5 +1,6 @@
 # api/main.py
 
+import asyncio
 import logging
 import os
 
@@ -56,6 +57,52 @@ app.include_router(alerts_router, tags=["alerts"])
 from api.map_routes import router as map_router
 app.include_router(map_router, tags=["maps"])
 
+# Director pressure history (read from the bot's history files)
+from api.director_routes import router as director_router
+app.include_router(director_router, tags=["director"])
+
+# Player sheets (read from the follower, CAS writes through the bot)
+from api.player_routes import router as player_router
+app.include_router(player_router, tags=["players"])
+
+# Model call scheduler metrics (asked of the bot)
+from api.llm_routes import router as llm_router
+app.include_router(llm_router, tags=["llm"])
+
+# =====================================================
+# BOT DATA STORE (read-only follower of the bot's journal)
+# =====================================================
+
+from core.storage.coherence import follow_store
+from core.utils_api import STORE_SOCKET, open_store_control, open_store_follower
+
+
+@app.on_event("startup")
+async def start_store_follower():
+    follower = open_store_follower()
+    app.state.store_follower = follower
+    app.state.data_store = follower.data
+    app.state.store_control = open_store_control()
+    # Refreshes on every bot notification, and at least once a second.
+    app.state.store_task = asyncio.create_task(
+        follow_store(follower, sock_path=STORE_SOCKET, interval=1.0)
+    )
+
+
+@app.on_event("shutdown")
+async def stop_store_follower():
+    task = getattr(app.state, "store_task", None)
+    if task:
+        task.cancel()
+
+# =====================================================
+# DIRECTOR STATE (read-only: reloads the bot's per-guild files on change)
+# =====================================================
+
+from core.director.registry import DIRECTOR_STATE_DIR, DIRECTOR_STATE_PATH, DirectorRegistry
+
+app.state.directors = DirectorRegistry(DIRECTOR_STATE_DIR, seed_path=DIRECTOR_STATE_PATH, follow=True)
+
 # =====================================================
 # ROOT / HEALTH
 # =====================================================
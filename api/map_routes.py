@@ -4,8 +4,8 @@ from fastapi import APIRouter, Request, Depends
 from fastapi.responses import JSONResponse
 
 from core.travel.zones_loader import ZoneRegistry
-from utils import get_guild_data
-from director_system.state import get_director_state
+from core.utils_shared import get_guild_data
+from core.director.director_system.state import get_director_state
 
 router = APIRouter()
 
@@ -123,25 +123,30 @@ async def api_map_state(request: Request):
     {
       "awareness": int,
       "influence": {...},
-      "themes": {...}
+      "themes": {...},
+      "zone_pressure": {zone_key: {"si": float, ...}},  # local, sparse
+      "version": int      # bumps whenever the bot writes this guild
     }
     """
     app = request.app
     guild_id = getattr(app.state, "default_guild_id", None)
     if guild_id is None:
         return JSONResponse(
-            {"awareness": 0, "influence": {}, "themes": {}},
+            {"awareness": 0, "influence": {}, "themes": {}, "zone_pressure": {}},
             status_code=200,
         )
 
-    data_store = app.state.data_store
-    g_data = get_guild_data(data_store, guild_id)
-    state = get_director_state(g_data)
+    state = get_director_state(guild_id, registry=app.state.directors)
+
+    follower = getattr(app.state, "store_follower", None)
+    version = follower.version(guild_id) if follower else 0
 
     return JSONResponse(
         {
-            "awareness": getattr(state, "awareness", 0),
-            "influence": state.influence,
-            "themes": state.themes,
+            "awareness": state.awareness,
+            "influence": dict(state.influence),
+            "themes": dict(state.themes),
+            "zone_pressure": state.state.data.get("zone_pressure", {}),
+            "version": version,
         }
     )
\ No newline at end of file
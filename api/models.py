@@ -1,7 +1,7 @@
 # api/models.py
 from datetime import datetime
 from enum import Enum
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel
 
@@ -46,3 +46,71 @@ class AlertCreate(BaseModel):
 class OAuthRequest(BaseModel):
     code: str
     redirect_uri: str
+
+
+# Top-level sheet fields a player may change on their own character.
+# Everything mechanical (hunger, humanity, XP, blood potency, havens...)
+# is ST-only or changed by bot commands.
+PLAYER_EDITABLE_FIELDS = frozenset({
+    "name",
+    "concept",
+    "ambition",
+    "desire",
+    "appearance",
+    "biography",
+    "notes",
+})
+
+
+class PlayerPatch(BaseModel):
+    # Character version the client last read (GET /api/players/...).
+    expected_version: int
+    changes: Dict[str, Any] = {}
+    remove: List[str] = []
+
+    def fields(self) -> set:
+        return set(self.changes) | set(self.remove)
+
+
+class ForecastRequest(BaseModel):
+    guild_id: Optional[str] = None
+    nights: int = 30
+    samples: int = 2000
+    # Nights of logged events the base rates come from, and a multiplier.
+    window_nights: float = 14
+    scale: float = 1.0
+    # Event kind -> events per night, e.g. {"hunt:human": 2, "travel:margate": 0.5}
+    rates: Dict[str, float] = {}
+    seed: Optional[int] = None
+
+
+class SandboxVariant(BaseModel):
+    name: str = ""
+    # Delta multipliers by "<rule id>:<key>", rule id, event, key or "*",
+    # e.g. {"hunt.messy": 0.5, "si_pressure": 0.8}
+    weights: Dict[str, float] = {}
+    # Bounds overrides, e.g. {"si_pressure": [0, 15], "theme:occult": [0, 8]}
+    clamps: Dict[str, List[int]] = {}
+    # A whole alternative rules file ({"rules": [...]}); default: the current one
+    rules: Optional[Dict[str, Any]] = None
+
+
+class SandboxRequest(BaseModel):
+    guild_id: Optional[str] = None
+    # Replay the last `nights`, or [since, until] (unix seconds) when given.
+    nights: float = 14
+    since: Optional[float] = None
+    until: Optional[float] = None
+    # "event", "hour" or "night"
+    resolution: str = "night"
+    variants: List[SandboxVariant] = []
+
+
+class ThresholdCreate(BaseModel):
+    guild_id: Optional[str] = None
+    # e.g. "si_pressure >= 15", "global_threat >= 4", "theme:occult >= 9"
+    spec: str
+    # Level the value must return to before it can fire again
+    clear: Optional[int] = None
+    severity: str = "high"
+    label: str = ""
@@ -0,0 +1,106 @@
+# api/player_routes.py
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+from api.auth.routes import get_current_user
+from api.models import PLAYER_EDITABLE_FIELDS, PlayerPatch, Role, User
+
+router = APIRouter()
+
+
+def _require_access(user: User, user_id: str):
+    if Role.st not in user.roles and user.id != str(user_id):
+        raise HTTPException(status_code=403, detail="Not your character")
+
+
+@router.get("/api/players/{guild_id}/{user_id}")
+async def get_player(
+    guild_id: str,
+    user_id: str,
+    request: Request,
+    user: User = Depends(get_current_user),
+):
+    """
+    Character sheet plus its version. Send the version back as
+    `expected_version` when patching; the ETag header carries it too.
+    """
+    _require_access(user, user_id)
+    app = request.app
+    guild = app.state.data_store.get("guilds", {}).get(str(guild_id)) or {}
+    player = guild.get("players", {}).get(str(user_id))
+    if player is None:
+        raise HTTPException(status_code=404, detail="No such character")
+
+    version = app.state.store_follower.player_version(guild_id, user_id)
+    return JSONResponse(
+        {"guild_id": guild_id, "user_id": user_id, "version": version, "player": player},
+        headers={"ETag": f'"{version}"'},
+    )
+
+
+@router.patch("/api/players/{guild_id}/{user_id}")
+async def patch_player(
+    guild_id: str,
+    user_id: str,
+    body: PlayerPatch,
+    request: Request,
+    user: User = Depends(get_current_user),
+):
+    """
+    Compare-and-swap update of top-level character fields.
+
+    The bot applies it under the same per-player lock its commands use, and
+    only if the character is still at `expected_version`. Otherwise 409
+    with the current version and sheet, so the client can merge and retry.
+
+    Players may only touch PLAYER_EDITABLE_FIELDS (403 otherwise); the ST
+    can edit the whole sheet.
+    """
+    _require_access(user, user_id)
+    if Role.st not in user.roles:
+        denied = sorted(body.fields() - PLAYER_EDITABLE_FIELDS)
+        if denied:
+            raise HTTPException(
+                status_code=403,
+                detail=f"Only the ST can change: {', '.join(denied)}",
+            )
+    try:
+        reply = await request.app.state.store_control.patch_player(
+            guild_id, user_id, body.expected_version, body.changes, body.remove
+        )
+    except ConnectionError:
+        raise HTTPException(status_code=503, detail="Bot is not reachable")
+
+    if reply.get("ok"):
+        return JSONResponse(
+            {"guild_id": guild_id, "user_id": user_id, "version": reply["version"], "player": reply["player"]},
+            headers={"ETag": f'"{reply["version"]}"'},
+        )
+    if reply.get("error") == "not_found":
+        raise HTTPException(status_code=404, detail="No such character")
+    if reply.get("error") == "conflict":
+        return JSONResponse(
+            {"detail": "Version conflict", "version": reply["version"], "player": reply["player"]},
+            status_code=409,
+        )
+    raise HTTPException(status_code=500, detail=reply.get("detail", "Store write failed"))
+
+
+@router.get("/api/store/locks")
+async def store_lock_stats(
+    request: Request,
+    user: User = Depends(get_current_user),
+):
+    """
+    Lock contention metrics from the bot: totals plus the hottest keys by
+    time spent waiting and by CAS conflicts. ST only.
+    """
+    if Role.st not in user.roles:
+        raise HTTPException(status_code=403, detail="Only ST can view store metrics")
+    try:
+        reply = await request.app.state.store_control.lock_stats()
+    except ConnectionError:
+        raise HTTPException(status_code=503, detail="Bot is not reachable")
+    return JSONResponse({"locks": reply.get("locks", {}), "store": reply.get("store", {})})
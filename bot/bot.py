@@ -1,22 +1,100 @@
+import asyncio
 import os
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
+
+# Before the core imports: they read their settings from the environment
+# at import time.
+load_dotenv()
+
+from core.config import ai_model_json, ai_model_text
 from core.travel.zones_loader import ZoneRegistry
+from core.director.llm_scheduler import LLM_SCHEDULER
+from core.director.registry import DIRECTOR_PROPHECIES, DIRECTOR_THRESHOLDS, DIRECTORS
+from core.director.rules import DIRECTOR_RULES
+from core.director.director_system.nightly import NightlyScheduler
+from core.director.history import DIRECTOR_HISTORY_DIR
+from core.events import EventBus, EventLog, register_default_consumers
+from core.storage.backup import BackupService
+from core.storage.control import StoreControlServer
+from core.storage.locks import KeyedLocks
+from core.utils_bot import (
+    BOT_BACKUP_DIR,
+    BOT_BACKUP_INTERVAL,
+    BOT_DATA_PATH,
+    BOT_DIRECTOR_TICK_HOUR,
+    BOT_STORE_CONTROL,
+    open_bot_store,
+)
 
 bot.zone_registry = ZoneRegistry()
 bot.zone_registry.load()
 
-load_dotenv()
-
 TOKEN = os.getenv("DISCORD_BOT_TOKEN")
 
 class VTM(commands.Bot):
     def __init__(self):
         intents = discord.Intents.all()
         super().__init__(command_prefix="!", intents=intents)
+        self.store = open_bot_store()
+        self.data_store = self.store.data
+        # Per-player / per-guild locks for read-modify-write commands
+        self.locks = KeyedLocks()
+        self.store_control = StoreControlServer(self.store, self.locks, BOT_STORE_CONTROL)
+        # Game events: commands publish, Director/alerts/stats consume off
+        # the command path.
+        self.events = EventBus()
+        self.event_consumers = register_default_consumers(
+            self.events, DIRECTORS, event_log=EventLog(DIRECTOR_HISTORY_DIR)
+        )
+        # ST-registered Director thresholds and prophecy threads alert
+        # through the bus
+        DIRECTOR_THRESHOLDS.publish = self.events.publish
+        DIRECTOR_PROPHECIES.publish = self.events.publish
+        self.store_control.register("director_thresholds", DIRECTOR_THRESHOLDS.control_handler(DIRECTORS))
+        # Cogs call the models through these; core.config wraps them in
+        # LLM_SCHEDULER when it is enabled.
+        self.ai_model_text = ai_model_text
+        self.ai_model_json = ai_model_json
+        # Model call queue metrics for the dashboard
+        self.store_control.register("llm_stats", LLM_SCHEDULER.control_handler())
+
+    def save_data(self, guild_id=None, *path):
+        """
+        Persist a change to the data store.
+
+        save_data(guild_id, "players", user_id) journals just that subtree;
+        save_data() with no scope folds everything into a fresh snapshot.
+
+        Memory is updated immediately; the write is queued on the disk
+        writer. Await the returned PendingWrite only when the caller must
+        know the change is on disk.
+        """
+        if guild_id is None:
+            return self.store.compact()
+        return self.store.record(guild_id, *path)
 
     async def setup_hook(self):
+        await self.store_control.start()
+        self.events.start()
+        # Compile the Director rules now, so a broken rules file shows up
+        # in the startup log rather than at the first hunt.
+        DIRECTOR_RULES.reload_if_changed()
+        if BOT_BACKUP_INTERVAL > 0:
+            # Reads the files under a shared lock in a worker thread; the
+            # bot never waits on it.
+            self.backups = BackupService(BOT_DATA_PATH, BOT_BACKUP_DIR)
+            self.backup_task = asyncio.create_task(self.backups.run(BOT_BACKUP_INTERVAL))
+        if BOT_DIRECTOR_TICK_HOUR >= 0:
+            if not hasattr(self, "zone_registry"):
+                # Shared with the cogs (they reuse bot.zone_registry)
+                self.zone_registry = ZoneRegistry()
+                self.zone_registry.load()
+            self.nightly = NightlyScheduler(
+                self.store, DIRECTORS, hour_utc=BOT_DIRECTOR_TICK_HOUR, zones=self.zone_registry
+            )
+            self.nightly_task = asyncio.create_task(self.nightly.run())
         await self.load_extension("cogs.admin")
         await self.load_extension("cogs.player")
         await self.load_extension("cogs.hunting")
@@ -32,5 +110,19 @@ class VTM(commands.Bot):
     async def on_ready(self):
         print(f"Bot online as {self.user}")
 
+    async def close(self):
+        for name in ("backup_task", "nightly_task"):
+            task = getattr(self, name, None)
+            if task:
+                task.cancel()
+        await self.store_control.close()
+        # Let consumers finish what commands already published.
+        await self.events.close()
+        # Pending write-behind Director saves go out before the writer drains.
+        DIRECTORS.flush()
+        # close() waits for queued writes; keep that off the loop.
+        await asyncio.to_thread(self.store.close)
+        await super().close()
+
 bot = VTM()
 bot.run(TOKEN)
\ No newline at end of file
@@ -1,11 +1,12 @@
 import discord
 from discord.ext import commands
 
-from core.utils_bot import get_guild_data, load_data_from_file, save_data
+from core.utils_bot import load_data_from_file, save_data
+from core.utils_shared import get_guild_data
 from core.combat.combat_manager import CombatManager
 from core.combat.combatant_factory import CombatantFactory
 from core.combat.frenzy_system import FrenzySystem
-from director_system.hooks import apply_combat_event
+from core.events import AttackResolved
 from core.weapons.weapon_loader import load_weapons
 
 
@@ -179,18 +180,17 @@ class CombatCog(commands.Cog):
                 f"😡 **{attacker_name} is in Frenzy!** They must keep attacking until calmed or combat ends."
             )
 
-        # Director hook (Masquerade / Violence tracking)
-        severity = max(1, int(dmg)) if dmg is not None else 1
-        apply_combat_event(
-            guild_data=g_data,
-            outcome=outcome_str,
-            severity=severity,
+        # Director / alerts pick this up off the command path
+        self.bot.events.publish(AttackResolved(
+            guild_id=str(ctx.guild.id),
+            channel_id=str(ctx.channel.id),
             attacker=attacker_name,
             defender=result["defender"],
+            outcome=outcome_str,
+            damage=int(dmg or 0),
+            defeated=bool(result.get("defender_defeated") or result.get("defeated")),
             chaos=bestial_chaos,
-        )
-        # Persist updated director state and any other changes
-        self.bot.save_data()
+        ))
 
         # Advance turn
         actor = session.next_turn()
@@ -246,8 +246,8 @@ class CombatCog(commands.Cog):
         ST/Mod tool: end frenzy for a given combatant (by character name).
         """
         if FrenzySystem.is_frenzied(target):
+            # Frenzy lives in FrenzySystem, not in the store: nothing to save.
             FrenzySystem.clear_frenzy(target)
-            self.bot.save_data()
             await ctx.send(f"🧘 **{target} is calmed. Frenzy ends.**")
         else:
             await ctx.send(f"{target} is not currently frenzied.")
@@ -1,13 +1,16 @@
 import discord
 from discord.ext import commands
 
-from core.utils_bot import get_guild_data, load_data_from_file, save_data
+from core.utils_bot import load_data_from_file, save_data
+from core.utils_shared import get_guild_data
 from core.havens.haven_registry import HavenRegistry
 from core.havens.haven_engine import HavenEngine
 from core.travel.zones_loader import ZoneRegistry
 from core.havens.sheets_loader import load_sheet_havens, save_havens_file
 from core.vtmv5 import character_model
 from core.director.ai_director import AIDirector
+from core.director.scene_stream import deliver_scene
+from core.events import HavenRaided
 
 
 class HavenCog(commands.Cog):
@@ -195,79 +198,81 @@ class HavenCog(commands.Cog):
         """
         Create a haven at your current location_key.
         """
-        guild_data = get_guild_data(self.bot.data_store, ctx.guild.id)
-        players = guild_data.get("players") or {}
-        player = players.get(str(ctx.author.id))
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data = get_guild_data(self.bot.data_store, ctx.guild.id)
+            players = guild_data.get("players") or {}
+            player = players.get(str(ctx.author.id))
 
-        if not player:
-            return await ctx.reply("You do not have a character sheet.")
+            if not player:
+                return await ctx.reply("You do not have a character sheet.")
 
-        character_model.ensure_character_state(player)
+            character_model.ensure_character_state(player)
 
-        zone_key = player.get("location_key") or self.zone_registry.default_zone_key()
-        zone = self.zone_registry.get(zone_key) or self.zone_registry.find(zone_key)
+            zone_key = player.get("location_key") or self.zone_registry.default_zone_key()
+            zone = self.zone_registry.get(zone_key) or self.zone_registry.find(zone_key)
 
-        if not zone:
-            return await ctx.reply("Your current location is not a valid zone; ask the ST to fix it first.")
+            if not zone:
+                return await ctx.reply("Your current location is not a valid zone; ask the ST to fix it first.")
 
-        haven = self.engine.create_haven_for_player(
-            player_id=str(ctx.author.id),
-            name=name,
-            zone_key=zone.key,
-            lat=zone.latitude,
-            lng=zone.longitude,
-        )
+            haven = self.engine.create_haven_for_player(
+                player_id=str(ctx.author.id),
+                name=name,
+                zone_key=zone.key,
+                lat=zone.latitude,
+                lng=zone.longitude,
+            )
 
-        # If they have no primary haven yet, set this as primary
-        if not character_model.get_primary_haven_id(player):
-            character_model.set_primary_haven_id(player, haven.id)
-            self.bot.save_data()
+            # If they have no primary haven yet, set this as primary
+            if not character_model.get_primary_haven_id(player):
+                character_model.set_primary_haven_id(player, haven.id)
+                self.bot.save_data(ctx.guild.id, "players", str(ctx.author.id))
 
-        description = self._format_haven(haven)
+            description = self._format_haven(haven)
 
-        embed = discord.Embed(
-            title="Haven Established",
-            description=description,
-            color=discord.Color.dark_gold(),
-        )
-        await ctx.send(embed=embed)
+            embed = discord.Embed(
+                title="Haven Established",
+                description=description,
+                color=discord.Color.dark_gold(),
+            )
+            await ctx.send(embed=embed)
 
     @commands.command(name="haven")
     async def haven_create_zone(self, ctx: commands.Context, zone: str, *, name: str):
         """
         Create a haven in a named zone (by key or fuzzy name).
         """
-        guild_data = get_guild_data(self.bot.data_store, ctx.guild.id)
-        players = guild_data.get("players") or {}
-        player = players.get(str(ctx.author.id))
-
-        if not player:
-            return await ctx.reply("You do not have a character sheet.")
-
-        character_model.ensure_character_state(player)
-
-        z = self.zone_registry.find(zone)
-        if not z:
-            return await ctx.reply(f"Unknown zone `{zone}`.")
-
-        haven = self.engine.create_haven_for_player(
-            player_id=str(ctx.author.id),
-            name=name,
-            zone_key=z.key,
-            lat=z.latitude,
-            lng=z.longitude,
-        )
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data = get_guild_data(self.bot.data_store, ctx.guild.id)
+            players = guild_data.get("players") or {}
+            player = players.get(str(ctx.author.id))
+
+            if not player:
+                return await ctx.reply("You do not have a character sheet.")
+
+            character_model.ensure_character_state(player)
+
+            z = self.zone_registry.find(zone)
+            if not z:
+                return await ctx.reply(f"Unknown zone `{zone}`.")
+
+            haven = self.engine.create_haven_for_player(
+                player_id=str(ctx.author.id),
+                name=name,
+                zone_key=z.key,
+                lat=z.latitude,
+                lng=z.longitude,
+            )
 
-        if not character_model.get_primary_haven_id(player):
-            character_model.set_primary_haven_id(player, haven.id)
-            self.bot.save_data()
+            if not character_model.get_primary_haven_id(player):
+                character_model.set_primary_haven_id(player, haven.id)
+                self.bot.save_data(ctx.guild.id, "players", str(ctx.author.id))
 
-        embed = discord.Embed(
-            title="Haven Established",
-            description=self._format_haven(haven),
-            color=discord.Color.dark_gold(),
-        )
-        await ctx.send(embed=embed)
+            embed = discord.Embed(
+                title="Haven Established",
+                description=self._format_haven(haven),
+                color=discord.Color.dark_gold(),
+            )
+            await ctx.send(embed=embed)
 
     @commands.command(name="haven_info")
     async def haven_info(self, ctx: commands.Context, *, token: str):
@@ -300,24 +305,25 @@ class HavenCog(commands.Cog):
         """
         Set your primary haven by id or name.
         """
-        guild_data = get_guild_data(self.bot.data_store, ctx.guild.id)
-        players = guild_data.get("players") or {}
-        player = players.get(str(ctx.author.id))
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data = get_guild_data(self.bot.data_store, ctx.guild.id)
+            players = guild_data.get("players") or {}
+            player = players.get(str(ctx.author.id))
 
-        if not player:
-            return await ctx.reply("You do not have a character sheet.")
+            if not player:
+                return await ctx.reply("You do not have a character sheet.")
 
-        haven = self.engine.get_haven_by_id_or_name(token)
-        if not haven:
-            return await ctx.reply(f"No haven found for `{token}`.")
+            haven = self.engine.get_haven_by_id_or_name(token)
+            if not haven:
+                return await ctx.reply(f"No haven found for `{token}`.")
 
-        if str(ctx.author.id) not in haven.owner_ids:
-            return await ctx.reply("You are not an owner of that haven.")
+            if str(ctx.author.id) not in haven.owner_ids:
+                return await ctx.reply("You are not an owner of that haven.")
 
-        character_model.set_primary_haven_id(player, haven.id)
-        self.bot.save_data()
+            character_model.set_primary_haven_id(player, haven.id)
+            self.bot.save_data(ctx.guild.id, "players", str(ctx.author.id))
 
-        await ctx.reply(f"Primary haven set to **{haven.name}** (`{haven.id}`).")
+            await ctx.reply(f"Primary haven set to **{haven.name}** (`{haven.id}`).")
 
     @commands.command(name="haven_rest")
     async def haven_rest(self, ctx: commands.Context, token: str | None = None):
@@ -329,16 +335,18 @@ class HavenCog(commands.Cog):
           - Applies shelter effects to Director
         If no token is given, uses your primary haven (or first owned).
         """
-        guild_data, player, haven = self._resolve_player_and_haven(ctx, token)
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data, player, haven = self._resolve_player_and_haven(ctx, token)
 
-        if not player:
-            return await ctx.reply("You do not have a character sheet.")
-        if not haven:
-            return await ctx.reply("You do not own any havens yet.")
+            if not player:
+                return await ctx.reply("You do not have a character sheet.")
+            if not haven:
+                return await ctx.reply("You do not own any havens yet.")
 
-        result = self.engine.rest_in_haven(player, haven)
-        # Persist changes to player data
-        self.bot.save_data()
+            # Player sheet + Director shelter effects in one transaction
+            with self.bot.store.transaction() as tx:
+                result = self.engine.rest_in_haven(ctx.guild.id, player, haven, tx=tx)
+                tx.record(ctx.guild.id, "players", str(ctx.author.id))
 
         city = result.get("director", {})
 
@@ -392,8 +400,9 @@ class HavenCog(commands.Cog):
         base_risk = 2
         risk = max(1, base_risk - (haven.security // 2))
 
-        async with ctx.typing():
-            scene = await AIDirector.generate_scene(
+        await deliver_scene(
+            ctx,
+            lambda on_update: AIDirector.stream_scene(
                 model_text=self.bot.ai_model_text,
                 model_json=self.bot.ai_model_json,
                 guild_data=guild_data,
@@ -402,10 +411,11 @@ class HavenCog(commands.Cog):
                 travelers=[player],
                 risk=risk,
                 tags=["haven", "safehouse"],
-            )
-
-        embed = await self._scene_embed_from_result(ctx, scene, title_prefix=f"Haven Scene – {haven.name}")
-        await ctx.send(embed=embed)
+                on_update=on_update,
+            ),
+            lambda scene: self._scene_embed_from_result(ctx, scene, title_prefix=f"Haven Scene – {haven.name}"),
+            failure="Haven scene generation failed.",
+        )
 
     # -------------------------------------------------
     # ST commands
@@ -419,7 +429,7 @@ class HavenCog(commands.Cog):
         async with ctx.typing():
             try:
                 sheet_havens = load_sheet_havens()
-                save_havens_file(sheet_havens)
+                await save_havens_file(sheet_havens)
 
                 self.haven_registry.load()
                 await ctx.send("✅ Havens synced from sheet and registry reloaded.")
@@ -438,9 +448,18 @@ class HavenCog(commands.Cog):
         if not haven:
             return await ctx.reply(f"No haven found for `{token}`.")
 
-        result = self.engine.apply_raid(haven, severity=severity)
+        # havens.json and the Director state commit together
+        with self.bot.store.transaction() as tx:
+            result = self.engine.apply_raid(ctx.guild.id, haven, severity=severity, tx=tx)
         h = result["haven"]
         city = result["director"]
+        self.bot.events.publish(HavenRaided(
+            guild_id=str(ctx.guild.id),
+            haven_id=str(h["id"]),
+            haven_name=h["name"],
+            severity=result["severity"],
+            director=city,
+        ))
 
         embed = discord.Embed(
             title=f"Haven Raid – Severity {result['severity']}",
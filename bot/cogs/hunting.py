@@ -1,11 +1,14 @@
 import discord
 from discord.ext import commands
 
-from core.utils_bot import get_guild_data, load_data_from_file, save_data
+from core.utils_bot import load_data_from_file, save_data
+from core.utils_shared import get_guild_data
 from core.vtmv5.hunting_engine import HuntingEngine
 from core.vtmv5 import character_model
 from core.travel.zones_loader import ZoneRegistry
-from core.director.ai_director import _V5_DIRECTOR, _DIRECTOR_STATE
+from core.director.ai_director import v5_director
+from core.director.llm_scheduler import SCENE, llm_context
+from core.events import HuntResolved
 
 
 class HuntingCommands(commands.Cog):
@@ -32,13 +35,14 @@ class HuntingCommands(commands.Cog):
         Legacy/simple: generate a narrative victim for a given textual location.
         """
         guild_data = get_guild_data(self.bot.data_store, ctx.guild.id)
-        text = await generate_hunt_victim(
-            model=self.bot.ai_model_text,
-            guild_data=guild_data,
-            guild_id=ctx.guild.id,
-            location=location,
-            author_id=ctx.author.id,
-        )
+        with llm_context(SCENE, ctx.guild.id):
+            text = await generate_hunt_victim(
+                model=self.bot.ai_model_text,
+                guild_data=guild_data,
+                guild_id=ctx.guild.id,
+                location=location,
+                author_id=ctx.author.id,
+            )
         await ctx.send(text)
 
     # -------------------------------------------------
@@ -50,30 +54,46 @@ class HuntingCommands(commands.Cog):
         Perform a full V5-compatible hunt using HuntingEngine,
         zone data, Predator types, and update the V5 Director.
         """
-        guild_data = get_guild_data(self.bot.data_store, ctx.guild.id)
-        players = guild_data.get("players") or {}
-        player = players.get(str(ctx.author.id))
-
-        if not player:
-            return await ctx.reply("You do not have a character sheet.")
-
-        character_model.ensure_character_state(player)
-
-        location_key = player.get("location_key") or self.registry.default_zone_key()
-        zone = self.registry.get(location_key)
-
-        if not zone:
-            return await ctx.reply(
-                f"Your current location `{location_key}` is not a valid zone."
-            )
-
-        async with ctx.typing():
-            hunt_result = self.engine.hunt(player, zone)
-            # Wire this hunt into the V5 Director
-            directives = _V5_DIRECTOR.on_hunt(player, hunt_result, zone=zone)
-            _DIRECTOR_STATE.save()
+        # Held across the whole read-modify-write so a concurrent command
+        # or dashboard patch on this character cannot interleave.
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data = get_guild_data(self.bot.data_store, ctx.guild.id)
+            players = guild_data.get("players") or {}
+            player = players.get(str(ctx.author.id))
+
+            if not player:
+                return await ctx.reply("You do not have a character sheet.")
+
+            character_model.ensure_character_state(player)
+
+            location_key = player.get("location_key") or self.registry.default_zone_key()
+            zone = self.registry.get(location_key)
+
+            if not zone:
+                return await ctx.reply(
+                    f"Your current location `{location_key}` is not a valid zone."
+                )
+
+            async with ctx.typing():
+                director = v5_director(ctx.guild.id)
+                hunt_result = self.engine.hunt(player, zone, pressure=director.state.local_pressure(zone.key))
+                # Wire this hunt into the V5 Director; the character and the
+                # Director state are written together, once.
+                with self.bot.store.transaction() as tx:
+                    directives = director.on_hunt(player, hunt_result, zone=zone, tx=tx)
+                    tx.record(ctx.guild.id, "players", str(ctx.author.id))
 
         dice_res = hunt_result["dice_result"]
+        self.bot.events.publish(HuntResolved(
+            guild_id=str(ctx.guild.id),
+            user_id=str(ctx.author.id),
+            zone_key=location_key,
+            source=hunt_result.get("feeding_result", {}).get("source", "human"),
+            messy=dice_res.get("messy_critical", False),
+            bestial=dice_res.get("bestial_failure", False),
+            successes=dice_res.get("successes", 0),
+        ))
+
         feeding = hunt_result["feeding_result"]
 
         messy = dice_res.get("messy_critical", False)
@@ -1,9 +1,15 @@
 import discord
 from discord.ext import commands
-import traceback
 
 from core.director.ai_director import AIDirector
-from core.utils_bot import get_guild_data, load_data_from_file, save_data
+from core.director.director_system.prophecy import parse_thread, thread_status
+from core.director.llm_scheduler import LLM_SCHEDULER, PRIORITIES, ST, llm_context
+from core.director.registry import DIRECTOR_PROPHECIES, DIRECTOR_THRESHOLDS, DIRECTORS
+from core.director.scene_cache import GUILD_FLAG, SCENE_CACHE, enabled_for
+from core.director.scene_stream import deliver_scene
+from core.director.thresholds import SEVERITIES, parse_threshold
+from core.utils_bot import load_data_from_file, save_data
+from core.utils_shared import get_guild_data
 
 
 class StorytellerCog(commands.Cog):
@@ -14,6 +20,10 @@ class StorytellerCog(commands.Cog):
       !scene        – Players request a new scene in their current location
       !stscene      – Storyteller manually triggers a scene
       !stforce      – Force a scene with custom risk/tags
+      !threshold    – Alert the ST when a Director value crosses a level
+      !prophecy     – Staged prophecy threads driven by Director values
+      !scenecache   – Scene cache on/off, stats
+      !llmstats     – Model call queue, rate limit and drops
     """
 
     def __init__(self, bot):
@@ -115,23 +125,20 @@ class StorytellerCog(commands.Cog):
         if not location_key:
             return await ctx.reply("You are not currently located anywhere.")
 
-        async with ctx.typing():
-            try:
-                scene = await AIDirector.generate_scene(
-                    model_text=self.bot.ai_model_text,
-                    model_json=self.bot.ai_model_json,
-                    guild_data=guild_data,
-                    guild_id=ctx.guild.id,
-                    location_key=location_key,
-                    travelers=[player],
-                    risk=2,
-                )
-            except Exception:
-                traceback.print_exc()
-                return await ctx.reply("Scene generation failed.")
-
-        embed = await self.build_scene_embed(ctx, scene)
-        await ctx.send(embed=embed)
+        await deliver_scene(
+            ctx,
+            lambda on_update: AIDirector.stream_scene(
+                model_text=self.bot.ai_model_text,
+                model_json=self.bot.ai_model_json,
+                guild_data=guild_data,
+                guild_id=ctx.guild.id,
+                location_key=location_key,
+                travelers=[player],
+                risk=2,
+                on_update=on_update,
+            ),
+            lambda scene: self.build_scene_embed(ctx, scene),
+        )
 
     # --------------------------------------------------------
     # Storyteller command – manual scene
@@ -147,9 +154,11 @@ class StorytellerCog(commands.Cog):
         # If ST wants to run a scene without players, we use global directives
         travelers = []
 
-        async with ctx.typing():
-            try:
-                scene = await AIDirector.generate_scene(
+        # ST tooling: queued behind player scenes.
+        with llm_context(ST, ctx.guild.id):
+            await deliver_scene(
+                ctx,
+                lambda on_update: AIDirector.stream_scene(
                     model_text=self.bot.ai_model_text,
                     model_json=self.bot.ai_model_json,
                     guild_data=guild_data,
@@ -157,13 +166,10 @@ class StorytellerCog(commands.Cog):
                     location_key="elysium",  # safe default
                     travelers=travelers,
                     risk=severity,
-                )
-            except Exception:
-                traceback.print_exc()
-                return await ctx.reply("Scene generation failed.")
-
-        embed = await self.build_scene_embed(ctx, scene)
-        await ctx.send(embed=embed)
+                    on_update=on_update,
+                ),
+                lambda scene: self.build_scene_embed(ctx, scene),
+            )
 
     # --------------------------------------------------------
     # Storyteller force scene with custom tags
@@ -180,9 +186,10 @@ class StorytellerCog(commands.Cog):
         guild_data = get_guild_data(self.bot.data_store, ctx.guild.id)
         tags_list = [t.strip() for t in tags.split(",") if t.strip()]
 
-        async with ctx.typing():
-            try:
-                scene = await AIDirector.generate_scene(
+        with llm_context(ST, ctx.guild.id):
+            await deliver_scene(
+                ctx,
+                lambda on_update: AIDirector.stream_scene(
                     model_text=self.bot.ai_model_text,
                     model_json=self.bot.ai_model_json,
                     guild_data=guild_data,
@@ -191,13 +198,188 @@ class StorytellerCog(commands.Cog):
                     travelers=[],
                     risk=severity,
                     tags=tags_list,
+                    on_update=on_update,
+                ),
+                lambda scene: self.build_scene_embed(ctx, scene),
+                failure="Forced scene generation failed.",
+            )
+
+    # --------------------------------------------------------
+    # Storyteller Director thresholds
+    # --------------------------------------------------------
+    @commands.group(name="threshold", invoke_without_command=True)
+    @commands.has_permissions(administrator=True)
+    async def threshold(self, ctx):
+        await ctx.reply(
+            "Use: !threshold add <key> >= <value> [clear <n>] [severity], "
+            "!threshold list, !threshold remove <id>"
+        )
+
+    @threshold.command(name="add")
+    @commands.has_permissions(administrator=True)
+    async def threshold_add(self, ctx, *, spec: str):
+        """
+        Alert once when a Director value crosses a level.
+
+        Example:
+          !threshold add si_pressure >= 15 clear 12 critical
+          !threshold add theme:occult >= 9
+        """
+        words = spec.split()
+        severity = "high"
+        if words and words[-1].lower() in SEVERITIES:
+            severity = words.pop().lower()
+        clear = None
+        if len(words) >= 2 and words[-2].lower() == "clear":
+            try:
+                clear = int(words[-1])
+            except ValueError:
+                return await ctx.reply("`clear` needs a number.")
+            words = words[:-2]
+
+        try:
+            t = parse_threshold(" ".join(words), clear=clear, severity=severity)
+        except ValueError as e:
+            return await ctx.reply(str(e))
+        t = DIRECTOR_THRESHOLDS.add(ctx.guild.id, DIRECTORS.get(ctx.guild.id), t)
+        note = "" if t["armed"] else " (already past it: fires on the next crossing)"
+        await ctx.reply(
+            f"Threshold `{t['id']}`: {t['key']} {t['op']} {t['value']}, "
+            f"re-arms at {t['clear']}, {t['severity']}{note}."
+        )
+
+    @threshold.command(name="list")
+    @commands.has_permissions(administrator=True)
+    async def threshold_list(self, ctx):
+        items = DIRECTOR_THRESHOLDS.status(DIRECTORS.get(ctx.guild.id))
+        if not items:
+            return await ctx.reply("No Director thresholds set.")
+        lines = [
+            f"`{t['id']}` {t['key']} {t['op']} {t['value']} (now {t['current']}, "
+            f"{'armed' if t.get('armed', True) else 'fired'}, {t.get('severity', 'high')})"
+            for t in items
+        ]
+        await ctx.send("\n".join(lines))
+
+    @threshold.command(name="remove")
+    @commands.has_permissions(administrator=True)
+    async def threshold_remove(self, ctx, threshold_id: str):
+        if not DIRECTOR_THRESHOLDS.remove(ctx.guild.id, DIRECTORS.get(ctx.guild.id), threshold_id):
+            return await ctx.reply(f"No threshold `{threshold_id}`.")
+        await ctx.reply(f"Removed threshold `{threshold_id}`.")
+
+    # --------------------------------------------------------
+    # Storyteller prophecy threads
+    # --------------------------------------------------------
+    @commands.group(name="prophecy", invoke_without_command=True)
+    @commands.has_permissions(administrator=True)
+    async def prophecy(self, ctx):
+        await ctx.reply("Use: !prophecy add <spec>, !prophecy list, !prophecy remove <id>")
+
+    @prophecy.command(name="add")
+    @commands.has_permissions(administrator=True)
+    async def prophecy_add(self, ctx, *, spec: str):
+        """
+        Start a prophecy thread: a title line, then one stage per line.
+
+        Example:
+          !prophecy add The Red Star
+          theme:violence >= 7 => Omens of blood in the gutters
+          violence_pressure >= 12 and global_threat >= 3 => The Red Star rises
+          fail: masquerade_pressure <= 1
+        """
+        try:
+            thread = parse_thread(spec)
+        except ValueError as e:
+            return await ctx.reply(str(e))
+        t = DIRECTOR_PROPHECIES.add(ctx.guild.id, DIRECTORS.get(ctx.guild.id), thread)
+        await ctx.reply(
+            f"Prophecy `{t['id']}` **{t['title']}**: {len(t['stages'])} stage(s), "
+            f"at stage {t['stage']} ({t['status']})."
+        )
+
+    @prophecy.command(name="list")
+    @commands.has_permissions(administrator=True)
+    async def prophecy_list(self, ctx):
+        items = thread_status(DIRECTORS.get(ctx.guild.id))
+        if not items:
+            return await ctx.reply("No prophecy threads.")
+        lines = []
+        for t in items:
+            line = f"`{t['id']}` **{t['title']}** – {t['status']}, stage {t['stage']}/{len(t['stages'])}"
+            waiting = t.get("waiting_on")
+            if waiting:
+                line += " – waiting on " + ", ".join(
+                    f"{c['key']} {c['op']} {c['value']} (now {c['current']})" for c in waiting
                 )
-            except Exception:
-                traceback.print_exc()
-                return await ctx.reply("Forced scene generation failed.")
+            lines.append(line)
+        await ctx.send("\n".join(lines))
 
-        embed = await self.build_scene_embed(ctx, scene)
-        await ctx.send(embed=embed)
+    @prophecy.command(name="remove")
+    @commands.has_permissions(administrator=True)
+    async def prophecy_remove(self, ctx, thread_id: str):
+        if not DIRECTOR_PROPHECIES.remove(ctx.guild.id, DIRECTORS.get(ctx.guild.id), thread_id):
+            return await ctx.reply(f"No prophecy `{thread_id}`.")
+        await ctx.reply(f"Removed prophecy `{thread_id}`.")
+
+    # --------------------------------------------------------
+    # Scene cache
+    # --------------------------------------------------------
+    @commands.command(name="scenecache")
+    @commands.has_permissions(administrator=True)
+    async def scene_cache(self, ctx, action: str = "stats"):
+        """
+        Reuse near-identical scenes for a while (on by default).
+
+          !scenecache on|off    – opt this guild in / out
+          !scenecache clear     – drop this guild's cached scenes
+          !scenecache stats     – hit / miss counters (all guilds)
+        """
+        action = action.lower()
+        guild_data = get_guild_data(self.bot.data_store, ctx.guild.id)
+        if action in ("on", "off"):
+            guild_data[GUILD_FLAG] = action == "on"
+            self.bot.save_data(ctx.guild.id, GUILD_FLAG)
+            if action == "off":
+                SCENE_CACHE.clear(ctx.guild.id)
+            return await ctx.reply(f"Scene cache {action} for this server.")
+        if action == "clear":
+            n = SCENE_CACHE.clear(ctx.guild.id)
+            return await ctx.reply(f"Dropped {n} cached scene(s).")
+        if action != "stats":
+            return await ctx.reply("Use: !scenecache on|off|clear|stats")
+        st = SCENE_CACHE.stats()
+        state = "on" if enabled_for(guild_data) else "off"
+        await ctx.reply(
+            f"Scene cache {state} here: {st['entries']}/{st['capacity']} scenes, TTL {st['ttl']:.0f}s, "
+            f"{st['hits']} hits + {st['joined']} joined / {st['misses']} misses "
+            f"({st['hit_rate']:.0%}), {st['expired']} expired, {st['evictions']} evicted."
+        )
+
+    # --------------------------------------------------------
+    # Model call scheduler
+    # --------------------------------------------------------
+    @commands.command(name="llmstats")
+    @commands.has_permissions(administrator=True)
+    async def llm_stats(self, ctx):
+        """
+        Model call queue across all servers: depth and waits per priority,
+        the adaptive concurrency limit, 429s and dropped requests.
+        """
+        st = LLM_SCHEDULER.stats()
+        lines = [
+            f"In flight {st['in_flight']}/{st['limit']} (max {st['max_concurrency']}), "
+            f"{st['queued']} queued, latency {st['latency_ms']:.0f} ms, "
+            f"rate {st['rpm']:.0f}/min ({st['tokens']:.1f} tokens banked"
+            + (f", paused {st['paused_for']:.1f}s)" if st["paused_for"] else ")")
+        ]
+        for p in PRIORITIES:
+            c = st["classes"][p]
+            lines.append(
+                f"{p}: {c['queued']} queued, wait p50 {c['wait_p50_ms']:.0f} / p95 {c['wait_p95_ms']:.0f} ms, "
+                f"{c['completed']} done, {c['errors']} errors, {c['throttled']} throttled, {c['dropped']} dropped"
+            )
+        await ctx.reply("\n".join(lines))
 
 
 async def setup(bot):
@@ -4,12 +4,14 @@ import discord
 from discord.ext import commands
 from dotenv import load_dotenv
 
-from core.utils_bot import get_guild_data, load_data_from_file, save_data
+from core.utils_bot import load_data_from_file, save_data
+from core.utils_shared import get_guild_data
 from core.travel.zones_loader import ZoneRegistry
 from core.travel.travel_engine import TravelEngine
 from core.travel.sheets_loader import load_sheet_zones, save_zones_file
 from core.time.time_state import get_time_state, advance_time, format_time
-from core.director.ai_director import _V5_DIRECTOR, _DIRECTOR_STATE
+from core.director.ai_director import v5_director
+from core.events import TravelCompleted
 
 load_dotenv()
 
@@ -55,29 +57,24 @@ class TravelCog(commands.Cog):
 
     def _apply_travel_to_director(
         self,
+        guild_id,
         zone,
         time_info,
+        tx=None,
     ):
         """
-        Rough integration of travel + time into V5 Director state.
+        Rough integration of travel + time into the guild's V5 Director state.
+        With a store transaction (tx) the save is staged into it.
         """
-        risk = zone.base_risk
-
-        _DIRECTOR_STATE.adjust("masquerade_pressure", risk.get("masquerade", 1))
-        _DIRECTOR_STATE.adjust("violence_pressure", risk.get("violence", 1))
-        _DIRECTOR_STATE.adjust("occult_pressure", risk.get("occult", 1))
-        _DIRECTOR_STATE.adjust("si_pressure", risk.get("si", 1))
-
-        if time_info.get("crossed_sunrise"):
-            _DIRECTOR_STATE.adjust("masquerade_pressure", 2)
-            _DIRECTOR_STATE.adjust("si_pressure", 2)
-            _DIRECTOR_STATE.adjust("awareness", 2)
-        elif time_info.get("near_sunrise"):
-            _DIRECTOR_STATE.adjust_theme("masquerade", +1)
-            _DIRECTOR_STATE.adjust("awareness", 1)
-
-        _DIRECTOR_STATE.save()
-        return _DIRECTOR_STATE.summarize()
+        director = v5_director(guild_id)
+        director.apply_travel(
+            zone.base_risk,
+            crossed_sunrise=bool(time_info.get("crossed_sunrise")),
+            near_sunrise=bool(time_info.get("near_sunrise")),
+            tx=tx,
+            zone_key=zone.key,
+        )
+        return director.state.summarize()
 
     # -------------------------------------------------
     # Commands
@@ -122,72 +119,89 @@ class TravelCog(commands.Cog):
         """
         Travel to another zone by key or name (fuzzy).
         """
-        guild_data = get_guild_data(self.bot.data_store, ctx.guild.id)
-        players = guild_data.get("players") or {}
-        player = players.get(str(ctx.author.id))
-
-        if not player:
-            return await ctx.reply("You do not have a character sheet.")
-
-        async with ctx.typing():
-            result = self.engine.travel(player, destination)
-
-            if not result["success"]:
-                return await ctx.reply(result["msg"])
-
-            zone = result["zone"]
-            origin = result["origin"]
-            time_cost = result["time_cost"]
-
-            # Time progression
-            ts = get_time_state(guild_data)
-            time_info = advance_time(guild_data, time_cost)
-            time_str = format_time(time_info["time_state"])
-
-            director_summary = self._apply_travel_to_director(zone, time_info)
-
-        embed = discord.Embed(
-            title="Travel",
-            description=result["msg"],
-            color=discord.Color.dark_gold(),
-        )
-
-        embed.add_field(
-            name="Time Cost",
-            value=f"{time_cost} hours\nNew time: {time_str}",
-            inline=False,
-        )
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data = get_guild_data(self.bot.data_store, ctx.guild.id)
+            players = guild_data.get("players") or {}
+            player = players.get(str(ctx.author.id))
+
+            if not player:
+                return await ctx.reply("You do not have a character sheet.")
+
+            async with ctx.typing():
+                # Encounter odds read the destination's local Director pressure
+                result = self.engine.travel(
+                    player, destination, pressure=v5_director(ctx.guild.id).state.local_pressure
+                )
+
+                if not result["success"]:
+                    return await ctx.reply(result["msg"])
+
+                zone = result["zone"]
+                origin = result["origin"]
+                time_cost = result["time_cost"]
+
+                # Player location, guild time and Director state commit together
+                with self.bot.store.transaction() as tx:
+                    # Time progression
+                    ts = get_time_state(guild_data)
+                    time_info = advance_time(guild_data, time_cost)
+                    time_str = format_time(time_info["time_state"])
+
+                    director_summary = self._apply_travel_to_director(ctx.guild.id, zone, time_info, tx=tx)
+                    tx.record(ctx.guild.id, "players", str(ctx.author.id))
+                    tx.record(ctx.guild.id, "time_state")
+
+                self.bot.events.publish(TravelCompleted(
+                    guild_id=str(ctx.guild.id),
+                    user_id=str(ctx.author.id),
+                    origin_key=getattr(origin, "key", None),
+                    zone_key=zone.key,
+                    crossed_sunrise=bool(time_info.get("crossed_sunrise")),
+                    near_sunrise=bool(time_info.get("near_sunrise")),
+                ))
+
+            embed = discord.Embed(
+                title="Travel",
+                description=result["msg"],
+                color=discord.Color.dark_gold(),
+            )
 
-        embed.add_field(
-            name="Destination",
-            value=self._format_zone(zone),
-            inline=False,
-        )
+            embed.add_field(
+                name="Time Cost",
+                value=f"{time_cost} hours\nNew time: {time_str}",
+                inline=False,
+            )
 
-        city_state = director_summary
-        embed.add_field(
-            name="City Pressure (Director)",
-            value=(
-                f"Masquerade: {city_state.get('masquerade_pressure', 0)}\n"
-                f"Violence: {city_state.get('violence_pressure', 0)}\n"
-                f"Occult: {city_state.get('occult_pressure', 0)}\n"
-                f"SI: {city_state.get('si_pressure', 0)}\n"
-                f"Politics: {city_state.get('political_pressure', 0)}\n"
-                f"Global Threat: {city_state.get('global_threat', 1)}"
-            ),
-            inline=False,
-        )
+            embed.add_field(
+                name="Destination",
+                value=self._format_zone(zone),
+                inline=False,
+            )
 
-        if result["encounter"]:
-            enc = result["encounter"]
+            city_state = director_summary
             embed.add_field(
-                name="Travel Encounter",
-                value=f"{enc.get('text', 'Something happens on the road...')}\n"
-                      f"Severity: {enc.get('severity', 1)}",
+                name="City Pressure (Director)",
+                value=(
+                    f"Masquerade: {city_state.get('masquerade_pressure', 0)}\n"
+                    f"Violence: {city_state.get('violence_pressure', 0)}\n"
+                    f"Occult: {city_state.get('occult_pressure', 0)}\n"
+                    f"SI: {city_state.get('si_pressure', 0)}\n"
+                    f"Politics: {city_state.get('political_pressure', 0)}\n"
+                    f"Global Threat: {city_state.get('global_threat', 1)}"
+                ),
                 inline=False,
             )
 
-        await ctx.send(embed=embed)
+            if result["encounter"]:
+                enc = result["encounter"]
+                embed.add_field(
+                    name="Travel Encounter",
+                    value=f"{enc.get('text', 'Something happens on the road...')}\n"
+                          f"Severity: {enc.get('severity', 1)}",
+                    inline=False,
+                )
+
+            await ctx.send(embed=embed)
 
     @commands.command(name="sync_zones")
     @commands.has_permissions(administrator=True)
@@ -198,7 +212,7 @@ class TravelCog(commands.Cog):
         async with ctx.typing():
             try:
                 zones = load_sheet_zones()  # uses .env defaults
-                save_zones_file(zones)
+                await save_zones_file(zones)
 
                 self.registry.load()
                 self.bot.zone_registry = self.registry
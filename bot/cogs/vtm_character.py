@@ -1,7 +1,8 @@
 import discord
 from discord.ext import commands
 
-from core.utils_bot import get_guild_data, load_data_from_file, save_data
+from core.utils_bot import load_data_from_file, save_data
+from core.utils_shared import get_guild_data
 from core.vtmv5 import character_model, merits_flaws, humanity
 
 
@@ -94,41 +95,43 @@ class VtMCharacterCog(commands.Cog):
         *,
         note: str = "",
     ):
-        guild_data, player = await self._require_player(ctx)
-        if not player:
-            return
-
-        # Try to match a registered merit first
-        reg = merits_flaws.get_merit(name)
-        if reg:
-            name = reg["name"]
-            dots = reg.get("dots", dots)
-            mtype = reg.get("category", mtype)
-            tags = reg.get("tags", [])
-        else:
-            tags = []
-
-        character_model.add_merit(
-            player,
-            name=name,
-            dots=dots,
-            m_type=mtype,
-            tags=tags,
-            note=note,
-        )
-        self.bot.save_data()
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data, player = await self._require_player(ctx)
+            if not player:
+                return
+
+            # Try to match a registered merit first
+            reg = merits_flaws.get_merit(name)
+            if reg:
+                name = reg["name"]
+                dots = reg.get("dots", dots)
+                mtype = reg.get("category", mtype)
+                tags = reg.get("tags", [])
+            else:
+                tags = []
+
+            character_model.add_merit(
+                player,
+                name=name,
+                dots=dots,
+                m_type=mtype,
+                tags=tags,
+                note=note,
+            )
+            self.bot.save_data(ctx.guild.id, "players", str(ctx.author.id))
 
-        await ctx.reply(f"✅ Merit **{name} ({dots})** added/updated.")
+            await ctx.reply(f"✅ Merit **{name} ({dots})** added/updated.")
 
     @commands.command(name="remove_merit")
     async def remove_merit_cmd(self, ctx: commands.Context, *, name: str):
-        guild_data, player = await self._require_player(ctx)
-        if not player:
-            return
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data, player = await self._require_player(ctx)
+            if not player:
+                return
 
-        character_model.remove_merit(player, name)
-        self.bot.save_data()
-        await ctx.reply(f"✅ Merit **{name}** removed (if it existed).")
+            character_model.remove_merit(player, name)
+            self.bot.save_data(ctx.guild.id, "players", str(ctx.author.id))
+            await ctx.reply(f"✅ Merit **{name}** removed (if it existed).")
 
     # --------------------------------------------------
     # Flaws
@@ -171,40 +174,42 @@ class VtMCharacterCog(commands.Cog):
         *,
         note: str = "",
     ):
-        guild_data, player = await self._require_player(ctx)
-        if not player:
-            return
-
-        reg = merits_flaws.get_flaw(name)
-        if reg:
-            name = reg["name"]
-            dots = reg.get("dots", dots)
-            ftype = reg.get("category", ftype)
-            tags = reg.get("tags", [])
-        else:
-            tags = []
-
-        character_model.add_flaw(
-            player,
-            name=name,
-            dots=dots,
-            f_type=ftype,
-            tags=tags,
-            note=note,
-        )
-        self.bot.save_data()
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data, player = await self._require_player(ctx)
+            if not player:
+                return
+
+            reg = merits_flaws.get_flaw(name)
+            if reg:
+                name = reg["name"]
+                dots = reg.get("dots", dots)
+                ftype = reg.get("category", ftype)
+                tags = reg.get("tags", [])
+            else:
+                tags = []
+
+            character_model.add_flaw(
+                player,
+                name=name,
+                dots=dots,
+                f_type=ftype,
+                tags=tags,
+                note=note,
+            )
+            self.bot.save_data(ctx.guild.id, "players", str(ctx.author.id))
 
-        await ctx.reply(f"✅ Flaw **{name} ({dots})** added/updated.")
+            await ctx.reply(f"✅ Flaw **{name} ({dots})** added/updated.")
 
     @commands.command(name="remove_flaw")
     async def remove_flaw_cmd(self, ctx: commands.Context, *, name: str):
-        guild_data, player = await self._require_player(ctx)
-        if not player:
-            return
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data, player = await self._require_player(ctx)
+            if not player:
+                return
 
-        character_model.remove_flaw(player, name)
-        self.bot.save_data()
-        await ctx.reply(f"✅ Flaw **{name}** removed (if it existed).")
+            character_model.remove_flaw(player, name)
+            self.bot.save_data(ctx.guild.id, "players", str(ctx.author.id))
+            await ctx.reply(f"✅ Flaw **{name}** removed (if it existed).")
 
     # --------------------------------------------------
     # Convictions
@@ -230,24 +235,26 @@ class VtMCharacterCog(commands.Cog):
 
     @commands.command(name="add_conviction")
     async def add_conviction_cmd(self, ctx: commands.Context, *, text: str):
-        guild_data, player = await self._require_player(ctx)
-        if not player:
-            return
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data, player = await self._require_player(ctx)
+            if not player:
+                return
 
-        character_model.add_conviction(player, text=text)
-        self.bot.save_data()
-        await ctx.reply("✅ Conviction added.")
+            character_model.add_conviction(player, text=text)
+            self.bot.save_data(ctx.guild.id, "players", str(ctx.author.id))
+            await ctx.reply("✅ Conviction added.")
 
     @commands.command(name="remove_conviction")
     async def remove_conviction_cmd(self, ctx: commands.Context, index: int):
-        guild_data, player = await self._require_player(ctx)
-        if not player:
-            return
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data, player = await self._require_player(ctx)
+            if not player:
+                return
 
-        # user sees 1-based index; we store 0-based
-        character_model.remove_conviction(player, index - 1)
-        self.bot.save_data()
-        await ctx.reply(f"✅ Conviction #{index} removed (if it existed).")
+            # user sees 1-based index; we store 0-based
+            character_model.remove_conviction(player, index - 1)
+            self.bot.save_data(ctx.guild.id, "players", str(ctx.author.id))
+            await ctx.reply(f"✅ Conviction #{index} removed (if it existed).")
 
     # --------------------------------------------------
     # Touchstones
@@ -289,13 +296,14 @@ class VtMCharacterCog(commands.Cog):
         *,
         role: str = "",
     ):
-        guild_data, player = await self._require_player(ctx)
-        if not player:
-            return
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data, player = await self._require_player(ctx)
+            if not player:
+                return
 
-        character_model.add_touchstone(player, name=name, role=role)
-        self.bot.save_data()
-        await ctx.reply(f"✅ Touchstone **{name}** added as '{role}'.")
+            character_model.add_touchstone(player, name=name, role=role)
+            self.bot.save_data(ctx.guild.id, "players", str(ctx.author.id))
+            await ctx.reply(f"✅ Touchstone **{name}** added as '{role}'.")
 
     @commands.command(name="kill_touchstone")
     async def kill_touchstone_cmd(
@@ -311,35 +319,37 @@ class VtMCharacterCog(commands.Cog):
           !kill_touchstone Alice
           !kill_touchstone Alice no   (for non-deliberate / tragic loss)
         """
-        guild_data, player = await self._require_player(ctx)
-        if not player:
-            return
-
-        deliberate_flag = str(deliberate).lower() not in ("no", "false", "0")
-        humanity.apply_touchstone_loss(player, name=name, deliberate=deliberate_flag)
-        self.bot.save_data()
-
-        if deliberate_flag:
-            msg = (
-                f"Touchstone **{name}** marked dead. "
-                "This deliberate loss inflicts extra Stains."
-            )
-        else:
-            msg = (
-                f"Touchstone **{name}** marked dead. "
-                "Stains applied for tragic loss."
-            )
-        await ctx.reply(f"⚫ {msg}")
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data, player = await self._require_player(ctx)
+            if not player:
+                return
+
+            deliberate_flag = str(deliberate).lower() not in ("no", "false", "0")
+            humanity.apply_touchstone_loss(player, name=name, deliberate=deliberate_flag)
+            self.bot.save_data(ctx.guild.id, "players", str(ctx.author.id))
+
+            if deliberate_flag:
+                msg = (
+                    f"Touchstone **{name}** marked dead. "
+                    "This deliberate loss inflicts extra Stains."
+                )
+            else:
+                msg = (
+                    f"Touchstone **{name}** marked dead. "
+                    "Stains applied for tragic loss."
+                )
+            await ctx.reply(f"⚫ {msg}")
 
     @commands.command(name="remove_touchstone")
     async def remove_touchstone_cmd(self, ctx: commands.Context, *, name: str):
-        guild_data, player = await self._require_player(ctx)
-        if not player:
-            return
-
-        character_model.remove_touchstone(player, name)
-        self.bot.save_data()
-        await ctx.reply(f"✅ Touchstone **{name}** removed (if it existed).")
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data, player = await self._require_player(ctx)
+            if not player:
+                return
+
+            character_model.remove_touchstone(player, name)
+            self.bot.save_data(ctx.guild.id, "players", str(ctx.author.id))
+            await ctx.reply(f"✅ Touchstone **{name}** removed (if it existed).")
 
 
 async def setup(bot: commands.Bot):
@@ -1,6 +1,8 @@
 import discord
 from discord.ext import commands
-from core.utils_bot import get_guild_data, load_data_from_file, save_data
+from core.utils_bot import load_data_from_file, save_data
+from core.utils_shared import get_guild_data
+from core.events import FrenzyFailed
 from core.vtmv5 import (
     dice,
     hunger,
@@ -78,57 +80,58 @@ class VtMV5Cog(commands.Cog):
           Touchstones, Havens) exist.
         - Optionally sets a Predator Type by name or key.
         """
-        guild_data = get_guild_data(self.bot.data_store, ctx.guild.id)
-        players = guild_data.setdefault("players", {})
-        pid = str(ctx.author.id)
-        player = players.get(pid, {"id": pid})
-
-        # basic meta
-        player["name"] = name
-        player["clan"] = clan
-
-        predator_key = None
-        predator_name = None
-        if predator:
-            pt = predator_types.get_predator_type(predator)
-            if not pt:
-                await ctx.reply(
-                    f"Unknown predator type `{predator}`. Sheet created without predator type.\n"
-                    f"Use `!predator` to see options."
-                )
-            else:
-                predator_key = pt["key"]
-                predator_name = pt["name"]
-
-        character_model.bootstrap_v5_character(
-            player,
-            name=name,
-            clan=clan,
-            predator_key=predator_key,
-            predator_name=predator_name,
-        )
-
-        players[pid] = player
-        # Persist via bot's save hook if it exists
-        save = getattr(self.bot, "save_data", None)
-        if callable(save):
-            save()
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data = get_guild_data(self.bot.data_store, ctx.guild.id)
+            players = guild_data.setdefault("players", {})
+            pid = str(ctx.author.id)
+            player = players.get(pid, {"id": pid})
+
+            # basic meta
+            player["name"] = name
+            player["clan"] = clan
+
+            predator_key = None
+            predator_name = None
+            if predator:
+                pt = predator_types.get_predator_type(predator)
+                if not pt:
+                    await ctx.reply(
+                        f"Unknown predator type `{predator}`. Sheet created without predator type.\n"
+                        f"Use `!predator` to see options."
+                    )
+                else:
+                    predator_key = pt["key"]
+                    predator_name = pt["name"]
+
+            character_model.bootstrap_v5_character(
+                player,
+                name=name,
+                clan=clan,
+                predator_key=predator_key,
+                predator_name=predator_name,
+            )
 
-        predator_display = predator_name or "None"
-        embed = discord.Embed(
-            title="V5 Sheet Created/Updated",
-            description=(
-                f"**Name:** {player.get('name')}\n"
-                f"**Clan:** {player.get('clan')}\n"
-                f"**Predator Type:** {predator_display}"
-            ),
-            color=discord.Color.dark_red(),
-        )
-        embed.add_field(name="Hunger", value=str(character_model.get_hunger(player)), inline=True)
-        embed.add_field(name="Humanity", value=str(character_model.get_humanity(player)), inline=True)
-        embed.add_field(name="Blood Potency", value=str(character_model.get_blood_potency(player)), inline=True)
+            players[pid] = player
+            # Persist via bot's save hook if it exists
+            save = getattr(self.bot, "save_data", None)
+            if callable(save):
+                save(ctx.guild.id, "players", pid)
+
+            predator_display = predator_name or "None"
+            embed = discord.Embed(
+                title="V5 Sheet Created/Updated",
+                description=(
+                    f"**Name:** {player.get('name')}\n"
+                    f"**Clan:** {player.get('clan')}\n"
+                    f"**Predator Type:** {predator_display}"
+                ),
+                color=discord.Color.dark_red(),
+            )
+            embed.add_field(name="Hunger", value=str(character_model.get_hunger(player)), inline=True)
+            embed.add_field(name="Humanity", value=str(character_model.get_humanity(player)), inline=True)
+            embed.add_field(name="Blood Potency", value=str(character_model.get_blood_potency(player)), inline=True)
 
-        await ctx.send(embed=embed)
+            await ctx.send(embed=embed)
 
     @commands.command(name="v5sheet")
     async def v5sheet(self, ctx):
@@ -333,31 +336,32 @@ class VtMV5Cog(commands.Cog):
         """
         Perform a Rouse Check for your character.
         """
-        guild_data, player = self._get_player(ctx)
-        if not player:
-            return await ctx.reply("You don't have a character sheet yet.")
-
-        res = hunger.rouse_check(player)
-        if callable(getattr(self.bot, "save_data", None)):
-            self.bot.save_data()
-
-        embed = discord.Embed(
-            title=f"Rouse Check – {player.get('name', ctx.author.display_name)}",
-            color=discord.Color.dark_red(),
-        )
-        embed.add_field(name="Roll", value=str(res["roll"]), inline=True)
-        embed.add_field(
-            name="Result",
-            value="Success" if res["success"] else "Failure (Hunger +1)",
-            inline=True,
-        )
-        embed.add_field(
-            name="Hunger",
-            value=f"{res['old_hunger']} → {res['new_hunger']}",
-            inline=False,
-        )
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data, player = self._get_player(ctx)
+            if not player:
+                return await ctx.reply("You don't have a character sheet yet.")
+
+            res = hunger.rouse_check(player)
+            if callable(getattr(self.bot, "save_data", None)):
+                self.bot.save_data(ctx.guild.id, "players", str(ctx.author.id))
+
+            embed = discord.Embed(
+                title=f"Rouse Check – {player.get('name', ctx.author.display_name)}",
+                color=discord.Color.dark_red(),
+            )
+            embed.add_field(name="Roll", value=str(res["roll"]), inline=True)
+            embed.add_field(
+                name="Result",
+                value="Success" if res["success"] else "Failure (Hunger +1)",
+                inline=True,
+            )
+            embed.add_field(
+                name="Hunger",
+                value=f"{res['old_hunger']} → {res['new_hunger']}",
+                inline=False,
+            )
 
-        await ctx.send(embed=embed)
+            await ctx.send(embed=embed)
 
     @commands.command(name="frenzy")
     async def frenzy(self, ctx, dice_pool: int, difficulty: int):
@@ -365,35 +369,44 @@ class VtMV5Cog(commands.Cog):
         Frenzy / Rötschreck test:
           !frenzy 5 3
         """
-        guild_data, player = self._get_player(ctx)
-        if not player:
-            return await ctx.reply("You don't have a character sheet yet.")
-
-        res = frenzy_mod.frenzy_test(player, dice_pool, difficulty)
-        if callable(getattr(self.bot, "save_data", None)):
-            self.bot.save_data()
-
-        roll = res["result"]
-        dice_str = " ".join(str(d) for d in roll["dice"])
-        hunger_str = " ".join(str(d) for d in roll["hunger_dice"])
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data, player = self._get_player(ctx)
+            if not player:
+                return await ctx.reply("You don't have a character sheet yet.")
+
+            res = frenzy_mod.frenzy_test(player, dice_pool, difficulty)
+            if callable(getattr(self.bot, "save_data", None)):
+                self.bot.save_data(ctx.guild.id, "players", str(ctx.author.id))
+            if res["failed"]:
+                self.bot.events.publish(FrenzyFailed(
+                    guild_id=str(ctx.guild.id),
+                    user_id=str(ctx.author.id),
+                    character=player.get("name", ctx.author.display_name),
+                    messy=res["result"].get("messy_critical", False),
+                    bestial=res["result"].get("bestial_failure", False),
+                ))
+
+            roll = res["result"]
+            dice_str = " ".join(str(d) for d in roll["dice"])
+            hunger_str = " ".join(str(d) for d in roll["hunger_dice"])
+
+            color = discord.Color.dark_red() if res["failed"] else discord.Color.dark_green()
+            embed = discord.Embed(
+                title=f"Frenzy Test – {player.get('name', ctx.author.display_name)}",
+                color=color,
+            )
+            embed.add_field(name="Dice Pool", value=str(dice_pool), inline=True)
+            embed.add_field(name="Difficulty", value=str(difficulty), inline=True)
+            embed.add_field(name="Hunger", value=str(character_model.get_hunger(player)), inline=True)
 
-        color = discord.Color.dark_red() if res["failed"] else discord.Color.dark_green()
-        embed = discord.Embed(
-            title=f"Frenzy Test – {player.get('name', ctx.author.display_name)}",
-            color=color,
-        )
-        embed.add_field(name="Dice Pool", value=str(dice_pool), inline=True)
-        embed.add_field(name="Difficulty", value=str(difficulty), inline=True)
-        embed.add_field(name="Hunger", value=str(character_model.get_hunger(player)), inline=True)
+            embed.add_field(name="Normal Dice", value=dice_str or "—", inline=False)
+            embed.add_field(name="Hunger Dice", value=hunger_str or "—", inline=False)
+            embed.add_field(name="Successes", value=str(roll["successes"]), inline=True)
 
-        embed.add_field(name="Normal Dice", value=dice_str or "—", inline=False)
-        embed.add_field(name="Hunger Dice", value=hunger_str or "—", inline=False)
-        embed.add_field(name="Successes", value=str(roll["successes"]), inline=True)
-
-        state = "🐺 Frenzied!" if res["failed"] else "Calm"
-        embed.add_field(name="Outcome", value=state, inline=False)
+            state = "🐺 Frenzied!" if res["failed"] else "Calm"
+            embed.add_field(name="Outcome", value=state, inline=False)
 
-        await ctx.send(embed=embed)
+            await ctx.send(embed=embed)
 
     @commands.command(name="wp")
     async def show_willpower(self, ctx):
@@ -422,48 +435,50 @@ class VtMV5Cog(commands.Cog):
         """
         Add Stains to your Humanity track (Storyteller call).
         """
-        guild_data, player = self._get_player(ctx)
-        if not player:
-            return await ctx.reply("You don't have a character sheet yet.")
-
-        humanity.apply_stain(player, amount=amount)
-        if callable(getattr(self.bot, "save_data", None)):
-            self.bot.save_data()
-
-        embed = discord.Embed(
-            title=f"Stains Applied – {player.get('name', ctx.author.display_name)}",
-            color=discord.Color.dark_red(),
-        )
-        embed.add_field(name="New Stains", value=str(character_model.get_stains(player)), inline=True)
-        embed.add_field(name="Humanity", value=str(character_model.get_humanity(player)), inline=True)
-        await ctx.send(embed=embed)
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data, player = self._get_player(ctx)
+            if not player:
+                return await ctx.reply("You don't have a character sheet yet.")
+
+            humanity.apply_stain(player, amount=amount)
+            if callable(getattr(self.bot, "save_data", None)):
+                self.bot.save_data(ctx.guild.id, "players", str(ctx.author.id))
+
+            embed = discord.Embed(
+                title=f"Stains Applied – {player.get('name', ctx.author.display_name)}",
+                color=discord.Color.dark_red(),
+            )
+            embed.add_field(name="New Stains", value=str(character_model.get_stains(player)), inline=True)
+            embed.add_field(name="Humanity", value=str(character_model.get_humanity(player)), inline=True)
+            await ctx.send(embed=embed)
 
     @commands.command(name="remorse")
     async def remorse(self, ctx):
         """
         Perform a Remorse roll for your character.
         """
-        guild_data, player = self._get_player(ctx)
-        if not player:
-            return await ctx.reply("You don't have a character sheet yet.")
-
-        res = humanity.remorse_roll(player)
-        if callable(getattr(self.bot, "save_data", None)):
-            self.bot.save_data()
-
-        embed = discord.Embed(
-            title=f"Remorse Roll – {player.get('name', ctx.author.display_name)}",
-            color=discord.Color.dark_purple(),
-        )
-        embed.add_field(name="Dice", value=str(res["dice"]), inline=True)
-        embed.add_field(name="Successes", value=str(res["successes"]), inline=True)
-        embed.add_field(
-            name="Result",
-            value="Remorse" if res["remorse"] else "No Remorse",
-            inline=True,
-        )
-        embed.add_field(name="Humanity", value=str(res["new_humanity"]), inline=False)
-        await ctx.send(embed=embed)
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data, player = self._get_player(ctx)
+            if not player:
+                return await ctx.reply("You don't have a character sheet yet.")
+
+            res = humanity.remorse_roll(player)
+            if callable(getattr(self.bot, "save_data", None)):
+                self.bot.save_data(ctx.guild.id, "players", str(ctx.author.id))
+
+            embed = discord.Embed(
+                title=f"Remorse Roll – {player.get('name', ctx.author.display_name)}",
+                color=discord.Color.dark_purple(),
+            )
+            embed.add_field(name="Dice", value=str(res["dice"]), inline=True)
+            embed.add_field(name="Successes", value=str(res["successes"]), inline=True)
+            embed.add_field(
+                name="Result",
+                value="Remorse" if res["remorse"] else "No Remorse",
+                inline=True,
+            )
+            embed.add_field(name="Humanity", value=str(res["new_humanity"]), inline=False)
+            await ctx.send(embed=embed)
 
     @commands.command(name="v5stats")
     async def v5stats(self, ctx):
@@ -516,23 +531,24 @@ class VtMV5Cog(commands.Cog):
           !predator              -> show current
           !predator alleycat     -> set to Alleycat
         """
-        guild_data, player = self._get_player(ctx)
-        if not player:
-            return await ctx.reply("You don't have a character sheet yet.")
-
-        if not name:
-            current = character_model.get_predator_type_name(player)
-            if not current:
-                return await ctx.reply(
-                    "No predator type set. Use `!predator <name>`.\n"
-                    "Try `!predatorinfo alleycat` or `!predatorinfo bagger` for examples."
-                )
-            return await ctx.reply(f"Your predator type is **{current}**.")
-
-        pt = predator_types.set_player_predator_type(player, name)
-        if callable(getattr(self.bot, "save_data", None)):
-            self.bot.save_data()
-        await ctx.reply(f"Predator type set to **{pt['name']}**.")
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data, player = self._get_player(ctx)
+            if not player:
+                return await ctx.reply("You don't have a character sheet yet.")
+
+            if not name:
+                current = character_model.get_predator_type_name(player)
+                if not current:
+                    return await ctx.reply(
+                        "No predator type set. Use `!predator <name>`.\n"
+                        "Try `!predatorinfo alleycat` or `!predatorinfo bagger` for examples."
+                    )
+                return await ctx.reply(f"Your predator type is **{current}**.")
+
+            pt = predator_types.set_player_predator_type(player, name)
+            if callable(getattr(self.bot, "save_data", None)):
+                self.bot.save_data(ctx.guild.id, "players", str(ctx.author.id))
+            await ctx.reply(f"Predator type set to **{pt['name']}**.")
 
     @commands.command(name="predatorinfo")
     async def predatorinfo(self, ctx, *, name: str):
@@ -592,38 +608,39 @@ class VtMV5Cog(commands.Cog):
         source: human / animal / bagged / vampire
         amount: approximate "intensity" (1–3, more for dramatic scenes)
         """
-        guild_data, player = self._get_player(ctx)
-        if not player:
-            return await ctx.reply("You don't have a character sheet yet.")
+        async with self.bot.locks.player(ctx.guild.id, ctx.author.id):
+            guild_data, player = self._get_player(ctx)
+            if not player:
+                return await ctx.reply("You don't have a character sheet yet.")
 
-        src_norm = source.lower()
-        if src_norm not in ("human", "animal", "bagged", "vampire"):
-            return await ctx.reply("Source must be one of: human, animal, bagged, vampire.")
+            src_norm = source.lower()
+            if src_norm not in ("human", "animal", "bagged", "vampire"):
+                return await ctx.reply("Source must be one of: human, animal, bagged, vampire.")
 
-        res = hunger.apply_feeding(player, src_norm, amount)
-        if callable(getattr(self.bot, "save_data", None)):
-            self.bot.save_data()
+            res = hunger.apply_feeding(player, src_norm, amount)
+            if callable(getattr(self.bot, "save_data", None)):
+                self.bot.save_data(ctx.guild.id, "players", str(ctx.author.id))
 
-        predator_name = res["predator_type"] or (
-            character_model.get_predator_type_name(player) or "None"
-        )
-        notes = "\n".join(res["notes"]) if res["notes"] else "—"
+            predator_name = res["predator_type"] or (
+                character_model.get_predator_type_name(player) or "None"
+            )
+            notes = "\n".join(res["notes"]) if res["notes"] else "—"
 
-        embed = discord.Embed(
-            title=f"Feeding – {player.get('name', ctx.author.display_name)}",
-            color=discord.Color.dark_red(),
-        )
-        embed.add_field(name="Source", value=src_norm, inline=True)
-        embed.add_field(name="Amount", value=str(res["amount"]), inline=True)
-        embed.add_field(name="Predator Type", value=predator_name, inline=True)
-        embed.add_field(
-            name="Hunger",
-            value=f"{res['old_hunger']} → {res['new_hunger']}",
-            inline=False,
-        )
-        embed.add_field(name="Notes", value=notes, inline=False)
+            embed = discord.Embed(
+                title=f"Feeding – {player.get('name', ctx.author.display_name)}",
+                color=discord.Color.dark_red(),
+            )
+            embed.add_field(name="Source", value=src_norm, inline=True)
+            embed.add_field(name="Amount", value=str(res["amount"]), inline=True)
+            embed.add_field(name="Predator Type", value=predator_name, inline=True)
+            embed.add_field(
+                name="Hunger",
+                value=f"{res['old_hunger']} → {res['new_hunger']}",
+                inline=False,
+            )
+            embed.add_field(name="Notes", value=notes, inline=False)
 
-        await ctx.send(embed=embed)
+            await ctx.send(embed=embed)
 
 
 async def setup(bot: commands.Bot):
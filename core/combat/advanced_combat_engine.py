@@ -8,7 +8,6 @@ import math
 from core.combat.attack_outcomes import AttackOutcome
 from core.combat.frenzy_system import FrenzySystem, FrenzyTrigger
 from core.combat.bestial_chaos import roll_bestial_chaos
-from core.director.director import Director   # AI Director integration
 
 
 @dataclass
@@ -188,18 +187,8 @@ class CombatEngine:
 
         dmg_report = self.apply_damage(defender, damage, aggravated)
 
-        # DIRECTOR HOOKS
-        if dice.outcome in [AttackOutcome.BESTIAL_SUCCESS, AttackOutcome.MESSY_CRITICAL]:
-            Director.modify_influence("violence", +1)
-
-        if dice.outcome == AttackOutcome.BESTIAL_FAILURE:
-            Director.modify_influence("masquerade", +1)
-
-        if dice.outcome == AttackOutcome.MESSY_CRITICAL:
-            Director.modify_influence("violence", +2)
-
-        if dice.outcome == AttackOutcome.BESTIAL_SUCCESS:
-            Director.modify_influence("masquerade", +1)
+        # Director pressure is applied by the event bus consumer
+        # (AttackResolved -> V5DirectorAdapter.apply_attack).
 
         return {
             "attacker": attacker_name,
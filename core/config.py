@@ -3,13 +3,20 @@ import os
 from dotenv import load_dotenv
 import google.generativeai as genai
 
+# Before the core imports: llm_scheduler reads the LLM_* settings at
+# import time.
 load_dotenv()
 
+from core.director.llm_scheduler import LLM_SCHEDULER, LLM_SCHEDULER_ENABLED, ScheduledModel
+from core.director.stub_model import StubModel
+
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 DISCORD_BOT_TOKEN = os.getenv("DISCORD_BOT_TOKEN")
 BOT_OWNER_ID_RAW = os.getenv("BOT_OWNER_ID")
+# Local stand-in models instead of Gemini (load tests, offline dev)
+AI_MODEL_STUB = os.getenv("AI_MODEL_STUB", "0") == "1"
 
-if not GOOGLE_API_KEY:
+if not GOOGLE_API_KEY and not AI_MODEL_STUB:
     raise RuntimeError("GOOGLE_API_KEY missing from environment/.env")
 
 if not DISCORD_BOT_TOKEN:
@@ -23,12 +30,36 @@ try:
 except ValueError:
     raise RuntimeError("BOT_OWNER_ID must be an integer")
 
-# Configure Gemini
-genai.configure(api_key=GOOGLE_API_KEY)
+if AI_MODEL_STUB:
+    # core.director.stub_model: AI_STUB_LATENCY (e.g. lognormal:600:0.4),
+    # AI_STUB_TOKENS_PER_SEC, AI_STUB_ERROR_RATE, AI_STUB_TIMEOUT_RATE,
+    # AI_STUB_RPM (simulated provider quota, 0 = none)
+    stub = dict(
+        latency=os.getenv("AI_STUB_LATENCY", "lognormal:600:0.4"),
+        tokens_per_sec=float(os.getenv("AI_STUB_TOKENS_PER_SEC", "120")),
+        error_rate=float(os.getenv("AI_STUB_ERROR_RATE", "0")),
+        timeout_rate=float(os.getenv("AI_STUB_TIMEOUT_RATE", "0")),
+        rpm=float(os.getenv("AI_STUB_RPM", "0")),
+    )
+    ai_model_json = StubModel(
+        "gemini-2.0-flash",
+        generation_config={"response_mime_type": "application/json"},
+        **stub,
+    )
+    ai_model_text = StubModel("gemini-2.0-flash", **stub)
+else:
+    # Configure Gemini
+    genai.configure(api_key=GOOGLE_API_KEY)
+
+    ai_model_json = genai.GenerativeModel(
+        "gemini-2.0-flash",
+        generation_config={"response_mime_type": "application/json"},
+    )
 
-ai_model_json = genai.GenerativeModel(
-    "gemini-2.0-flash",
-    generation_config={"response_mime_type": "application/json"},
-)
+    ai_model_text = genai.GenerativeModel("gemini-2.0-flash")
 
-ai_model_text = genai.GenerativeModel("gemini-2.0-flash")
+if LLM_SCHEDULER_ENABLED:
+    # All async model calls share one prioritised, rate-limited queue
+    # (core.director.llm_scheduler).
+    ai_model_json = ScheduledModel(ai_model_json, LLM_SCHEDULER)
+    ai_model_text = ScheduledModel(ai_model_text, LLM_SCHEDULER)
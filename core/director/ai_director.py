@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-import os
-from typing import Dict, Any, List, Optional
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
 
 from utils import (
     generate_storyteller_response,
@@ -15,13 +17,45 @@ from core.vtmv5 import character_model
 from core.director.state import DirectorState
 from core.director.director import V5DirectorAdapter
 
+# Per-guild DirectorState + V5 adapter, importable by other modules (hunting, travel, etc.)
+from core.director.registry import DIRECTORS
+from core.director.llm_scheduler import SCENE, llm_guild
+from core.director.scene_cache import SCENE_CACHE, enabled_for, scene_key, theme_ranking
+from core.director.scene_stream import CURSOR, PLACEHOLDER, split_hook, storyteller_prompt
 
-# Path to V5-aware director_state.json (separate from legacy director_system)
-DIRECTOR_STATE_PATH = os.path.join(os.path.dirname(__file__), "director_state.json")
+log = logging.getLogger(__name__)
 
-# Shared DirectorState + V5 adapter, importable by other modules (hunting, travel, etc.)
-_DIRECTOR_STATE = DirectorState(DIRECTOR_STATE_PATH)
-_V5_DIRECTOR = V5DirectorAdapter(_DIRECTOR_STATE)
+# Storyteller text when the model call fails (never cached).
+FALLBACK_INTRO = "The night moves, but the Director cannot find the words."
+
+
+def director_state(guild_id) -> DirectorState:
+    return DIRECTORS.get(guild_id)
+
+
+def v5_director(guild_id) -> V5DirectorAdapter:
+    return DIRECTORS.adapter(guild_id)
+
+
+T = TypeVar("T")
+# Receives the partial scene dict (same keys as the final payload, plus
+# "pending") whenever it changes; must not block.
+SceneUpdate = Callable[[Dict[str, Any]], Any]
+
+
+def _ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+async def _timed(timings: Dict[str, float], stage: str, aw: Awaitable[T]) -> T:
+    """
+    Await one pipeline stage and record its wall time in ms.
+    """
+    start = time.perf_counter()
+    try:
+        return await aw
+    finally:
+        timings[stage] = _ms(start)
 
 
 class AIDirector:
@@ -30,7 +64,7 @@ class AIDirector:
 
     This class:
       - Pulls V5 context (Humanity, Stains, Hunger, Predator Type, Merits/Flaws, Touchstones)
-      - Reads global director_state.json via DirectorState
+      - Reads the guild's Director state via DirectorRegistry
       - Calls your AI helpers (generate_storyteller_response, generate_random_encounter, etc.)
       - Returns a unified scene payload:
 
@@ -42,6 +76,9 @@ class AIDirector:
           "severity": int or None,        # 1–5
           "severity_label": str or None,  # "low", "guarded", "tense", "critical", "apocalyptic"
           "director_update": {...},       # updated director state snapshot
+          "encounter_reaction": {...} or None,
+          "cache": "hit" | "joined" | "miss" | "off",
+          "timings": {"context", "npcs", "encounter", "storyteller", "reaction", "cache", "total"},  # ms
         }
     """
 
@@ -62,12 +99,14 @@ class AIDirector:
     def _build_director_context(
         guild_data: Dict[str, Any],
         travelers: List[Any],
+        guild_id=None,
     ) -> Dict[str, Any]:
         """
         Build a V5-aware director context based on the first traveling character.
         """
+        director = v5_director(guild_id)
         if not travelers:
-            return _V5_DIRECTOR.global_scene_directives()
+            return director.global_scene_directives()
 
         players_map = (guild_data.get("players") or {}) if isinstance(guild_data, dict) else {}
         primary = travelers[0]
@@ -76,36 +115,13 @@ class AIDirector:
             primary = players_map.get(str(primary), {})
 
         character_model.ensure_character_state(primary)
-        return _V5_DIRECTOR.scene_directives_for_player(primary)
+        return director.scene_directives_for_player(primary)
 
+    # -------------------------------------------------
+    # Pipeline stages (each swallows its own failures)
+    # -------------------------------------------------
     @staticmethod
-    async def generate_scene(
-        model_text,
-        model_json,
-        guild_data: Dict[str, Any],
-        guild_id: int,
-        location_key: str,
-        travelers: List[Any],
-        risk: int = 2,
-        tags: Optional[List[str]] = None,
-        director_state: Optional[Dict[str, Any]] = None,
-    ) -> Dict[str, Any]:
-        """
-        Unified scene-generation engine.
-        """
-        tags = tags or []
-
-        director_context = AIDirector._build_director_context(guild_data, travelers)
-        city_state = director_context.get("city_state", {})
-        personal = director_context.get("personal", {})
-
-        global_threat = city_state.get("global_threat", 1)
-        personal_threat = personal.get("personal_threat", 1)
-
-        severity = max(global_threat, personal_threat, int(risk or 1))
-        severity_label = AIDirector._severity_label(severity)
-
-        # 2) NPCs
+    async def _npcs(model_json, location_key: str, guild_data: Dict[str, Any]) -> List[Any]:
         try:
             npcs = await populate_location_npcs(
                 model_json,
@@ -120,16 +136,20 @@ class AIDirector:
         except Exception:
             npcs = []
 
-        if npcs is None:
-            npcs = []
-
-        # 3) Encounter
-        encounter = None
-        encounter_severity = None
-        encounter_reaction = None
+        return npcs or []
 
+    @staticmethod
+    async def _encounter(
+        model_json,
+        guild_data: Dict[str, Any],
+        guild_id,
+        location_key: str,
+        travelers: List[Any],
+        director_context: Dict[str, Any],
+        tags: List[str],
+    ) -> Optional[Dict[str, Any]]:
         try:
-            encounter = await generate_random_encounter(
+            return await generate_random_encounter(
                 model_json=model_json,
                 guild_data=guild_data,
                 guild_id=guild_id,
@@ -140,16 +160,125 @@ class AIDirector:
             )
         except TypeError:
             try:
-                encounter = await generate_random_encounter(
+                return await generate_random_encounter(
                     model_json,
                     location_key,
                     guild_data,
                 )
             except Exception:
-                encounter = None
+                return None
+        except Exception:
+            return None
+
+    @staticmethod
+    async def _reaction(model_json, encounter: Dict[str, Any], guild_data: Dict[str, Any], guild_id):
+        try:
+            state = director_state(guild_id)
+            reaction = await apply_director_reaction_from_encounter(
+                model_json=model_json,
+                director_data=state.data,
+                encounter=encounter,
+                guild_data=guild_data,
+                guild_id=guild_id,
+            )
+            # Scenes can come in bursts; coalesce their saves.
+            state.save_later()
+            return reaction
+        except TypeError:
+            try:
+                state = director_state(guild_id)
+                reaction = await apply_director_reaction_from_encounter(
+                    state.data,
+                    encounter,
+                    guild_data,
+                    guild_id,
+                )
+                state.save_later()
+                return reaction
+            except Exception:
+                return None
         except Exception:
-            encounter = None
+            return None
 
+    @staticmethod
+    def _intro(payload) -> Tuple[str, str]:
+        if isinstance(payload, str):
+            return payload, ""
+        if isinstance(payload, dict):
+            return payload.get("intro_text") or payload.get("text") or "", payload.get("quest_hook") or ""
+        return "", ""
+
+    @staticmethod
+    async def _storyteller(
+        model_text,
+        guild_data: Dict[str, Any],
+        prompt_context: Dict[str, Any],
+    ) -> Tuple[str, str]:
+        """
+        (intro_text, quest_hook)
+        """
+        try:
+            return AIDirector._intro(await generate_storyteller_response(
+                model_text=model_text,
+                context=prompt_context,
+            ))
+        except TypeError:
+            try:
+                return AIDirector._intro(await generate_storyteller_response(
+                    model_text,
+                    guild_data,
+                    prompt_context["guild_id"],
+                    prompt_context["location_key"],
+                    prompt_context["travelers"],
+                    npcs=prompt_context["npcs"],
+                    encounter=prompt_context["encounter"],
+                    severity=prompt_context["severity"],
+                    severity_label=prompt_context["severity_label"],
+                    tags=prompt_context["tags"],
+                ))
+            except Exception:
+                return FALLBACK_INTRO, ""
+        except Exception:
+            return FALLBACK_INTRO, ""
+
+    @staticmethod
+    async def _compose(
+        model_text,
+        model_json,
+        guild_data: Dict[str, Any],
+        guild_id,
+        location_key: str,
+        travelers: List[Any],
+        tags: List[str],
+        director_context: Dict[str, Any],
+        severity: int,
+        timings: Dict[str, float],
+    ) -> Dict[str, Any]:
+        """
+        The model calls of a scene, as a dependency graph:
+
+            NPCs ──────┐
+                       ├─> storyteller
+            encounter ─┤
+                       └─> Director reaction
+
+        NPCs and the encounter start together; the storyteller starts as
+        soon as both are in, alongside the Director's reaction to the
+        encounter (the prompt does not use the reaction). A scene costs
+        max(NPCs, encounter) + max(storyteller, reaction) instead of the
+        sum of all four.
+        """
+        severity_label = AIDirector._severity_label(severity)
+
+        # 2) NPCs and 3) encounter, concurrently
+        npcs, encounter = await asyncio.gather(
+            _timed(timings, "npcs", AIDirector._npcs(model_json, location_key, guild_data)),
+            _timed(timings, "encounter", AIDirector._encounter(
+                model_json, guild_data, guild_id, location_key, travelers, director_context, tags,
+            )),
+        )
+
+        encounter_severity = None
         if encounter:
             try:
                 encounter_severity = score_encounter_severity(
@@ -162,37 +291,11 @@ class AIDirector:
                 except Exception:
                     encounter_severity = None
 
-            try:
-                encounter_reaction = await apply_director_reaction_from_encounter(
-                    model_json=model_json,
-                    director_data=_DIRECTOR_STATE.data,
-                    encounter=encounter,
-                    guild_data=guild_data,
-                    guild_id=guild_id,
-                )
-                _DIRECTOR_STATE.save()
-            except TypeError:
-                try:
-                    encounter_reaction = await apply_director_reaction_from_encounter(
-                        _DIRECTOR_STATE.data,
-                        encounter,
-                        guild_data,
-                        guild_id,
-                    )
-                    _DIRECTOR_STATE.save()
-                except Exception:
-                    encounter_reaction = None
-            except Exception:
-                encounter_reaction = None
-
             if isinstance(encounter_severity, int):
                 severity = max(severity, encounter_severity)
                 severity_label = AIDirector._severity_label(severity)
 
-        # 4) Storyteller intro text
-        quest_hook = ""
-        intro_text = ""
-
+        # 4) Storyteller intro text, alongside the Director's reaction
         prompt_context = {
             "guild_id": guild_id,
             "location_key": location_key,
@@ -205,43 +308,11 @@ class AIDirector:
             "tags": tags,
         }
 
-        try:
-            intro_payload = await generate_storyteller_response(
-                model_text=model_text,
-                context=prompt_context,
-            )
-            if isinstance(intro_payload, str):
-                intro_text = intro_payload
-            elif isinstance(intro_payload, dict):
-                intro_text = intro_payload.get("intro_text") or intro_payload.get("text") or ""
-                quest_hook = intro_payload.get("quest_hook") or ""
-        except TypeError:
-            try:
-                intro_payload = await generate_storyteller_response(
-                    model_text,
-                    guild_data,
-                    guild_id,
-                    location_key,
-                    travelers,
-                    npcs=npcs,
-                    encounter=encounter,
-                    severity=severity,
-                    severity_label=severity_label,
-                    tags=tags,
-                )
-                if isinstance(intro_payload, str):
-                    intro_text = intro_payload
-                elif isinstance(intro_payload, dict):
-                    intro_text = intro_payload.get("intro_text") or intro_payload.get("text") or ""
-                    quest_hook = intro_payload.get("quest_hook") or ""
-            except Exception:
-                intro_text = "The night moves, but the Director cannot find the words."
-                quest_hook = ""
-        except Exception:
-            intro_text = "The night moves, but the Director cannot find the words."
-            quest_hook = ""
-
-        director_update = _DIRECTOR_STATE.summarize()
+        stages = [_timed(timings, "storyteller", AIDirector._storyteller(model_text, guild_data, prompt_context))]
+        if encounter:
+            stages.append(_timed(timings, "reaction", AIDirector._reaction(model_json, encounter, guild_data, guild_id)))
+        results = await asyncio.gather(*stages)
+        intro_text, quest_hook = results[0]
 
         return {
             "intro_text": intro_text,
@@ -250,6 +321,269 @@ class AIDirector:
             "quest_hook": quest_hook,
             "severity": severity,
             "severity_label": severity_label,
-            "director_update": director_update,
-            "encounter_reaction": encounter_reaction,
-        }
\ No newline at end of file
+            "encounter_reaction": results[1] if encounter else None,
+        }
+
+    @staticmethod
+    async def generate_scene(
+        model_text,
+        model_json,
+        guild_data: Dict[str, Any],
+        guild_id: int,
+        location_key: str,
+        travelers: List[Any],
+        risk: int = 2,
+        tags: Optional[List[str]] = None,
+        director_state: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Unified scene-generation engine.
+
+        Scenes are cached (core.director.scene_cache) by guild, zone,
+        severity band, Director theme ranking and tags, unless the guild
+        opted out. A cached scene skips the model calls and the Director
+        reaction: the Director already reacted to that encounter.
+        """
+        tags = tags or []
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+
+        director_context = AIDirector._build_director_context(guild_data, travelers, guild_id)
+        timings["context"] = _ms(start)
+        city_state = director_context.get("city_state", {})
+        personal = director_context.get("personal", {})
+
+        global_threat = city_state.get("global_threat", 1)
+        personal_threat = personal.get("personal_threat", 1)
+
+        severity = max(global_threat, personal_threat, int(risk or 1))
+
+        def compose():
+            return AIDirector._compose(
+                model_text, model_json, guild_data, guild_id, location_key, travelers, tags,
+                director_context, severity, timings,
+            )
+
+        # `director_state` is shadowed by the parameter here
+        state = DIRECTORS.get(guild_id)
+        # Model calls are scheduled as a player-facing scene for this
+        # guild unless the caller set a priority (ST commands do).
+        with llm_guild(guild_id, SCENE):
+            if enabled_for(guild_data):
+                key = scene_key(guild_id, location_key, severity, theme_ranking(state.data.get("themes")), tags)
+                scene, cache = await SCENE_CACHE.get_or_create(
+                    key, compose, guild_id, store=lambda s: s["intro_text"] not in ("", FALLBACK_INTRO),
+                )
+                if cache != "miss":
+                    scene["encounter_reaction"] = None
+                    timings["cache"] = round(_ms(start) - timings["context"], 1)
+            else:
+                scene, cache = await compose(), "off"
+
+        timings["total"] = _ms(start)
+        return dict(scene, director_update=state.summarize(), cache=cache, timings=timings)
+
+    # -------------------------------------------------
+    # Streaming
+    # -------------------------------------------------
+    @staticmethod
+    async def _stream_storyteller(
+        model_text,
+        guild_data: Dict[str, Any],
+        prompt_context: Dict[str, Any],
+        on_text: Callable[[str], Any],
+    ) -> Tuple[str, str]:
+        """
+        (intro_text, quest_hook) from the model's streaming API, calling
+        on_text(text so far) per chunk. Falls back to the one-shot
+        storyteller when the model cannot stream or fails before any text.
+        """
+        stream = getattr(model_text, "generate_content_async", None)
+        text = ""
+        if stream is not None:
+            try:
+                response = await stream(storyteller_prompt(prompt_context), stream=True)
+                async for chunk in response:
+                    try:
+                        piece = chunk.text
+                    except ValueError:
+                        # Chunk without text parts (safety / finish metadata)
+                        continue
+                    if piece:
+                        text += piece
+                        on_text(text)
+            except Exception:
+                if text:
+                    log.exception("Storyteller stream broke off; keeping the partial text")
+        if not text:
+            return await AIDirector._storyteller(model_text, guild_data, prompt_context)
+        return split_hook(text)
+
+    @staticmethod
+    async def _compose_streaming(
+        model_text,
+        model_json,
+        guild_data: Dict[str, Any],
+        guild_id,
+        location_key: str,
+        travelers: List[Any],
+        tags: List[str],
+        director_context: Dict[str, Any],
+        severity: int,
+        timings: Dict[str, float],
+        start: float,
+        on_update: SceneUpdate,
+    ) -> Dict[str, Any]:
+        """
+        _compose with progress, on the same dependency graph: NPCs and
+        encounter each land in the partial scene as they complete, then
+        the storyteller streams from the same prompt context as _compose
+        (NPCs and encounter included) beside the Director reaction.
+        """
+        state = DIRECTORS.get(guild_id)
+        scene: Dict[str, Any] = {
+            "intro_text": PLACEHOLDER,
+            "npcs": [],
+            "encounter": None,
+            "quest_hook": "",
+            "severity": severity,
+            "severity_label": AIDirector._severity_label(severity),
+            "director_update": state.summarize(),
+            "encounter_reaction": None,
+            "pending": {"storyteller", "npcs", "encounter"},
+        }
+
+        def changed():
+            try:
+                on_update(scene)
+            except Exception:
+                log.exception("Scene update callback failed")
+
+        def on_text(text: str):
+            if "first_text" not in timings:
+                timings["first_text"] = _ms(start)
+            intro, hook = split_hook(text)
+            scene["intro_text"] = intro + CURSOR
+            scene["quest_hook"] = hook
+            changed()
+
+        async def npcs():
+            scene["npcs"] = await _timed(timings, "npcs", AIDirector._npcs(model_json, location_key, guild_data))
+            scene["pending"].discard("npcs")
+            changed()
+
+        async def encounter():
+            found = await _timed(timings, "encounter", AIDirector._encounter(
+                model_json, guild_data, guild_id, location_key, travelers, director_context, tags,
+            ))
+            scene["encounter"] = found
+            if found:
+                try:
+                    level = score_encounter_severity(found, director_context)
+                except TypeError:
+                    try:
+                        level = score_encounter_severity(found)
+                    except Exception:
+                        level = None
+                if isinstance(level, int) and level > scene["severity"]:
+                    scene["severity"] = level
+                    scene["severity_label"] = AIDirector._severity_label(level)
+                scene["pending"].add("director")
+            scene["pending"].discard("encounter")
+            changed()
+
+        await asyncio.gather(npcs(), encounter())
+
+        prompt_context = {
+            "guild_id": guild_id,
+            "location_key": location_key,
+            "travelers": travelers,
+            "npcs": scene["npcs"],
+            "encounter": scene["encounter"],
+            "severity": scene["severity"],
+            "severity_label": scene["severity_label"],
+            "director_context": director_context,
+            "tags": tags,
+        }
+
+        async def storyteller():
+            intro, hook = await _timed(timings, "storyteller", AIDirector._stream_storyteller(
+                model_text, guild_data, prompt_context, on_text,
+            ))
+            scene["intro_text"], scene["quest_hook"] = intro, hook
+            scene["pending"].discard("storyteller")
+            changed()
+
+        async def reaction():
+            scene["encounter_reaction"] = await _timed(
+                timings, "reaction", AIDirector._reaction(model_json, scene["encounter"], guild_data, guild_id),
+            )
+            scene["director_update"] = state.summarize()
+            scene["pending"].discard("director")
+            changed()
+
+        stages = [storyteller()]
+        if scene["encounter"]:
+            stages.append(reaction())
+        await asyncio.gather(*stages)
+        scene.pop("pending")
+        return scene
+
+    @staticmethod
+    async def stream_scene(
+        model_text,
+        model_json,
+        guild_data: Dict[str, Any],
+        guild_id: int,
+        location_key: str,
+        travelers: List[Any],
+        risk: int = 2,
+        tags: Optional[List[str]] = None,
+        on_update: Optional[SceneUpdate] = None,
+    ) -> Dict[str, Any]:
+        """
+        generate_scene with progress: on_update(partial scene) is called
+        as storyteller text streams in and as each other part completes;
+        the return value is the final payload. A cached scene comes back
+        whole, with no updates. Without on_update this is generate_scene.
+        """
+        if on_update is None:
+            return await AIDirector.generate_scene(
+                model_text, model_json, guild_data, guild_id, location_key, travelers, risk=risk, tags=tags,
+            )
+        tags = tags or []
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+
+        director_context = AIDirector._build_director_context(guild_data, travelers, guild_id)
+        timings["context"] = _ms(start)
+        city_state = director_context.get("city_state", {})
+        personal = director_context.get("personal", {})
+        severity = max(city_state.get("global_threat", 1), personal.get("personal_threat", 1), int(risk or 1))
+
+        def compose():
+            return AIDirector._compose_streaming(
+                model_text, model_json, guild_data, guild_id, location_key, travelers, tags,
+                director_context, severity, timings, start, on_update,
+            )
+
+        state = DIRECTORS.get(guild_id)
+        # Scheduled as in generate_scene. Streamed scenes are cached apart
+        # from generate_scene's: the streaming storyteller prompt
+        # (scene_stream.storyteller_prompt) is not the one-shot one.
+        with llm_guild(guild_id, SCENE):
+            if enabled_for(guild_data):
+                key = scene_key(
+                    guild_id, location_key, severity, theme_ranking(state.data.get("themes")), tags, stream=True,
+                )
+                scene, cache = await SCENE_CACHE.get_or_create(
+                    key, compose, guild_id, store=lambda s: s["intro_text"] not in ("", FALLBACK_INTRO),
+                )
+                if cache != "miss":
+                    scene["encounter_reaction"] = None
+                    timings["cache"] = round(_ms(start) - timings["context"], 1)
+            else:
+                scene, cache = await compose(), "off"
+
+        timings["total"] = _ms(start)
+        return dict(scene, director_update=state.summarize(), cache=cache, timings=timings)
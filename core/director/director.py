@@ -5,6 +5,7 @@ from typing import Dict, Any, List, Optional
 from core.vtmv5 import character_model
 from core.vtmv5 import merits_flaws
 from core.vtmv5 import frenzy as frenzy_mod  # may be used by callers
+from core.director.rules import DIRECTOR_RULES, RuleBook
 from core.director.state import DirectorState
 
 
@@ -17,10 +18,22 @@ class V5DirectorAdapter:
       - scene severity
       - thematic weighting
       - flags for the AI Director prompt
+
+    How much each event moves the city is data, not code: the rules in
+    data/director_rules.json (see core.director.rules).
     """
 
-    def __init__(self, state: DirectorState):
+    def __init__(self, state: DirectorState, rules: Optional[RuleBook] = None):
         self.state = state
+        self.rules = rules or DIRECTOR_RULES
+
+    def apply(self, event: str, tx=None, **ctx):
+        """
+        Run the Director rules for one event (fields as keyword
+        arguments) in a single Director transaction. With a zone_key the
+        event's pressure also lands in that zone's local field.
+        """
+        return self.rules.apply(self.state, event, ctx, tx=tx)
 
     # -------------------------------------------------
     # Event: hunt result
@@ -30,43 +43,88 @@ class V5DirectorAdapter:
         player: Dict[str, Any],
         hunt_result: Dict[str, Any],
         zone: Optional[Dict[str, Any]] = None,
+        tx=None,
     ) -> Dict[str, Any]:
         """
         Called after a hunt.
         hunt_result is expected to come from HuntingEngine.hunt()
         or something with similar shape.
+        With a store transaction (tx) the Director save is staged into it.
         """
         dice_res = hunt_result.get("dice_result", {})
         feeding = hunt_result.get("feeding_result", {})
-        source = feeding.get("source", "human")
-        messy = dice_res.get("messy_critical", False)
-        bestial = dice_res.get("bestial_failure", False)
-
-        # Base pressure from source
-        if source == "human":
-            self.state.adjust("masquerade_pressure", 1)
-        elif source == "animal":
-            self.state.adjust("masquerade_pressure", 0)
-        elif source == "bagged":
-            self.state.adjust("masquerade_pressure", 0)
-        elif source == "vampire":
-            self.state.adjust("occult_pressure", 1)
-            self.state.adjust("political_pressure", 1)
-
-        # Messy/Bestial -> more tension
-        if messy:
-            self.state.adjust("violence_pressure", 2)
-            self.state.adjust("masquerade_pressure", 2)
-        if bestial:
-            self.state.adjust("violence_pressure", 1)
-
-        if messy or bestial:
-            self.state.adjust_theme("violence", +1)
-            self.state.adjust_theme("masquerade", +1)
-
-        self.state.save()
+        if zone is not None:
+            zone_key = zone.get("key") if isinstance(zone, dict) else getattr(zone, "key", None)
+        else:
+            zone_key = hunt_result.get("zone_key")
+        self.apply_hunt(
+            feeding.get("source", "human"),
+            messy=dice_res.get("messy_critical", False),
+            bestial=dice_res.get("bestial_failure", False),
+            tx=tx,
+            zone_key=zone_key,
+        )
         return self.scene_directives_for_player(player)
 
+    def apply_hunt(
+        self,
+        source: str = "human",
+        messy: bool = False,
+        bestial: bool = False,
+        tx=None,
+        zone_key: Optional[str] = None,
+    ):
+        """
+        Director pressure from one hunt, without building directives.
+        """
+        return self.apply("hunt", tx=tx, source=source, messy=messy, bestial=bestial, zone_key=zone_key)
+
+    # -------------------------------------------------
+    # Event: travel / havens
+    # -------------------------------------------------
+    def apply_travel(
+        self,
+        risk: Dict[str, int],
+        crossed_sunrise: bool = False,
+        near_sunrise: bool = False,
+        tx=None,
+        zone_key: Optional[str] = None,
+    ):
+        """
+        Rough integration of travel + time: the destination zone's
+        base_risk, plus sunrise exposure.
+        """
+        return self.apply(
+            "travel", tx=tx, risk=risk, crossed_sunrise=crossed_sunrise, near_sunrise=near_sunrise,
+            zone_key=zone_key,
+        )
+
+    def apply_raid(self, severity: int, tx=None, zone_key: Optional[str] = None):
+        """
+        Director pressure from a raid on a haven (severity 1–5).
+        """
+        severity = max(1, min(5, int(severity)))
+        return self.apply("raid", tx=tx, severity=severity, zone_key=zone_key)
+
+    def apply_shelter(
+        self,
+        security: int,
+        warding: int,
+        masquerade_buffer: int,
+        influence: int,
+        tx=None,
+        zone_key: Optional[str] = None,
+    ):
+        """
+        A character retreating to their haven calms the streets a little:
+          - security & warding lower Masquerade / SI pressure
+          - influence & masquerade_buffer lower city awareness
+        """
+        return self.apply(
+            "shelter", tx=tx, security=security, warding=warding,
+            masquerade_buffer=masquerade_buffer, influence=influence, zone_key=zone_key,
+        )
+
     # -------------------------------------------------
     # Event: frenzy test result
     # -------------------------------------------------
@@ -80,26 +138,32 @@ class V5DirectorAdapter:
         Called after a frenzy test (success or failure).
         frenzy_result is expected from frenzy.frenzy_test().
         """
-        failed = frenzy_result.get("failed", False)
         base = frenzy_result.get("result", {})
-        messy = base.get("messy_critical", False)
-        bestial = base.get("bestial_failure", False)
-
-        if failed:
-            # The Beast rampages
-            self.state.adjust("violence_pressure", 2)
-            self.state.adjust("masquerade_pressure", 2)
-        if messy:
-            self.state.adjust("violence_pressure", 1)
-        if bestial:
-            self.state.adjust("violence_pressure", 1)
-
-        self.state.adjust_theme("occult", +1)
-        self.state.adjust_theme("mystery", +1)
-
-        self.state.save()
+        self.apply_frenzy(
+            frenzy_result.get("failed", False),
+            messy=base.get("messy_critical", False),
+            bestial=base.get("bestial_failure", False),
+        )
         return self.scene_directives_for_player(player)
 
+    def apply_frenzy(self, failed: bool, messy: bool = False, bestial: bool = False, tx=None):
+        """
+        Director pressure from a frenzy test, without building directives
+        (event-bus consumers batch these).
+        """
+        return self.apply("frenzy", tx=tx, failed=failed, messy=messy, bestial=bestial)
+
+    # -------------------------------------------------
+    # Event: combat attack resolved
+    # -------------------------------------------------
+    def apply_attack(self, outcome: str, tx=None):
+        """
+        Director pressure from one attack (what CombatEngine.attack used to
+        push through the missing Director.modify_influence). outcome is an
+        AttackOutcome value; ordinary hits and misses leave the city alone.
+        """
+        return self.apply("attack", tx=tx, outcome=(outcome or "").lower())
+
     # -------------------------------------------------
     # Event: explicit masquerade breach
     # -------------------------------------------------
@@ -114,11 +178,7 @@ class V5DirectorAdapter:
 
         severity: 1–5
         """
-        self.state.adjust("masquerade_pressure", severity)
-        if severity >= 3:
-            self.state.adjust("si_pressure", severity - 2)
-
-        self.state.save()
+        self.apply("masquerade_breach", severity=severity, source=source)
         if player:
             return self.scene_directives_for_player(player)
         return self.global_scene_directives()
@@ -135,15 +195,7 @@ class V5DirectorAdapter:
         """
         Called when a Touchstone dies (and you've already updated Humanity).
         """
-        self.state.adjust("occult_pressure", 1)
-        self.state.adjust_theme("mystery", +1)
-        self.state.adjust_theme("masquerade", +1)
-
-        if deliberate:
-            self.state.adjust("si_pressure", 1)
-            self.state.adjust("political_pressure", 1)
-
-        self.state.save()
+        self.apply("touchstone_loss", deliberate=deliberate, name=name)
         return self.scene_directives_for_player(player)
 
     # -------------------------------------------------
@@ -154,11 +206,7 @@ class V5DirectorAdapter:
         severity: int = 1,
         occult: bool = False,
     ) -> Dict[str, Any]:
-        self.state.adjust("political_pressure", severity)
-        if occult:
-            self.state.adjust("occult_pressure", 1)
-
-        self.state.save()
+        self.apply("political", severity=severity, occult=occult)
         return self.global_scene_directives()
 
     # -------------------------------------------------
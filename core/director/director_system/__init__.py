@@ -1,3 +1,4 @@
 from .state import DirectorState, get_director_state, save_director_state
 from .engine import apply_encounter_to_director, director_night_tick
-from .prophecy import DirectorProphecyThread, ensure_default_prophecy_threads
+from .prophecy import ProphecyEngine, parse_thread, resolve_prophecy, thread_status
+from .nightly import NightlyScheduler, apply_night_tick, apply_night_tick_async, night_tick_all
@@ -1,74 +1,64 @@
-from typing import Dict, Any, List
+from typing import Dict, Any
+
+import numpy as np
+
+from core.director.rules import DIRECTOR_RULES, tag_set, word_tags
+from core.travel.pressure_field import ZoneGraph, diffuse_state
+
 from .state import DirectorState, get_director_state, save_director_state
+from .nightly import tick_arrays
 
-THEMES_FROM_TYPES = {
-    "combat": "violence",
-    "social": "politics",
-    "investigation": "mystery",
-    "supernatural": "occult",
-    "masquerade": "masquerade",
-}
 
-def apply_encounter_to_director(guild_data: Dict[str, Any], encounter: Dict[str, Any]):
+def apply_encounter_to_director(guild_id, encounter: Dict[str, Any], tx=None, registry=None):
     """Update director awareness/influence/themes based on a single encounter.
 
-    This is intended to be called whenever an encounter is logged.
+    This is intended to be called whenever an encounter is logged. The
+    reactions are the "encounter" rules in data/director_rules.json. With a
+    store transaction (tx) the Director save is staged into it.
     """
     if not encounter:
         return
 
-    state = get_director_state(guild_data)
+    state = get_director_state(guild_id, registry)
     etype = (encounter.get("type") or "").lower()
-    severity = int(encounter.get("severity") or 0)
-    tags: List[str] = [str(t).lower() for t in encounter.get("tags", [])]
-
-    # Bump base awareness by severity
-    if severity > 0:
-        state.awareness += max(1, severity // 2)
-
-    # Thematic bump
-    base_theme = THEMES_FROM_TYPES.get(etype)
-    if base_theme:
-        state.bump_theme(base_theme, max(1, severity))
-
-    if "masquerade" in etype or "masquerade" in tags:
-        state.bump_theme("masquerade", max(1, severity))
-        state.bump_influence("masquerade", max(1, severity))
-
-    if "supernatural" in etype or "occult" in tags or "ritual" in tags:
-        state.bump_theme("occult", max(1, severity))
-        state.bump_influence("occult", max(1, severity - 1))
-
-    if "si" in tags or "second inquisition" in tags:
-        state.bump_theme("second_inquisition", max(1, severity))
-        state.bump_influence("second_inquisition", max(1, severity))
+    ctx = {
+        "zone_key": encounter.get("zone_key") or encounter.get("location_key"),
+        "type": etype,
+        "severity": int(encounter.get("severity") or 0),
+        # "masquerade_breach" counts as tagged "masquerade"
+        "tags": tag_set(encounter.get("tags")) | word_tags(etype),
+    }
+    with state.transaction(tx=tx):
+        DIRECTOR_RULES.apply(state.state, "encounter", ctx, tx=tx)
+        state.clamp_awareness()
+    return state
 
-    # clamp awareness
-    state.clamp_awareness(0, 10)
-    save_director_state(guild_data, state)
 
+def director_night_tick(guild_id, registry=None, zones=None) -> DirectorState:
+    """Advance one guild's Director city-scale logic by one 'night'.
 
-def director_night_tick(guild_data: Dict[str, Any]):
-    """Advance the Director's city-scale logic by one 'night'.
+    - Slightly cools themes
+    - Awareness drifts towards 1-3
+    - Prophecy threads react to the settled values (prophecy.ProphecyEngine)
+    - With a ZoneRegistry, spreads and decays per-zone pressure
 
-    - Slightly cools or heats themes
-    - Gently shifts influence
-    - Can be used to spawn prophecy events (handled elsewhere)
+    The scheduled tick covers every guild at once (nightly.apply_night_tick);
+    this is the same rule for a single guild.
     """
-    state = get_director_state(guild_data)
-    # Cool down all themes slightly to avoid runaway explosion
-    cooled = {}
-    for k, v in state.themes.items():
-        nv = v - 1 if v > 0 else v
-        cooled[k] = nv
-    state.themes = cooled
-
-    # Awareness naturally drifts towards 1-3
-    if state.awareness > 3:
-        state.awareness -= 1
-    elif state.awareness < 1:
-        state.awareness += 1
-
-    state.clamp_awareness(0, 10)
-    save_director_state(guild_data, state)
+    state = get_director_state(guild_id, registry)
+    themes = state.state.data.setdefault("themes", {})
+    keys = list(themes)
+    awareness, cooled = tick_arrays(
+        np.array([state.awareness], dtype=np.int64),
+        np.array([[int(themes[k]) for k in keys]], dtype=np.int64),
+        np.ones((1, len(keys)), dtype=bool),
+    )
+    state.state.data["awareness"] = int(awareness[0])
+    themes.update({k: int(v) for k, v in zip(keys, cooled[0])})
+    state.state.notify({"awareness", *("theme:" + k for k in keys)})
+    if zones is not None:
+        diffuse_state(state.state, ZoneGraph.from_registry(zones))
+    save_director_state(state)
+    if state.state.on_event is not None:
+        state.state.on_event("night", {"nights": 1})
     return state
@@ -2,73 +2,37 @@ from __future__ import annotations
 
 from typing import Any, Dict, Optional
 
-from director_system.state import get_director_state, save_director_state
+from core.director.rules import DIRECTOR_RULES, tag_set
 
-
-def _ensure_director_basics(state: Any):
-    """
-    Ensure influence/themes/awareness keys exist.
-    """
-    if not hasattr(state, "influence"):
-        state.influence = {}
-    if not hasattr(state, "themes"):
-        state.themes = {}
-    if not hasattr(state, "awareness"):
-        state.awareness = 0
-
-    state.influence.setdefault("violence", 0)
-    state.influence.setdefault("masquerade", 0)
-    state.influence.setdefault("occult", 0)
-    state.influence.setdefault("politics", 0)
-    state.influence.setdefault("second_inquisition", 0)
-
-    state.themes.setdefault("violence", 0)
-    state.themes.setdefault("masquerade", 0)
-    state.themes.setdefault("occult", 0)
-    state.themes.setdefault("politics", 0)
-    state.themes.setdefault("mystery", 0)
+from .state import get_director_state
 
 
 def apply_combat_event(
-    guild_data: Dict[str, Any],
+    guild_id,
     outcome: str,
     severity: int,
     messy: bool = False,
     bestial: bool = False,
+    tx=None,
 ):
     """
     Example combat hook (kept minimal so it doesn't break your existing stuff).
-    You can expand with more detailed combat outcome mapping.
+    The reactions are the "combat" rules in data/director_rules.json.
     """
-    state = get_director_state(guild_data)
-    _ensure_director_basics(state)
-
-    sev = max(1, int(severity))
-
-    if messy:
-        state.influence["violence"] += sev
-        state.influence["masquerade"] += 1
-        state.themes["violence"] += sev
-        state.themes["masquerade"] += 1
-        state.awareness += 1
-    elif bestial:
-        state.influence["masquerade"] += 2
-        state.themes["masquerade"] += sev
-        state.awareness += 1
-    else:
-        # normal success/fail just nudges violence
-        if outcome.lower() in ("hit", "success", "win"):
-            state.influence["violence"] += 1
-            state.themes["violence"] += sev
-
-    save_director_state(guild_data, state)
+    state = get_director_state(guild_id)
+    return DIRECTOR_RULES.apply(
+        state.state, "combat",
+        {"outcome": outcome, "severity": max(1, int(severity)), "messy": messy, "bestial": bestial},
+        tx=tx,
+    )
 
 
 def apply_travel_event(
-    guild_data: Dict[str, Any],
+    guild_id,
     zone,
     encounter: Optional[Dict[str, Any]],
     time_info: Dict[str, Any],
+    tx=None,
 ):
     """
     Hook travel outcomes into Director state.
@@ -81,47 +45,16 @@ def apply_travel_event(
          "crossed_sunrise": bool,
          "near_sunrise": bool
        }
-    """
-    state = get_director_state(guild_data)
-    _ensure_director_basics(state)
-
-    sev = 0
-    if encounter:
-        sev = int(encounter.get("severity", 1))
-
-    # Base impact from encounters by zone risk
-    if encounter:
-        # Violence-heavy tables
-        if "sabbat" in (zone.tags or []) or "warfront" in (zone.tags or []):
-            state.influence["violence"] += sev
-            state.themes["violence"] += sev
-
-        # Masquerade risk for urban/crowded/etc.
-        if "urban" in (zone.tags or []) or "masquerade" in (zone.tags or []):
-            state.influence["masquerade"] += max(1, sev - 1)
-            state.themes["masquerade"] += 1
 
-        # SI / Pentex tags
-        if "second_inquisition" in (zone.tags or []) or "si" in (zone.tags or []) \
-           or "pentex" in (zone.tags or []):
-            state.influence["second_inquisition"] += sev
-            state.awareness += 1
-
-        # Occult stuff
-        if "occult" in (zone.tags or []) or "mystery" in (zone.tags or []):
-            state.influence["occult"] += 1
-            state.themes["occult"] += 1
-
-    # Sunrise risk
-    if time_info.get("crossed_sunrise"):
-        # Doing anything past sunrise is BAD
-        state.influence["masquerade"] += 2
-        state.influence["second_inquisition"] += 2
-        state.themes["masquerade"] += 2
-        state.awareness += 2
-    elif time_info.get("near_sunrise"):
-        # Near sunrise = tension rises
-        state.themes["masquerade"] += 1
-        state.awareness += 1
-
-    save_director_state(guild_data, state)
\ No newline at end of file
+    The reactions are the "travel_encounter" rules, matched on zone tags.
+    """
+    state = get_director_state(guild_id)
+    ctx = {
+        "zone_key": getattr(zone, "key", None),
+        "tags": tag_set(getattr(zone, "tags", None)),
+        "encounter": bool(encounter),
+        "severity": int(encounter.get("severity", 1)) if encounter else 0,
+        "crossed_sunrise": bool(time_info.get("crossed_sunrise")),
+        "near_sunrise": bool(time_info.get("near_sunrise")),
+    }
+    return DIRECTOR_RULES.apply(state.state, "travel_encounter", ctx, tx=tx)
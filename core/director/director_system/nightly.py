@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from core.travel.pressure_field import FIELD_KEY as ZONE_FIELD, ZoneGraph, diffuse_state
+
+log = logging.getLogger(__name__)
+
+# Nightly Director tick for every guild at once.
+#
+# Same rules as engine.director_night_tick (themes above their neutral
+# weight cool by 1, awareness drifts one step toward 1–3, then clamps),
+# but over a guild × column matrix instead of per-guild dict loops, and
+# only the guilds whose numbers actually moved are written back.
+
+# DirectorState.adjust's default bounds
+AWARENESS_MIN, AWARENESS_MAX = 0, 20
+AWARENESS_FLOOR, AWARENESS_CEILING = 1, 3
+# Themes rest at the DEFAULT_STATE weight; only heat above it cools off.
+THEME_BASELINE = 5
+
+DAY = 86400.0
+# Tick when the night is over (noon UTC by default), matching the
+# nightly pressure-history buckets.
+TICK_HOUR_UTC = 12
+
+
+class DirectorColumns:
+    """
+    Columnar view of per-guild Director data (DirectorState.data):
+    awareness[g] and themes[g, k] over the union of theme keys, with
+    `present[g, k]` marking which guild actually has theme k (the tick
+    never invents keys).
+    """
+
+    def __init__(self, states: Mapping[str, Dict[str, Any]]):
+        self.gids: List[str] = []
+        raws: List[Dict[str, Any]] = []
+        keys: Dict[str, int] = {}
+        for gid, raw in states.items():
+            raw = raw or {}
+            self.gids.append(str(gid))
+            raws.append(raw)
+            for k in raw.get("themes") or {}:
+                keys.setdefault(str(k), len(keys))
+        self.theme_keys: List[str] = list(keys)
+
+        n, m = len(self.gids), len(self.theme_keys)
+        self.awareness = np.zeros(n, dtype=np.int64)
+        self.themes = np.zeros((n, m), dtype=np.int64)
+        self.present = np.zeros((n, m), dtype=bool)
+        for i, raw in enumerate(raws):
+            self.awareness[i] = int(raw.get("awareness", 0) or 0)
+            for k, v in (raw.get("themes") or {}).items():
+                j = keys[str(k)]
+                self.themes[i, j] = int(v or 0)
+                self.present[i, j] = True
+
+    def __len__(self) -> int:
+        return len(self.gids)
+
+
+def tick_arrays(
+    awareness: np.ndarray,
+    themes: np.ndarray,
+    present: np.ndarray,
+    nights: int = 1,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Apply `nights` ticks; returns new arrays, inputs are left untouched.
+    """
+    awareness = awareness.copy()
+    themes = themes.copy()
+    for _ in range(max(0, nights)):
+        # Cool down all themes slightly to avoid runaway explosion
+        themes -= (present & (themes > THEME_BASELINE))
+        # Awareness naturally drifts towards 1-3
+        awareness -= awareness > AWARENESS_CEILING
+        awareness += awareness < AWARENESS_FLOOR
+        np.clip(awareness, AWARENESS_MIN, AWARENESS_MAX, out=awareness)
+    return awareness, themes
+
+
+def night_tick_all(states: Mapping[str, Dict[str, Any]], nights: int = 1) -> Dict[str, Dict[str, Any]]:
+    """
+    Tick every guild; returns {guild_id: {"awareness": int, "themes": {...}}}
+    for the guilds that changed. `states` itself is not modified.
+    """
+    cols = DirectorColumns(states)
+    if not len(cols):
+        return {}
+    awareness, themes = tick_arrays(cols.awareness, cols.themes, cols.present, nights)
+
+    changed = (awareness != cols.awareness)
+    if themes.size:
+        changed |= (themes != cols.themes).any(axis=1)
+
+    out: Dict[str, Dict[str, Any]] = {}
+    for i in np.flatnonzero(changed):
+        row, mask = themes[i], cols.present[i]
+        out[cols.gids[i]] = {
+            "awareness": int(awareness[i]),
+            "themes": {k: int(row[j]) for j, k in enumerate(cols.theme_keys) if mask[j]},
+        }
+    return out
+
+
+# -------------------------------------------------
+# Registry integration + scheduling
+# -------------------------------------------------
+TICK_KEY = "director_tick"  # root-level marker in the bot store: {"night": int, "at": float}
+
+
+def night_number(t: float, hour_utc: int = TICK_HOUR_UTC) -> int:
+    """
+    Index of the night that ends at hour_utc on or before t.
+    """
+    return int((t - hour_utc * 3600) // DAY)
+
+
+def apply_night_tick(
+    store,
+    directors,
+    nights: int = 1,
+    night: Optional[int] = None,
+    zones=None,
+    preloaded=None,
+) -> List[str]:
+    """
+    Tick every guild in the DirectorRegistry and commit the changed states
+    (plus the tick marker in the bot store) as one store transaction.
+    Returns the guild ids written.
+
+    With a ZoneRegistry (`zones`), each guild's per-zone pressure also
+    spreads to neighbouring zones and decays (core.travel.pressure_field).
+
+    Only awareness and the changed themes are written into each state, in
+    place. Runs synchronously on the event loop thread with no await
+    between read and write, so commands cannot interleave with it; from
+    the loop, use apply_night_tick_async(), which reads the uncached
+    states off the loop first (`preloaded`).
+    """
+    start = time.perf_counter()
+    states = dict(directors.states(preloaded))
+    changed = night_tick_all({gid: state.data for gid, state in states.items()}, nights)
+
+    diffused = set()
+    if zones is not None and nights > 0:
+        graph = ZoneGraph.from_registry(zones)
+        diffused = {
+            gid for gid, state in states.items()
+            if state.data.get(ZONE_FIELD) and diffuse_state(state, graph, nights)
+        }
+
+    with store.transaction() as tx:
+        for gid, values in changed.items():
+            state = states[gid]
+            state.data["awareness"] = values["awareness"]
+            state.data.setdefault("themes", {}).update(values["themes"])
+            state.notify({"awareness", *("theme:" + k for k in values["themes"])})
+            state.save(tx=tx)
+        for gid in diffused - set(changed):
+            states[gid].save(tx=tx)
+        if night is not None:
+            tx.put(None, [TICK_KEY], {"night": night, "at": time.time()})
+
+    if nights > 0:
+        # Every guild, moved or not: replay needs each tick in the journal.
+        for state in states.values():
+            if state.on_event is not None:
+                state.on_event("night", {"nights": nights})
+
+    log.info(
+        "Director night tick: %d night(s), %d guild(s), %d changed, %d zone fields, %.1f ms",
+        nights, len(states), len(changed), len(diffused), (time.perf_counter() - start) * 1000,
+    )
+    return list(changed) + sorted(diffused - set(changed))
+
+
+async def apply_night_tick_async(
+    store,
+    directors,
+    nights: int = 1,
+    night: Optional[int] = None,
+    zones=None,
+) -> List[str]:
+    """
+    apply_night_tick for the event loop: every guild not in the registry's
+    cache is read and parsed in a worker thread first, so the loop only
+    does the tick and the write. A guild that enters the cache meanwhile
+    is ticked from the cache.
+    """
+    preloaded = await asyncio.to_thread(directors.read_states, directors.uncached_ids())
+    return apply_night_tick(store, directors, nights=nights, night=night, zones=zones, preloaded=preloaded)
+
+
+class NightlyScheduler:
+    """
+    Runs apply_night_tick once per night at hour_utc. The last night ticked
+    is kept in the bot store, so a restart neither repeats a night nor loses
+    one; missed nights are caught up (at most max_catchup). With a
+    ZoneRegistry, zone pressure diffuses over the current zone graph.
+    """
+
+    def __init__(self, store, directors, hour_utc: int = TICK_HOUR_UTC, max_catchup: int = 7, zones=None):
+        self.store = store
+        self.directors = directors
+        self.zones = zones
+        self.hour_utc = hour_utc
+        self.max_catchup = max_catchup
+
+    def last_night(self) -> Optional[int]:
+        marker = self.store.data.get(TICK_KEY) or {}
+        night = marker.get("night")
+        return None if night is None else int(night)
+
+    def due(self, now: Optional[float] = None) -> Tuple[int, int]:
+        """
+        (current night, nights to tick). First run ticks nothing, it only
+        starts the count.
+        """
+        current = night_number(time.time() if now is None else now, self.hour_utc)
+        last = self.last_night()
+        if last is None:
+            return current, 0
+        return current, max(0, min(self.max_catchup, current - last))
+
+    def run_due(self, now: Optional[float] = None) -> List[str]:
+        current, nights = self.due(now)
+        if nights == 0 and self.last_night() == current:
+            return []
+        return apply_night_tick(self.store, self.directors, nights=nights, night=current, zones=self.zones)
+
+    async def run_due_async(self, now: Optional[float] = None) -> List[str]:
+        current, nights = self.due(now)
+        if nights == 0 and self.last_night() == current:
+            return []
+        return await apply_night_tick_async(
+            self.store, self.directors, nights=nights, night=current, zones=self.zones
+        )
+
+    def seconds_until_next(self, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        next_at = (night_number(now, self.hour_utc) + 1) * DAY + self.hour_utc * 3600
+        return max(1.0, next_at - now)
+
+    async def run(self):
+        while True:
+            try:
+                await self.run_due_async()
+            except Exception:
+                log.exception("Director night tick failed")
+            await asyncio.sleep(self.seconds_until_next())
@@ -1,10 +1,271 @@
 # core/director/director_system/prophecy.py
+from __future__ import annotations
+
+import logging
+import re
+import time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+from core.director.thresholds import DEPENDS, current_value, validate_key
+from core.events.types import ProphecyAdvanced
+
+log = logging.getLogger(__name__)
+
+# Prophecy threads: long-running arcs that move through stages as the
+# city's Director values line up. Kept per guild in the Director state
+# (data["prophecy_threads"]):
+#
+#   {"id": "p1", "title": "The Red Star", "status": "active", "stage": 1,
+#    "stages": [
+#      {"text": "Omens of blood in the gutters",
+#       "when": [{"key": "theme:violence", "op": ">=", "value": 7}], "any": false},
+#      {"text": "The Red Star rises over the docks",
+#       "when": [{"key": "violence_pressure", "op": ">=", "value": 12},
+#                {"key": "global_threat", "op": ">=", "value": 3}], "any": false}
+#    ],
+#    "fail": [{"key": "masquerade_pressure", "op": "<=", "value": 1}],
+#    "reached": [{"stage": 0, "at": 1700000000.0}]}
+#
+# `stage` is the next stage to reach; reaching the last one fulfils the
+# thread, and any `fail` condition averts it. Only the current stage and
+# the fail conditions are watched: each Director transaction re-checks
+# just the threads whose watched keys it touched.
+
+STATUSES = ("active", "fulfilled", "failed")
+
+OPS: Dict[str, Callable[[int, int], bool]] = {
+    ">=": lambda a, b: a >= b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    "<": lambda a, b: a < b,
+    "==": lambda a, b: a == b,
+}
+_COND = re.compile(r"^\s*([a-z_:]+)\s*(>=|<=|==|>|<|≥|≤)\s*(-?\d+)\s*$")
+
+
+def parse_condition(text: str) -> Dict[str, Any]:
+    """
+    "theme:violence >= 7" -> {"key": "theme:violence", "op": ">=", "value": 7}
+    """
+    m = _COND.match(text.lower())
+    if not m:
+        raise ValueError(f"Bad condition {text.strip()!r}: expected e.g. `si_pressure >= 12`")
+    op = {"≥": ">=", "≤": "<="}.get(m.group(2), m.group(2))
+    return {"key": validate_key(m.group(1)), "op": op, "value": int(m.group(3))}
+
+
+def _conditions(text: str) -> Dict[str, Any]:
+    """
+    "a >= 1 and b >= 2" (all) or "a >= 1 or b >= 2" (any).
+    """
+    lowered = f" {text.lower()} "
+    if " and " in lowered and " or " in lowered:
+        raise ValueError("Use either `and` or `or` within one stage, not both")
+    any_ = " or " in lowered
+    parts = re.split(r"\s+(?:and|or)\s+", text.strip(), flags=re.IGNORECASE)
+    return {"when": [parse_condition(p) for p in parts], "any": any_}
+
+
+def parse_thread(text: str) -> Dict[str, Any]:
+    """
+    A thread spec from ST text, one item per line:
+
+        The Red Star
+        theme:violence >= 7 => Omens of blood in the gutters
+        violence_pressure >= 12 and global_threat >= 3 => The Red Star rises
+        fail: masquerade_pressure <= 1
+    """
+    lines = [l.strip() for l in text.strip().splitlines() if l.strip()]
+    if len(lines) < 2:
+        raise ValueError("Give a title line and at least one `conditions => omen` line")
+    title, stages, fail = lines[0], [], []
+    for line in lines[1:]:
+        if line.lower().startswith("fail:"):
+            fail.extend(_conditions(line[5:])["when"])
+            continue
+        if "=>" not in line:
+            raise ValueError(f"Stage line needs `=>`: {line!r}")
+        conds, omen = line.split("=>", 1)
+        stages.append(dict(_conditions(conds), text=omen.strip()))
+    if not stages:
+        raise ValueError("A prophecy needs at least one stage")
+    return {"title": title[:100], "stages": stages, "fail": fail}
+
+
+def _holds(state, cond: Mapping[str, Any]) -> bool:
+    return OPS[cond["op"]](current_value(state, cond["key"]), int(cond["value"]))
+
+
+def _watched(thread: Mapping[str, Any]) -> Iterable[str]:
+    stage = thread["stages"][thread["stage"]]
+    for cond in list(stage["when"]) + list(thread.get("fail") or []):
+        yield from DEPENDS.get(cond["key"], (cond["key"],))
+
+
+def thread_status(state) -> List[Dict[str, Any]]:
+    """
+    Threads with the current values of what they are waiting on.
+    """
+    out = []
+    for t in state.data.get("prophecy_threads") or []:
+        row = dict(t)
+        if t.get("status") == "active" and t["stage"] < len(t["stages"]):
+            row["waiting_on"] = [
+                dict(c, current=current_value(state, c["key"])) for c in t["stages"][t["stage"]]["when"]
+            ]
+        out.append(row)
+    return out
+
+
+class ProphecyEngine:
+    """
+    Advances a guild's prophecy threads when its DirectorState reports
+    settled keys (DirectorState.key_listeners) and publishes a
+    ProphecyAdvanced event per stage reached, fulfilment or failure.
+
+    Per guild, active threads are indexed by the keys their current stage
+    and fail conditions read, so hundreds of threads cost nothing until
+    an event touches one of their keys. The index is rebuilt only when a
+    thread moves.
+    """
+
+    def __init__(self, publish: Optional[Callable[[ProphecyAdvanced], Any]] = None):
+        self.publish = publish
+        self._index: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] = {}
+        self.advanced = 0
+
+    def attach(self, guild_id, state):
+        gid = str(guild_id)
+        self._index.pop(gid, None)
+        state.key_listeners.append(lambda keys: self.check(gid, state, keys))
+
+    # -------------------------------------------------
+    # Registration (ST commands)
+    # -------------------------------------------------
+    @staticmethod
+    def threads(state) -> List[Dict[str, Any]]:
+        return state.data.setdefault("prophecy_threads", [])
+
+    def add(self, guild_id, state, spec: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Register a thread (from parse_thread) and save. Stages whose
+        conditions already hold are reached right away.
+        """
+        items = self.threads(state)
+        n = max((int(t["id"][1:]) for t in items if str(t.get("id", "")).startswith("p")
+                 and t["id"][1:].isdigit()), default=0) + 1
+        t = dict(spec, id=f"p{n}", status="active", stage=0, reached=[], created_at=time.time())
+        items.append(t)
+        gid = str(guild_id)
+        self._index.pop(gid, None)
+        self._advance(gid, state, t)
+        state.save()
+        return t
+
+    def remove(self, guild_id, state, thread_id: str) -> bool:
+        items = self.threads(state)
+        kept = [t for t in items if t.get("id") != thread_id]
+        if len(kept) == len(items):
+            return False
+        items[:] = kept
+        self._index.pop(str(guild_id), None)
+        state.save()
+        return True
+
+    # -------------------------------------------------
+    # Evaluation
+    # -------------------------------------------------
+    def _index_for(self, gid: str, state) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        index = self._index.get(gid)
+        if index is None:
+            index = {}
+            for t in state.data.get("prophecy_threads") or []:
+                if t.get("status") != "active":
+                    continue
+                for key in _watched(t):
+                    index.setdefault(key, {})[t["id"]] = t
+            self._index[gid] = index
+        return index
+
+    def check(self, guild_id, state, keys: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        Re-evaluate the threads watching `keys`; returns those that moved.
+        """
+        gid = str(guild_id)
+        try:
+            index = self._index_for(gid, state)
+            if not index:
+                return []
+            candidates: Dict[str, Dict[str, Any]] = {}
+            for k in keys:
+                candidates.update(index.get(k, ()))
+            moved = [t for t in candidates.values() if self._advance(gid, state, t)]
+            if moved:
+                self._index.pop(gid, None)
+            return moved
+        except Exception:
+            log.exception("Prophecy check failed for guild %s", gid)
+            return []
+
+    def _advance(self, gid: str, state, t: Dict[str, Any]) -> bool:
+        """
+        Move one active thread as far as its conditions allow.
+        """
+        moved = False
+        while t.get("status") == "active":
+            if any(_holds(state, c) for c in t.get("fail") or []):
+                t["status"] = "failed"
+                t["ended_at"] = time.time()
+                self._publish(gid, t, t["stage"], "")
+                return True
+            stage = t["stages"][t["stage"]]
+            test = any if stage.get("any") else all
+            if not test(_holds(state, c) for c in stage["when"]):
+                break
+            reached = t["stage"]
+            t.setdefault("reached", []).append({"stage": reached, "at": time.time()})
+            t["stage"] = reached + 1
+            if t["stage"] >= len(t["stages"]):
+                t["status"] = "fulfilled"
+                t["ended_at"] = time.time()
+            self._publish(gid, t, reached, stage.get("text", ""))
+            moved = True
+        return moved
+
+    def _publish(self, gid: str, t: Dict[str, Any], stage: int, text: str):
+        self.advanced += 1
+        if self.publish is None:
+            return
+        self.publish(ProphecyAdvanced(
+            guild_id=gid,
+            thread_id=t["id"],
+            title=t.get("title", ""),
+            stage=stage,
+            text=text,
+            status=t["status"],
+        ))
+
 
 def resolve_prophecy(state) -> str:
     """
-    Pick the highest theme and generate the prophecy hint.
+    The prophecy hint for a scene: the latest omen of the furthest-along
+    active thread, else the highest theme.
+
+    `state` may be the legacy director_system DirectorState, a V5
+    DirectorState or a raw state dict.
     """
-    themes = state.get("themes", {})
+    if isinstance(state, Mapping):
+        data = state
+    else:
+        data = getattr(getattr(state, "state", state), "data", {})
+
+    active = [t for t in data.get("prophecy_threads") or []
+              if t.get("status") == "active" and t.get("stage", 0) > 0]
+    if active:
+        t = max(active, key=lambda t: t["stage"] / len(t["stages"]))
+        return f"{t['title']}: {t['stages'][t['stage'] - 1].get('text', '')}".rstrip(": ")
+
+    themes = data.get("themes", {})
     if not themes:
         return "The future is unclear."
 
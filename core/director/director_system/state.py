@@ -1,54 +1,155 @@
-from dataclasses import dataclass, field
-from typing import Dict, List, Any
-import copy
+from typing import Any, Dict, Iterator, List, MutableMapping
+
+# The legacy city-scale Director API, kept for its call sites. There is no
+# separate legacy store any more: every DirectorState below is a live
+# adapter over the guild's one V5 state in the DirectorRegistry, so reads
+# copy nothing and writes are deltas on that state (one clamp and one
+# save per transaction) instead of a rewritten director block.
+
+# Legacy influence bucket -> V5 pressure key
+INFLUENCE_KEYS: Dict[str, str] = {
+    "violence": "violence_pressure",
+    "masquerade": "masquerade_pressure",
+    "occult": "occult_pressure",
+    "politics": "political_pressure",
+    "second_inquisition": "si_pressure",
+}
+_PRESSURE_KEYS = {v: k for k, v in INFLUENCE_KEYS.items()}
+
+# Legacy awareness range; the V5 state allows 0-20, but writes through
+# this API keep the old 0-10 bound.
+AWARENESS_MAX = 10
+
+
+def _pressure_key(key: str) -> str:
+    key = key.lower()
+    if key == "si":
+        key = "second_inquisition"
+    return INFLUENCE_KEYS.get(key, f"{key}_pressure")
+
+
+class _Influence(MutableMapping):
+    """
+    influence["violence"] reads and writes violence_pressure.
+    """
+
+    def __init__(self, state):
+        self._state = state
+
+    def __getitem__(self, key: str) -> int:
+        return int(self._state.data.get(_pressure_key(key), 0))
+
+    def __setitem__(self, key: str, value: int):
+        self._state.adjust(_pressure_key(key), int(value) - self[key])
+
+    def __delitem__(self, key: str):
+        raise TypeError("influence buckets cannot be removed")
+
+    def __iter__(self) -> Iterator[str]:
+        for k in self._state.data:
+            if k in _PRESSURE_KEYS:
+                yield _PRESSURE_KEYS[k]
+            elif k.endswith("_pressure"):
+                yield k[: -len("_pressure")]
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class _Themes(MutableMapping):
+    """
+    themes["occult"] reads and writes the V5 theme weight (0–10).
+    """
+
+    def __init__(self, state):
+        self._state = state
+
+    def __getitem__(self, key: str) -> int:
+        # A theme the guild has not touched yet sits at the neutral weight.
+        return self._state.theme_weight(key)
+
+    def __contains__(self, key) -> bool:
+        return key in self._state.data.get("themes", {})
+
+    def __setitem__(self, key: str, value: int):
+        self._state.adjust_theme(key, int(value) - self[key])
+
+    def __delitem__(self, key: str):
+        self._state.data.get("themes", {}).pop(key)
+        self._state.save()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._state.data.get("themes", {})))
+
+    def __len__(self) -> int:
+        return len(self._state.data.get("themes", {}))
+
 
-@dataclass
 class DirectorState:
     """Represents the 'self-aware' city-scale Director AI.
 
-    awareness: how 'awake' the city is to trouble (0-5+)
+    awareness: how 'awake' the city is to trouble
     influence: buckets tracking pressure in different themes
     themes: running tallies per theme (violence, occult, masquerade, politics, etc.)
     prophecy_threads: long-running narrative arcs
+
+    An adapter over a core.director.state.DirectorState (`.state`).
+    Changes apply to it immediately; group them in transaction() to get
+    one clamp and one save.
     """
-    awareness: int = 0
-    influence: Dict[str, int] = field(default_factory=dict)
-    themes: Dict[str, int] = field(default_factory=dict)
-    prophecy_threads: List[Dict[str, Any]] = field(default_factory=list)
+
+    def __init__(self, state):
+        self.state = state
+        self.influence = _Influence(state)
+        self.themes = _Themes(state)
+
+    @property
+    def awareness(self) -> int:
+        return int(self.state.data.get("awareness", 0))
+
+    @awareness.setter
+    def awareness(self, value: int):
+        self.state.adjust("awareness", int(value) - self.awareness, hi=AWARENESS_MAX)
+
+    @property
+    def prophecy_threads(self) -> List[Dict[str, Any]]:
+        return self.state.data.setdefault("prophecy_threads", [])
+
+    def transaction(self, tx=None):
+        return self.state.transaction(tx=tx)
 
     def bump_theme(self, theme: str, amount: int = 1):
-        theme = theme.lower()
-        self.themes[theme] = self.themes.get(theme, 0) + amount
+        self.state.adjust_theme(theme.lower(), amount)
 
     def bump_influence(self, key: str, amount: int = 1):
-        key = key.lower()
-        self.influence[key] = self.influence.get(key, 0) + amount
-
-    def clamp_awareness(self, minimum: int = 0, maximum: int = 10):
-        self.awareness = max(minimum, min(maximum, self.awareness))
-
-    @classmethod
-    def from_guild(cls, guild_data: dict) -> "DirectorState":
-        raw = guild_data.get("director", {})
-        return cls(
-            awareness=int(raw.get("awareness", 0) or 0),
-            influence=copy.deepcopy(raw.get("influence", {}) or {}),
-            themes=copy.deepcopy(raw.get("themes", {}) or {}),
-            prophecy_threads=copy.deepcopy(raw.get("prophecy_threads", []) or []),
-        )
+        self.state.adjust(_pressure_key(key), amount)
+
+    def clamp_awareness(self, minimum: int = 0, maximum: int = AWARENESS_MAX):
+        # A zero delta: inside a transaction the bound applies at its clamp.
+        self.state.adjust("awareness", 0, lo=minimum, hi=maximum)
 
     def to_dict(self) -> dict:
         return {
-            "awareness": int(self.awareness),
+            "awareness": self.awareness,
             "influence": dict(self.influence),
             "themes": dict(self.themes),
             "prophecy_threads": list(self.prophecy_threads),
         }
 
 
-def get_director_state(guild_data: dict) -> DirectorState:
-    return DirectorState.from_guild(guild_data)
+def get_director_state(guild_id, registry=None) -> DirectorState:
+    """
+    The guild's Director through the legacy API. `registry` defaults to
+    the bot's DIRECTORS.
+    """
+    if registry is None:
+        from core.director.registry import DIRECTORS as registry
+    return DirectorState(registry.get(guild_id))
 
 
-def save_director_state(guild_data: dict, state: DirectorState):
-    guild_data["director"] = state.to_dict()
+def save_director_state(state: DirectorState, tx=None):
+    """
+    Persist changes made outside a transaction (staged into the store
+    transaction `tx` if given).
+    """
+    return state.state.save(tx=tx)
@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import functools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from core.director.director import V5DirectorAdapter
+from core.director.director_system.nightly import tick_arrays
+from core.director.history import DIRECTOR_HISTORY_DIR, FIELDS, vector
+from core.director.registry import DIRECTOR_STATE_DIR, DIRECTOR_STATE_PATH
+from core.director.state import DEFAULT_STATE, DirectorState
+from core.events.log import EventLog
+from core.events.types import AttackResolved, FrenzyFailed, GameEvent, HavenRaided, HuntResolved, TravelCompleted
+
+# Monte Carlo forecast of a guild's V5 Director state.
+#
+# Every event kind ("hunt:human:messy", "travel:margate", "raid:3", ...)
+# is turned into a per-field delta by running the real V5DirectorAdapter
+# rule on a scratch state, so the forecast follows the rules as they are
+# coded. Each simulated night draws Poisson event counts per kind for all
+# samples at once, adds counts @ deltas, and clamps once — the same net
+# delta + single clamp a DirectorTransaction applies — then runs the
+# nightly tick (director_system.nightly.tick_arrays) on the columns.
+#
+#   python -m core.director.forecast GUILD --nights 30 --rate hunt:human=2
+
+DAY = 86400.0
+PERCENTILES = (5, 25, 50, 75, 95)
+
+PRESSURES = ("masquerade_pressure", "violence_pressure", "occult_pressure", "si_pressure", "political_pressure")
+# DirectorState.adjust clamps pressures to 0–20, adjust_theme themes to 0–10
+LO = np.array([0 for _ in FIELDS], dtype=np.int64)
+HI = np.array([10 if f.startswith("theme:") else 20 for f in FIELDS], dtype=np.int64)
+_PRESSURE_IDX = [FIELDS.index(f) for f in PRESSURES]
+_THEME_IDX = [j for j, f in enumerate(FIELDS) if f.startswith("theme:")]
+_AWARENESS_IDX = FIELDS.index("awareness")
+# DirectorState.global_threat_level bands
+_THREAT_EDGES = np.array([10, 20, 30, 40])
+
+
+# -------------------------------------------------
+# Event kinds -> deltas through the real rules
+# -------------------------------------------------
+def event_key(event: GameEvent) -> Optional[str]:
+    if isinstance(event, HuntResolved):
+        suffix = ":messy" if event.messy else ":bestial" if event.bestial else ""
+        return f"hunt:{event.source}{suffix}"
+    if isinstance(event, AttackResolved):
+        return f"attack:{event.outcome}"
+    if isinstance(event, FrenzyFailed):
+        return "frenzy:messy" if event.messy else "frenzy:bestial" if event.bestial else "frenzy"
+    if isinstance(event, TravelCompleted):
+        suffix = ":sunrise" if event.crossed_sunrise else ":near_sunrise" if event.near_sunrise else ""
+        return f"travel:{event.zone_key}{suffix}"
+    if isinstance(event, HavenRaided):
+        return f"raid:{max(1, min(5, int(event.severity)))}"
+    return None
+
+
+class _ScratchState(DirectorState):
+    """
+    A DirectorState that never touches disk, parked mid-range so a rule's
+    full delta shows before clamping.
+    """
+
+    def __init__(self):
+        super().__init__(path="")
+
+    def load(self):
+        self.data = copy.deepcopy(DEFAULT_STATE)
+        for f in FIELDS:
+            if f.startswith("theme:"):
+                self.data["themes"][f[6:]] = 5
+            else:
+                self.data[f] = 10
+
+    def save(self, tx=None):
+        return None
+
+    def save_later(self, delay=None):
+        return None
+
+
+def _apply(adapter: V5DirectorAdapter, key: str, zone_risks: Mapping[str, Dict[str, int]]):
+    kind, _, rest = key.partition(":")
+    if kind == "hunt":
+        source, _, flag = rest.partition(":")
+        adapter.apply_hunt(source or "human", messy=flag == "messy", bestial=flag == "bestial")
+    elif kind == "attack":
+        adapter.apply_attack(rest)
+    elif kind == "frenzy":
+        adapter.apply_frenzy(True, messy=rest == "messy", bestial=rest == "bestial")
+    elif kind == "travel":
+        zone, _, flag = rest.partition(":")
+        adapter.apply_travel(
+            zone_risks.get(zone) or {},
+            crossed_sunrise=flag == "sunrise",
+            near_sunrise=flag == "near_sunrise",
+        )
+    elif kind == "raid":
+        adapter.apply_raid(int(rest or 3))
+    else:
+        raise ValueError(f"Unknown event kind {key!r}")
+
+
+def effect_matrix(keys: List[str], zone_risks: Optional[Mapping[str, Dict[str, int]]] = None) -> np.ndarray:
+    """
+    (len(keys), len(FIELDS)) deltas, one row per event kind.
+    """
+    zone_risks = zone_risks or {}
+    rows = []
+    for key in keys:
+        state = _ScratchState()
+        before = np.array(vector(state.data))
+        _apply(V5DirectorAdapter(state), key, zone_risks)
+        rows.append(np.array(vector(state.data)) - before)
+    return np.array(rows, dtype=np.int64).reshape(len(keys), len(FIELDS))
+
+
+def rates_from_events(events: Iterable[GameEvent], nights: float) -> Dict[str, float]:
+    """
+    Per-night rate of each event kind over a window of `nights`.
+    """
+    counts: Dict[str, int] = {}
+    for e in events:
+        key = event_key(e)
+        if key:
+            counts[key] = counts.get(key, 0) + 1
+    nights = max(nights, 1e-9)
+    return {k: c / nights for k, c in counts.items()}
+
+
+# -------------------------------------------------
+# Simulation
+# -------------------------------------------------
+def threat_levels(state: np.ndarray) -> np.ndarray:
+    total = state[:, _PRESSURE_IDX].sum(axis=1)
+    return np.searchsorted(_THREAT_EDGES, total, side="left") + 1
+
+
+def simulate(
+    start: np.ndarray,
+    rates: np.ndarray,
+    effects: np.ndarray,
+    nights: int,
+    samples: int,
+    seed: Optional[int] = None,
+    percentiles: Tuple[int, ...] = PERCENTILES,
+) -> Dict[str, np.ndarray]:
+    """
+    Returns {"bands": (nights, P, F), "threat": (nights, P), "first_cap": (samples, F)}
+    where first_cap is the first night each field hit its cap (0 = never).
+    """
+    rng = np.random.default_rng(seed)
+    n_fields = len(FIELDS)
+    state = np.tile(start.astype(np.int64), (samples, 1))
+    bands = np.empty((nights, len(percentiles), n_fields))
+    threat = np.empty((nights, len(percentiles)))
+    first_cap = np.zeros((samples, n_fields), dtype=np.int64)
+    present = np.ones((samples, len(_THEME_IDX)), dtype=bool)
+
+    for night in range(nights):
+        if len(rates):
+            counts = rng.poisson(rates, size=(samples, len(rates)))
+            state += counts @ effects
+            np.clip(state, LO, HI, out=state)
+        # Caps count when reached during the night, before the tick
+        hit = (state >= HI) & (first_cap == 0)
+        first_cap[hit] = night + 1
+        # The real nightly tick: themes cool, awareness drifts towards 1-3
+        awareness, themes = tick_arrays(state[:, _AWARENESS_IDX], state[:, _THEME_IDX], present)
+        state[:, _AWARENESS_IDX] = awareness
+        state[:, _THEME_IDX] = themes
+        bands[night] = np.percentile(state, percentiles, axis=0)
+        threat[night] = np.percentile(threat_levels(state), percentiles)
+
+    return {"bands": bands, "threat": threat, "first_cap": first_cap}
+
+
+def forecast(
+    start: Mapping[str, Any],
+    rates: Mapping[str, float],
+    nights: int = 30,
+    samples: int = 2000,
+    zone_risks: Optional[Mapping[str, Dict[str, int]]] = None,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Percentile bands for every field and for global_threat_level, for
+    nights 1..N, plus how likely and how soon each field reaches its cap.
+
+    start: a DirectorState.data dict; rates: {event kind: events per night}.
+    Plain data in and out, so it can run in a worker process.
+    """
+    t0 = time.perf_counter()
+    keys = sorted(k for k, r in rates.items() if r > 0)
+    effects = effect_matrix(keys, zone_risks)
+    start_vec = np.array(vector(start), dtype=np.int64)
+    sim = simulate(
+        start_vec,
+        np.array([rates[k] for k in keys], dtype=float),
+        effects,
+        nights,
+        samples,
+        seed,
+    )
+
+    first_cap = sim["first_cap"]
+    cap: Dict[str, Any] = {}
+    for j, f in enumerate(FIELDS):
+        hits = first_cap[:, j][first_cap[:, j] > 0]
+        cap[f] = {
+            "cap": int(HI[j]),
+            "probability": round(len(hits) / samples, 4),
+            "night_p50": int(np.percentile(hits, 50)) if len(hits) else None,
+            "night_p90": int(np.percentile(hits, 90)) if len(hits) else None,
+        }
+
+    return {
+        "nights": nights,
+        "samples": samples,
+        "percentiles": list(PERCENTILES),
+        "rates": {k: rates[k] for k in keys},
+        "effects": {k: {f: int(v) for f, v in zip(FIELDS, row) if v} for k, row in zip(keys, effects)},
+        "start": dict(zip(FIELDS, start_vec.tolist())),
+        "bands": {f: sim["bands"][:, :, j].round(2).tolist() for j, f in enumerate(FIELDS)},
+        "global_threat": sim["threat"].round(2).tolist(),
+        "cap": cap,
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+
+
+# -------------------------------------------------
+# Inputs from disk (bot files; the API only reads)
+# -------------------------------------------------
+def load_start_state(guild_id, state_dir: str = DIRECTOR_STATE_DIR) -> Dict[str, Any]:
+    path = os.path.join(state_dir, f"{guild_id}.json")
+    for p in (path, DIRECTOR_STATE_PATH):
+        if os.path.exists(p):
+            with open(p, "r", encoding="utf-8") as f:
+                return json.load(f)
+    return copy.deepcopy(DEFAULT_STATE)
+
+
+def recent_rates(guild_id, window_nights: float = 14, root: str = DIRECTOR_HISTORY_DIR) -> Dict[str, float]:
+    since = time.time() - window_nights * DAY
+    return rates_from_events(EventLog(root).read(guild_id, since=since), window_nights)
+
+
+def guild_forecast(
+    guild_id,
+    nights: int = 30,
+    samples: int = 2000,
+    window_nights: float = 14,
+    rates: Optional[Mapping[str, float]] = None,
+    scale: float = 1.0,
+    zone_risks: Optional[Mapping[str, Dict[str, int]]] = None,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Forecast from the guild's current state: the last `window_nights` of
+    logged events set the rates (times `scale`), and explicit `rates`
+    override or add event kinds ("what if they hunt humans twice a night").
+    """
+    merged = {k: v * scale for k, v in recent_rates(guild_id, window_nights).items()}
+    merged.update(rates or {})
+    result = forecast(load_start_state(guild_id), merged, nights, samples, zone_risks, seed)
+    result["guild_id"] = str(guild_id)
+    result["window_nights"] = window_nights
+    return result
+
+
+_POOL: Optional[ProcessPoolExecutor] = None
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _POOL
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(max_workers=1)
+    return _POOL
+
+
+async def guild_forecast_async(guild_id, **kwargs) -> Dict[str, Any]:
+    """
+    guild_forecast in a worker process, so the caller's event loop (and
+    GIL) stay free while thousands of nights are simulated.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pool(), functools.partial(guild_forecast, guild_id, **kwargs))
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def _parse_rate(text: str) -> Tuple[str, float]:
+    key, _, value = text.partition("=")
+    return key.strip(), float(value)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m core.director.forecast")
+    parser.add_argument("guild")
+    parser.add_argument("--nights", type=int, default=30)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--window", type=float, default=14, help="nights of logged events to derive rates from")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply logged rates")
+    parser.add_argument("--rate", action="append", type=_parse_rate, default=[], help="KIND=PER_NIGHT, e.g. hunt:human=2")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    result = guild_forecast(
+        args.guild, nights=args.nights, samples=args.samples, window_nights=args.window,
+        rates=dict(args.rate), scale=args.scale, seed=args.seed,
+    )
+    if args.json:
+        print(json.dumps(result))
+        return
+
+    print(f"guild {result['guild_id']}: {args.nights} nights × {args.samples} samples in {result['elapsed_ms']} ms")
+    print("rates/night: " + (", ".join(f"{k}={v:.2f}" for k, v in result["rates"].items()) or "none"))
+    marks = sorted({n for n in (1, 7, 14, 30, args.nights) if n <= args.nights})
+    print(f"\n{'field':<22}" + "".join(f"{'night ' + str(n):>16}" for n in marks) + f"{'P(cap)':>9}{'cap p50':>9}")
+    rows = [(f, result["bands"][f]) for f in FIELDS] + [("global_threat", result["global_threat"])]
+    for name, bands in rows:
+        cells = "".join(f"{b[n - 1][2]:>7.0f} [{b[n - 1][0]:.0f}-{b[n - 1][4]:.0f}]".rjust(16) for n, b in ((n, bands) for n in marks))
+        cap = result["cap"].get(name)
+        tail = f"{cap['probability']:>9.2f}{str(cap['night_p50'] or '-'):>9}" if cap else ""
+        print(f"{name:<22}{cells}{tail}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import struct
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core.storage.io_executor import PendingWrite, completed_write, get_writer
+
+# Director pressure history, per guild:
+#
+#   <root>/<guild_id>/raw.ring      every change          (t, values...)
+#   <root>/<guild_id>/hourly.ring   one bucket per hour   (start, end, n, last/min/max/sum per field)
+#   <root>/<guild_id>/nightly.ring  one bucket per night  (same layout)
+#
+# Each .ring is a fixed-capacity ring of fixed-size records behind a small
+# header, so the files never grow past capacity and a reader can
+# binary-search by time without an index. The open hour/night bucket is
+# rewritten in place on every change, so rollups are always current and a
+# month of pressure is ~720 hourly records, not a scan of raw events.
+#
+# Only the bot writes; the API reads the files directly (query()).
+
+DIRECTOR_HISTORY_DIR = os.getenv(
+    "DIRECTOR_HISTORY_DIR",
+    os.path.join(os.path.dirname(__file__), "director_history"),
+)
+
+FIELDS: Tuple[str, ...] = (
+    "awareness",
+    "masquerade_pressure",
+    "violence_pressure",
+    "occult_pressure",
+    "si_pressure",
+    "political_pressure",
+    "theme:violence",
+    "theme:occult",
+    "theme:masquerade",
+    "theme:politics",
+    "theme:mystery",
+)
+
+HOUR = 3600.0
+NIGHT = 86400.0
+# Nights run noon to noon (UTC) so a whole night lands in one bucket.
+NIGHT_OFFSET = float(os.getenv("DIRECTOR_NIGHT_START_HOUR", "12")) * HOUR
+
+RESOLUTIONS = ("raw", "hour", "night")
+
+_MAGIC = b"DRH1"
+_HEADER = struct.Struct("<4sIIII")  # magic, record size, capacity, count, head
+RAW_RECORD = struct.Struct("<d" + "f" * len(FIELDS))
+ROLLUP_RECORD = struct.Struct("<ddI" + "f" * (4 * len(FIELDS)))
+
+
+def vector(data: Dict[str, Any]) -> Tuple[float, ...]:
+    """
+    FIELDS values from a DirectorState.data (or summarize()) dict.
+    """
+    themes = data.get("themes") or {}
+    out = []
+    for f in FIELDS:
+        if f.startswith("theme:"):
+            out.append(float(themes.get(f[6:], 5)))
+        else:
+            out.append(float(data.get(f, 0)))
+    return tuple(out)
+
+
+# -------------------------------------------------
+# Ring files
+# -------------------------------------------------
+def _pwrite_all(path: str, writes: List[Tuple[int, bytes]]):
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        for offset, blob in writes:
+            os.pwrite(fd, blob, offset)
+    finally:
+        os.close(fd)
+
+
+class RingFile:
+    """
+    Writer side of one .ring file. Keeps the header in memory; append() and
+    replace_last() return the (offset, bytes) writes that make it durable.
+    """
+
+    def __init__(self, path: str, record: struct.Struct, capacity: int):
+        self.path = path
+        self.record = record
+        self.capacity = capacity
+        self.count = 0
+        self.head = 0  # next physical slot
+        self.last: Optional[Tuple] = None
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with open(self.path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            magic, size, capacity, count, head = _HEADER.unpack(header)
+            if magic != _MAGIC or size != self.record.size:
+                return  # unreadable or old layout: start over
+            self.capacity, self.count, self.head = capacity, count, head
+            if count:
+                f.seek(self._offset((head - 1) % capacity))
+                blob = f.read(self.record.size)
+                if len(blob) == self.record.size:
+                    self.last = self.record.unpack(blob)
+
+    def _offset(self, slot: int) -> int:
+        return _HEADER.size + slot * self.record.size
+
+    def _header(self) -> Tuple[int, bytes]:
+        return 0, _HEADER.pack(_MAGIC, self.record.size, self.capacity, self.count, self.head)
+
+    def append(self, values: Tuple) -> List[Tuple[int, bytes]]:
+        slot = self.head
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.capacity, self.count + 1)
+        self.last = values
+        # Record first, then the header that makes it visible.
+        return [(self._offset(slot), self.record.pack(*values)), self._header()]
+
+    def replace_last(self, values: Tuple) -> List[Tuple[int, bytes]]:
+        if not self.count:
+            return self.append(values)
+        self.last = values
+        return [(self._offset((self.head - 1) % self.capacity), self.record.pack(*values))]
+
+
+def read_ring(path: str, record: struct.Struct, since: float, until: float) -> List[Tuple]:
+    """
+    Records with since <= t <= until (t = first field), oldest first.
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, "rb") as f:
+        blob = f.read()
+    if len(blob) < _HEADER.size:
+        return []
+    magic, size, capacity, count, head = _HEADER.unpack_from(blob)
+    if magic != _MAGIC or size != record.size or not count:
+        return []
+
+    start = (head - count) % capacity
+
+    def t_at(i: int) -> float:
+        return record.unpack_from(blob, _HEADER.size + ((start + i) % capacity) * size)[0]
+
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if t_at(mid) < since:
+            lo = mid + 1
+        else:
+            hi = mid
+    out = []
+    for i in range(lo, count):
+        rec = record.unpack_from(blob, _HEADER.size + ((start + i) % capacity) * size)
+        if rec[0] > until:
+            break
+        out.append(rec)
+    return out
+
+
+# -------------------------------------------------
+# Rollups
+# -------------------------------------------------
+def _bucket_start(t: float, width: float, offset: float = 0.0) -> float:
+    return (t - offset) // width * width + offset
+
+
+def _new_bucket(start: float, t: float, values: Sequence[float]) -> Tuple:
+    per_field: List[float] = []
+    for v in values:
+        per_field.extend((v, v, v, v))  # last, min, max, sum
+    return (start, t, 1, *per_field)
+
+
+def _merge_bucket(bucket: Tuple, t: float, values: Sequence[float]) -> Tuple:
+    start, _, n = bucket[0], bucket[1], bucket[2]
+    stats = list(bucket[3:])
+    for i, v in enumerate(values):
+        j = 4 * i
+        stats[j] = v
+        stats[j + 1] = min(stats[j + 1], v)
+        stats[j + 2] = max(stats[j + 2], v)
+        stats[j + 3] += v
+    return (start, t, n + 1, *stats)
+
+
+class _GuildHistory:
+    def __init__(self, directory: str, raw_capacity: int, hourly_capacity: int, nightly_capacity: int):
+        self.dir = directory
+        os.makedirs(directory, exist_ok=True)
+        self.raw = RingFile(os.path.join(directory, "raw.ring"), RAW_RECORD, raw_capacity)
+        self.hourly = RingFile(os.path.join(directory, "hourly.ring"), ROLLUP_RECORD, hourly_capacity)
+        self.nightly = RingFile(os.path.join(directory, "nightly.ring"), ROLLUP_RECORD, nightly_capacity)
+
+
+class PressureHistory:
+    """
+    Records Director pressure changes per guild and keeps the hourly and
+    nightly rollups current. record() is cheap and runs on the caller; the
+    file writes go through the disk writer (ordered per file) when an
+    event loop is running, inline otherwise.
+    """
+
+    def __init__(
+        self,
+        root: str = DIRECTOR_HISTORY_DIR,
+        raw_capacity: int = 4096,
+        hourly_capacity: int = 24 * 92,
+        nightly_capacity: int = 2 * 366,
+        writer=None,
+    ):
+        self.root = root
+        self.raw_capacity = raw_capacity
+        self.hourly_capacity = hourly_capacity
+        self.nightly_capacity = nightly_capacity
+        self._writer = writer
+        self._guilds: Dict[str, _GuildHistory] = {}
+
+    def _guild(self, guild_id) -> _GuildHistory:
+        gid = str(guild_id)
+        g = self._guilds.get(gid)
+        if g is None:
+            g = self._guilds[gid] = _GuildHistory(
+                os.path.join(self.root, gid), self.raw_capacity, self.hourly_capacity, self.nightly_capacity
+            )
+        return g
+
+    def _write(self, path: str, writes: List[Tuple[int, bytes]]) -> PendingWrite:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            _pwrite_all(path, writes)
+            return completed_write()
+        writer = self._writer or get_writer()
+        return writer.submit(path, _pwrite_all, path, writes)
+
+    def _roll(self, ring: RingFile, start: float, t: float, values: Tuple[float, ...]):
+        last = ring.last
+        if last is not None and last[0] == start:
+            return ring.replace_last(_merge_bucket(last, t, values))
+        return ring.append(_new_bucket(start, t, values))
+
+    def record(self, guild_id, data: Dict[str, Any], t: Optional[float] = None) -> Optional[PendingWrite]:
+        """
+        Record the state if any tracked value changed since the last sample.
+        """
+        values = vector(data)
+        g = self._guild(guild_id)
+        # Pressures and themes are small ints, exact in float32.
+        if g.raw.last is not None and tuple(g.raw.last[1:]) == values:
+            return None
+        t = time.time() if t is None else t
+
+        self._write(g.raw.path, g.raw.append((t, *values)))
+        self._write(g.hourly.path, self._roll(g.hourly, _bucket_start(t, HOUR), t, values))
+        return self._write(g.nightly.path, self._roll(g.nightly, _bucket_start(t, NIGHT, NIGHT_OFFSET), t, values))
+
+    def recorder(self, guild_id):
+        """
+        Callback for DirectorState.on_change.
+        """
+        return lambda data: self.record(guild_id, data)
+
+
+# -------------------------------------------------
+# Queries (API side)
+# -------------------------------------------------
+def pick_resolution(since: float, until: float) -> str:
+    span = until - since
+    if span <= 2 * NIGHT:
+        return "raw"
+    if span <= 62 * NIGHT:
+        return "hour"
+    return "night"
+
+
+def query(
+    root: str,
+    guild_id,
+    since: float,
+    until: float,
+    resolution: str = "auto",
+    fields: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Range read for charts. Raw points carry each field's value; rollup
+    points carry {"last", "min", "max", "mean"} per field.
+    """
+    if not str(guild_id).isdigit():
+        # It names a directory under root
+        raise ValueError("guild_id must be numeric")
+    if resolution == "auto":
+        resolution = pick_resolution(since, until)
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"resolution must be auto or one of {', '.join(RESOLUTIONS)}")
+    wanted = [f for f in (fields or FIELDS) if f in FIELDS]
+    index = {f: i for i, f in enumerate(FIELDS)}
+    directory = os.path.join(root, str(guild_id))
+
+    points: List[Dict[str, Any]] = []
+    if resolution == "raw":
+        for rec in read_ring(os.path.join(directory, "raw.ring"), RAW_RECORD, since, until):
+            point: Dict[str, Any] = {"t": rec[0]}
+            for f in wanted:
+                point[f] = rec[1 + index[f]]
+            points.append(point)
+    else:
+        name = "hourly.ring" if resolution == "hour" else "nightly.ring"
+        width = HOUR if resolution == "hour" else NIGHT
+        # A bucket that started before `since` still overlaps it.
+        for rec in read_ring(os.path.join(directory, name), ROLLUP_RECORD, since - width, until):
+            start, end, n = rec[0], rec[1], rec[2]
+            if start + width <= since:
+                continue
+            point = {"t": start, "t_end": end, "n": n}
+            for f in wanted:
+                j = 3 + 4 * index[f]
+                point[f] = {
+                    "last": rec[j],
+                    "min": rec[j + 1],
+                    "max": rec[j + 2],
+                    "mean": rec[j + 3] / n if n else rec[j],
+                }
+            points.append(point)
+
+    return {
+        "guild_id": str(guild_id),
+        "resolution": resolution,
+        "since": since,
+        "until": until,
+        "fields": wanted,
+        "points": points,
+    }
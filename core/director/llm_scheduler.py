@@ -0,0 +1,492 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, Optional, TypeVar
+
+log = logging.getLogger(__name__)
+
+# Global scheduler for model calls.
+#
+# Every cog shares one provider quota, so a burst of scenes across guilds
+# used to trip 429s and every call failed at once. ScheduledModel wraps
+# ai_model_text / ai_model_json (core.config) and sends each call through
+# LLM_SCHEDULER, which:
+#
+#   - runs higher priority classes first: player-facing scenes, then ST
+#     tooling, then background pre-generation;
+#   - within a class, takes guilds round-robin, so one busy guild cannot
+#     hold the queue;
+#   - spends a token bucket (LLM_RPM per minute, LLM_BURST deep) per call;
+#   - keeps an adaptive concurrency limit: +1/limit per fast success,
+#     shrinks while latency runs over LLM_TARGET_LATENCY, halves on a 429
+#     and pauses the bucket for LLM_429_COOLDOWN seconds;
+#   - drops a request (LLMRequestDropped) once its deadline has passed, or
+#     when the observed latency says it cannot finish in time anyway.
+#
+# Priority and guild come from the calling task (llm_context()); tasks
+# spawned inside inherit them, so AIDirector's gathered stages are
+# scheduled as the command that started them.
+#
+# A streamed call holds its concurrency slot until the response object
+# is back (first token), not until the stream ends: the provider limits
+# requests, not open streams.
+
+SCENE, ST, BACKGROUND = "scene", "st", "background"
+PRIORITIES = (SCENE, ST, BACKGROUND)
+
+# 0 hands the models to the cogs unwrapped.
+LLM_SCHEDULER_ENABLED = os.getenv("LLM_SCHEDULER", "1") != "0"
+LLM_RPM = float(os.getenv("LLM_RPM", "600"))
+LLM_BURST = int(os.getenv("LLM_BURST", "20"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_MIN_CONCURRENCY = 1
+LLM_TARGET_LATENCY = float(os.getenv("LLM_TARGET_LATENCY", "8"))
+LLM_429_COOLDOWN = float(os.getenv("LLM_429_COOLDOWN", "5"))
+# A throttled call goes back in the queue this many times before the 429
+# reaches the caller.
+LLM_429_RETRIES = int(os.getenv("LLM_429_RETRIES", "2"))
+# Seconds from submission after which a request is no longer worth making.
+LLM_DEADLINES = {
+    SCENE: float(os.getenv("LLM_DEADLINE_SCENE", "30")),
+    ST: float(os.getenv("LLM_DEADLINE_ST", "60")),
+    BACKGROUND: float(os.getenv("LLM_DEADLINE_BACKGROUND", "600")),
+}
+# Calls made outside any llm_context().
+DEFAULT_PRIORITY = ST
+# Latency EWMA weight of the newest sample.
+LATENCY_ALPHA = 0.2
+# Multiplier per latency decrease (at most one per observed latency).
+LATENCY_BACKOFF = 0.9
+# Wait-time samples kept per priority for the percentiles.
+WAIT_WINDOW = 512
+
+T = TypeVar("T")
+
+
+class LLMRequestDropped(TimeoutError):
+    """
+    A queued model call was dropped: its deadline passed, or would have
+    before an answer could come back.
+    """
+
+
+# (priority, guild id, absolute deadline or None) of the current task.
+_CONTEXT: contextvars.ContextVar[Optional[tuple]] = contextvars.ContextVar("llm_context", default=None)
+
+
+@contextmanager
+def llm_context(priority: str = SCENE, guild_id=None, deadline: Optional[float] = None) -> Iterator[None]:
+    """
+    Schedule model calls made in this block (and in tasks it starts) as
+    `priority` for `guild_id`. `deadline` is seconds from each call's
+    submission; None uses LLM_DEADLINES for the class.
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown LLM priority {priority!r}: use one of {', '.join(PRIORITIES)}")
+    token = _CONTEXT.set((priority, None if guild_id is None else str(guild_id), deadline))
+    try:
+        yield
+    finally:
+        _CONTEXT.reset(token)
+
+
+@contextmanager
+def llm_guild(guild_id, priority: str = SCENE) -> Iterator[None]:
+    """
+    llm_context for `guild_id` that keeps a priority already set by the
+    caller (an ST command running a scene stays ST); else `priority`.
+    """
+    current = _CONTEXT.get()
+    if current is None:
+        with llm_context(priority, guild_id):
+            yield
+    else:
+        with llm_context(current[0], guild_id, current[2]):
+            yield
+
+
+def current_context() -> tuple:
+    return _CONTEXT.get() or (DEFAULT_PRIORITY, None, None)
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """
+    True for a provider 429 (google.api_core ResourceExhausted, an HTTP
+    error with status 429, or anything that says so).
+    """
+    for attr in ("code", "status_code", "status"):
+        code = getattr(exc, attr, None)
+        if callable(code):
+            continue
+        if code == 429 or getattr(code, "value", None) == 429:
+            return True
+    if type(exc).__name__ in ("ResourceExhausted", "TooManyRequests", "RateLimitError"):
+        return True
+    text = str(exc).lower()
+    return "429" in text or "rate limit" in text or "resource exhausted" in text
+
+
+def _percentile(samples, q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class TokenBucket:
+    """
+    `rate` tokens per second, at most `capacity` banked. pause() empties
+    it and stops refills until the pause is over.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = max(1e-6, float(rate))
+        self.capacity = max(1, int(capacity))
+        self.tokens = float(self.capacity)
+        self._stamp = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float):
+        start = max(self._stamp, self.paused_until)
+        if now > start:
+            self.tokens = min(self.capacity, self.tokens + (now - start) * self.rate)
+        self._stamp = max(now, self._stamp)
+
+    def take(self) -> float:
+        """
+        Spend a token: 0.0 if one was available, else seconds until one is.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now + (1 - self.tokens) / self.rate
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def pause(self, seconds: float):
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = 0.0
+        self.paused_until = max(self.paused_until, now + seconds)
+
+
+class _Request:
+    __slots__ = ("priority", "guild", "deadline", "submitted", "grant", "attempts")
+
+    def __init__(self, priority: str, guild: str, deadline: float, grant: asyncio.Future):
+        self.priority = priority
+        self.guild = guild
+        self.deadline = deadline
+        self.submitted = time.monotonic()
+        self.grant = grant
+        self.attempts = 0
+
+
+class _ClassStats:
+    __slots__ = ("submitted", "completed", "errors", "dropped", "throttled", "waits")
+
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.errors = 0
+        self.dropped = 0
+        self.throttled = 0
+        self.waits: Deque[float] = deque(maxlen=WAIT_WINDOW)
+
+
+class LLMScheduler:
+    """
+    Priority + fair-share queue in front of the model provider.
+
+    submit(call) waits for a slot (priority class, then guild round-robin,
+    then a rate token and a free concurrency slot), runs `call()`, and
+    returns its result. stats() reports queue depth, waits, the current
+    limit and the drop / 429 counters.
+    """
+
+    def __init__(
+        self,
+        rpm: float = LLM_RPM,
+        burst: int = LLM_BURST,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        min_concurrency: int = LLM_MIN_CONCURRENCY,
+        target_latency: float = LLM_TARGET_LATENCY,
+        cooldown: float = LLM_429_COOLDOWN,
+        retries: int = LLM_429_RETRIES,
+        deadlines: Optional[Dict[str, float]] = None,
+    ):
+        self.bucket = TokenBucket(rpm / 60.0, burst)
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.min_concurrency = max(1, min(int(min_concurrency), self.max_concurrency))
+        self.limit = float(self.max_concurrency)
+        self.target_latency = float(target_latency)
+        self.cooldown = float(cooldown)
+        self.retries = max(0, int(retries))
+        self.deadlines = {**LLM_DEADLINES, **(deadlines or {})}
+        self.in_flight = 0
+        self.latency: Optional[float] = None
+        self._last_decrease = 0.0
+        # priority -> guild -> waiting requests, guilds in round-robin order
+        self._queues: Dict[str, "OrderedDict[str, Deque[_Request]]"] = {p: OrderedDict() for p in PRIORITIES}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._stats = {p: _ClassStats() for p in PRIORITIES}
+
+    # -------------------------------------------------
+    # Queue
+    # -------------------------------------------------
+    def queued(self, priority: Optional[str] = None) -> int:
+        classes = PRIORITIES if priority is None else (priority,)
+        return sum(
+            sum(1 for r in q if not r.grant.done())
+            for p in classes for q in self._queues[p].values()
+        )
+
+    def _enqueue(self, req: _Request, front: bool = False):
+        q = self._queues[req.priority].get(req.guild)
+        if q is None:
+            q = self._queues[req.priority][req.guild] = deque()
+        if front:
+            q.appendleft(req)
+        else:
+            q.append(req)
+
+    def _next(self) -> Optional[_Request]:
+        """
+        The next live request: highest class first, guilds in turn.
+        Requests whose caller gave up (cancelled grant) are discarded.
+        """
+        for priority in PRIORITIES:
+            guilds = self._queues[priority]
+            while guilds:
+                guild, q = next(iter(guilds.items()))
+                while q and q[0].grant.done():
+                    q.popleft()
+                if not q:
+                    del guilds[guild]
+                    continue
+                req = q.popleft()
+                if q:
+                    guilds.move_to_end(guild)
+                else:
+                    del guilds[guild]
+                return req
+        return None
+
+    def _peek(self) -> Optional[_Request]:
+        for priority in PRIORITIES:
+            for q in self._queues[priority].values():
+                for req in q:
+                    if not req.grant.done():
+                        return req
+        return None
+
+    def _pump(self):
+        """
+        Grant slots while there is capacity, a rate token and a request.
+        """
+        self._timer = None
+        while self.in_flight < int(self.limit):
+            if self._peek() is None:
+                return
+            wait = self.bucket.take()
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._pump)
+                return
+            req = self._next()
+            now = time.monotonic()
+            if now + (self.latency or 0.0) > req.deadline:
+                # Would answer after nobody is waiting: skip the call, and
+                # give the token back for the next request.
+                self.bucket.tokens = min(self.bucket.capacity, self.bucket.tokens + 1)
+                self._drop(req, "would miss its deadline")
+                continue
+            self.in_flight += 1
+            self._stats[req.priority].waits.append(now - req.submitted)
+            req.grant.set_result(None)
+
+    def _wake(self):
+        if self._timer is None:
+            self._pump()
+
+    def _drop(self, req: _Request, why: str):
+        self._stats[req.priority].dropped += 1
+        req.grant.set_exception(LLMRequestDropped(
+            f"{req.priority} model call for guild {req.guild} dropped: {why}"
+        ))
+
+    # -------------------------------------------------
+    # Adaptive concurrency
+    # -------------------------------------------------
+    def _observe(self, seconds: float):
+        self.latency = seconds if self.latency is None else (
+            LATENCY_ALPHA * seconds + (1 - LATENCY_ALPHA) * self.latency
+        )
+        now = time.monotonic()
+        if self.latency > self.target_latency:
+            # Back off at most once per round trip, so one slow patch
+            # does not collapse the limit.
+            if now - self._last_decrease >= self.latency:
+                self.limit = max(self.min_concurrency, self.limit * LATENCY_BACKOFF)
+                self._last_decrease = now
+        else:
+            self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+
+    def _throttled(self):
+        now = time.monotonic()
+        if now - self._last_decrease >= self.cooldown:
+            before = int(self.limit)
+            self.limit = max(self.min_concurrency, self.limit / 2)
+            self._last_decrease = now
+            if int(self.limit) < before:
+                log.warning(
+                    "Model provider rate limited us: concurrency limit %d -> %d, pausing %.1fs",
+                    before, int(self.limit), self.cooldown,
+                )
+        self.bucket.pause(self.cooldown)
+
+    # -------------------------------------------------
+    # Calls
+    # -------------------------------------------------
+    async def submit(
+        self,
+        call: Callable[[], Awaitable[T]],
+        priority: Optional[str] = None,
+        guild_id=None,
+        deadline: Optional[float] = None,
+    ) -> T:
+        """
+        Run `call()` when scheduled; priority, guild and deadline default
+        to the current llm_context(). Raises LLMRequestDropped when the
+        deadline passes first; a 429 is retried LLM_429_RETRIES times.
+        """
+        ctx_priority, ctx_guild, ctx_deadline = current_context()
+        priority = priority or ctx_priority
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown LLM priority {priority!r}: use one of {', '.join(PRIORITIES)}")
+        guild = str(guild_id) if guild_id is not None else (ctx_guild or "-")
+        budget = deadline if deadline is not None else (
+            ctx_deadline if ctx_deadline is not None else self.deadlines[priority]
+        )
+        loop = asyncio.get_running_loop()
+        req = _Request(priority, guild, time.monotonic() + budget, loop.create_future())
+        stats = self._stats[priority]
+        stats.submitted += 1
+
+        while True:
+            self._enqueue(req, front=req.attempts > 0)
+            self._wake()
+            try:
+                await asyncio.wait_for(req.grant, max(0.0, req.deadline - time.monotonic()))
+            except BaseException as e:
+                grant = req.grant
+                if grant.done() and not grant.cancelled() and grant.exception() is None:
+                    # Granted just as the caller was cancelled: hand the
+                    # slot back.
+                    self.in_flight -= 1
+                    self._wake()
+                elif isinstance(e, TimeoutError) and grant.cancelled():
+                    # wait_for gave up on it; a grant can no longer arrive.
+                    stats.dropped += 1
+                    raise LLMRequestDropped(
+                        f"{priority} model call for guild {guild} dropped: deadline passed in queue"
+                    ) from None
+                raise
+
+            start = time.monotonic()
+            try:
+                result = await call()
+            except Exception as e:
+                if is_rate_limited(e):
+                    stats.throttled += 1
+                    self._throttled()
+                    if req.attempts < self.retries and time.monotonic() < req.deadline:
+                        req.attempts += 1
+                        req.grant = loop.create_future()
+                        continue
+                else:
+                    self._observe(time.monotonic() - start)
+                stats.errors += 1
+                raise
+            else:
+                self._observe(time.monotonic() - start)
+                stats.completed += 1
+                return result
+            finally:
+                self.in_flight -= 1
+                self._wake()
+
+    # -------------------------------------------------
+    # Metrics
+    # -------------------------------------------------
+    def stats(self) -> Dict[str, Any]:
+        classes = {}
+        for p in PRIORITIES:
+            s = self._stats[p]
+            classes[p] = {
+                "queued": self.queued(p),
+                "guilds_waiting": sum(
+                    1 for q in self._queues[p].values() if any(not r.grant.done() for r in q)
+                ),
+                "submitted": s.submitted,
+                "completed": s.completed,
+                "errors": s.errors,
+                "dropped": s.dropped,
+                "throttled": s.throttled,
+                "wait_p50_ms": round(_percentile(s.waits, 0.50) * 1000, 1),
+                "wait_p95_ms": round(_percentile(s.waits, 0.95) * 1000, 1),
+                "wait_max_ms": round(max(s.waits, default=0.0) * 1000, 1),
+            }
+        now = time.monotonic()
+        self.bucket._refill(now)
+        return {
+            "queued": sum(c["queued"] for c in classes.values()),
+            "in_flight": self.in_flight,
+            "limit": int(self.limit),
+            "max_concurrency": self.max_concurrency,
+            "latency_ms": round((self.latency or 0.0) * 1000, 1),
+            "target_latency_ms": round(self.target_latency * 1000, 1),
+            "rpm": round(self.bucket.rate * 60, 1),
+            "tokens": round(self.bucket.tokens, 2),
+            "paused_for": round(max(0.0, self.bucket.paused_until - now), 2),
+            "classes": classes,
+        }
+
+    def control_handler(self):
+        """
+        The "llm_stats" op for StoreControlServer.register().
+        """
+        async def handle(req: Dict[str, Any]) -> Dict[str, Any]:
+            return {"ok": True, "llm": self.stats()}
+
+        return handle
+
+
+class ScheduledModel:
+    """
+    A GenerativeModel whose async calls go through a scheduler. Anything
+    else (generation_config, count_tokens, the blocking generate_content)
+    passes straight to the wrapped model.
+    """
+
+    def __init__(self, model, scheduler: LLMScheduler):
+        self.model = model
+        self.scheduler = scheduler
+
+    def __getattr__(self, name: str):
+        return getattr(self.model, name)
+
+    async def generate_content_async(self, contents: Any, *args, **kwargs):
+        return await self.scheduler.submit(
+            lambda: self.model.generate_content_async(contents, *args, **kwargs)
+        )
+
+
+LLM_SCHEDULER = LLMScheduler()
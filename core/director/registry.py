@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from core.director.director import V5DirectorAdapter
+from core.director.director_system.prophecy import ProphecyEngine
+from core.director.history import DIRECTOR_HISTORY_DIR, PressureHistory
+from core.director.replay import DirectorJournal
+from core.director.state import DirectorState
+from core.director.thresholds import ThresholdWatcher
+
+# Former single V5-aware director_state.json (separate from legacy
+# director_system); now only the seed for guilds without their own state.
+DIRECTOR_STATE_PATH = os.path.join(os.path.dirname(__file__), "director_state.json")
+# One <guild_id>.json per guild.
+DIRECTOR_STATE_DIR = os.getenv(
+    "DIRECTOR_STATE_DIR",
+    os.path.join(os.path.dirname(__file__), "director_states"),
+)
+DIRECTOR_CACHE_SIZE = int(os.getenv("DIRECTOR_CACHE_SIZE", "256"))
+
+
+class DirectorRegistry:
+    """
+    Per-guild V5 Director state: <root>/<guild_id>.json.
+
+    States are loaded on first use and kept in an LRU of `capacity`
+    guilds. Each guild saves to its own file, so a hunt in one guild
+    rewrites only that guild's state and never waits behind another's.
+
+    With a PressureHistory, every persisted change is also recorded in
+    the guild's pressure time series; with a ThresholdWatcher, every
+    settled change is checked against the guild's ST thresholds, and with
+    a ProphecyEngine it advances the guild's prophecy threads. With a
+    DirectorJournal, every rules event and night tick is journaled for
+    replay (core.director.replay).
+
+    A guild without a file yet starts from `seed_path` (the old global
+    director_state.json) when it exists, else from DEFAULT_STATE.
+
+    Eviction flushes a pending write-behind save first and skips states
+    with an open DirectorTransaction. Resolve the state per command rather
+    than keeping it across awaits; an evicted object that is still
+    written to afterwards would be reloaded stale.
+
+    This is the one Director model per guild: the legacy director_system
+    API and the nightly tick work on these states too. A process that only
+    reads the bot's files (the API) uses follow=True, which reloads a
+    cached state whenever its file changed on disk.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        capacity: int = 256,
+        seed_path: Optional[str] = None,
+        history: Optional[PressureHistory] = None,
+        follow: bool = False,
+        thresholds: Optional[ThresholdWatcher] = None,
+        prophecies: Optional[ProphecyEngine] = None,
+        journal: Optional[DirectorJournal] = None,
+    ):
+        self.root = root
+        self.follow = follow
+        self.history = history
+        self.thresholds = thresholds
+        self.prophecies = prophecies
+        self.journal = journal
+        self.capacity = max(1, int(capacity))
+        self.seed_path = seed_path
+        self._states: "OrderedDict[str, Tuple[DirectorState, V5DirectorAdapter]]" = OrderedDict()
+        self.loads = 0
+        self.evictions = 0
+
+    def path_for(self, guild_id) -> str:
+        return os.path.join(self.root, f"{guild_id}.json")
+
+    # -------------------------------------------------
+    # Lookup
+    # -------------------------------------------------
+    def _entry(self, guild_id) -> Tuple[DirectorState, V5DirectorAdapter]:
+        gid = str(guild_id)
+        entry = self._states.get(gid)
+        if entry is not None:
+            self._states.move_to_end(gid)
+            if self.follow:
+                entry[0].reload_if_changed()
+            return entry
+
+        state = self._load(gid)
+        entry = (state, V5DirectorAdapter(state))
+        self._states[gid] = entry
+        self.loads += 1
+        self._evict()
+        return entry
+
+    def _read(self, gid: str) -> DirectorState:
+        return DirectorState(self.path_for(gid), seed_path=self.seed_path)
+
+    def _load(self, gid: str, state: Optional[DirectorState] = None) -> DirectorState:
+        state = state if state is not None else self._read(gid)
+        if self.history is not None:
+            state.on_change = self.history.recorder(gid)
+        if self.thresholds is not None:
+            self.thresholds.attach(gid, state)
+        if self.prophecies is not None:
+            self.prophecies.attach(gid, state)
+        if self.journal is not None:
+            state.on_event = self.journal.recorder(gid)
+        return state
+
+    def get(self, guild_id) -> DirectorState:
+        return self._entry(guild_id)[0]
+
+    def adapter(self, guild_id) -> V5DirectorAdapter:
+        return self._entry(guild_id)[1]
+
+    def __contains__(self, guild_id) -> bool:
+        return str(guild_id) in self._states
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def cached(self) -> Iterator[Tuple[str, DirectorState]]:
+        for gid, (state, _) in list(self._states.items()):
+            yield gid, state
+
+    def guild_ids(self) -> List[str]:
+        """
+        Every guild with state, cached or on disk.
+        """
+        on_disk = set()
+        if os.path.isdir(self.root):
+            on_disk = {n[:-5] for n in os.listdir(self.root) if n.endswith(".json")}
+        return sorted(on_disk | set(self._states))
+
+    def read_states(self, guild_ids: List[str]) -> Dict[str, DirectorState]:
+        """
+        Read and parse these guilds' state files, nothing else: safe to
+        run off the event loop (asyncio.to_thread). Pass the result to
+        states(preloaded=), which attaches the hooks.
+        """
+        return {gid: self._read(gid) for gid in guild_ids}
+
+    def uncached_ids(self) -> List[str]:
+        return [gid for gid in self.guild_ids() if gid not in self._states]
+
+    def states(self, preloaded: Optional[Dict[str, DirectorState]] = None) -> Iterator[Tuple[str, DirectorState]]:
+        """
+        Every guild's state, for whole-city passes (nightly tick). Cached
+        states are yielded as they are; the others are loaded without
+        entering the LRU, so a pass over thousands of guilds does not
+        flush out the ones in active play. Write through what is yielded
+        before moving on: a non-cached state is not kept.
+
+        `preloaded` (from read_states) supplies states already read; a
+        guild cached since then is yielded from the cache instead.
+        """
+        preloaded = preloaded or {}
+        for gid in self.guild_ids():
+            entry = self._states.get(gid)
+            if entry is not None:
+                yield gid, entry[0]
+            else:
+                yield gid, self._load(gid, preloaded.get(gid))
+
+    # -------------------------------------------------
+    # Eviction / flushing
+    # -------------------------------------------------
+    def _evict(self):
+        if len(self._states) <= self.capacity:
+            return
+        for gid in list(self._states):
+            if len(self._states) <= self.capacity:
+                break
+            state = self._states[gid][0]
+            if state._txn is not None:
+                continue
+            state.flush()
+            del self._states[gid]
+            self.evictions += 1
+
+    def flush(self, guild_id=None):
+        """
+        Write pending write-behind saves now: one guild, or every cached one.
+        """
+        if guild_id is not None:
+            entry = self._states.get(str(guild_id))
+            return entry[0].flush() if entry else None
+        for state, _ in list(self._states.values()):
+            state.flush()
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cached": len(self._states),
+            "capacity": self.capacity,
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
+
+
+# The bot's registry, importable by cogs, hooks and the event consumers.
+DIRECTOR_HISTORY = PressureHistory(DIRECTOR_HISTORY_DIR)
+# The bot points their publish at the event bus.
+DIRECTOR_THRESHOLDS = ThresholdWatcher()
+DIRECTOR_PROPHECIES = ProphecyEngine()
+DIRECTOR_JOURNAL = DirectorJournal(DIRECTOR_HISTORY_DIR)
+DIRECTORS = DirectorRegistry(
+    DIRECTOR_STATE_DIR,
+    capacity=DIRECTOR_CACHE_SIZE,
+    seed_path=DIRECTOR_STATE_PATH,
+    history=DIRECTOR_HISTORY,
+    thresholds=DIRECTOR_THRESHOLDS,
+    prophecies=DIRECTOR_PROPHECIES,
+    journal=DIRECTOR_JOURNAL,
+)
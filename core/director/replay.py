@@ -0,0 +1,448 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import functools
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.director.director_system.nightly import tick_arrays
+from core.director.history import (
+    DIRECTOR_HISTORY_DIR, FIELDS, HOUR, NIGHT, NIGHT_OFFSET, RAW_RECORD, ROLLUP_RECORD, read_ring, vector,
+)
+from core.director.rules import DIRECTOR_RULES_PATH, CompiledRules, Rule
+from core.director.state import DEFAULT_STATE, DirectorState
+from core.storage.io_executor import PendingWrite, completed_write, get_writer
+
+# Director event replay and what-if sandbox.
+#
+# The bot journals every event the Director rules see, with the fields
+# the rules read, plus each nightly tick, one compact JSON array per line:
+#
+#   <root>/<guild_id>/director.jsonl
+#   [1718000000.12,"hunt",{"source":"human","messy":true,"zone_key":"margate"}]
+#   [1718035200.0,"night",{"nights":1}]
+#
+# The sandbox replays a window of that journal from the recorded pressure
+# history at its start, once through the rules as they are (baseline) and
+# once per variant (rule weights, clamps or a whole rules file), and
+# reports how each pressure curve would have differed. It runs in a
+# worker process on its own snapshot (files read fresh, forked memory is
+# copy-on-write), so live Director state is never touched.
+#
+#   python -m core.director.replay GUILD --nights 14 --weight hunt.messy=0.5 --clamp si_pressure=0:15
+
+DAY = 86400.0
+RESOLUTIONS = ("event", "hour", "night")
+OUT_FIELDS: Tuple[str, ...] = FIELDS + ("global_threat",)
+
+
+# -------------------------------------------------
+# Journal (bot side writes, tools and the API read)
+# -------------------------------------------------
+def _compact(ctx: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    ctx without empty / false fields (zeros stay: rules may default them).
+    """
+    out: Dict[str, Any] = {}
+    for k, v in ctx.items():
+        if v is None or v is False or v == "" or (isinstance(v, (list, tuple, set, frozenset, dict)) and not v):
+            continue
+        out[k] = sorted(v) if isinstance(v, (set, frozenset)) else v
+    return out
+
+
+def _append(path: str, text: str, max_bytes: int):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if max_bytes and os.path.exists(path) and os.path.getsize(path) >= max_bytes:
+        # Keep one previous generation; older entries age out.
+        os.replace(path, path + ".1")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+class DirectorJournal:
+    """
+    Per-guild append-only journal of Director events, rotated to
+    director.jsonl.1 past `max_bytes`. record() runs on the caller; the
+    append goes through the disk writer (ordered per file) when an event
+    loop is running, inline otherwise.
+    """
+
+    FILENAME = "director.jsonl"
+
+    def __init__(self, root: str = DIRECTOR_HISTORY_DIR, max_bytes: int = 8 * 1024 * 1024, writer=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._writer = writer
+
+    def path_for(self, guild_id) -> str:
+        return os.path.join(self.root, str(guild_id), self.FILENAME)
+
+    def record(self, guild_id, event: str, ctx: Mapping[str, Any], t: Optional[float] = None) -> PendingWrite:
+        t = round(time.time() if t is None else t, 2)
+        line = json.dumps([t, event, _compact(ctx)], separators=(",", ":"), ensure_ascii=False, default=str)
+        path = self.path_for(guild_id)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            _append(path, line + "\n", self.max_bytes)
+            return completed_write()
+        writer = self._writer or get_writer()
+        return writer.submit(path, _append, path, line + "\n", self.max_bytes)
+
+    def recorder(self, guild_id):
+        """
+        Callback for DirectorState.on_event.
+        """
+        return lambda event, ctx: self.record(guild_id, event, ctx)
+
+    def read(self, guild_id, since: float = 0.0, until: Optional[float] = None) -> Iterator[Tuple[float, str, Dict[str, Any]]]:
+        """
+        (t, event, ctx) with since <= t <= until, oldest first.
+        """
+        path = self.path_for(guild_id)
+        for p in (path + ".1", path):
+            if not os.path.exists(p):
+                continue
+            with open(p, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        t, event, ctx = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line
+                    if t < since or (until is not None and t > until):
+                        continue
+                    yield float(t), str(event), ctx
+
+
+# -------------------------------------------------
+# Sandbox
+# -------------------------------------------------
+class SandboxState(DirectorState):
+    """
+    A DirectorState over a private copy of a snapshot; never touches disk.
+    """
+
+    def __init__(self, snapshot: Mapping[str, Any]):
+        self._snapshot = snapshot
+        super().__init__(path="")
+
+    def load(self):
+        self.data = copy.deepcopy(dict(self._snapshot))
+
+    def save(self, tx=None):
+        return None
+
+    def save_later(self, delay=None):
+        return None
+
+
+def _threat(values: Sequence[float]) -> int:
+    total = sum(values[FIELDS.index(f)] for f in FIELDS if f.endswith("_pressure"))
+    return 1 + int(np.searchsorted([10, 20, 30, 40], total, side="left"))
+
+
+class Variant:
+    """
+    A what-if: rules (default: the current file) with per-rule / per-key
+    weights and clamp overrides.
+
+    weights: multipliers looked up as "<rule id>:<key>", "<rule id>",
+        "<event>", "<key>" (e.g. "si_pressure", "theme:occult"), then "*".
+    clamps: {"si_pressure": [0, 15], "theme:occult": [0, 8]}; themes can
+        only be narrowed within 0–10.
+    """
+
+    def __init__(
+        self,
+        rules: CompiledRules,
+        name: str = "variant",
+        weights: Optional[Mapping[str, float]] = None,
+        clamps: Optional[Mapping[str, Sequence[int]]] = None,
+    ):
+        self.rules = rules
+        self.name = name
+        self.weights = {str(k).lower(): float(v) for k, v in (weights or {}).items()}
+        self.clamps: Dict[str, Tuple[int, int]] = {}
+        for key, bounds in (clamps or {}).items():
+            lo, hi = (int(b) for b in bounds)
+            if lo > hi:
+                raise ValueError(f"clamp {key}: lo > hi")
+            self.clamps[str(key).lower()] = (lo, hi)
+
+    def _weight(self, rule: Rule, key: str) -> float:
+        w = self.weights
+        if not w:
+            return 1.0
+        for k in (f"{rule.id.lower()}:{key}", rule.id.lower(), rule.event, key, "*"):
+            if k in w:
+                return w[k]
+        return 1.0
+
+    def _delta(self, rule: Rule, key: str, delta: int) -> int:
+        weight = self._weight(rule, key)
+        return delta if weight == 1.0 else int(round(delta * weight))
+
+    def apply(self, state: DirectorState, event: str, ctx: Mapping[str, Any], fired: Counter):
+        """
+        One event, as CompiledRules.apply does it (one transaction: net
+        deltas, one clamp), with this variant's weights and clamps.
+        """
+        with state.transaction():
+            for rule in self.rules.match(event, ctx):
+                fired[rule.id] += 1
+                for key, value in rule.adjust:
+                    lo, hi = self.clamps.get(key, (0, 20))
+                    state.adjust(key, self._delta(rule, key, value(ctx)), lo=lo, hi=hi)
+                for theme, value in rule.themes:
+                    state.adjust_theme(theme, self._delta(rule, "theme:" + theme, value(ctx)))
+        themes = state.data.get("themes", {})
+        for key, (lo, hi) in self.clamps.items():
+            if key.startswith("theme:") and key[6:] in themes:
+                themes[key[6:]] = max(lo, min(hi, themes[key[6:]]))
+
+    def night(self, state: DirectorState, nights: int):
+        themes = state.data.setdefault("themes", {})
+        keys = list(themes)
+        awareness, cooled = tick_arrays(
+            np.array([int(state.data.get("awareness", 0))], dtype=np.int64),
+            np.array([[int(themes[k]) for k in keys]], dtype=np.int64),
+            np.ones((1, len(keys)), dtype=bool),
+            nights,
+        )
+        state.data["awareness"] = int(awareness[0])
+        themes.update({k: int(v) for k, v in zip(keys, cooled[0])})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "weights": self.weights, "clamps": {k: list(v) for k, v in self.clamps.items()}}
+
+
+def replay(
+    snapshot: Mapping[str, Any],
+    entries: Sequence[Tuple[float, str, Mapping[str, Any]]],
+    variant: Variant,
+) -> Tuple[np.ndarray, Counter]:
+    """
+    (len(entries), len(OUT_FIELDS)) values after each entry, and how
+    often each rule fired.
+    """
+    state = SandboxState(snapshot)
+    fired: Counter = Counter()
+    out = np.empty((len(entries), len(OUT_FIELDS)))
+    for i, (_t, event, ctx) in enumerate(entries):
+        if event == "night":
+            variant.night(state, int(ctx.get("nights", 1)))
+        else:
+            variant.apply(state, event, ctx, fired)
+        values = vector(state.data)
+        out[i, :-1] = values
+        out[i, -1] = _threat(values)
+    return out, fired
+
+
+def _last_per_bucket(times: np.ndarray, resolution: str) -> np.ndarray:
+    """
+    Index of the last entry in each hour / night bucket.
+    """
+    if resolution == "event" or not len(times):
+        return np.arange(len(times))
+    width, offset = (HOUR, 0.0) if resolution == "hour" else (NIGHT, NIGHT_OFFSET)
+    buckets = np.floor((times - offset) / width)
+    _, first_rev = np.unique(buckets[::-1], return_index=True)
+    return np.sort(len(times) - 1 - first_rev)
+
+
+def snapshot_at(root: str, guild_id, t: float) -> Tuple[Dict[str, Any], str]:
+    """
+    The guild's Director values at time t from its pressure history, and
+    where they came from: "raw", else the last hourly / nightly bucket
+    closed by t ("hour", "night"; raw has aged out), else "default".
+    """
+    directory = os.path.join(root, str(guild_id))
+    state = copy.deepcopy(DEFAULT_STATE)
+    values, source = None, "default"
+    raw = read_ring(os.path.join(directory, "raw.ring"), RAW_RECORD, 0.0, t)
+    if raw:
+        values, source = raw[-1][1:], "raw"
+    else:
+        for name, source in (("hourly.ring", "hour"), ("nightly.ring", "night")):
+            # Rollups are keyed by bucket start; rec[1] is their last sample.
+            closed = [r for r in read_ring(os.path.join(directory, name), ROLLUP_RECORD, 0.0, t) if r[1] <= t]
+            if closed:
+                values = [closed[-1][3 + 4 * j] for j in range(len(FIELDS))]
+                break
+        else:
+            source = "default"
+    if values is not None:
+        for f, v in zip(FIELDS, values):
+            if f.startswith("theme:"):
+                state["themes"][f[6:]] = int(v)
+            else:
+                state[f] = int(v)
+    return state, source
+
+
+def _load_rules(rules: Any, rules_path: str) -> CompiledRules:
+    if rules is None:
+        with open(rules_path, "r", encoding="utf-8") as f:
+            rules = json.load(f)
+    return CompiledRules.from_doc(rules)
+
+
+def sandbox(
+    guild_id,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    variants: Sequence[Mapping[str, Any]] = (),
+    resolution: str = "night",
+    root: str = DIRECTOR_HISTORY_DIR,
+    rules_path: str = DIRECTOR_RULES_PATH,
+) -> Dict[str, Any]:
+    """
+    Replay the guild's journal over [since, until] (default: the last 14
+    nights) through the current rules and through each variant
+    ({"name", "weights", "clamps", "rules"}; "rules" is a whole rules doc).
+
+    Plain data in and out, so it can run in a worker process. Curves are
+    the last value per `resolution` bucket; diffs are variant - baseline.
+    """
+    t0 = time.perf_counter()
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"resolution must be one of {', '.join(RESOLUTIONS)}")
+    until = time.time() if until is None else float(until)
+    since = until - 14 * DAY if since is None else float(since)
+    if since >= until:
+        raise ValueError("since must be before until")
+
+    entries = list(DirectorJournal(root).read(guild_id, since, until))
+    snapshot, source = snapshot_at(root, guild_id, since)
+    current = _load_rules(None, rules_path)
+    runs = [Variant(current, name="baseline")]
+    for i, spec in enumerate(variants):
+        rules = _load_rules(spec["rules"], rules_path) if spec.get("rules") is not None else current
+        runs.append(Variant(rules, str(spec.get("name") or f"variant {i + 1}"), spec.get("weights"), spec.get("clamps")))
+
+    times = np.array([t for t, _, _ in entries], dtype=float)
+    pick = _last_per_bucket(times, resolution)
+    start_values = list(vector(snapshot))
+    start_row = np.array(start_values + [_threat(start_values)], dtype=float)
+
+    results = []
+    base_curve = None
+    for run in runs:
+        curve, fired = replay(snapshot, entries, run)
+        if base_curve is None:
+            base_curve = curve
+        diff = curve - base_curve
+        full = np.vstack([start_row, curve])
+        results.append({
+            **run.to_dict(),
+            "curves": {f: curve[pick, j].tolist() for j, f in enumerate(OUT_FIELDS)},
+            "final": {f: float(full[-1, j]) for j, f in enumerate(OUT_FIELDS)},
+            "peak": {f: float(full[:, j].max()) for j, f in enumerate(OUT_FIELDS)},
+            "diff": {
+                f: {
+                    "final": float(diff[-1, j]) if len(diff) else 0.0,
+                    "max_abs": float(np.abs(diff[:, j]).max()) if len(diff) else 0.0,
+                    "mean": round(float(diff[:, j].mean()), 3) if len(diff) else 0.0,
+                }
+                for j, f in enumerate(OUT_FIELDS)
+            },
+            "fired": dict(fired.most_common()),
+        })
+
+    counts = Counter(event for _, event, _ in entries)
+    return {
+        "guild_id": str(guild_id),
+        "since": since,
+        "until": until,
+        "resolution": resolution,
+        "start": dict(zip(OUT_FIELDS, start_row.tolist())),
+        "start_source": source,
+        "events": len(entries) - counts.get("night", 0),
+        "nights": counts.get("night", 0),
+        "by_event": dict(counts.most_common()),
+        "t": times[pick].tolist(),
+        "baseline": results[0],
+        "variants": results[1:],
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+
+
+_POOL: Optional[ProcessPoolExecutor] = None
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _POOL
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(max_workers=1)
+    return _POOL
+
+
+async def sandbox_async(guild_id, **kwargs) -> Dict[str, Any]:
+    """
+    sandbox() in a worker process, off the caller's event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pool(), functools.partial(sandbox, guild_id, **kwargs))
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def _parse_weight(text: str) -> Tuple[str, float]:
+    key, _, value = text.partition("=")
+    return key.strip(), float(value)
+
+
+def _parse_clamp(text: str) -> Tuple[str, List[int]]:
+    key, _, value = text.partition("=")
+    lo, _, hi = value.partition(":")
+    return key.strip(), [int(lo), int(hi)]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m core.director.replay")
+    parser.add_argument("guild")
+    parser.add_argument("--nights", type=float, default=14, help="replay the last N nights")
+    parser.add_argument("--weight", action="append", type=_parse_weight, default=[], help="KEY=MULT, e.g. hunt.messy=0.5")
+    parser.add_argument("--clamp", action="append", type=_parse_clamp, default=[], help="KEY=LO:HI, e.g. si_pressure=0:15")
+    parser.add_argument("--rules", help="alternative rules file to compare")
+    parser.add_argument("--resolution", default="night", choices=RESOLUTIONS)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    variant: Dict[str, Any] = {"name": "what-if", "weights": dict(args.weight), "clamps": dict(args.clamp)}
+    if args.rules:
+        with open(args.rules, "r", encoding="utf-8") as f:
+            variant["rules"] = json.load(f)
+    now = time.time()
+    result = sandbox(args.guild, since=now - args.nights * DAY, until=now, variants=[variant], resolution=args.resolution)
+    if args.json:
+        print(json.dumps(result))
+        return
+
+    print(
+        f"guild {result['guild_id']}: {result['events']} events, {result['nights']} night ticks "
+        f"from {result['start_source']} start, in {result['elapsed_ms']} ms"
+    )
+    what_if = result["variants"][0]
+    print(f"\n{'field':<22}{'start':>8}{'baseline':>10}{'what-if':>9}{'Δ final':>9}{'Δ max':>8}{'Δ mean':>9}")
+    for f in OUT_FIELDS:
+        d = what_if["diff"][f]
+        print(
+            f"{f:<22}{result['start'][f]:>8.0f}{result['baseline']['final'][f]:>10.0f}"
+            f"{what_if['final'][f]:>9.0f}{d['final']:>+9.0f}{d['max_abs']:>8.0f}{d['mean']:>+9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
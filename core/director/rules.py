@@ -0,0 +1,453 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from core.travel.pressure_field import PRESSURE_CHANNELS
+
+log = logging.getLogger(__name__)
+
+# Data-driven Director reactions.
+#
+# data/director_rules.json lists rules: an event name, predicates on the
+# event's fields / tags / severity, and the pressure and theme deltas to
+# apply. The file is compiled once into per-event dispatch tables keyed by
+# frozen index tokens ("tag:urban", "source=human"), so an event only
+# looks at the rules that can match it. Edit the file and the next event
+# picks the change up; a broken edit is logged and the last good rules
+# stay in force.
+#
+#   python -m core.director.rules [path]     # check a rules file
+#
+# Rule keys:
+#   event                 event name ("hunt", "travel", "raid", ...)
+#   id                    optional label for logs and errors
+#   match                 {field: value | [values]}, compared lowercased
+#   if / if_any / unless  fields that must all / at least one / none be truthy
+#   tags_any / tags_all / tags_none
+#   severity_min / severity_max
+#   adjust                {state key: value}, clamped like DirectorState.adjust
+#   themes                {theme: value}, clamped like adjust_theme
+#
+# An event with a zone_key field also raises that zone's local pressure
+# by its violence / masquerade / SI / occult deltas
+# (core.travel.pressure_field).
+#
+# A value is an int, a field name, or
+#   {"from": field | [fields], "default": 0, "div": 1, "add": 0,
+#    "min": None, "max": None, "scale": 1}
+# evaluated as clamp(sum(fields) // div + add, min, max) * scale.
+# Field names may be dotted ("risk.masquerade").
+
+# Default anchored at the repo root: the bot runs from bot/, the API from
+# the root.
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DIRECTOR_RULES_PATH = os.getenv("DIRECTOR_RULES_PATH", os.path.join(_REPO_ROOT, "data", "director_rules.json"))
+
+RULE_KEYS = frozenset({
+    "id", "event", "match", "if", "if_any", "unless",
+    "tags_any", "tags_all", "tags_none", "severity_min", "severity_max",
+    "adjust", "themes",
+})
+VALUE_KEYS = frozenset({"from", "default", "div", "add", "min", "max", "scale"})
+
+Context = Mapping[str, Any]
+Value = Callable[[Context], int]
+
+
+def _norm(value: Any) -> str:
+    return str(value).strip().lower()
+
+
+def _getter(path: str, default: Any = None) -> Callable[[Context], Any]:
+    parts = tuple(path.split("."))
+
+    def get(ctx: Context) -> Any:
+        cur: Any = ctx
+        for p in parts:
+            if not isinstance(cur, Mapping) or p not in cur:
+                return default
+            cur = cur[p]
+        return cur
+
+    return get
+
+
+def _compile_value(spec: Any, where: str) -> Value:
+    if isinstance(spec, bool):
+        raise ValueError(f"{where}: booleans are not deltas")
+    if isinstance(spec, int):
+        return lambda ctx, v=spec: v
+    if isinstance(spec, str):
+        spec = {"from": spec}
+    if not isinstance(spec, dict) or "from" not in spec:
+        raise ValueError(f"{where}: expected an int, a field name or {{\"from\": ...}}")
+    unknown = set(spec) - VALUE_KEYS
+    if unknown:
+        raise ValueError(f"{where}: unknown value keys {sorted(unknown)}")
+
+    sources = spec["from"] if isinstance(spec["from"], list) else [spec["from"]]
+    default = int(spec.get("default", 0))
+    getters = [_getter(str(s), default) for s in sources]
+    div = int(spec.get("div", 1))
+    add = int(spec.get("add", 0))
+    lo, hi = spec.get("min"), spec.get("max")
+    scale = int(spec.get("scale", 1))
+    if div == 0:
+        raise ValueError(f"{where}: div must not be 0")
+
+    def value(ctx: Context) -> int:
+        x = sum(int(g(ctx) or 0) for g in getters) // div + add
+        if lo is not None:
+            x = max(int(lo), x)
+        if hi is not None:
+            x = min(int(hi), x)
+        return x * scale
+
+    return value
+
+
+def _str_set(raw: Any, where: str) -> FrozenSet[str]:
+    if raw is None:
+        return frozenset()
+    if isinstance(raw, str):
+        raw = [raw]
+    if not isinstance(raw, list):
+        raise ValueError(f"{where}: expected a list")
+    return frozenset(_norm(v) for v in raw)
+
+
+class Rule:
+    """
+    One compiled rule.
+    """
+
+    __slots__ = (
+        "order", "id", "event", "match", "if_all", "if_any", "unless",
+        "tags_any", "tags_all", "tags_none", "severity_min", "severity_max",
+        "adjust", "themes",
+    )
+
+    def __init__(self, order: int, raw: Mapping[str, Any]):
+        if not isinstance(raw, Mapping):
+            raise ValueError(f"rule #{order}: expected an object")
+        self.order = order
+        self.id = str(raw.get("id") or f"#{order}")
+        where = f"rule {self.id}"
+        unknown = set(raw) - RULE_KEYS
+        if unknown:
+            raise ValueError(f"{where}: unknown keys {sorted(unknown)}")
+        if not raw.get("event"):
+            raise ValueError(f"{where}: missing event")
+        self.event = _norm(raw["event"])
+
+        self.match: Tuple[Tuple[str, FrozenSet[str]], ...] = tuple(
+            (field, _str_set(values, f"{where}.match.{field}"))
+            for field, values in (raw.get("match") or {}).items()
+        )
+        self.if_all = tuple(str(f) for f in raw.get("if") or ())
+        self.if_any = tuple(str(f) for f in raw.get("if_any") or ())
+        self.unless = tuple(str(f) for f in raw.get("unless") or ())
+        self.tags_any = _str_set(raw.get("tags_any"), f"{where}.tags_any")
+        self.tags_all = _str_set(raw.get("tags_all"), f"{where}.tags_all")
+        self.tags_none = _str_set(raw.get("tags_none"), f"{where}.tags_none")
+        self.severity_min = raw.get("severity_min")
+        self.severity_max = raw.get("severity_max")
+
+        self.adjust: Tuple[Tuple[str, Value], ...] = tuple(
+            (key, _compile_value(v, f"{where}.adjust.{key}")) for key, v in (raw.get("adjust") or {}).items()
+        )
+        self.themes: Tuple[Tuple[str, Value], ...] = tuple(
+            (_norm(key), _compile_value(v, f"{where}.themes.{key}")) for key, v in (raw.get("themes") or {}).items()
+        )
+        if not self.adjust and not self.themes:
+            raise ValueError(f"{where}: no adjust or themes")
+
+    def index_tokens(self) -> FrozenSet[str]:
+        """
+        Tokens at least one of which every matching event carries; empty
+        when the rule has to be checked for every event of its type.
+        """
+        if self.tags_any:
+            return frozenset("tag:" + t for t in self.tags_any)
+        if self.tags_all:
+            return frozenset({"tag:" + min(self.tags_all)})
+        if len(self.match) == 1:
+            field, values = self.match[0]
+            return frozenset(f"{field}={v}" for v in values)
+        if self.if_all:
+            return frozenset({"if:" + self.if_all[0]})
+        if self.if_any:
+            return frozenset("if:" + f for f in self.if_any)
+        return frozenset()
+
+    def matches(self, ctx: Context, tags: FrozenSet[str]) -> bool:
+        for field, values in self.match:
+            if _norm(ctx.get(field, "")) not in values:
+                return False
+        if self.if_all and not all(ctx.get(f) for f in self.if_all):
+            return False
+        if self.if_any and not any(ctx.get(f) for f in self.if_any):
+            return False
+        if self.unless and any(ctx.get(f) for f in self.unless):
+            return False
+        if self.tags_any and not (self.tags_any & tags):
+            return False
+        if self.tags_all and not (self.tags_all <= tags):
+            return False
+        if self.tags_none and (self.tags_none & tags):
+            return False
+        if self.severity_min is not None or self.severity_max is not None:
+            sev = int(ctx.get("severity") or 0)
+            if self.severity_min is not None and sev < self.severity_min:
+                return False
+            if self.severity_max is not None and sev > self.severity_max:
+                return False
+        return True
+
+
+class EventTable:
+    """
+    Dispatch table for one event type: rules checked for every event,
+    plus rules indexed by a token they need ("tag:urban", "source=human",
+    "if:messy").
+    """
+
+    __slots__ = ("always", "indexed", "fields", "flags")
+
+    def __init__(self, rules: Iterable[Rule]):
+        always: List[Rule] = []
+        indexed: Dict[str, List[Rule]] = {}
+        fields, flags = set(), set()
+        for rule in rules:
+            tokens = rule.index_tokens()
+            if not tokens:
+                always.append(rule)
+            for tok in tokens:
+                indexed.setdefault(tok, []).append(rule)
+                if tok.startswith("if:"):
+                    flags.add(tok[3:])
+                elif not tok.startswith("tag:"):
+                    fields.add(tok.partition("=")[0])
+        self.always: Tuple[Rule, ...] = tuple(always)
+        self.indexed: Dict[str, Tuple[Rule, ...]] = {tok: tuple(rs) for tok, rs in indexed.items()}
+        # Fields whose "field=value" token selects rules, and truthy flags
+        self.fields: FrozenSet[str] = frozenset(fields)
+        self.flags: FrozenSet[str] = frozenset(flags)
+
+    def candidates(self, ctx: Context, tags: FrozenSet[str]) -> List[Rule]:
+        found: Dict[int, Rule] = {r.order: r for r in self.always}
+        for tag in tags:
+            for r in self.indexed.get("tag:" + tag, ()):
+                found[r.order] = r
+        for field in self.fields:
+            for r in self.indexed.get(f"{field}={_norm(ctx.get(field, ''))}", ()):
+                found[r.order] = r
+        for flag in self.flags:
+            if ctx.get(flag):
+                for r in self.indexed["if:" + flag]:
+                    found[r.order] = r
+        return [found[k] for k in sorted(found)]
+
+
+class CompiledRules:
+    """
+    All rules of one file, compiled: {event: EventTable}.
+    """
+
+    def __init__(self, raw_rules: Iterable[Mapping[str, Any]]):
+        self.rules: List[Rule] = [Rule(i, raw) for i, raw in enumerate(raw_rules)]
+        by_event: Dict[str, List[Rule]] = {}
+        for rule in self.rules:
+            by_event.setdefault(rule.event, []).append(rule)
+        self.tables: Dict[str, EventTable] = {e: EventTable(rs) for e, rs in by_event.items()}
+
+    @classmethod
+    def from_doc(cls, doc: Any) -> "CompiledRules":
+        if isinstance(doc, Mapping):
+            doc = doc.get("rules")
+        if not isinstance(doc, list):
+            raise ValueError('expected {"rules": [...]}')
+        return cls(doc)
+
+    def match(self, event: str, ctx: Context) -> List[Rule]:
+        table = self.tables.get(_norm(event))
+        if table is None:
+            return []
+        tags = ctx.get("tags") or frozenset()
+        if not isinstance(tags, frozenset):
+            tags = frozenset(_norm(t) for t in tags)
+        return [r for r in table.candidates(ctx, tags) if r.matches(ctx, tags)]
+
+    def deltas(self, event: str, ctx: Context) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """
+        Net ({state key: delta}, {theme: delta}) of every matching rule.
+        """
+        adjust: Counter = Counter()
+        themes: Counter = Counter()
+        for rule in self.match(event, ctx):
+            for key, value in rule.adjust:
+                adjust[key] += value(ctx)
+            for theme, value in rule.themes:
+                themes[theme] += value(ctx)
+        return dict(adjust), dict(themes)
+
+    def apply(self, state, event: str, ctx: Context, tx=None) -> List[Rule]:
+        """
+        Apply the matching rules to a DirectorState in one Director
+        transaction (one clamp, one save; staged into `tx` if given).
+        Returns the rules that fired.
+        """
+        fired = self.match(event, ctx)
+        zone = ctx.get("zone_key")
+        local: Counter = Counter()
+        with state.transaction(tx=tx):
+            for rule in fired:
+                for key, value in rule.adjust:
+                    delta = value(ctx)
+                    state.adjust(key, delta)
+                    if zone and key in PRESSURE_CHANNELS:
+                        local[PRESSURE_CHANNELS[key]] += delta
+                for theme, value in rule.themes:
+                    state.adjust_theme(theme, value(ctx))
+            for channel, delta in local.items():
+                if delta:
+                    state.adjust_zone(zone, channel, delta)
+        record = getattr(state, "on_event", None)
+        if record is not None:
+            record(event, ctx)
+        return fired
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        return {
+            event: {"rules": len(set(t.always) | {r for rs in t.indexed.values() for r in rs}),
+                    "always": len(t.always), "tokens": len(t.indexed)}
+            for event, t in sorted(self.tables.items())
+        }
+
+
+def tag_set(*groups: Optional[Iterable[str]]) -> FrozenSet[str]:
+    """
+    Lowercased tags from several sources (None and empty are skipped).
+    """
+    out = set()
+    for group in groups:
+        if not group:
+            continue
+        if isinstance(group, str):
+            group = [group]
+        out.update(t for t in (_norm(t) for t in group) if t)
+    return frozenset(out)
+
+
+def word_tags(text: Optional[str]) -> FrozenSet[str]:
+    """
+    A label plus its words as tags, so an encounter type
+    "masquerade_breach" also carries "masquerade".
+    """
+    text = _norm(text or "")
+    if not text:
+        return frozenset()
+    return frozenset({text, *(w for w in re.split(r"[^a-z0-9]+", text) if w)})
+
+
+class RuleBook:
+    """
+    The rules file, compiled, reloaded when its mtime changes (checked at
+    most every `check_interval` seconds). A file that fails to parse or
+    compile is logged and the previous rules stay in force.
+    """
+
+    def __init__(self, path: str = DIRECTOR_RULES_PATH, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._rules: Optional[CompiledRules] = None
+        self._mtime: Optional[int] = None
+        self._checked = 0.0
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+
+    def load(self) -> CompiledRules:
+        """
+        (Re)compile the file now; raises on errors, keeping the old rules.
+        """
+        mtime = os.stat(self.path).st_mtime_ns
+        with open(self.path, "r", encoding="utf-8") as f:
+            doc = json.load(f)
+        rules = CompiledRules.from_doc(doc)
+        self._rules, self._mtime = rules, mtime
+        self.reloads += 1
+        self.last_error = None
+        log.info("Director rules loaded from %s: %d rule(s)", self.path, len(rules.rules))
+        return rules
+
+    def reload_if_changed(self) -> bool:
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError as e:
+            if self._rules is None:
+                self._fail(e)
+            return False
+        if mtime == self._mtime:
+            return False
+        try:
+            self.load()
+        except (OSError, ValueError, TypeError) as e:
+            self._mtime = mtime  # do not retry the same broken file every event
+            self._fail(e)
+            return False
+        return True
+
+    def _fail(self, e: Exception):
+        self.last_error = str(e)
+        if self._rules is None:
+            self._rules = CompiledRules([])
+            log.error("Director rules %s not loaded (%s); the Director runs with NO rules", self.path, e)
+            return
+        log.error("Director rules %s not loaded (%s); keeping previous rules", self.path, e)
+
+    @property
+    def rules(self) -> CompiledRules:
+        now = time.monotonic()
+        if self._rules is None or now - self._checked >= self.check_interval:
+            self._checked = now
+            self.reload_if_changed()
+        return self._rules
+
+    def apply(self, state, event: str, ctx: Context, tx=None) -> List[Rule]:
+        return self.rules.apply(state, event, ctx, tx=tx)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "reloads": self.reloads,
+            "last_error": self.last_error,
+            "events": self.rules.summary(),
+        }
+
+
+# The bot's rules; adapters and hooks evaluate through this.
+DIRECTOR_RULES = RuleBook()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m core.director.rules")
+    parser.add_argument("path", nargs="?", default=DIRECTOR_RULES_PATH)
+    args = parser.parse_args(argv)
+    try:
+        book = RuleBook(args.path)
+        rules = book.load()
+    except (OSError, ValueError, TypeError) as e:
+        print(f"{args.path}: {e}")
+        raise SystemExit(1)
+    print(json.dumps({"path": args.path, "events": rules.summary()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
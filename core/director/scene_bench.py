@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import types
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from core.director.llm_scheduler import LLMScheduler, ScheduledModel
+from core.director.scene_stream import storyteller_prompt
+from core.director.stub_model import StubModel
+
+# Scene latency benchmark against the local stub model.
+#
+#   python -m core.director.scene_bench --scenes 200 --concurrency 20
+#   python -m core.director.scene_bench --latency lognormal:800:0.6 --errors 0.02 --timeouts 0.01 --stream
+#   python -m core.director.scene_bench --provider-rpm 300 --scheduler --rpm 280
+#
+# Runs N scene generations (AIDirector.generate_scene, or stream_scene
+# with --stream), at most `concurrency` at a time, over a few synthetic
+# guilds and zones, and reports p50/p95/p99 per pipeline stage from each
+# scene's "timings". Director state and history go to a temp directory,
+# never the live ones. Seeded, so runs with the same flags are comparable.
+# --scheduler puts the models behind an LLMScheduler, as core.config does
+# in the bot; --provider-rpm gives the stub a quota that answers 429.
+#
+# AIDirector takes its model helpers (NPCs, encounter, severity, Director
+# reaction, storyteller) from the bot's `utils` module, which is not part
+# of this package. When it cannot be imported (or with --stub-helpers)
+# the bench installs the helpers below in its place: they prompt the
+# models the way the pipeline needs and check the shape of every answer,
+# so a stub whose canned output stops fitting shows up as shape errors
+# instead of quietly empty scene parts.
+
+ZONES = ("elysium", "docks", "old_town", "university", "harbor", "cathedral")
+STAGE_ORDER = ("context", "npcs", "encounter", "first_text", "storyteller", "reaction", "cache", "total")
+
+
+# -------------------------------------------------
+# Stand-in model helpers (the `utils` module)
+# -------------------------------------------------
+HELPERS = (
+    "populate_location_npcs",
+    "generate_random_encounter",
+    "score_encounter_severity",
+    "apply_director_reaction_from_encounter",
+    "generate_storyteller_response",
+)
+# helper name -> answers that did not have the expected shape
+SHAPE_ERRORS: Counter = Counter()
+
+
+class ShapeError(ValueError):
+    """
+    A model answer that does not fit what the pipeline reads from it.
+    """
+
+
+def _check(helper: str, ok: bool, value: Any):
+    if not ok:
+        SHAPE_ERRORS[helper] += 1
+        raise ShapeError(f"{helper}: unexpected model output {value!r:.200}")
+
+
+async def _ask_json(model, prompt: str, helper: str) -> Any:
+    text = (await model.generate_content_async(prompt)).text
+    try:
+        return json.loads(text)
+    except ValueError:
+        _check(helper, False, text)
+
+
+async def populate_location_npcs(model_json, location_key: str, guild_data=None) -> List[Dict[str, Any]]:
+    helper = "populate_location_npcs"
+    npcs = await _ask_json(
+        model_json, f"List the NPCs present at {location_key} as JSON: [{{name, clan, role}}].", helper,
+    )
+    _check(helper, isinstance(npcs, list) and all(isinstance(n, dict) and n.get("name") for n in npcs), npcs)
+    return npcs
+
+
+async def generate_random_encounter(
+    model_json,
+    guild_data=None,
+    guild_id=None,
+    location_key: Optional[str] = None,
+    travelers=None,
+    director_context=None,
+    tags=None,
+) -> Dict[str, Any]:
+    helper = "generate_random_encounter"
+    encounter = await _ask_json(
+        model_json,
+        f"Generate a random encounter at {location_key} (tags: {', '.join(tags or []) or 'none'}) as JSON: "
+        "{name, description, type, severity 1-5, tags}.",
+        helper,
+    )
+    _check(
+        helper,
+        isinstance(encounter, dict) and bool(encounter.get("name")) and bool(encounter.get("description"))
+        and isinstance(encounter.get("severity"), int),
+        encounter,
+    )
+    return encounter
+
+
+def score_encounter_severity(encounter: Mapping[str, Any], director_context=None) -> int:
+    return max(1, min(5, int(encounter.get("severity") or 1)))
+
+
+async def apply_director_reaction_from_encounter(
+    model_json,
+    director_data: Dict[str, Any],
+    encounter: Mapping[str, Any],
+    guild_data=None,
+    guild_id=None,
+) -> Dict[str, int]:
+    helper = "apply_director_reaction_from_encounter"
+    reaction = await _ask_json(
+        model_json,
+        f"How does the Director react to this encounter? {json.dumps(dict(encounter))} "
+        "Answer as JSON: {field: delta}.",
+        helper,
+    )
+    _check(
+        helper,
+        isinstance(reaction, dict) and all(isinstance(v, int) and k in director_data for k, v in reaction.items()),
+        reaction,
+    )
+    for key, delta in reaction.items():
+        director_data[key] = max(0, min(20, int(director_data.get(key, 0)) + delta))
+    return reaction
+
+
+async def generate_storyteller_response(model_text, context: Mapping[str, Any]) -> str:
+    helper = "generate_storyteller_response"
+    text = (await model_text.generate_content_async(storyteller_prompt(context))).text
+    _check(helper, isinstance(text, str) and bool(text.strip()), text)
+    return text
+
+
+def install_helpers(force: bool = False) -> str:
+    """
+    Make sure `utils` provides AIDirector's helpers: the bot's own when
+    importable (and not `force`), else the stand-ins above. Returns which.
+    Call before importing core.director.ai_director.
+    """
+    if not force:
+        try:
+            import utils
+            if all(hasattr(utils, name) for name in HELPERS):
+                return "utils"
+        except ImportError:
+            pass
+    module = types.ModuleType("utils")
+    module.__doc__ = "Scene bench stand-ins for the bot's model helpers."
+    this = sys.modules[__name__]
+    for name in HELPERS:
+        setattr(module, name, getattr(this, name))
+    sys.modules["utils"] = module
+    return "stub"
+
+
+def _summary(samples: Sequence[float]) -> Dict[str, float]:
+    a = np.asarray(samples, dtype=float)
+    p50, p95, p99 = np.percentile(a, [50, 95, 99])
+    return {
+        "n": int(a.size),
+        "mean_ms": round(float(a.mean()), 1),
+        "p50_ms": round(float(p50), 1),
+        "p95_ms": round(float(p95), 1),
+        "p99_ms": round(float(p99), 1),
+        "max_ms": round(float(a.max()), 1),
+    }
+
+
+async def run_bench(
+    scenes: int = 100,
+    concurrency: int = 10,
+    guilds: int = 4,
+    stream: bool = False,
+    cache: bool = False,
+    model: Optional[Dict[str, Any]] = None,
+    scheduler: Optional[Dict[str, Any]] = None,
+    stub_helpers: bool = False,
+    seed: int = 1,
+) -> Dict[str, Any]:
+    """
+    Run the benchmark in the current event loop; the caller sets up
+    DIRECTOR_STATE_DIR / DIRECTOR_HISTORY_DIR first (main() does).
+    """
+    helpers = install_helpers(force=stub_helpers)
+    # Imported here: the Director registry reads its directories at import,
+    # and AIDirector needs `utils` in place.
+    from core.director.ai_director import FALLBACK_INTRO, AIDirector
+
+    SHAPE_ERRORS.clear()
+
+    model = dict(model or {})
+    text_model = StubModel(seed=seed, **model)
+    json_model = StubModel(generation_config={"response_mime_type": "application/json"}, seed=seed + 1, **model)
+    queue = None if scheduler is None else LLMScheduler(**scheduler)
+    model_text = text_model if queue is None else ScheduledModel(text_model, queue)
+    model_json = json_model if queue is None else ScheduledModel(json_model, queue)
+
+    gate = asyncio.Semaphore(max(1, concurrency))
+    samples: Dict[str, List[float]] = defaultdict(list)
+    outcome = {"failed": 0, "fallback_text": 0, "no_npcs": 0, "no_encounter": 0, "cache_hits": 0}
+
+    async def one(i: int):
+        gid = 900000 + i % max(1, guilds)
+        kwargs = dict(
+            model_text=model_text,
+            model_json=model_json,
+            guild_data={"players": {}, "scene_cache": cache},
+            guild_id=gid,
+            location_key=ZONES[i % len(ZONES)],
+            travelers=[],
+            risk=1 + i % 3,
+        )
+        async with gate:
+            try:
+                if stream:
+                    scene = await AIDirector.stream_scene(on_update=lambda s: None, **kwargs)
+                else:
+                    scene = await AIDirector.generate_scene(**kwargs)
+            except Exception:
+                outcome["failed"] += 1
+                return
+        for stage, ms in (scene.get("timings") or {}).items():
+            samples[stage].append(ms)
+        if scene.get("intro_text") == FALLBACK_INTRO:
+            outcome["fallback_text"] += 1
+        if not scene.get("npcs"):
+            outcome["no_npcs"] += 1
+        if not scene.get("encounter"):
+            outcome["no_encounter"] += 1
+        if scene.get("cache") in ("hit", "joined"):
+            outcome["cache_hits"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(scenes)))
+    elapsed = time.perf_counter() - start
+
+    order = [s for s in STAGE_ORDER if s in samples] + sorted(set(samples) - set(STAGE_ORDER))
+    return {
+        "scenes": scenes,
+        "concurrency": concurrency,
+        "mode": "stream" if stream else "generate",
+        "helpers": helpers,
+        "elapsed_s": round(elapsed, 2),
+        "scenes_per_sec": round(scenes / elapsed, 2) if elapsed else 0.0,
+        **outcome,
+        "stages": {stage: _summary(samples[stage]) for stage in order},
+        "models": {"text": text_model.stats(), "json": json_model.stats()},
+        "shape_errors": dict(SHAPE_ERRORS),
+        "scheduler": None if queue is None else queue.stats(),
+    }
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m core.director.scene_bench")
+    parser.add_argument("--scenes", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--guilds", type=int, default=4)
+    parser.add_argument("--stream", action="store_true", help="stream_scene instead of generate_scene")
+    parser.add_argument("--cache", action="store_true", help="leave the scene cache on")
+    parser.add_argument("--latency", default="lognormal:600:0.4", help="time to first token, e.g. fixed:300, uniform:200:900")
+    parser.add_argument("--tokens-per-sec", type=float, default=120.0)
+    parser.add_argument("--errors", type=float, default=0.0, help="share of model calls that fail")
+    parser.add_argument("--timeouts", type=float, default=0.0, help="share of model calls that hang, then time out")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds an injected timeout hangs")
+    parser.add_argument("--provider-rpm", type=float, default=0.0, help="stub quota per minute; over it calls get a 429")
+    parser.add_argument("--scheduler", action="store_true", help="send model calls through an LLMScheduler")
+    parser.add_argument("--rpm", type=float, default=600.0, help="scheduler rate limit per minute")
+    parser.add_argument("--max-concurrency", type=int, default=16, help="scheduler concurrency ceiling")
+    parser.add_argument("--stub-helpers", action="store_true", help="bench stand-ins even if `utils` is importable")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--dir", help="Director state / history here instead of a temp dir")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    root = args.dir or tempfile.mkdtemp(prefix="vtm-scene-bench-")
+    os.environ["DIRECTOR_STATE_DIR"] = os.path.join(root, "states")
+    os.environ["DIRECTOR_HISTORY_DIR"] = os.path.join(root, "history")
+    try:
+        result = asyncio.run(run_bench(
+            scenes=args.scenes,
+            concurrency=args.concurrency,
+            guilds=args.guilds,
+            stream=args.stream,
+            cache=args.cache,
+            model=dict(
+                latency=args.latency,
+                tokens_per_sec=args.tokens_per_sec,
+                error_rate=args.errors,
+                timeout_rate=args.timeouts,
+                timeout=args.timeout,
+                rpm=args.provider_rpm,
+            ),
+            scheduler=dict(rpm=args.rpm, max_concurrency=args.max_concurrency) if args.scheduler else None,
+            stub_helpers=args.stub_helpers,
+            seed=args.seed,
+        ))
+    finally:
+        if not args.dir:
+            shutil.rmtree(root, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(result))
+        return
+
+    print(
+        f"{result['scenes']} scenes ({result['mode']}, {result['helpers']} helpers), "
+        f"concurrency {result['concurrency']}: {result['elapsed_s']} s, {result['scenes_per_sec']} scenes/s; "
+        f"{result['failed']} failed, {result['fallback_text']} fallback text, {result['no_npcs']} without NPCs, "
+        f"{result['no_encounter']} without encounter, {result['cache_hits']} cache hits"
+    )
+    if result["shape_errors"]:
+        print("  shape errors: " + ", ".join(f"{k} {v}" for k, v in sorted(result["shape_errors"].items())))
+    for name, m in result["models"].items():
+        print(
+            f"  {name} model: {m['calls']} calls, {m['errors']} errors, {m['timeouts']} timeouts, "
+            f"{m['throttled']} throttled, {m['tokens']} tokens"
+        )
+    q = result["scheduler"]
+    if q:
+        c = q["classes"]["scene"]
+        print(
+            f"  scheduler: limit {q['limit']}/{q['max_concurrency']}, {c['completed']} done, "
+            f"{c['throttled']} throttled, {c['dropped']} dropped, wait p50 {c['wait_p50_ms']:.0f} / p95 {c['wait_p95_ms']:.0f} ms"
+        )
+    print()
+    print(f"{'stage':<12} {'n':>6} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for stage, row in result["stages"].items():
+        print(
+            f"{stage:<12} {row['n']:>6} {row['mean_ms']:>9.1f} {row['p50_ms']:>9.1f} "
+            f"{row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+# Scene response cache for AIDirector.generate_scene.
+#
+# Scenes asked for in the same zone, at the same severity band, with the
+# same Director theme ranking and tags come out nearly identical, so the
+# model output of the first one is reused for SCENE_CACHE_TTL seconds.
+# The key is a digest of that bucketed context, not of the raw prompt:
+#
+#   {"g": "123", "zone": "elysium", "severity": 3,
+#    "themes": ["violence", "occult", "masquerade"], "tags": ["haven"]}
+#
+# Entries live in a size-bounded LRU. Identical requests that arrive
+# while the first is still being generated wait for it instead of making
+# their own model calls. A guild opts out with guild_data["scene_cache"]
+# = False (!scenecache off).
+
+SCENE_CACHE_TTL = float(os.getenv("SCENE_CACHE_TTL", "600"))
+SCENE_CACHE_SIZE = int(os.getenv("SCENE_CACHE_SIZE", "512"))
+# Themes in the key: the top N by weight (ties by name).
+THEME_RANK = 3
+GUILD_FLAG = "scene_cache"
+
+
+def enabled_for(guild_data: Optional[Mapping[str, Any]]) -> bool:
+    return not isinstance(guild_data, Mapping) or guild_data.get(GUILD_FLAG, True) is not False
+
+
+def theme_ranking(themes: Optional[Mapping[str, Any]], top: int = THEME_RANK) -> Tuple[str, ...]:
+    """
+    Theme names, heaviest first: ("violence", "occult", "masquerade").
+    """
+    ranked = sorted((themes or {}).items(), key=lambda kv: (-int(kv[1] or 0), str(kv[0])))
+    return tuple(str(k) for k, _ in ranked[:top])
+
+
+def scene_key(
+    guild_id,
+    location_key: Optional[str],
+    severity: int,
+    themes: Iterable[str],
+    tags: Optional[Iterable[str]] = None,
+    **extra: Any,
+) -> str:
+    """
+    Digest of the canonical (sorted, lower-cased) bucketed scene context.
+    """
+    canonical = {
+        "g": str(guild_id),
+        "zone": str(location_key or "").strip().lower(),
+        "severity": int(severity),
+        "themes": list(themes),
+        "tags": sorted({str(t).strip().lower() for t in tags or () if str(t).strip()}),
+        **extra,
+    }
+    blob = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(blob.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SceneCache:
+    """
+    TTL + LRU cache of scene payloads. Values are deep-copied in and out,
+    so a caller editing its scene never changes the cached one.
+    """
+
+    def __init__(self, ttl: float = SCENE_CACHE_TTL, capacity: int = SCENE_CACHE_SIZE):
+        self.ttl = float(ttl)
+        self.capacity = max(1, int(capacity))
+        # key -> (expires at, guild id, value)
+        self._entries: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.joined = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            self.expired += 1
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(entry[2])
+
+    def put(self, key: str, value: Any, guild_id=None):
+        self._entries[key] = (time.monotonic() + self.ttl, str(guild_id), copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_create(
+        self,
+        key: str,
+        create: Callable[[], Awaitable[Any]],
+        guild_id=None,
+        store: Callable[[Any], bool] = lambda value: True,
+    ) -> Tuple[Any, str]:
+        """
+        (value, "hit" | "joined" | "miss"). On a miss `create()` runs and
+        its result is cached if `store(result)`; identical keys asked for
+        meanwhile wait on it. If it fails or is not cached, the waiters
+        make their own.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value, "hit"
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            value = await asyncio.shield(pending)
+            if value is not None:
+                self.joined += 1
+                return copy.deepcopy(value), "joined"
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        shared = None
+        try:
+            value = await create()
+            if store(value):
+                self.put(key, value, guild_id)
+                shared = self._entries[key][2]
+            return value, "miss"
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            future.set_result(shared)
+
+    def clear(self, guild_id=None) -> int:
+        """
+        Drop every entry, or only one guild's; returns how many.
+        """
+        if guild_id is None:
+            n = len(self._entries)
+            self._entries.clear()
+            return n
+        gid = str(guild_id)
+        stale = [k for k, (_, g, _) in self._entries.items() if g == gid]
+        for k in stale:
+            del self._entries[k]
+        return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.joined + self.misses
+        return {
+            "entries": len(self._entries),
+            "capacity": self.capacity,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "joined": self.joined,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.joined) / lookups, 3) if lookups else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+        }
+
+
+SCENE_CACHE = SceneCache()
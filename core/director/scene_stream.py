@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+# Streaming scene delivery.
+#
+# AIDirector.stream_scene() reports the partial scene as NPCs and
+# encounter complete, then as the storyteller's text arrives on the
+# model's streaming API and the Director reaction lands. ProgressiveMessage
+# turns those reports into one posted message plus throttled edits: the
+# first report is posted at once, later ones coalesce so at most one edit
+# goes out per SCENE_STREAM_EDIT_INTERVAL (Discord allows about 5 edits
+# per 5 s per channel), and the final scene is always the last edit.
+
+# 0 turns streaming off: cogs fall back to generate_scene and one send.
+SCENE_STREAM = os.getenv("SCENE_STREAM", "1") != "0"
+SCENE_STREAM_EDIT_INTERVAL = float(os.getenv("SCENE_STREAM_EDIT_INTERVAL", "1.2"))
+
+# Shown at the end of the text while it is still streaming.
+CURSOR = " ▌"
+PLACEHOLDER = "*The night takes shape…*"
+HOOK_PREFIX = "quest hook:"
+
+STORYTELLER_PROMPT = """You are the Storyteller of a Vampire: The Masquerade chronicle.
+Write the opening of a scene: two to four short paragraphs, second person,
+present tense, moody and concrete. Do not list NPCs or game statistics.
+End with one line that starts with "Quest hook:" and gives a single hook.
+
+Location: {location}
+Severity: {severity}/5 ({severity_label})
+City: masquerade {masquerade}, violence {violence}, occult {occult}, second inquisition {si}, politics {politics} (0-20)
+Dominant themes: {themes}
+Present: {npcs}
+Encounter: {encounter}
+{extra}"""
+
+
+def _npc_line(npc: Any) -> str:
+    if not isinstance(npc, Mapping):
+        return str(npc)
+    detail = ", ".join(str(npc[k]) for k in ("clan", "role") if npc.get(k))
+    return f"{npc.get('name', 'someone')} ({detail})" if detail else str(npc.get("name", "someone"))
+
+
+def storyteller_prompt(context: Mapping[str, Any]) -> str:
+    """
+    The streaming storyteller prompt, from the same prompt context
+    AIDirector passes to the one-shot storyteller (NPCs and encounter
+    included).
+    """
+    director = context.get("director_context") or {}
+    city = director.get("city_state") or {}
+    themes = city.get("themes") or {}
+    ranked = sorted(themes, key=lambda k: -int(themes[k] or 0))[:3]
+
+    extra = []
+    personal = director.get("personal") or {}
+    if personal:
+        extra.append(
+            f"Focus character: hunger {personal.get('hunger')}, humanity {personal.get('humanity')}, "
+            f"predator type {personal.get('predator_type')}"
+        )
+        if personal.get("suggested_personal_themes"):
+            extra.append("Personal themes: " + ", ".join(personal["suggested_personal_themes"]))
+    if context.get("tags"):
+        extra.append("Tags: " + ", ".join(context["tags"]))
+
+    encounter = context.get("encounter")
+    if isinstance(encounter, Mapping):
+        encounter = " - ".join(str(encounter[k]) for k in ("name", "description") if encounter.get(k))
+
+    return STORYTELLER_PROMPT.format(
+        location=context.get("location_key") or "somewhere in the city",
+        severity=context.get("severity", 1),
+        severity_label=context.get("severity_label", "low"),
+        masquerade=city.get("masquerade_pressure", 0),
+        violence=city.get("violence_pressure", 0),
+        occult=city.get("occult_pressure", 0),
+        si=city.get("si_pressure", 0),
+        politics=city.get("political_pressure", 0),
+        themes=", ".join(ranked) or "none",
+        npcs="; ".join(_npc_line(n) for n in context.get("npcs") or ()) or "no one of note",
+        encounter=encounter or "none",
+        extra="\n".join(extra),
+    ).strip()
+
+
+def split_hook(text: str) -> Tuple[str, str]:
+    """
+    (intro, quest hook) from streamed text; the hook line may be partial.
+    """
+    lowered = text.lower()
+    i = lowered.rfind(HOOK_PREFIX)
+    if i < 0:
+        return text.strip(), ""
+    return text[:i].strip(), text[i + len(HOOK_PREFIX):].strip()
+
+
+class ProgressiveMessage:
+    """
+    One message, posted on the first update and edited as later updates
+    arrive, at most once per `interval`; updates in between coalesce into
+    the next edit (only the latest is sent).
+
+    `post(scene)` sends and returns the message; `edit(message, scene)`
+    edits it. Both render `scene` at send time, so a burst of token
+    updates costs one render. update() never waits on the network.
+    """
+
+    def __init__(
+        self,
+        post: Callable[[Dict[str, Any]], Awaitable[Any]],
+        edit: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        interval: float = SCENE_STREAM_EDIT_INTERVAL,
+    ):
+        self._post = post
+        self._edit = edit
+        self.interval = interval
+        self.message: Any = None
+        self._latest: Optional[Dict[str, Any]] = None
+        self._dirty = False
+        self._last = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self.edits = 0
+
+    def update(self, scene: Dict[str, Any]):
+        self._latest = scene
+        self._dirty = True
+        if self._task is None or self._task.done():
+            if self._task is not None and not self._task.cancelled() and self._task.exception():
+                # The post failed; try again with this update.
+                log.warning("Scene message post failed, retrying: %r", self._task.exception())
+            self._task = asyncio.create_task(self._pump())
+
+    async def _pump(self):
+        while self._dirty:
+            if self.message is None:
+                self._dirty = False
+                self.message = await self._post(self._latest)
+            else:
+                wait = self._last + self.interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._dirty = False
+                try:
+                    await self._edit(self.message, self._latest)
+                    self.edits += 1
+                except Exception:
+                    # A lost intermediate edit is harmless; the next one
+                    # carries everything.
+                    log.exception("Scene message edit failed")
+            self._last = time.monotonic()
+
+    async def finish(self, scene: Dict[str, Any]) -> Any:
+        """
+        Send the final scene (posted or as the last edit) and return the
+        message. Raises if the message could not be posted at all.
+        """
+        self.update(scene)
+        await self._task
+        return self.message
+
+    def cancel(self):
+        if self._task is not None:
+            self._task.cancel()
+
+
+async def deliver_scene(
+    ctx,
+    run: Callable[[Optional[Callable[[Dict[str, Any]], Any]]], Awaitable[Dict[str, Any]]],
+    render: Callable[[Dict[str, Any]], Awaitable[Any]],
+    failure: str = "Scene generation failed.",
+):
+    """
+    Run a scene for a command and show it as an embed: streamed into one
+    progressively edited message (SCENE_STREAM), else sent once when done.
+
+    run(on_update) produces the scene (AIDirector.stream_scene; on_update
+    is None when not streaming); render(scene) builds the embed.
+    """
+    async def post(scene):
+        return await ctx.send(embed=await render(scene))
+
+    async def edit(message, scene):
+        return await message.edit(embed=await render(scene))
+
+    out = ProgressiveMessage(post, edit)
+    async with ctx.typing():
+        try:
+            scene = await run(out.update if SCENE_STREAM else None)
+        except Exception:
+            out.cancel()
+            log.exception("Scene generation failed")
+            return await ctx.reply(failure)
+    return await out.finish(scene)
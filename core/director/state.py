@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import asyncio
+import copy
 import json
 import os
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Iterable, List, Mapping, Optional, Tuple
+
+from core.storage.io_executor import PendingWrite, write_json
+from core.travel.pressure_field import FIELD_KEY as ZONE_FIELD, LOCAL_MAX
 
 
 DEFAULT_STATE: Dict[str, Any] = {
@@ -30,37 +35,151 @@ class DirectorState:
     Thin manager around a city-scale director_state JSON blob.
     """
 
-    def __init__(self, path: str):
+    # Debounce for write-behind flushes (seconds).
+    FLUSH_DELAY = 2.0
+
+    def __init__(self, path: str, seed_path: Optional[str] = None):
         self.path = path
+        # Read when `path` does not exist yet (e.g. a guild's first state
+        # starting from the old global file).
+        self.seed_path = seed_path
         self.data: Dict[str, Any] = {}
+        # mtime of the file last loaded (follow-mode registries reload on change)
+        self._mtime: Optional[int] = None
+        self._txn: Optional["DirectorTransaction"] = None
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Called with self.data whenever a change is persisted or
+        # scheduled (pressure history); set by DirectorRegistry.
+        self.on_change: Optional[Callable[[Dict[str, Any]], Any]] = None
+        # Each called with the keys whose values just settled ("awareness",
+        # "si_pressure", "theme:occult"): after each clamped adjust, or
+        # once per transaction. Threshold alerts and prophecies hang off this.
+        self.key_listeners: List[Callable[[set], Any]] = []
+        # Called with (event, ctx) for every rules event applied, and
+        # ("night", {"nights": n}) per nightly tick (replay journal).
+        self.on_event: Optional[Callable[[str, Mapping[str, Any]], Any]] = None
         self.load()
 
     # -------------------------------------------------
     # IO
     # -------------------------------------------------
     def load(self):
-        if os.path.exists(self.path):
+        source = self.path
+        if not os.path.exists(source) and self.seed_path:
+            source = self.seed_path
+        if os.path.exists(source):
             try:
-                with open(self.path, "r", encoding="utf-8") as f:
+                self._mtime = os.stat(source).st_mtime_ns if source == self.path else None
+                with open(source, "r", encoding="utf-8") as f:
                     self.data = json.load(f)
             except Exception:
-                self.data = DEFAULT_STATE.copy()
+                self.data = copy.deepcopy(DEFAULT_STATE)
         else:
-            self.data = DEFAULT_STATE.copy()
+            # Deep copy: states are per guild now, and a shared "themes"
+            # dict would leak one guild's theme shifts into the others.
+            self.data = copy.deepcopy(DEFAULT_STATE)
 
         # Ensure required keys
         for k, v in DEFAULT_STATE.items():
             if k not in self.data:
-                # dicts should be shallow copies
-                self.data[k] = v.copy() if isinstance(v, dict) else v
+                # never share DEFAULT_STATE containers
+                self.data[k] = copy.deepcopy(v)
 
         if "themes" not in self.data:
             self.data["themes"] = DEFAULT_STATE["themes"].copy()
 
-    def save(self):
-        os.makedirs(os.path.dirname(self.path), exist_ok=True)
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(self.data, f, indent=2, ensure_ascii=False)
+    def reload_if_changed(self) -> bool:
+        """
+        Reload when another process rewrote the file since it was loaded.
+        For read-only holders only: a writer would drop its own pending
+        changes.
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self.load()
+        return True
+
+    def save(self, tx=None) -> Optional[PendingWrite]:
+        """
+        Queue a rewrite on the disk writer, or, inside a store transaction
+        (tx), stage it to be written atomically with the rest of the tx.
+        """
+        if self._txn is not None:
+            # The open Director transaction persists once on exit.
+            self._txn.dirty = True
+            if tx is not None and self._txn.tx is None:
+                self._txn.tx = tx
+            return None
+        self._changed()
+        if tx is not None:
+            tx.file(self.path, self.data, indent=2, ensure_ascii=False)
+            return None
+        self._cancel_flush()
+        return write_json(self.path, self.data, indent=2, ensure_ascii=False)
+
+    def save_later(self, delay: Optional[float] = None) -> Optional[PendingWrite]:
+        """
+        Write-behind: schedule one save `delay` seconds from now; further
+        calls before it fires are absorbed into it. Without a running loop
+        this is a plain save().
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self.save()
+        self._changed()
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(
+                self.FLUSH_DELAY if delay is None else delay, self._flush_due
+            )
+        return None
+
+    def _flush_due(self):
+        self._flush_handle = None
+        self.save()
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change(self.data)
+
+    def notify(self, keys: Iterable[str]):
+        """
+        Report keys changed outside adjust()/adjust_theme() (nightly tick).
+        """
+        if self.key_listeners:
+            keys = set(keys)
+            if keys:
+                for listener in self.key_listeners:
+                    listener(keys)
+
+    def _cancel_flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    def flush(self) -> Optional[PendingWrite]:
+        """
+        Write a pending write-behind save now (shutdown path).
+        """
+        if self._flush_handle is None:
+            return None
+        return self.save()
+
+    def transaction(self, tx=None, write_behind: bool = False) -> "DirectorTransaction":
+        """
+        Group many adjustments into one clamp and one save:
+
+            with state.transaction(tx=tx):
+                state.adjust("violence_pressure", 2)
+                state.adjust("masquerade_pressure", 2)
+
+        Nested transactions join the outermost one.
+        """
+        return DirectorTransaction(self, tx=tx, write_behind=write_behind)
 
     # -------------------------------------------------
     # Simple helpers
@@ -71,14 +190,44 @@ class DirectorState:
 
     def adjust(self, key: str, delta: int, lo: int = 0, hi: int = 20):
         self.data[key] = int(self.data.get(key, 0)) + delta
+        if self._txn is not None:
+            self._txn.bounds[key] = (lo, hi)
+            return
         self.clamp(key, lo=lo, hi=hi)
+        self.notify((key,))
 
     def theme_weight(self, theme: str) -> int:
         return int(self.data.get("themes", {}).get(theme, 5))
 
     def adjust_theme(self, theme: str, delta: int):
         themes = self.data.setdefault("themes", {})
-        themes[theme] = max(0, min(10, int(themes.get(theme, 5)) + delta))
+        themes[theme] = int(themes.get(theme, 5)) + delta
+        if self._txn is not None:
+            self._txn.themes.add(theme)
+            return
+        themes[theme] = max(0, min(10, themes[theme]))
+        self.notify(("theme:" + theme,))
+
+    def local_pressure(self, zone_key: Optional[str]) -> Dict[str, float]:
+        """
+        The zone's local pressure by channel (core.travel.pressure_field).
+        """
+        if not zone_key:
+            return {}
+        return dict(self.data.get(ZONE_FIELD, {}).get(zone_key) or {})
+
+    def adjust_zone(self, zone_key: str, channel: str, delta: float):
+        field = self.data.setdefault(ZONE_FIELD, {})
+        cell = field.setdefault(zone_key, {})
+        value = max(0.0, min(LOCAL_MAX, float(cell.get(channel, 0.0)) + delta))
+        if value:
+            cell[channel] = round(value, 2)
+        else:
+            cell.pop(channel, None)
+        if not cell:
+            field.pop(zone_key, None)
+        if self._txn is not None:
+            self._txn.dirty = True
 
     # -------------------------------------------------
     # Derived severity for scenes
@@ -115,4 +264,70 @@ class DirectorState:
             "political_pressure": self.data.get("political_pressure", 0),
             "themes": self.data.get("themes", {}),
             "global_threat": self.global_threat_level(),
-        }
\ No newline at end of file
+        }
+
+class DirectorTransaction:
+    """
+    Batch of Director adjustments, opened with DirectorState.transaction().
+
+    While open, adjust()/adjust_theme() only accumulate (the raw sum lands
+    in state.data) and save() is deferred. On a clean exit every touched
+    key is clamped once and the state persists once: staged into the store
+    transaction `tx` if given, else write-behind (save_later) or an
+    immediate save. Values are clamped on the net delta, so a -1 followed
+    by +1 at the floor leaves the key where it was.
+
+    On an exception the accumulated deltas are still clamped (state.data
+    holds them already) but nothing is saved by the transaction.
+
+    Never await inside one: the state is shared, and another command's
+    adjustments would join this transaction instead of their own.
+    """
+
+    def __init__(self, state: DirectorState, tx=None, write_behind: bool = False):
+        self.state = state
+        self.tx = tx
+        self.write_behind = write_behind
+        self.bounds: Dict[str, Tuple[int, int]] = {}
+        self.themes: set = set()
+        self.dirty = False
+        self.result: Optional[PendingWrite] = None
+        self._outer: Optional[DirectorTransaction] = None
+
+    def __enter__(self) -> "DirectorTransaction":
+        self._outer = self.state._txn
+        if self._outer is None:
+            self.state._txn = self
+        return self
+
+    def _clamp(self):
+        for key, (lo, hi) in self.bounds.items():
+            self.state.clamp(key, lo=lo, hi=hi)
+        themes = self.state.data.setdefault("themes", {})
+        for theme in self.themes:
+            themes[theme] = max(0, min(10, int(themes.get(theme, 5))))
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._outer is not None:
+            # Joined an enclosing transaction: hand everything up to it.
+            self._outer.bounds.update(self.bounds)
+            self._outer.themes |= self.themes
+            self._outer.dirty = self._outer.dirty or self.dirty or bool(self.bounds or self.themes)
+            if self.tx is not None and self._outer.tx is None:
+                self._outer.tx = self.tx
+            return False
+
+        self.state._txn = None
+        self._clamp()
+        # Before saving, so whatever the listeners record rides along.
+        self.state.notify(set(self.bounds) | {"theme:" + t for t in self.themes})
+        if exc_type is not None:
+            return False
+        if self.dirty or self.bounds or self.themes:
+            if self.tx is not None:
+                self.state.save(tx=self.tx)
+            elif self.write_behind:
+                self.state.save_later()
+            else:
+                self.result = self.state.save()
+        return False
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import random
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional
+
+# Local stand-in for google.generativeai.GenerativeModel.
+#
+# Same surface as core.config.ai_model_text / ai_model_json as the bot
+# uses them (generate_content, generate_content_async with and without
+# stream=True, count_tokens, model_name), answering from canned content
+# after a simulated delay, with injected errors and timeouts. Used by the
+# scene benchmark (python -m core.director.scene_bench) and, with
+# AI_MODEL_STUB=1, by a whole bot that must not call Gemini.
+#
+# rpm > 0 gives the stub a provider quota: calls beyond that many in the
+# last 60 s fail at once with StubRateLimited (a 429).
+#
+# Latency specs (milliseconds to first token):
+#   "fixed:300"            always 300
+#   "uniform:200:900"      uniform between 200 and 900
+#   "lognormal:600:0.5"    median 600, sigma 0.5 (long right tail)
+#   "normal:600:150"       mean 600, sd 150 (floored at 0)
+
+# Rough tokens per word, for count_tokens and generation time.
+TOKENS_PER_WORD = 1.3
+STREAM_CHUNK_TOKENS = 8
+
+CANNED: Dict[str, List[Any]] = {
+    "npcs": [
+        [
+            {"name": "Mira Vos", "clan": "Toreador", "role": "gallery owner with debts"},
+            {"name": "Old Tam", "clan": "Nosferatu", "role": "information broker in the drains"},
+        ],
+        [
+            {"name": "Detective Hale", "clan": "mortal", "role": "SI-adjacent homicide detective"},
+            {"name": "Sister Agathe", "clan": "Tremere", "role": "chantry envoy"},
+            {"name": "Rook", "clan": "Brujah", "role": "anarch bouncer"},
+        ],
+    ],
+    "encounter": [
+        {"name": "Blood in the Alley", "description": "A fresh body, drained and left where anyone could find it.",
+         "type": "masquerade_breach", "severity": 3, "tags": ["masquerade", "violence"]},
+        {"name": "The Quiet Offer", "description": "A Ventrue ghoul offers a favour for a favour.",
+         "type": "social", "severity": 2, "tags": ["politics"]},
+        {"name": "Hunters at the Docks", "description": "Torchlight and crosses near the warehouses.",
+         "type": "si_raid", "severity": 4, "tags": ["si", "violence"]},
+    ],
+    "reaction": [
+        {"awareness": 1, "masquerade_pressure": 1},
+        {"violence_pressure": 1},
+        {},
+    ],
+    "storyteller": [
+        "Rain needles down through the sodium light and the street smells of wet iron. "
+        "Somewhere above you a window slams, and the city holds its breath.\n\n"
+        "Footsteps echo behind you, keeping pace, never closing.\n"
+        "Quest hook: Follow the footsteps to their owner before dawn.",
+        "The club's bass is a second heartbeat under your feet. Faces turn toward you and away again, "
+        "each one a question you have not been asked yet.\n\n"
+        "At the bar, a glass of something dark waits with your name on a napkin.\n"
+        "Quest hook: Find out who left the glass, and what they want for it.",
+    ],
+}
+
+
+class StubModelError(RuntimeError):
+    """
+    Injected model failure (stands in for a 5xx error).
+    """
+
+
+class StubRateLimited(StubModelError):
+    """
+    Over the stub's requests-per-minute quota (stands in for a 429).
+    """
+
+    code = 429
+
+
+class Latency:
+    """
+    A parsed latency spec; sample() returns seconds.
+    """
+
+    def __init__(self, spec: str = "fixed:300"):
+        kind, *args = str(spec).split(":")
+        self.kind = kind.strip().lower()
+        self.args = [float(a) for a in args]
+        need = {"fixed": 1, "uniform": 2, "lognormal": 2, "normal": 2}.get(self.kind)
+        if need is None or len(self.args) != need:
+            raise ValueError(f"Bad latency spec {spec!r}: use fixed:MS, uniform:LO:HI, lognormal:MEDIAN:SIGMA or normal:MEAN:SD")
+        self.spec = spec
+
+    def sample(self, rng: random.Random) -> float:
+        a = self.args
+        if self.kind == "fixed":
+            ms = a[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(a[0], a[1])
+        elif self.kind == "lognormal":
+            ms = a[0] * math.exp(rng.gauss(0.0, a[1]))
+        else:
+            ms = rng.gauss(a[0], a[1])
+        return max(0.0, ms) / 1000.0
+
+
+def _tokens(text: str) -> int:
+    return max(1, int(len(text.split()) * TOKENS_PER_WORD))
+
+
+class StubChunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubResponse:
+    """
+    The parts of GenerateContentResponse the bot reads: .text, and for
+    streamed responses async iteration over chunks plus resolve().
+    """
+
+    def __init__(self, text: str, chunks: Optional[AsyncIterator[StubChunk]] = None):
+        self._text = text
+        self._chunks = chunks
+        self.prompt_feedback = None
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def __aiter__(self):
+        if self._chunks is None:
+            raise TypeError("Not a streamed response")
+        return self._chunks
+
+    async def resolve(self):
+        if self._chunks is not None:
+            async for _ in self._chunks:
+                pass
+
+
+class StubModel:
+    """
+    GenerativeModel stand-in.
+
+    latency: time to first token (a Latency spec); tokens_per_sec: output
+    rate after that; error_rate / timeout_rate: share of calls that fail
+    with StubModelError, or hang for `timeout` seconds and raise
+    TimeoutError. JSON models (response_mime_type application/json)
+    answer NPC, encounter or Director-reaction JSON by the prompt's
+    wording; text models answer storyteller prose.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "stub",
+        generation_config: Optional[Mapping[str, Any]] = None,
+        latency: str = "lognormal:600:0.4",
+        tokens_per_sec: float = 120.0,
+        error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        timeout: float = 10.0,
+        rpm: float = 0.0,
+        canned: Optional[Mapping[str, List[Any]]] = None,
+        seed: Optional[int] = None,
+    ):
+        self.model_name = f"models/{model_name}"
+        self.generation_config = dict(generation_config or {})
+        self.json = self.generation_config.get("response_mime_type") == "application/json"
+        self.latency = Latency(latency)
+        self.tokens_per_sec = float(tokens_per_sec)
+        self.error_rate = float(error_rate)
+        self.timeout_rate = float(timeout_rate)
+        self.timeout = float(timeout)
+        self.rpm = float(rpm)
+        self._recent: deque = deque()
+        self.canned = {**CANNED, **(canned or {})}
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.throttled = 0
+        self.tokens = 0
+
+    # -------------------------------------------------
+    # Content
+    # -------------------------------------------------
+    def kind_for(self, prompt: Any) -> str:
+        if not self.json:
+            return "storyteller"
+        text = str(prompt).lower()
+        if "encounter" in text and ("react" in text or "director" in text):
+            return "reaction"
+        if "encounter" in text:
+            return "encounter"
+        if "npc" in text:
+            return "npcs"
+        return "reaction"
+
+    def answer(self, prompt: Any) -> str:
+        value = self.rng.choice(self.canned[self.kind_for(prompt)])
+        return value if isinstance(value, str) else json.dumps(value)
+
+    def count_tokens(self, contents: Any):
+        return {"total_tokens": _tokens(str(contents))}
+
+    # -------------------------------------------------
+    # Faults + timing
+    # -------------------------------------------------
+    def _fault(self) -> Optional[str]:
+        self.calls += 1
+        if self.rpm > 0:
+            now = time.monotonic()
+            while self._recent and self._recent[0] <= now - 60.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.rpm:
+                self.throttled += 1
+                return "throttled"
+            self._recent.append(now)
+        roll = self.rng.random()
+        if roll < self.error_rate:
+            self.errors += 1
+            return "error"
+        if roll < self.error_rate + self.timeout_rate:
+            self.timeouts += 1
+            return "timeout"
+        return None
+
+    def _generation_time(self, text: str) -> float:
+        return _tokens(text) / self.tokens_per_sec if self.tokens_per_sec > 0 else 0.0
+
+    # -------------------------------------------------
+    # GenerativeModel surface
+    # -------------------------------------------------
+    def generate_content(self, contents: Any, stream: bool = False, **kwargs) -> StubResponse:
+        fault = self._fault()
+        if fault == "throttled":
+            raise StubRateLimited("429 stub model quota exceeded (injected)")
+        if fault == "timeout":
+            time.sleep(self.timeout)
+            raise TimeoutError("stub model timed out")
+        time.sleep(self.latency.sample(self.rng))
+        if fault == "error":
+            raise StubModelError("stub model error (injected)")
+        text = self.answer(contents)
+        time.sleep(self._generation_time(text))
+        self.tokens += _tokens(text)
+        return StubResponse(text)
+
+    async def generate_content_async(self, contents: Any, stream: bool = False, **kwargs) -> StubResponse:
+        fault = self._fault()
+        if fault == "throttled":
+            raise StubRateLimited("429 stub model quota exceeded (injected)")
+        if fault == "timeout":
+            await asyncio.sleep(self.timeout)
+            raise TimeoutError("stub model timed out")
+        await asyncio.sleep(self.latency.sample(self.rng))
+        if fault == "error":
+            raise StubModelError("stub model error (injected)")
+        text = self.answer(contents)
+        self.tokens += _tokens(text)
+        if not stream:
+            await asyncio.sleep(self._generation_time(text))
+            return StubResponse(text)
+        return StubResponse(text, self._stream(text))
+
+    async def _stream(self, text: str) -> AsyncIterator[StubChunk]:
+        words = text.split(" ")
+        step = max(1, int(STREAM_CHUNK_TOKENS / TOKENS_PER_WORD))
+        for i in range(0, len(words), step):
+            piece = " ".join(words[i:i + step])
+            if i + step < len(words):
+                piece += " "
+            yield StubChunk(piece)
+            await asyncio.sleep(self._generation_time(piece))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "throttled": self.throttled,
+            "tokens": self.tokens,
+        }
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import logging
+import re
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.events.types import ThresholdCrossed
+
+log = logging.getLogger(__name__)
+
+# ST-registered Director thresholds, edge-triggered with hysteresis.
+#
+# Kept per guild in the Director state itself (data["thresholds"]), so
+# they persist and load with it:
+#
+#   {"id": "t1", "key": "si_pressure", "op": ">=", "value": 15,
+#    "clear": 13, "severity": "high", "label": "", "armed": true}
+#
+# A threshold fires once when its key reaches `value` while armed, then
+# stays quiet until the key has fallen back to `clear` (re-armed). Only
+# thresholds that depend on the keys a transaction touched are checked.
+
+PRESSURES = ("masquerade_pressure", "violence_pressure", "occult_pressure", "si_pressure", "political_pressure")
+STATE_KEYS = ("awareness",) + PRESSURES
+SEVERITIES = ("low", "medium", "high", "critical")
+
+# global_threat is derived from the pressure sum
+DEPENDS: Dict[str, Tuple[str, ...]] = {"global_threat": PRESSURES}
+
+_SPEC = re.compile(r"^\s*([a-z_:]+)\s*(>=|<=|≥|≤)\s*(-?\d+)\s*$")
+
+
+def _band(key: str) -> int:
+    """
+    Default hysteresis: 2 on the 0–20 scales, 1 on themes and threat.
+    """
+    return 1 if key.startswith("theme:") or key == "global_threat" else 2
+
+
+def validate_key(key: str) -> str:
+    key = key.strip().lower()
+    if key in STATE_KEYS or key == "global_threat":
+        return key
+    if key.startswith("theme:") and len(key) > 6:
+        return key
+    raise ValueError(
+        f"Unknown key {key!r}: use awareness, a *_pressure key, global_threat or theme:<name>"
+    )
+
+
+def make_threshold(
+    key: str,
+    op: str,
+    value: int,
+    clear: Optional[int] = None,
+    severity: str = "high",
+    label: str = "",
+) -> Dict[str, Any]:
+    """
+    A validated threshold dict (without id / armed, which add() sets).
+    """
+    key = validate_key(key)
+    op = {"≥": ">=", "≤": "<="}.get(op, op)
+    if op not in (">=", "<="):
+        raise ValueError("op must be >= or <=")
+    value = int(value)
+    if clear is None:
+        clear = value - _band(key) if op == ">=" else value + _band(key)
+    clear = int(clear)
+    if (op == ">=" and clear >= value) or (op == "<=" and clear <= value):
+        raise ValueError("clear must be on the far side of the threshold (below for >=, above for <=)")
+    if severity not in SEVERITIES:
+        raise ValueError(f"severity must be one of {', '.join(SEVERITIES)}")
+    return {"key": key, "op": op, "value": value, "clear": clear, "severity": severity, "label": label}
+
+
+def parse_threshold(text: str, **kwargs) -> Dict[str, Any]:
+    """
+    "si_pressure >= 15" -> make_threshold("si_pressure", ">=", 15, **kwargs)
+    """
+    m = _SPEC.match(text.lower())
+    if not m:
+        raise ValueError("expected e.g. `si_pressure >= 15` or `global_threat >= 4`")
+    return make_threshold(m.group(1), m.group(2), int(m.group(3)), **kwargs)
+
+
+def current_value(state, key: str) -> int:
+    if key == "global_threat":
+        return state.global_threat_level()
+    if key.startswith("theme:"):
+        return state.theme_weight(key[6:])
+    return int(state.data.get(key, 0))
+
+
+def _beyond(t: Dict[str, Any], v: int, level: int) -> bool:
+    return v >= level if t["op"] == ">=" else v <= level
+
+
+class ThresholdWatcher:
+    """
+    Checks a guild's thresholds whenever its DirectorState reports settled
+    keys (DirectorState.key_listeners) and publishes a ThresholdCrossed event
+    for each one that fires; the event bus turns those into ST alerts.
+
+    Per guild, thresholds are indexed by the state keys they depend on, so
+    a transaction touching violence_pressure only looks at thresholds on
+    violence_pressure and global_threat.
+    """
+
+    def __init__(self, publish: Optional[Callable[[ThresholdCrossed], Any]] = None):
+        self.publish = publish
+        self._index: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        self.fired = 0
+
+    def attach(self, guild_id, state):
+        gid = str(guild_id)
+        self._index.pop(gid, None)
+        state.key_listeners.append(lambda keys: self.check(gid, state, keys))
+
+    # -------------------------------------------------
+    # Registration (ST commands / API)
+    # -------------------------------------------------
+    @staticmethod
+    def thresholds(state) -> List[Dict[str, Any]]:
+        return state.data.setdefault("thresholds", [])
+
+    def add(self, guild_id, state, spec: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Register a threshold (from make_threshold / parse_threshold) and
+        save. A threshold already beyond its level starts disarmed: it
+        fires on the next crossing, not on registration.
+        """
+        items = self.thresholds(state)
+        n = max((int(t["id"][1:]) for t in items if str(t.get("id", "")).startswith("t")
+                 and t["id"][1:].isdigit()), default=0) + 1
+        t = dict(spec, id=f"t{n}", created_at=time.time())
+        t["armed"] = not _beyond(t, current_value(state, t["key"]), t["value"])
+        items.append(t)
+        self._index.pop(str(guild_id), None)
+        state.save()
+        return t
+
+    def remove(self, guild_id, state, threshold_id: str) -> bool:
+        items = self.thresholds(state)
+        kept = [t for t in items if t.get("id") != threshold_id]
+        if len(kept) == len(items):
+            return False
+        items[:] = kept
+        self._index.pop(str(guild_id), None)
+        state.save()
+        return True
+
+    def status(self, state) -> List[Dict[str, Any]]:
+        return [dict(t, current=current_value(state, t["key"])) for t in state.data.get("thresholds") or []]
+
+    # -------------------------------------------------
+    # Checking
+    # -------------------------------------------------
+    def _index_for(self, gid: str, state) -> Dict[str, List[Dict[str, Any]]]:
+        index = self._index.get(gid)
+        if index is None:
+            index = {}
+            for t in state.data.get("thresholds") or []:
+                for dep in DEPENDS.get(t["key"], (t["key"],)):
+                    index.setdefault(dep, []).append(t)
+            self._index[gid] = index
+        return index
+
+    def check(self, guild_id, state, keys: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        Update the thresholds that depend on `keys`; returns those that fired.
+        """
+        gid = str(guild_id)
+        try:
+            index = self._index_for(gid, state)
+            if not index:
+                return []
+            candidates: Dict[str, Dict[str, Any]] = {}
+            for k in keys:
+                for t in index.get(k, ()):
+                    candidates[t["id"]] = t
+
+            fired = []
+            for t in candidates.values():
+                v = current_value(state, t["key"])
+                if t.get("armed", True):
+                    if _beyond(t, v, t["value"]):
+                        t["armed"] = False
+                        t["fired_at"] = time.time()
+                        fired.append(t)
+                        self._publish(gid, t, v)
+                elif (v <= t["clear"]) if t["op"] == ">=" else (v >= t["clear"]):
+                    # Back past the clear level: re-arm
+                    t["armed"] = True
+            return fired
+        except Exception:
+            log.exception("Director threshold check failed for guild %s", gid)
+            return []
+
+    # -------------------------------------------------
+    # Store control op (API writes go through the bot)
+    # -------------------------------------------------
+    def control_handler(self, registry):
+        """
+        The "director_thresholds" op for StoreControlServer.register():
+        action "list", "add" (spec, clear, severity, label) or "remove" (id).
+        """
+        async def handle(req: Dict[str, Any]) -> Dict[str, Any]:
+            gid = str(req["g"])
+            state = registry.get(gid)
+            action = req.get("action", "list")
+            if action == "list":
+                return {"ok": True, "thresholds": self.status(state)}
+            if action == "add":
+                try:
+                    spec = parse_threshold(
+                        str(req.get("spec", "")),
+                        clear=req.get("clear"),
+                        severity=req.get("severity") or "high",
+                        label=req.get("label") or "",
+                    )
+                except ValueError as e:
+                    return {"ok": False, "error": "invalid", "detail": str(e)}
+                return {"ok": True, "threshold": self.add(gid, state, spec)}
+            if action == "remove":
+                if not self.remove(gid, state, str(req.get("id", ""))):
+                    return {"ok": False, "error": "not_found"}
+                return {"ok": True}
+            return {"ok": False, "error": "unknown_action"}
+
+        return handle
+
+    def _publish(self, gid: str, t: Dict[str, Any], current: int):
+        self.fired += 1
+        if self.publish is None:
+            return
+        self.publish(ThresholdCrossed(
+            guild_id=gid,
+            threshold_id=t["id"],
+            key=t["key"],
+            op=t["op"],
+            value=int(t["value"]),
+            current=int(current),
+            severity=t.get("severity", "high"),
+            label=t.get("label", ""),
+        ))
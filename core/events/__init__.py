@@ -0,0 +1,13 @@
+from .types import (
+    GameEvent,
+    HuntResolved,
+    AttackResolved,
+    FrenzyFailed,
+    TravelCompleted,
+    HavenRaided,
+    ThresholdCrossed,
+    ProphecyAdvanced,
+)
+from .bus import EventBus, Subscription
+from .log import EventLog, event_from_dict, event_to_dict
+from .consumers import AlertConsumer, DirectorConsumer, StatsConsumer, register_default_consumers
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from .types import GameEvent
+
+log = logging.getLogger(__name__)
+
+Handler = Callable[..., Any]
+
+
+class Subscription:
+    """
+    One consumer: its own bounded queue and worker task.
+
+    Plain subscribers get one event per call. Batching subscribers get a
+    list: the worker waits for the first event, then keeps collecting
+    until `max_batch` events or `max_delay` seconds, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Handler,
+        types: Tuple[Type[GameEvent], ...],
+        batch: bool,
+        max_batch: int,
+        max_delay: float,
+        maxsize: int,
+    ):
+        self.name = name
+        self.handler = handler
+        self.types = types
+        self.batch = batch
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max_delay
+        self.queue: "asyncio.Queue[GameEvent]" = asyncio.Queue(maxsize=maxsize)
+        self.task: Optional[asyncio.Task] = None
+        self.delivered = 0
+        self.batches = 0
+        self.dropped = 0
+        self.errors = 0
+        self.busy_s = 0.0
+
+    def wants(self, event: GameEvent) -> bool:
+        return not self.types or isinstance(event, self.types)
+
+    def offer(self, event: GameEvent):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A stuck consumer must not back up the commands publishing to it.
+            self.dropped += 1
+            log.warning("Event bus: %s is full, dropped %s", self.name, event.name)
+
+    async def _collect(self) -> List[GameEvent]:
+        events = [await self.queue.get()]
+        if not self.batch:
+            return events
+        deadline = time.monotonic() + self.max_delay
+        while len(events) < self.max_batch:
+            try:
+                events.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                events.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return events
+
+    async def run(self):
+        while True:
+            events = await self._collect()
+            start = time.perf_counter()
+            try:
+                result = self.handler(events) if self.batch else self.handler(events[0])
+                if inspect.isawaitable(result):
+                    await result
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.errors += 1
+                log.exception("Event bus: %s failed on %d event(s)", self.name, len(events))
+            finally:
+                self.busy_s += time.perf_counter() - start
+                self.delivered += len(events)
+                self.batches += 1
+                for _ in events:
+                    self.queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queue.qsize(),
+            "delivered": self.delivered,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "busy_ms": round(self.busy_s * 1000, 1),
+        }
+
+
+class EventBus:
+    """
+    In-process async pub/sub for game events.
+
+        bus.subscribe(on_attack, AttackResolved)
+        bus.subscribe(record_many, HuntResolved, FrenzyFailed, batch=True)
+        bus.publish(HuntResolved(guild_id=..., user_id=..., zone_key=...))
+
+    publish() never blocks and never runs a handler: it only enqueues for
+    each matching subscriber, so command handlers publish and reply right
+    away. Each subscriber drains its own queue on its own task (sync or
+    async handlers), in publish order; one slow or failing consumer does
+    not hold up the others.
+
+    Workers start on the first publish or start() with a running loop;
+    close() drains what is queued, then stops them.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._subs: List[Subscription] = []
+        self._started = False
+        self.published: Dict[str, int] = {}
+
+    def subscribe(
+        self,
+        handler: Handler,
+        *types: Type[GameEvent],
+        batch: bool = False,
+        max_batch: int = 100,
+        max_delay: float = 0.5,
+        name: Optional[str] = None,
+    ) -> Subscription:
+        """
+        No types means every event.
+        """
+        sub = Subscription(
+            name or getattr(handler, "__qualname__", repr(handler)),
+            handler,
+            tuple(types),
+            batch,
+            max_batch,
+            max_delay,
+            self.maxsize,
+        )
+        self._subs.append(sub)
+        if self._started:
+            sub.task = asyncio.get_running_loop().create_task(sub.run())
+        return sub
+
+    def start(self):
+        if self._started:
+            return
+        loop = asyncio.get_running_loop()
+        self._started = True
+        for sub in self._subs:
+            if sub.task is None:
+                sub.task = loop.create_task(sub.run())
+
+    def publish(self, event: GameEvent):
+        if not self._started:
+            self.start()
+        self.published[event.name] = self.published.get(event.name, 0) + 1
+        for sub in self._subs:
+            if sub.wants(event):
+                sub.offer(event)
+
+    async def drain(self):
+        """
+        Wait until every queued event has been handled.
+        """
+        for sub in self._subs:
+            await sub.queue.join()
+
+    async def close(self, timeout: float = 5.0):
+        if self._started:
+            try:
+                await asyncio.wait_for(self.drain(), timeout)
+            except asyncio.TimeoutError:
+                log.warning("Event bus: closing with events still queued")
+        for sub in self._subs:
+            if sub.task is not None:
+                sub.task.cancel()
+        for sub in self._subs:
+            if sub.task is not None:
+                try:
+                    await sub.task
+                except asyncio.CancelledError:
+                    pass
+                sub.task = None
+        self._started = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "published": dict(self.published),
+            "subscribers": {sub.name: sub.stats() for sub in self._subs},
+        }
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .bus import EventBus
+from .types import (
+    AttackResolved, FrenzyFailed, GameEvent, HavenRaided, HuntResolved, ProphecyAdvanced, ThresholdCrossed,
+)
+
+log = logging.getLogger(__name__)
+
+
+def _by_guild(events: List[GameEvent]) -> Dict[str, List[GameEvent]]:
+    grouped: Dict[str, List[GameEvent]] = defaultdict(list)
+    for e in events:
+        grouped[str(e.guild_id)].append(e)
+    return grouped
+
+
+class DirectorConsumer:
+    """
+    Applies combat and frenzy pressure to each guild's V5 Director.
+
+    A batch becomes one Director transaction per guild: a burst of attacks
+    in a fight is clamped and saved once. Hunts, travel and raids still
+    update the Director inside their own store transaction (the reply
+    shows the new city state), so they are not handled here.
+    """
+
+    types = (AttackResolved, FrenzyFailed)
+
+    def __init__(self, directors):
+        self.directors = directors
+
+    def __call__(self, events: List[GameEvent]):
+        for gid, batch in _by_guild(events).items():
+            adapter = self.directors.adapter(gid)
+            with adapter.state.transaction(write_behind=True):
+                for e in batch:
+                    if isinstance(e, AttackResolved):
+                        adapter.apply_attack(e.outcome)
+                    elif isinstance(e, FrenzyFailed):
+                        adapter.apply_frenzy(True, messy=e.messy, bestial=e.bestial)
+
+
+class AlertConsumer:
+    """
+    Turns notable events into ST alerts on the API. Within a batch, events
+    of the same kind in the same guild collapse into one alert, and the
+    HTTP calls run off the event loop.
+    """
+
+    types = (HuntResolved, FrenzyFailed, HavenRaided, AttackResolved, ThresholdCrossed, ProphecyAdvanced)
+
+    def __init__(self, send: Optional[Callable[..., Any]] = None):
+        if send is None:
+            from core.alerts_client import send_alert as send
+        self.send = send
+
+    @staticmethod
+    def _alert_for(e: GameEvent) -> Optional[Tuple[str, str, str]]:
+        """
+        (kind, severity, line) or None when the event is not alert-worthy.
+        """
+        if isinstance(e, HuntResolved) and (e.messy or e.bestial):
+            what = "messy critical" if e.messy else "bestial failure"
+            return "Masquerade Risk", "high", f"A hunt in {e.zone_key or 'the city'} ended in a {what}."
+        if isinstance(e, FrenzyFailed):
+            return "Frenzy", "high", f"{e.character} lost control to the Beast."
+        if isinstance(e, HavenRaided):
+            sev = "critical" if e.severity >= 4 else "high"
+            return "Haven Raid", sev, f"{e.haven_name} was raided (severity {e.severity})."
+        if isinstance(e, AttackResolved) and e.outcome == "messy_critical" and e.defeated:
+            return "Violence", "medium", f"{e.attacker} brutally put down {e.defender}."
+        if isinstance(e, ThresholdCrossed):
+            what = e.label or f"{e.key} {e.op} {e.value}"
+            return "Director Threshold", e.severity, f"{what} (now {e.current})."
+        if isinstance(e, ProphecyAdvanced):
+            if e.status == "failed":
+                return "Prophecy", "low", f"{e.title}: averted."
+            severity = "high" if e.status == "fulfilled" else "medium"
+            return "Prophecy", severity, f"{e.title}: {e.text}"
+        return None
+
+    async def __call__(self, events: List[GameEvent]):
+        grouped: Dict[Tuple[str, str], List[Tuple[str, str]]] = defaultdict(list)
+        for e in events:
+            alert = self._alert_for(e)
+            if alert:
+                kind, sev, line = alert
+                grouped[(str(e.guild_id), kind)].append((sev, line))
+
+        order = ["low", "medium", "high", "critical"]
+        for (_gid, kind), items in grouped.items():
+            severity = max((sev for sev, _ in items), key=order.index)
+            lines = [line for _, line in items]
+            message = lines[0] if len(lines) == 1 else "\n".join(f"• {l}" for l in lines)
+            title = kind if len(lines) == 1 else f"{kind} ×{len(lines)}"
+            await asyncio.to_thread(
+                self.send, title=title, message=message, role="st", severity=severity, tag="ST"
+            )
+
+
+class StatsConsumer:
+    """
+    In-memory counters per guild and event type, for analytics and ops.
+    """
+
+    def __init__(self):
+        self.counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.last_seen: Dict[str, float] = {}
+
+    def __call__(self, events: List[GameEvent]):
+        for e in events:
+            self.counts[str(e.guild_id)][e.name] += 1
+            self.last_seen[e.name] = getattr(e, "t", 0.0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "by_guild": {gid: dict(c) for gid, c in self.counts.items()},
+            "last_seen": dict(self.last_seen),
+        }
+
+
+def register_default_consumers(bus: EventBus, directors, send_alert=None, event_log=None) -> Dict[str, Any]:
+    """
+    Wire the Director, alert and stats consumers (and the event log, when
+    given). Returns them by name.
+    """
+    director = DirectorConsumer(directors)
+    alerts = AlertConsumer(send_alert)
+    stats = StatsConsumer()
+    bus.subscribe(director, *DirectorConsumer.types, batch=True, max_delay=0.25, name="director")
+    bus.subscribe(alerts, *AlertConsumer.types, batch=True, max_delay=2.0, name="alerts")
+    bus.subscribe(stats, batch=True, max_delay=1.0, name="stats")
+    consumers = {"director": director, "alerts": alerts, "stats": stats}
+    if event_log is not None:
+        bus.subscribe(event_log, batch=True, max_delay=1.0, name="event_log")
+        consumers["event_log"] = event_log
+    return consumers
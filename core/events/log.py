@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import json
+import os
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Type
+
+from core.storage.io_executor import PendingWrite, completed_write, get_writer
+
+from .types import (
+    AttackResolved,
+    FrenzyFailed,
+    GameEvent,
+    HavenRaided,
+    HuntResolved,
+    ProphecyAdvanced,
+    ThresholdCrossed,
+    TravelCompleted,
+)
+
+EVENT_TYPES: Dict[str, Type[GameEvent]] = {
+    cls.__name__: cls
+    for cls in (
+        HuntResolved, AttackResolved, FrenzyFailed, TravelCompleted, HavenRaided,
+        ThresholdCrossed, ProphecyAdvanced,
+    )
+}
+
+
+def event_to_dict(event: GameEvent) -> Dict[str, Any]:
+    d = dataclasses.asdict(event)
+    d["type"] = event.name
+    return d
+
+
+def event_from_dict(d: Dict[str, Any]) -> Optional[GameEvent]:
+    """
+    None for unknown types; unknown fields are dropped (older/newer logs).
+    """
+    cls = EVENT_TYPES.get(d.get("type", ""))
+    if cls is None:
+        return None
+    names = {f.name for f in dataclasses.fields(cls)}
+    return cls(**{k: v for k, v in d.items() if k in names})
+
+
+def _append_lines(path: str, text: str, max_bytes: int):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if max_bytes and os.path.exists(path) and os.path.getsize(path) >= max_bytes:
+        # Keep one previous generation; older events age out.
+        os.replace(path, path + ".1")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+class EventLog:
+    """
+    Per-guild JSONL log of game events: <root>/<guild_id>/events.jsonl,
+    rotated to events.jsonl.1 past `max_bytes` (so ~2× that is kept).
+
+    As a batching bus subscriber it appends each batch with one write per
+    guild, on the disk writer. read() is for forecasting/replay tools and
+    the API, which only read.
+    """
+
+    FILENAME = "events.jsonl"
+
+    def __init__(self, root: str, max_bytes: int = 4 * 1024 * 1024, writer=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._writer = writer
+
+    def path_for(self, guild_id) -> str:
+        return os.path.join(self.root, str(guild_id), self.FILENAME)
+
+    def append(self, events: List[GameEvent]) -> PendingWrite:
+        by_guild: Dict[str, List[str]] = defaultdict(list)
+        for e in events:
+            by_guild[str(e.guild_id)].append(json.dumps(event_to_dict(e), separators=(",", ":")))
+
+        result = completed_write()
+        try:
+            asyncio.get_running_loop()
+            writer = self._writer or get_writer()
+        except RuntimeError:
+            writer = None
+        for gid, lines in by_guild.items():
+            path = self.path_for(gid)
+            text = "\n".join(lines) + "\n"
+            if writer is None:
+                _append_lines(path, text, self.max_bytes)
+            else:
+                result = writer.submit(path, _append_lines, path, text, self.max_bytes)
+        return result
+
+    __call__ = append
+
+    def read(self, guild_id, since: float = 0.0, until: Optional[float] = None) -> Iterator[GameEvent]:
+        """
+        Events with since <= t <= until, oldest first (both generations).
+        """
+        path = self.path_for(guild_id)
+        for p in (path + ".1", path):
+            if not os.path.exists(p):
+                continue
+            with open(p, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        d = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line
+                    t = d.get("t", 0.0)
+                    if t < since or (until is not None and t > until):
+                        continue
+                    event = event_from_dict(d)
+                    if event is not None:
+                        yield event
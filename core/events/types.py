@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+
+@dataclass(frozen=True)
+class GameEvent:
+    """
+    Base for everything published on the EventBus. Ids are str, as in the
+    store; `t` is wall time at publish.
+    """
+
+    guild_id: str
+
+    @property
+    def name(self) -> str:
+        return type(self).__name__
+
+
+def _now() -> float:
+    return time.time()
+
+
+@dataclass(frozen=True)
+class HuntResolved(GameEvent):
+    user_id: str
+    zone_key: Optional[str]
+    source: str = "human"
+    messy: bool = False
+    bestial: bool = False
+    successes: int = 0
+    t: float = field(default_factory=_now)
+
+
+@dataclass(frozen=True)
+class AttackResolved(GameEvent):
+    channel_id: str
+    attacker: str
+    defender: str
+    outcome: str  # AttackOutcome value
+    damage: int = 0
+    defeated: bool = False
+    chaos: Optional[str] = None
+    t: float = field(default_factory=_now)
+
+
+@dataclass(frozen=True)
+class FrenzyFailed(GameEvent):
+    user_id: str
+    character: str
+    messy: bool = False
+    bestial: bool = False
+    t: float = field(default_factory=_now)
+
+
+@dataclass(frozen=True)
+class TravelCompleted(GameEvent):
+    user_id: str
+    origin_key: Optional[str]
+    zone_key: str
+    crossed_sunrise: bool = False
+    near_sunrise: bool = False
+    t: float = field(default_factory=_now)
+
+
+@dataclass(frozen=True)
+class HavenRaided(GameEvent):
+    haven_id: str
+    haven_name: str
+    severity: int
+    director: Dict[str, Any] = field(default_factory=dict)
+    t: float = field(default_factory=_now)
+
+
+@dataclass(frozen=True)
+class ThresholdCrossed(GameEvent):
+    threshold_id: str
+    key: str          # "si_pressure", "theme:occult", "global_threat", ...
+    op: str           # ">=" or "<="
+    value: int        # the threshold
+    current: int
+    severity: str = "high"
+    label: str = ""
+    t: float = field(default_factory=_now)
+
+
+@dataclass(frozen=True)
+class ProphecyAdvanced(GameEvent):
+    thread_id: str
+    title: str
+    stage: int        # index of the stage just reached
+    text: str         # that stage's omen
+    status: str = "active"  # "fulfilled" on the last stage, "failed" when averted
+    t: float = field(default_factory=_now)
@@ -6,7 +6,7 @@ from .haven_registry import HavenRegistry
 from .haven_model import Haven
 from core.travel.zones_loader import ZoneRegistry
 from core.vtmv5 import character_model
-from core.director.ai_director import _DIRECTOR_STATE
+from core.director.ai_director import director_state, v5_director
 
 
 class HavenEngine:
@@ -75,40 +75,36 @@ class HavenEngine:
     # -------------------------------------------------
     # Director / Domain effects
     # -------------------------------------------------
-    def apply_shelter_effects(self, haven: Haven):
+    def apply_shelter_effects(self, guild_id, haven: Haven, tx=None):
         """
         When a character retreats to their haven, we can gently nudge Director state:
           - security & warding lower Masquerade / SI pressure a bit
           - influence & masquerade_buffer lower city awareness slightly
+        With a store transaction (tx) the Director save is staged into it.
         """
-        sec = haven.security
-        ward = haven.domain.get("warding_level", 0)
-        mbuf = haven.domain.get("masquerade_buffer", 0)
-        infl = haven.domain.get("influence", 0)
-
-        # Better defenses = safer streets, less obvious chaos
-        _DIRECTOR_STATE.adjust("masquerade_pressure", -max(0, sec // 2))
-        _DIRECTOR_STATE.adjust("si_pressure", -max(0, ward // 2))
-
-        # Influence / buffer dampen how big things feel to mortals
-        _DIRECTOR_STATE.adjust("awareness", -max(0, (mbuf + infl) // 2))
-
-        _DIRECTOR_STATE.save()
+        v5_director(guild_id).apply_shelter(
+            haven.security,
+            haven.domain.get("warding_level", 0),
+            haven.domain.get("masquerade_buffer", 0),
+            haven.domain.get("influence", 0),
+            tx=tx,
+            zone_key=haven.zone_key,
+        )
 
-    def apply_raid(self, haven: Haven, severity: int = 3) -> Dict[str, Any]:
+    def apply_raid(self, guild_id, haven: Haven, severity: int = 3, tx=None) -> Dict[str, Any]:
         """
         Represents a raid / attack on a haven.
         severity: 1–5
         - Raises Director pressures
         - Damages haven security / warding / influence a bit
+        Pass a store transaction (tx) to commit havens.json and the
+        Director state together.
         """
         severity = max(1, min(5, int(severity)))
 
-        # Director impact
-        _DIRECTOR_STATE.adjust("violence_pressure", severity + 1)
-        _DIRECTOR_STATE.adjust("masquerade_pressure", severity)
-        _DIRECTOR_STATE.adjust("si_pressure", max(0, severity - 1))
-        _DIRECTOR_STATE.adjust("awareness", severity // 2)
+        # Director impact (one clamp, one save)
+        director = v5_director(guild_id)
+        director.apply_raid(severity, tx=tx, zone_key=haven.zone_key)
 
         # Haven damage
         haven.security = max(0, haven.security - (severity // 2))
@@ -122,12 +118,11 @@ class HavenEngine:
         )
 
         self.havens.upsert(haven)
-        self.havens.save()
-        _DIRECTOR_STATE.save()
+        self.havens.save(tx=tx)
 
         return {
             "haven": haven.to_dict(),
-            "director": _DIRECTOR_STATE.summarize(),
+            "director": director.state.summarize(),
             "severity": severity,
         }
 
@@ -172,8 +167,10 @@ class HavenEngine:
     # -------------------------------------------------
     def rest_in_haven(
         self,
+        guild_id,
         player: Dict[str, Any],
         haven: Haven,
+        tx=None,
     ) -> Dict[str, Any]:
         """
         Apply rest/recuperation effects for a PC resting in a haven.
@@ -182,6 +179,9 @@ class HavenEngine:
         - May reduce 1 stain if haven is comfy enough
         - May reduce hunger slightly if domain feeding is strong
         - Applies shelter effects to Director
+
+        The player dict is mutated in place; with a store transaction (tx)
+        the caller records it there and the Director save joins it.
         """
         character_model.ensure_character_state(player)
 
@@ -216,8 +216,8 @@ class HavenEngine:
         hunger_after = character_model.get_hunger(player)
 
         # --- Director shelter effect ---
-        self.apply_shelter_effects(haven)
-        director_summary = _DIRECTOR_STATE.summarize()
+        self.apply_shelter_effects(guild_id, haven, tx=tx)
+        director_summary = director_state(guild_id).summarize()
 
         return {
             "willpower_before": wp_before,
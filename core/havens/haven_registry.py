@@ -5,6 +5,7 @@ import os
 from typing import Dict, List, Optional
 
 from .haven_model import Haven
+from core.storage.io_executor import PendingWrite, write_json
 
 HAVENS_JSON_PATH = "data/havens.json"
 
@@ -42,11 +43,19 @@ class HavenRegistry:
             except Exception:
                 continue
 
-    def save(self):
-        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+    def save(self, tx=None) -> Optional[PendingWrite]:
+        """
+        Queue a rewrite of havens.json on the disk writer.
+        Await the result if you need it on disk before continuing.
+
+        Inside a store transaction (tx) the rewrite is staged instead and
+        lands atomically with the transaction's other changes.
+        """
         data = [h.to_dict() for h in self._havens.values()]
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        if tx is not None:
+            tx.file(self.path, data, indent=2, ensure_ascii=False)
+            return None
+        return write_json(self.path, data, indent=2, ensure_ascii=False)
 
     # -------------------------------------------------
     # Queries
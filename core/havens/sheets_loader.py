@@ -9,6 +9,7 @@ from dotenv import load_dotenv
 
 from .haven_model import Haven
 from .haven_registry import HAVENS_JSON_PATH
+from core.storage.io_executor import PendingWrite, write_json
 
 load_dotenv()
 
@@ -139,8 +140,6 @@ def load_sheet_havens(sheet_id: str | None = None) -> Dict[str, Haven]:
     return havens
 
 
-def save_havens_file(havens: Dict[str, Haven], path: str = HAVENS_JSON_PATH):
+def save_havens_file(havens: Dict[str, Haven], path: str = HAVENS_JSON_PATH) -> PendingWrite:
     data = [h.to_dict() for h in havens.values()]
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
\ No newline at end of file
+    return write_json(path, data, indent=2, ensure_ascii=False)
\ No newline at end of file
@@ -0,0 +1,9 @@
+from .journal import JournaledStore, DEFAULT_BOT_STORE
+from .packed import PackedReader, LazyGuilds, write_packed, is_packed
+from .filelock import StoreLock
+from .coherence import JournalFollower, UnixNotifier, follow_store
+from .io_executor import DiskWriter, PendingWrite, get_writer, write_json
+from .locks import KeyedLocks
+from .control import StoreControlServer, StoreControlClient
+from .backends import StorageBackend, JsonFileBackend, JournaledBackend, ShardedJsonBackend, SqliteBackend, open_backend
+from .unit_of_work import UnitOfWork
@@ -0,0 +1,386 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.utils_shared import load_data_from_file, save_data
+
+from .journal import DEFAULT_BOT_STORE, JournaledStore
+
+# (guild_id, user_id or None for the whole guild, document)
+BatchItem = Tuple[str, Optional[str], Dict[str, Any]]
+
+
+class StorageBackend(ABC):
+    """
+    The one storage interface: guild and player documents by id.
+
+    - get_* return None for missing documents. A guild document contains
+      its "players" mapping; put_guild replaces the guild including it.
+    - put_player creates the guild ({"players": {}}) if needed.
+    - batch_put applies many puts as one unit where the backend can
+      (one file rewrite, one SQLite transaction).
+    - Ids are always str.
+
+    Every implementation must pass core/storage/conformance.py.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def get_guild(self, guild_id: str) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def put_guild(self, guild_id: str, guild: Dict[str, Any]): ...
+
+    @abstractmethod
+    def get_player(self, guild_id: str, user_id: str) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def put_player(self, guild_id: str, user_id: str, player: Dict[str, Any]): ...
+
+    @abstractmethod
+    def list_guilds(self) -> List[str]: ...
+
+    @abstractmethod
+    def list_players(self, guild_id: str) -> List[str]: ...
+
+    def batch_put(self, items: Iterable[BatchItem]):
+        for gid, uid, doc in items:
+            if uid is None:
+                self.put_guild(gid, doc)
+            else:
+                self.put_player(gid, uid, doc)
+
+    def iter_guilds(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for gid in self.list_guilds():
+            guild = self.get_guild(gid)
+            if guild is not None:
+                yield gid, guild
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+def _copy(doc: Dict[str, Any]) -> Dict[str, Any]:
+    # Callers must not alias backend state (SQLite could never honour it).
+    return json.loads(json.dumps(doc))
+
+
+# -------------------------------------------------
+# Single JSON file
+# -------------------------------------------------
+class JsonFileBackend(StorageBackend):
+    """
+    The classic bot_data.json: whole store in memory, whole file rewritten
+    on every put (or once per batch_put).
+    """
+
+    name = "json"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data = load_data_from_file(path, DEFAULT_BOT_STORE)
+        self.data.setdefault("guilds", {})
+        self._batching = False
+
+    def _save(self):
+        if not self._batching:
+            save_data(self.path, self.data)
+
+    def get_guild(self, guild_id):
+        guild = self.data["guilds"].get(str(guild_id))
+        return None if guild is None else _copy(guild)
+
+    def put_guild(self, guild_id, guild):
+        self.data["guilds"][str(guild_id)] = _copy(guild)
+        self._save()
+
+    def get_player(self, guild_id, user_id):
+        guild = self.data["guilds"].get(str(guild_id)) or {}
+        player = (guild.get("players") or {}).get(str(user_id))
+        return None if player is None else _copy(player)
+
+    def put_player(self, guild_id, user_id, player):
+        guild = self.data["guilds"].setdefault(str(guild_id), {"players": {}})
+        guild.setdefault("players", {})[str(user_id)] = _copy(player)
+        self._save()
+
+    def list_guilds(self):
+        return list(self.data["guilds"].keys())
+
+    def list_players(self, guild_id):
+        guild = self.data["guilds"].get(str(guild_id)) or {}
+        return list((guild.get("players") or {}).keys())
+
+    def batch_put(self, items):
+        self._batching = True
+        try:
+            super().batch_put(items)
+        finally:
+            self._batching = False
+        save_data(self.path, self.data)
+
+
+# -------------------------------------------------
+# Journaled JSON (what the bot runs on)
+# -------------------------------------------------
+class JournaledBackend(StorageBackend):
+    """
+    JournaledStore behind the common interface: puts append one journal
+    line; the snapshot is rewritten only on compaction.
+    """
+
+    name = "journaled"
+
+    def __init__(self, path: str, **store_opts):
+        self.store = JournaledStore(path, **store_opts)
+
+    @property
+    def _guilds(self):
+        return self.store.data.setdefault("guilds", {})
+
+    def get_guild(self, guild_id):
+        guild = self._guilds.get(str(guild_id))
+        return None if guild is None else _copy(guild)
+
+    def put_guild(self, guild_id, guild):
+        self.store.put(str(guild_id), [], _copy(guild))
+
+    def get_player(self, guild_id, user_id):
+        guild = self._guilds.get(str(guild_id)) or {}
+        player = (guild.get("players") or {}).get(str(user_id))
+        return None if player is None else _copy(player)
+
+    def put_player(self, guild_id, user_id, player):
+        gid = str(guild_id)
+        if gid not in self._guilds:
+            self.store.put(gid, [], {"players": {}})
+        self.store.put(gid, ["players", str(user_id)], _copy(player))
+
+    def list_guilds(self):
+        return [str(g) for g in self._guilds]
+
+    def list_players(self, guild_id):
+        guild = self._guilds.get(str(guild_id)) or {}
+        return list((guild.get("players") or {}).keys())
+
+    def flush(self):
+        self.store.sync()
+
+    def close(self):
+        self.store.close()
+
+
+# -------------------------------------------------
+# One JSON file per guild
+# -------------------------------------------------
+class ShardedJsonBackend(StorageBackend):
+    """
+    <dir>/<guild_id>.json per guild. A put rewrites one guild's file, so
+    cost follows guild size rather than store size. Guild files are read
+    on demand and cached.
+    """
+
+    name = "sharded"
+
+    def __init__(self, directory: str):
+        self.dir = directory
+        os.makedirs(directory, exist_ok=True)
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._batching: Optional[set] = None
+
+    def _path(self, gid: str) -> str:
+        return os.path.join(self.dir, f"{gid}.json")
+
+    def _load(self, gid: str) -> Optional[Dict[str, Any]]:
+        if gid in self._cache:
+            return self._cache[gid]
+        path = self._path(gid)
+        if not os.path.exists(path):
+            return None
+        guild = load_data_from_file(path)
+        self._cache[gid] = guild
+        return guild
+
+    def _save(self, gid: str):
+        if self._batching is not None:
+            self._batching.add(gid)
+        else:
+            save_data(self._path(gid), self._cache[gid])
+
+    def get_guild(self, guild_id):
+        guild = self._load(str(guild_id))
+        return None if guild is None else _copy(guild)
+
+    def put_guild(self, guild_id, guild):
+        gid = str(guild_id)
+        self._cache[gid] = _copy(guild)
+        self._save(gid)
+
+    def get_player(self, guild_id, user_id):
+        guild = self._load(str(guild_id)) or {}
+        player = (guild.get("players") or {}).get(str(user_id))
+        return None if player is None else _copy(player)
+
+    def put_player(self, guild_id, user_id, player):
+        gid = str(guild_id)
+        guild = self._load(gid)
+        if guild is None:
+            guild = self._cache[gid] = {"players": {}}
+        guild.setdefault("players", {})[str(user_id)] = _copy(player)
+        self._save(gid)
+
+    def list_guilds(self):
+        on_disk = {n[:-5] for n in os.listdir(self.dir) if n.endswith(".json")}
+        return sorted(on_disk | set(self._cache))
+
+    def list_players(self, guild_id):
+        guild = self._load(str(guild_id)) or {}
+        return list((guild.get("players") or {}).keys())
+
+    def batch_put(self, items):
+        self._batching = set()
+        try:
+            super().batch_put(items)
+            touched = self._batching
+        finally:
+            self._batching = None
+        for gid in touched:
+            save_data(self._path(gid), self._cache[gid])
+
+
+# -------------------------------------------------
+# SQLite
+# -------------------------------------------------
+class SqliteBackend(StorageBackend):
+    """
+    guilds(guild_id, doc) + players(guild_id, user_id, doc), WAL mode.
+    Player rows are separate, so a player put touches one row; a guild
+    document is reassembled from both tables on read.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, synchronous: str = "NORMAL"):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(f"PRAGMA synchronous={synchronous}")
+        self.db.execute("CREATE TABLE IF NOT EXISTS guilds (guild_id TEXT PRIMARY KEY, doc TEXT NOT NULL)")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS players ("
+            " guild_id TEXT NOT NULL, user_id TEXT NOT NULL, doc TEXT NOT NULL,"
+            " PRIMARY KEY (guild_id, user_id))"
+        )
+
+    @staticmethod
+    def _dumps(doc: Dict[str, Any]) -> str:
+        return json.dumps(doc, separators=(",", ":"), ensure_ascii=False)
+
+    def _put_guild(self, gid: str, guild: Dict[str, Any]):
+        rest = {k: v for k, v in guild.items() if k != "players"}
+        self.db.execute("INSERT OR REPLACE INTO guilds VALUES (?, ?)", (gid, self._dumps(rest)))
+        self.db.execute("DELETE FROM players WHERE guild_id = ?", (gid,))
+        self.db.executemany(
+            "INSERT INTO players VALUES (?, ?, ?)",
+            [(gid, str(uid), self._dumps(p)) for uid, p in (guild.get("players") or {}).items()],
+        )
+
+    def _put_player(self, gid: str, uid: str, player: Dict[str, Any]):
+        self.db.execute("INSERT OR IGNORE INTO guilds VALUES (?, ?)", (gid, "{}"))
+        self.db.execute("INSERT OR REPLACE INTO players VALUES (?, ?, ?)", (gid, uid, self._dumps(player)))
+
+    def _tx(self, fn: Callable[[], Any]):
+        with self._lock:
+            self.db.execute("BEGIN")
+            try:
+                fn()
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+
+    def get_guild(self, guild_id):
+        gid = str(guild_id)
+        with self._lock:
+            row = self.db.execute("SELECT doc FROM guilds WHERE guild_id = ?", (gid,)).fetchone()
+            if row is None:
+                return None
+            players = self.db.execute("SELECT user_id, doc FROM players WHERE guild_id = ?", (gid,)).fetchall()
+        guild = json.loads(row[0])
+        guild["players"] = {uid: json.loads(doc) for uid, doc in players}
+        return guild
+
+    def put_guild(self, guild_id, guild):
+        self._tx(lambda: self._put_guild(str(guild_id), guild))
+
+    def get_player(self, guild_id, user_id):
+        with self._lock:
+            row = self.db.execute(
+                "SELECT doc FROM players WHERE guild_id = ? AND user_id = ?", (str(guild_id), str(user_id))
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put_player(self, guild_id, user_id, player):
+        self._tx(lambda: self._put_player(str(guild_id), str(user_id), player))
+
+    def list_guilds(self):
+        with self._lock:
+            return [r[0] for r in self.db.execute("SELECT guild_id FROM guilds ORDER BY guild_id")]
+
+    def list_players(self, guild_id):
+        with self._lock:
+            return [r[0] for r in self.db.execute(
+                "SELECT user_id FROM players WHERE guild_id = ? ORDER BY user_id", (str(guild_id),)
+            )]
+
+    def batch_put(self, items):
+        items = list(items)
+
+        def apply():
+            for gid, uid, doc in items:
+                if uid is None:
+                    self._put_guild(str(gid), doc)
+                else:
+                    self._put_player(str(gid), str(uid), doc)
+
+        self._tx(apply)
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+
+# -------------------------------------------------
+# Selection
+# -------------------------------------------------
+BACKENDS: Dict[str, Callable[[str], StorageBackend]] = {
+    "json": JsonFileBackend,
+    "journaled": JournaledBackend,
+    "sharded": ShardedJsonBackend,
+    "sqlite": SqliteBackend,
+}
+
+
+def open_backend(kind: str, path: str) -> StorageBackend:
+    """
+    kind is one of BACKENDS; path is a file (json, journaled, sqlite) or a
+    directory (sharded).
+    """
+    try:
+        factory = BACKENDS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown storage backend {kind!r} (use {', '.join(BACKENDS)})")
+    return factory(path)
@@ -0,0 +1,468 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import lzma
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .coherence import JournalFollower
+from .journal import apply_record, record_guild
+
+log = logging.getLogger(__name__)
+
+# -------------------------------------------------
+# Layout
+# -------------------------------------------------
+#
+#   <backup dir>/
+#     objects/ab/ab12...ef.gz     content-addressed chunks (sha256 of the
+#                                 uncompressed bytes), gzip or xz
+#     manifests/20261019T120000123Z.json
+#
+# A chunk is one guild (compact, key-sorted JSON), the non-guild root, or a
+# journal segment (the records applied between two manifests, one per line).
+# A manifest maps every guild to its chunk and lists the segments since the
+# previous manifest. Guilds whose version did not move reuse the previous
+# chunk without being re-read, so a backup costs O(changed guilds).
+
+_CODECS = {
+    "gzip": (".gz", lambda b: gzip.compress(b, compresslevel=6), gzip.decompress),
+    "xz": (".xz", lambda b: lzma.compress(b, preset=6), lzma.decompress),
+}
+
+
+def _encode(value: Any) -> bytes:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _stamp(ts: float) -> str:
+    dt = datetime.fromtimestamp(ts, tz=timezone.utc)
+    return dt.strftime("%Y%m%dT%H%M%S") + f"{dt.microsecond // 1000:03d}Z"
+
+
+class ObjectStore:
+    """
+    Content-addressed, compressed chunk store. Writing a chunk that is
+    already present is a stat() and nothing else.
+    """
+
+    def __init__(self, root: str, codec: str = "gzip"):
+        if codec not in _CODECS:
+            raise ValueError(f"Unknown codec {codec!r} (use {', '.join(_CODECS)})")
+        self.root = os.path.join(root, "objects")
+        self.codec = codec
+
+    def _path(self, digest: str, ext: str) -> str:
+        return os.path.join(self.root, digest[:2], digest + ext)
+
+    def _find(self, digest: str) -> Optional[str]:
+        for ext, _, _ in _CODECS.values():
+            p = self._path(digest, ext)
+            if os.path.exists(p):
+                return p
+        return None
+
+    def put(self, data: bytes) -> Tuple[str, int]:
+        """
+        Returns (digest, compressed bytes written; 0 if deduplicated).
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        if self._find(digest) is not None:
+            return digest, 0
+        ext, compress, _ = _CODECS[self.codec]
+        path = self._path(digest, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        blob = compress(data)
+        _write_atomic(path, blob)
+        return digest, len(blob)
+
+    def get(self, digest: str) -> bytes:
+        path = self._find(digest)
+        if path is None:
+            raise FileNotFoundError(f"backup object {digest} is missing")
+        for ext, _, decompress in _CODECS.values():
+            if path.endswith(ext):
+                with open(path, "rb") as f:
+                    return decompress(f.read())
+        raise ValueError(path)
+
+    def digests(self) -> Iterable[str]:
+        if not os.path.isdir(self.root):
+            return
+        for sub in os.listdir(self.root):
+            for name in os.listdir(os.path.join(self.root, sub)):
+                if not name.endswith(".tmp"):
+                    yield name.split(".", 1)[0]
+
+    def delete(self, digest: str) -> int:
+        path = self._find(digest)
+        if path is None:
+            return 0
+        size = os.path.getsize(path)
+        os.remove(path)
+        return size
+
+
+class BackupService:
+    """
+    Incremental backups of a JournaledStore, taken from the files on disk.
+
+    It follows the store like the API does (JournalFollower under the
+    shared lock), so it never touches the bot's memory and never pauses
+    it; run() does the work in a thread. Every journal record it sees is
+    kept for the next manifest's segment, which is what makes restores to
+    an arbitrary timestamp possible.
+
+    Retention: every manifest from the last `keep_hours`, then the newest
+    per day for `keep_days` and per ISO week for `keep_weeks`. Chunks no
+    kept manifest references are deleted. Point-in-time restore is exact
+    inside the hourly window and falls back to the nearest kept manifest
+    before the target beyond it.
+    """
+
+    def __init__(
+        self,
+        store_path: str,
+        backup_dir: str,
+        codec: str = "gzip",
+        keep_hours: int = 48,
+        keep_days: int = 14,
+        keep_weeks: int = 8,
+    ):
+        self.store_path = store_path
+        self.dir = backup_dir
+        self.manifest_dir = os.path.join(backup_dir, "manifests")
+        self.objects = ObjectStore(backup_dir, codec)
+        self.keep_hours = keep_hours
+        self.keep_days = keep_days
+        self.keep_weeks = keep_weeks
+
+        self.follower: Optional[JournalFollower] = None
+        self._segment: List[Dict[str, Any]] = []
+        self._last: Optional[Dict[str, Any]] = None
+
+    # -------------------------------------------------
+    # Manifests
+    # -------------------------------------------------
+    def manifest_names(self) -> List[str]:
+        if not os.path.isdir(self.manifest_dir):
+            return []
+        return sorted(n for n in os.listdir(self.manifest_dir) if n.endswith(".json"))
+
+    def read_manifest(self, name: str) -> Dict[str, Any]:
+        with open(os.path.join(self.manifest_dir, name), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def latest_manifest(self) -> Optional[Dict[str, Any]]:
+        names = self.manifest_names()
+        return self.read_manifest(names[-1]) if names else None
+
+    # -------------------------------------------------
+    # Taking a backup
+    # -------------------------------------------------
+    def _collect(self, records: List[Dict[str, Any]]):
+        self._segment.extend(records)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Take one incremental backup now. Blocking; run() calls it in a thread.
+        """
+        if self.follower is None:
+            self._last = self.latest_manifest()
+            self.follower = JournalFollower(self.store_path, record_sink=self._collect)
+        else:
+            self.follower.refresh()
+
+        follower = self.follower
+        prev = self._last or {}
+        prev_guilds = prev.get("guilds", {})
+        prev_versions = prev.get("versions", {})
+
+        now = time.time()
+        written = reused = new_objects = 0
+
+        guilds = follower.data.get("guilds") or {}
+        out_guilds: Dict[str, str] = {}
+        versions: Dict[str, int] = {}
+        for gid in list(guilds):
+            gid = str(gid)
+            v = follower.version(gid)
+            versions[gid] = v
+            if gid in prev_guilds and prev_versions.get(gid) == v:
+                out_guilds[gid] = prev_guilds[gid]
+                reused += 1
+                continue
+            digest, size = self.objects.put(_encode(guilds[gid]))
+            out_guilds[gid] = digest
+            written += size
+            new_objects += 1 if size else 0
+
+        root_v = follower.version(None)
+        prev_root = prev.get("root") or {}
+        if prev_root.get("hash") and prev_root.get("version") == root_v:
+            root_hash = prev_root["hash"]
+        else:
+            root = {k: v for k, v in follower.data.items() if k != "guilds"}
+            root_hash, size = self.objects.put(_encode(root))
+            written += size
+            new_objects += 1 if size else 0
+
+        segments = []
+        if self._segment:
+            lines = b"".join(_encode(r) + b"\n" for r in self._segment)
+            digest, size = self.objects.put(lines)
+            written += size
+            new_objects += 1 if size else 0
+            times = [float(r["t"]) for r in self._segment if r.get("t")]
+            segments.append({
+                "hash": digest,
+                "count": len(self._segment),
+                "from": min(times) if times else prev.get("ts", now),
+                "to": max(times) if times else now,
+            })
+            self._segment = []
+
+        name = _stamp(now) + ".json"
+        manifest = {
+            "name": name,
+            "ts": now,
+            "prev": prev.get("name"),
+            "store": self.store_path,
+            "codec": self.objects.codec,
+            "root": {"hash": root_hash, "version": root_v},
+            "guilds": out_guilds,
+            "versions": versions,
+            "segments": segments,
+            "stats": {
+                "guilds_written": len(out_guilds) - reused,
+                "guilds_reused": reused,
+                "new_objects": new_objects,
+                "bytes_written": written,
+            },
+        }
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        _write_atomic(os.path.join(self.manifest_dir, name), json.dumps(manifest, indent=2).encode("utf-8"))
+        self._last = manifest
+
+        self.prune(now)
+        return manifest
+
+    async def run(self, interval: float = 900.0):
+        """
+        Back up every `interval` seconds until cancelled.
+        """
+        while True:
+            try:
+                m = await asyncio.to_thread(self.snapshot)
+                st = m["stats"]
+                log.info(
+                    "Backup %s: %d guilds written, %d reused, %d bytes",
+                    m["name"], st["guilds_written"], st["guilds_reused"], st["bytes_written"],
+                )
+            except Exception:
+                log.exception("Backup failed")
+            await asyncio.sleep(interval)
+
+    # -------------------------------------------------
+    # Retention
+    # -------------------------------------------------
+    def prune(self, now: Optional[float] = None) -> Dict[str, int]:
+        now = time.time() if now is None else now
+        names = self.manifest_names()
+        if not names:
+            return {"manifests_removed": 0, "objects_removed": 0, "bytes_freed": 0}
+
+        keep: Set[str] = {names[-1]}
+        days: Dict[str, str] = {}
+        weeks: Dict[str, str] = {}
+        for name in names:
+            ts = self.read_manifest(name)["ts"]
+            age = now - ts
+            dt = datetime.fromtimestamp(ts, tz=timezone.utc)
+            if age <= self.keep_hours * 3600:
+                keep.add(name)
+            if age <= self.keep_days * 86400:
+                days[dt.strftime("%Y-%m-%d")] = name      # sorted, so newest wins
+            if age <= self.keep_weeks * 7 * 86400:
+                iso = dt.isocalendar()
+                weeks[f"{iso[0]}-{iso[1]}"] = name
+        keep.update(days.values())
+        keep.update(weeks.values())
+
+        removed = 0
+        referenced: Set[str] = set()
+        for name in names:
+            if name not in keep:
+                os.remove(os.path.join(self.manifest_dir, name))
+                removed += 1
+                continue
+            m = self.read_manifest(name)
+            referenced.update(m.get("guilds", {}).values())
+            referenced.add((m.get("root") or {}).get("hash"))
+            referenced.update(s["hash"] for s in m.get("segments", []))
+
+        freed = objects_removed = 0
+        for digest in list(self.objects.digests()):
+            if digest not in referenced:
+                freed += self.objects.delete(digest)
+                objects_removed += 1
+
+        return {"manifests_removed": removed, "objects_removed": objects_removed, "bytes_freed": freed}
+
+    # -------------------------------------------------
+    # Restore
+    # -------------------------------------------------
+    def guild_at(self, guild_id: str, at: float) -> Optional[Dict[str, Any]]:
+        """
+        The guild as it was at timestamp `at`: the newest manifest taken at
+        or before `at`, plus that guild's journal records up to `at` from
+        the segment of the manifest that follows it. None if the guild did
+        not exist then.
+        """
+        gid = str(guild_id)
+        names = self.manifest_names()
+        base = None
+        following = None
+        for i, name in enumerate(names):
+            m = self.read_manifest(name)
+            if m["ts"] <= at:
+                base = m
+                following = None
+                if i + 1 < len(names):
+                    nxt = self.read_manifest(names[i + 1])
+                    if nxt.get("prev") == name:
+                        following = nxt
+            else:
+                break
+
+        if base is None:
+            raise LookupError("No backup taken at or before that time")
+
+        data: Dict[str, Any] = {"guilds": {}}
+        if gid in base["guilds"]:
+            data["guilds"][gid] = json.loads(self.objects.get(base["guilds"][gid]))
+
+        if following is not None:
+            for seg in following.get("segments", []):
+                for line in self.objects.get(seg["hash"]).splitlines():
+                    record = json.loads(line)
+                    if float(record.get("t") or seg["to"]) > at:
+                        break
+                    if record_guild(record) == gid:
+                        apply_record(data, record)
+
+        return data["guilds"].get(gid)
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def _parse_when(text: Optional[str]) -> float:
+    if not text:
+        return time.time()
+    try:
+        return float(text)
+    except ValueError:
+        dt = datetime.fromisoformat(text)
+        if dt.tzinfo is None:
+            dt = dt.astimezone()
+        return dt.timestamp()
+
+
+async def _apply_guild(store_path: str, guild_id: str, guild: Dict[str, Any]):
+    """
+    Hand the restored guild to the running bot; if it is down, write it
+    into the store directly.
+    """
+    from core.utils_api import open_store_control
+    try:
+        reply = await open_store_control().put_guild(guild_id, guild)
+        return f"applied through the bot (guild version {reply.get('version')})"
+    except ConnectionError:
+        from .journal import JournaledStore
+        store = JournaledStore(store_path)
+        store.put(str(guild_id), [], guild)
+        for uid in list((guild.get("players") or {}).keys()):
+            store.record(str(guild_id), "players", uid)
+        store.close()
+        return "bot not running; written to the store directly"
+
+
+def main(argv: Optional[List[str]] = None):
+    from core.utils_bot import BOT_BACKUP_DIR, BOT_DATA_PATH
+
+    parser = argparse.ArgumentParser(prog="python -m core.storage.backup")
+    parser.add_argument("--store", default=BOT_DATA_PATH)
+    parser.add_argument("--dir", default=BOT_BACKUP_DIR)
+    parser.add_argument("--codec", default="gzip", choices=sorted(_CODECS))
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("snapshot", help="take one incremental backup now")
+    p_run = sub.add_parser("run", help="back up periodically until interrupted")
+    p_run.add_argument("--interval", type=float, default=900.0)
+    sub.add_parser("list", help="list manifests")
+    sub.add_parser("prune", help="apply the retention policy")
+    p_restore = sub.add_parser("restore", help="restore one guild to a point in time")
+    p_restore.add_argument("guild_id")
+    p_restore.add_argument("--at", help="ISO time (local unless it has an offset) or epoch seconds; default now")
+    p_restore.add_argument("--out", help="write the guild JSON here instead of stdout")
+    p_restore.add_argument("--apply", action="store_true", help="put it back into the live store")
+
+    args = parser.parse_args(argv)
+    svc = BackupService(args.store, args.dir, codec=args.codec)
+
+    if args.cmd == "snapshot":
+        m = svc.snapshot()
+        print(f"{m['name']}: {json.dumps(m['stats'])}")
+    elif args.cmd == "run":
+        logging.basicConfig(level=logging.INFO)
+        try:
+            asyncio.run(svc.run(args.interval))
+        except KeyboardInterrupt:
+            pass
+    elif args.cmd == "list":
+        for name in svc.manifest_names():
+            m = svc.read_manifest(name)
+            when = datetime.fromtimestamp(m["ts"]).isoformat(timespec="seconds")
+            records = sum(s["count"] for s in m.get("segments", []))
+            print(f"{name}  {when}  guilds={len(m['guilds'])}  journal_records={records}")
+    elif args.cmd == "prune":
+        print(json.dumps(svc.prune()))
+    elif args.cmd == "restore":
+        at = _parse_when(args.at)
+        try:
+            guild = svc.guild_at(args.guild_id, at)
+        except LookupError as e:
+            sys.exit(str(e))
+        if guild is None:
+            sys.exit(f"Guild {args.guild_id} did not exist at {datetime.fromtimestamp(at).isoformat()}")
+
+        if args.apply:
+            print(asyncio.run(_apply_guild(args.store, args.guild_id, guild)))
+        elif args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(guild, f, indent=4, ensure_ascii=False)
+            print(f"Wrote guild {args.guild_id} to {args.out}")
+        else:
+            print(json.dumps(guild, indent=4, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
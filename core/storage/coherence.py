@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import socket
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from .filelock import StoreLock
+from .journal import (
+    DEFAULT_BOT_STORE,
+    FILE_KEY,
+    apply_record,
+    load_snapshot,
+    note_record_versions,
+    parse_journal_lines,
+    player_version_key,
+    record_guild,
+)
+from .packed import LazyGuilds
+
+log = logging.getLogger(__name__)
+
+
+# -------------------------------------------------
+# Change notifications (writer side)
+# -------------------------------------------------
+class UnixNotifier:
+    """
+    Fire-and-forget change notifications over a local Unix datagram socket.
+
+    The bot calls this after every journal append; the API binds the socket
+    (see follow_store). If nobody is listening the datagram is dropped and
+    the follower's once-a-second poll catches up instead.
+    """
+
+    def __init__(self, sock_path: str):
+        self.sock_path = sock_path
+        self._sock = None
+        if hasattr(socket, "AF_UNIX"):
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._sock.setblocking(False)
+
+    def __call__(self, guild_id: str, version: int):
+        if self._sock is None:
+            return
+        payload = json.dumps({"g": guild_id, "n": version}).encode("utf-8")
+        try:
+            self._sock.sendto(payload, self.sock_path)
+        except OSError:
+            # No listener, or its buffer is full; polling covers it.
+            pass
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+# -------------------------------------------------
+# Follower (reader side)
+# -------------------------------------------------
+class JournalFollower:
+    """
+    Read-only, incrementally refreshed view of a JournaledStore owned by
+    another process (the API following the bot's store).
+
+    - refresh() is a single stat() when nothing changed.
+    - New journal lines are read from the last offset and applied, so only
+      the guilds they touch change; nothing else is re-parsed.
+    - When the writer compacts (new journal inode) the snapshot is reloaded.
+      For packed snapshots that is a header read, and resident guilds whose
+      version did not move are kept decoded.
+
+    `data` is mutated in place, so `app.state.data_store = follower.data`
+    stays valid across reloads.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        default: Optional[Dict[str, Any]] = None,
+        max_resident_guilds: int = 256,
+        max_resident_bytes: int = 64 * 1024 * 1024,
+        guild_idle_seconds: float = 300.0,
+        record_sink: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    ):
+        self.path = path
+        # Sees every journal record as it is applied (backups keep them).
+        self.record_sink = record_sink
+        self.journal_path = path + ".journal"
+        self.default = default if default is not None else DEFAULT_BOT_STORE
+        self.lock = StoreLock(path)
+        self._lazy_opts = {
+            "max_resident": max_resident_guilds,
+            "max_bytes": max_resident_bytes,
+            "idle_seconds": guild_idle_seconds,
+        }
+
+        self.data: Dict[str, Any] = {}
+        self.versions: Dict[str, int] = {}
+        self._offset = 0
+        self._ino: Optional[int] = None
+        self.reloads = 0
+        self.reload()
+
+    def version(self, guild_id: Optional[str]) -> int:
+        return self.versions.get("_root" if guild_id is None else str(guild_id), 0)
+
+    def player_version(self, guild_id, user_id) -> int:
+        return self.versions.get(player_version_key(guild_id, user_id), 0)
+
+    def _journal_stat(self):
+        try:
+            return os.stat(self.journal_path)
+        except FileNotFoundError:
+            return None
+
+    def reload(self) -> Set[str]:
+        """
+        Re-read the snapshot and whole journal. Returns guilds whose version
+        changed relative to what we held before.
+        """
+        with self.lock.shared():
+            old_versions = dict(self.versions)
+            old_guilds = self.data.get("guilds")
+
+            data, versions = load_snapshot(self.path, self.default, self._lazy_opts)
+            new_guilds = data.get("guilds")
+            if isinstance(old_guilds, LazyGuilds) and isinstance(new_guilds, LazyGuilds):
+                for gid in list(old_guilds.resident()):
+                    if versions.get(gid, 0) == old_versions.get(gid, 0) and gid in new_guilds.reader.index:
+                        new_guilds._admit(gid, old_guilds._cache[gid], old_guilds._sizes.get(gid, 0))
+                old_guilds.reader.close()
+
+            self.data.clear()
+            self.data.update(data)
+            self.versions = versions
+
+            st = self._journal_stat()
+            self._ino = st.st_ino if st else None
+            self._offset = 0
+            self._consume()
+            self.reloads += 1
+
+        keys = set(old_versions) | set(self.versions)
+        # Player counters ("<gid>/players/<uid>") ride along with their guild.
+        return {k for k in keys if "/" not in k and old_versions.get(k, 0) != self.versions.get(k, 0)}
+
+    def _consume(self) -> Set[str]:
+        changed: Set[str] = set()
+        try:
+            with open(self.journal_path, "rb") as f:
+                f.seek(self._offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return changed
+
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            return changed
+
+        records, consumed = parse_journal_lines(chunk[: end + 1].decode("utf-8"))
+        self._offset += len(chunk[: end + 1].decode("utf-8")[:consumed].encode("utf-8"))
+
+        if records and self.record_sink is not None:
+            self.record_sink(records)
+
+        guilds = self.data.get("guilds")
+        for record in records:
+            if FILE_KEY in record:
+                # Side files (havens.json...) are read from disk, not from here.
+                continue
+            apply_record(self.data, record)
+            key = record_guild(record) or "_root"
+            if isinstance(guilds, LazyGuilds) and key != "_root":
+                # Our copy now differs from the snapshot; never evict it.
+                guilds.mark_dirty(key)
+            note_record_versions(self.versions, record)
+            changed.add(key)
+        return changed
+
+    def refresh(self) -> Set[str]:
+        """
+        Apply whatever the writer appended since the last call.
+        Returns the set of guild ids that changed.
+        """
+        st = self._journal_stat()
+        if st is None:
+            return set()
+        if st.st_ino != self._ino or st.st_size < self._offset:
+            return self.reload()
+        if st.st_size == self._offset:
+            return set()
+        with self.lock.shared():
+            return self._consume()
+
+
+async def follow_store(
+    follower: JournalFollower,
+    sock_path: Optional[str] = None,
+    interval: float = 1.0,
+    on_change: Optional[Callable[[Set[str]], None]] = None,
+):
+    """
+    Keep `follower` current: refresh on every datagram from the writer's
+    UnixNotifier, and at least once per `interval` seconds regardless.
+    Runs until cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    sock = None
+
+    if sock_path and hasattr(socket, "AF_UNIX"):
+        try:
+            if os.path.exists(sock_path):
+                os.unlink(sock_path)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(sock_path)
+            sock.setblocking(False)
+        except OSError as e:
+            log.warning("Store notifications disabled (%s); polling only", e)
+            sock = None
+
+    try:
+        while True:
+            if sock is not None:
+                try:
+                    await asyncio.wait_for(loop.sock_recv(sock, 4096), timeout=interval)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(interval)
+
+            try:
+                changed = follower.refresh()
+            except Exception:
+                log.exception("Store refresh failed")
+                continue
+
+            if changed and on_change is not None:
+                on_change(changed)
+    finally:
+        if sock is not None:
+            sock.close()
+            try:
+                os.unlink(sock_path)
+            except OSError:
+                pass
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .backends import BACKENDS, StorageBackend, open_backend
+
+# Conformance + throughput suite for every StorageBackend.
+#
+#   python -m core.storage.conformance                      # all backends
+#   python -m core.storage.conformance --backends json,sqlite --guilds 50
+#
+# Each backend first has to pass the conformance checks; then it is timed
+# on the same synthetic data (seeded, so runs are comparable) and the
+# report gives ops/sec and p50/p99 latency per operation.
+
+Factory = Callable[[], StorageBackend]
+
+
+def _target(kind: str, root: str) -> str:
+    return os.path.join(root, "shards") if kind == "sharded" else os.path.join(root, f"store.{kind}")
+
+
+# -------------------------------------------------
+# Conformance
+# -------------------------------------------------
+def _check(cond: bool, msg: str, failures: List[str]):
+    if not cond:
+        failures.append(msg)
+
+
+def run_conformance(factory: Factory) -> List[str]:
+    """
+    Run every check against fresh instances from `factory` (all opened on
+    the same location). Returns failure messages; empty means it conforms.
+    """
+    failures: List[str] = []
+    b = factory()
+    try:
+        _check(b.get_guild("g1") is None, "missing guild should be None", failures)
+        _check(b.get_player("g1", "u1") is None, "missing player should be None", failures)
+        _check(b.list_guilds() == [], "new store should list no guilds", failures)
+
+        b.put_player("g1", "u1", {"name": "Ilse", "hunger": 2})
+        _check(b.get_player("g1", "u1") == {"name": "Ilse", "hunger": 2}, "player round-trip", failures)
+        _check(b.get_guild("g1") == {"players": {"u1": {"name": "Ilse", "hunger": 2}}},
+               "put_player should create the guild", failures)
+
+        doc = {"hunger": 1, "nested": {"list": [1, 2, {"x": None}]}, "name": "Zoë — ñ"}
+        b.put_player("g1", "u1", doc)
+        _check(b.get_player("g1", "u1") == doc, "overwrite + unicode + nesting", failures)
+
+        got = b.get_player("g1", "u1")
+        got["hunger"] = 99
+        _check(b.get_player("g1", "u1")["hunger"] == 1, "returned documents must not alias storage", failures)
+
+        b.put_guild("g2", {"director": {"awareness": 3}, "players": {"u9": {"n": 9}}})
+        _check(b.get_guild("g2") == {"director": {"awareness": 3}, "players": {"u9": {"n": 9}}},
+               "guild round-trip", failures)
+        b.put_guild("g2", {"director": {"awareness": 4}, "players": {}})
+        _check(b.get_player("g2", "u9") is None, "put_guild should replace its players", failures)
+
+        b.batch_put([("g3", None, {"players": {}, "tag": "b"})] +
+                    [("g3", f"u{i}", {"i": i}) for i in range(10)])
+        _check(sorted(b.list_players("g3")) == sorted(f"u{i}" for i in range(10)), "batch_put players", failures)
+        _check(b.get_guild("g3").get("tag") == "b", "batch_put guild", failures)
+
+        _check(sorted(b.list_guilds()) == ["g1", "g2", "g3"], "list_guilds", failures)
+        seen = dict(b.iter_guilds())
+        _check(sorted(seen) == ["g1", "g2", "g3"] and seen["g1"] == b.get_guild("g1"),
+               "iter_guilds should match get_guild", failures)
+    except Exception as e:
+        failures.append(f"raised {type(e).__name__}: {e}")
+    finally:
+        b.close()
+
+    reopened = factory()
+    try:
+        _check(reopened.get_player("g1", "u1") == doc, "data should survive close/reopen", failures)
+        _check(sorted(reopened.list_players("g3")) == sorted(f"u{i}" for i in range(10)),
+               "batch should survive close/reopen", failures)
+    except Exception as e:
+        failures.append(f"reopen raised {type(e).__name__}: {e}")
+    finally:
+        reopened.close()
+    return failures
+
+
+# -------------------------------------------------
+# Throughput
+# -------------------------------------------------
+def _player_doc(rng: random.Random, size: int) -> Dict[str, Any]:
+    return {
+        "name": f"npc-{rng.randrange(10**6)}",
+        "clan": rng.choice(["Brujah", "Toreador", "Nosferatu", "Ventrue", "Tremere"]),
+        "hunger": rng.randrange(6),
+        "willpower": {"max": 5, "superficial": rng.randrange(3), "aggravated": 0},
+        "skills": {f"s{i}": rng.randrange(6) for i in range(size)},
+        "notes": "x" * rng.randrange(size * 4),
+    }
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _timed(name: str, ops: List[Callable[[], Any]]) -> Dict[str, Any]:
+    lat: List[float] = []
+    start = time.perf_counter()
+    for op in ops:
+        t = time.perf_counter()
+        op()
+        lat.append(time.perf_counter() - t)
+    total = time.perf_counter() - start
+    return {
+        "op": name,
+        "n": len(ops),
+        "ops_per_sec": len(ops) / total if total else float("inf"),
+        "p50_ms": _percentile(lat, 50) * 1000,
+        "p99_ms": _percentile(lat, 99) * 1000,
+    }
+
+
+def run_benchmark(
+    factory: Factory,
+    guilds: int = 20,
+    players: int = 50,
+    ops: int = 2000,
+    doc_size: int = 20,
+    seed: int = 1,
+) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    gids = [f"{900000 + g}" for g in range(guilds)]
+    uids = [f"{100000 + u}" for u in range(players)]
+    results = []
+
+    b = factory()
+    try:
+        load = [(gid, uid, _player_doc(rng, doc_size)) for gid in gids for uid in uids]
+        results.append(_timed("batch_put (load)", [lambda: b.batch_put(load)]))
+        results[-1]["n"] = len(load)
+        results[-1]["ops_per_sec"] *= len(load)
+
+        keys = [(rng.choice(gids), rng.choice(uids)) for _ in range(ops)]
+        docs = [_player_doc(rng, doc_size) for _ in range(ops)]
+        results.append(_timed("put_player", [
+            (lambda g=g, u=u, d=d: b.put_player(g, u, d)) for (g, u), d in zip(keys, docs)
+        ]))
+        results.append(_timed("get_player", [(lambda g=g, u=u: b.get_player(g, u)) for g, u in keys]))
+        results.append(_timed("get_guild", [(lambda g=g: b.get_guild(g)) for g, _ in keys[: max(1, ops // 10)]]))
+        results.append(_timed("list_players", [(lambda g=g: b.list_players(g)) for g, _ in keys[: max(1, ops // 10)]]))
+        results.append(_timed("iter_guilds", [lambda: sum(1 for _ in b.iter_guilds())]))
+        results.append(_timed("flush", [b.flush]))
+    finally:
+        b.close()
+    return results
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m core.storage.conformance")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--players", type=int, default=50)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--doc-size", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--dir", help="work in this directory instead of a temp dir (e.g. the deploy disk)")
+    parser.add_argument("--skip-bench", action="store_true")
+    args = parser.parse_args(argv)
+
+    kinds = [k.strip() for k in args.backends.split(",") if k.strip()]
+    root = tempfile.mkdtemp(prefix="vtm-storage-", dir=args.dir)
+    failed = False
+    report: List[Tuple[str, Dict[str, Any]]] = []
+    try:
+        for kind in kinds:
+            conf_root = os.path.join(root, kind, "conformance")
+            os.makedirs(conf_root, exist_ok=True)
+            failures = run_conformance(lambda: open_backend(kind, _target(kind, conf_root)))
+            status = "PASS" if not failures else f"FAIL ({len(failures)})"
+            print(f"[{kind}] conformance: {status}")
+            for f in failures:
+                print(f"    - {f}")
+            failed = failed or bool(failures)
+
+            if args.skip_bench or failures:
+                continue
+            bench_root = os.path.join(root, kind, "bench")
+            os.makedirs(bench_root, exist_ok=True)
+            for row in run_benchmark(
+                lambda: open_backend(kind, _target(kind, bench_root)),
+                guilds=args.guilds, players=args.players, ops=args.ops,
+                doc_size=args.doc_size, seed=args.seed,
+            ):
+                report.append((kind, row))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    if report:
+        print()
+        print(f"{'backend':<10} {'operation':<18} {'n':>7} {'ops/sec':>12} {'p50 ms':>9} {'p99 ms':>9}")
+        for kind, row in report:
+            print(
+                f"{kind:<10} {row['op']:<18} {row['n']:>7} {row['ops_per_sec']:>12.1f} "
+                f"{row['p50_ms']:>9.3f} {row['p99_ms']:>9.3f}"
+            )
+
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
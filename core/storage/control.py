@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from .journal import JournaledStore
+from .locks import KeyedLocks
+
+log = logging.getLogger(__name__)
+
+
+# -------------------------------------------------
+# Protocol
+# -------------------------------------------------
+#
+# One JSON object per line over a local Unix stream socket, one reply per
+# request:
+#
+#   {"op": "patch_player", "g": "<gid>", "u": "<uid>", "expected": 7,
+#    "set": {"hunger": 2}, "unset": ["stains"]}
+#     -> {"ok": true, "version": 8, "player": {...}}
+#     -> {"ok": false, "error": "conflict", "version": 9, "player": {...}}
+#     -> {"ok": false, "error": "not_found"}
+#
+#   {"op": "put_guild", "g": "<gid>", "v": {...}}      (backup restores)
+#     -> {"ok": true, "version": 12}
+#
+#   {"op": "lock_stats"} -> {"ok": true, "locks": {...}, "store": {...}}
+#
+# Other subsystems add their own ops with StoreControlServer.register(), e.g.
+#
+#   {"op": "director_thresholds", "g": "<gid>", "action": "add",
+#    "spec": "si_pressure >= 15", "severity": "high"}
+#     -> {"ok": true, "threshold": {...}}
+#
+# The bot owns the data; the API only ever writes through here, so every
+# write to a character is serialised by the same per-player lock.
+
+
+class StoreControlServer:
+    """
+    Bot side: applies API writes to the live store under KeyedLocks, with
+    compare-and-swap on the character's version counter.
+    """
+
+    def __init__(self, store: JournaledStore, locks: KeyedLocks, sock_path: str):
+        self.store = store
+        self.locks = locks
+        self.sock_path = sock_path
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._ops: Dict[str, Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]] = {}
+
+    def register(self, op: str, handler: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]):
+        """
+        Serve `op` with `handler(req) -> reply`, run on the bot's loop.
+        """
+        self._ops[op] = handler
+
+    async def start(self):
+        if not hasattr(asyncio, "start_unix_server"):
+            log.warning("Store control socket unavailable on this platform")
+            return
+        if os.path.exists(self.sock_path):
+            os.unlink(self.sock_path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.sock_path)
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            try:
+                os.unlink(self.sock_path)
+            except OSError:
+                pass
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    reply = await self.dispatch(json.loads(line))
+                except Exception as e:
+                    log.exception("Store control request failed")
+                    reply = {"ok": False, "error": "internal", "detail": str(e)}
+                writer.write(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def dispatch(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        op = req.get("op")
+        if op == "patch_player":
+            return await self.patch_player(
+                req["g"], req["u"], int(req.get("expected", -1)),
+                req.get("set") or {}, req.get("unset") or [],
+            )
+        if op == "put_guild":
+            return await self.put_guild(req["g"], req["v"])
+        if op == "lock_stats":
+            return {"ok": True, "locks": self.locks.stats(), "store": self.store.stats()}
+        handler = self._ops.get(op)
+        if handler is not None:
+            return await handler(req)
+        return {"ok": False, "error": "unknown_op"}
+
+    async def patch_player(
+        self,
+        guild_id: str,
+        user_id: str,
+        expected: int,
+        changes: Dict[str, Any],
+        remove: Iterable[str] = (),
+    ) -> Dict[str, Any]:
+        gid, uid = str(guild_id), str(user_id)
+        async with self.locks.player(gid, uid):
+            guilds = self.store.data.get("guilds", {})
+            guild = guilds.get(gid)
+            if guild is None and gid.isdigit():
+                # get_guild_data() keys by int until the first record()
+                guild = guilds.get(int(gid))
+            player = (guild or {}).get("players", {}).get(uid)
+            if player is None:
+                return {"ok": False, "error": "not_found"}
+
+            current = self.store.player_version(gid, uid)
+            if expected != current:
+                self.locks.note_conflict(gid, uid)
+                return {"ok": False, "error": "conflict", "version": current, "player": player}
+
+            player.update(changes)
+            for key in remove:
+                player.pop(key, None)
+            await self.store.record(gid, "players", uid)
+            return {"ok": True, "version": self.store.player_version(gid, uid), "player": player}
+
+
+    async def put_guild(self, guild_id: str, value: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Replace a whole guild, with every player command in it held off.
+        """
+        gid = str(guild_id)
+        async with self.locks.guild(gid):
+            guilds = self.store.data.get("guilds", {})
+            if isinstance(guilds, dict) and gid.isdigit():
+                guilds.pop(int(gid), None)
+            await self.store.put(gid, [], value)
+            # Bump every character's version so in-flight API edits made
+            # against the pre-restore sheets fail their CAS.
+            for uid in list((value.get("players") or {}).keys()):
+                self.store.record(gid, "players", uid)
+            return {"ok": True, "version": self.store.version(gid)}
+
+
+class StoreControlClient:
+    """
+    API side: one request per connection, so concurrent requests never
+    share a socket.
+    """
+
+    def __init__(self, sock_path: str, timeout: float = 5.0):
+        self.sock_path = sock_path
+        self.timeout = timeout
+
+    async def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Raises ConnectionError when the bot is not reachable.
+        """
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_unix_connection(self.sock_path), timeout=self.timeout
+            )
+        except (OSError, asyncio.TimeoutError, AttributeError) as e:
+            raise ConnectionError(f"store control socket {self.sock_path}: {e}") from e
+
+        try:
+            writer.write(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+            await writer.drain()
+            line = await asyncio.wait_for(reader.readline(), timeout=self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise ConnectionError(f"store control request failed: {e}") from e
+        finally:
+            writer.close()
+
+        if not line:
+            raise ConnectionError("store control socket closed without a reply")
+        return json.loads(line)
+
+    async def patch_player(
+        self,
+        guild_id: str,
+        user_id: str,
+        expected_version: int,
+        changes: Dict[str, Any],
+        remove: Iterable[str] = (),
+    ) -> Dict[str, Any]:
+        return await self.request({
+            "op": "patch_player",
+            "g": str(guild_id),
+            "u": str(user_id),
+            "expected": int(expected_version),
+            "set": changes,
+            "unset": list(remove),
+        })
+
+    async def put_guild(self, guild_id: str, value: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.request({"op": "put_guild", "g": str(guild_id), "v": value})
+
+    async def lock_stats(self) -> Dict[str, Any]:
+        return await self.request({"op": "lock_stats"})
+
+    async def llm_stats(self) -> Dict[str, Any]:
+        return await self.request({"op": "llm_stats"})
+
+    async def director_thresholds(self, guild_id: str, action: str = "list", **fields) -> Dict[str, Any]:
+        return await self.request({"op": "director_thresholds", "g": str(guild_id), "action": action, **fields})
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows dev boxes: locking becomes a no-op
+    fcntl = None
+
+
+class StoreLock:
+    """
+    Advisory lock on <store path>.lock shared by every process that touches
+    the store. Writers take it exclusively; readers that need a consistent
+    snapshot + journal view take it shared.
+
+    Re-entrant within one StoreLock instance (nested holds are no-ops).
+    """
+
+    def __init__(self, path: str):
+        self.path = path + ".lock"
+        self._fd = None
+        self._depth = 0
+
+    def _acquire(self, mode: int):
+        if fcntl is None:
+            return
+        if self._fd is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._fd, mode)
+
+    def _release(self):
+        if fcntl is None or self._fd is None:
+            return
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _hold(self, mode_name: str):
+        if self._depth:
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+            return
+
+        self._acquire(getattr(fcntl, mode_name, 0))
+        self._depth = 1
+        try:
+            yield
+        finally:
+            self._depth = 0
+            self._release()
+
+    def exclusive(self):
+        return self._hold("LOCK_EX")
+
+    def shared(self):
+        return self._hold("LOCK_SH")
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
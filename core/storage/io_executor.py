@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+
+class PendingWrite:
+    """
+    Handle for a queued disk write.
+
+    Await it from async code; call .result() from sync code (CLI scripts);
+    or just drop it – the write still happens, in order.
+    """
+
+    def __init__(self, future: Future):
+        self._future = future
+
+    def __await__(self):
+        return asyncio.wrap_future(self._future).__await__()
+
+    def result(self, timeout: Optional[float] = None):
+        return self._future.result(timeout)
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def add_done_callback(self, fn: Callable[[Future], Any]):
+        self._future.add_done_callback(fn)
+
+
+class _Job:
+    __slots__ = ("fn", "args", "futures", "coalesce")
+
+    def __init__(self, fn, args, future: Future, coalesce: bool):
+        self.fn = fn
+        self.args = args
+        self.futures: List[Future] = [future]
+        self.coalesce = coalesce
+
+
+class DiskWriter:
+    """
+    Dedicated I/O executor for every file the bot and API persist.
+
+    - Jobs are queued per key (normally the file path) and run strictly in
+      submission order for that key; different files proceed in parallel.
+    - Whole-file rewrites submitted with coalesce=True replace a rewrite of
+      the same file that is still waiting, so a burst of saves costs one
+      write. Every caller's awaitable still resolves when the data lands.
+    - Nothing here touches the event loop: callers get a PendingWrite back
+      immediately.
+    """
+
+    def __init__(self, max_workers: int = 4, name: str = "vtm-disk"):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._queues: Dict[str, Deque[_Job]] = {}
+        self._running: Set[str] = set()
+
+    def submit(self, key: str, fn: Callable[..., Any], *args, coalesce: bool = False) -> PendingWrite:
+        future: Future = Future()
+        with self._lock:
+            queue = self._queues.setdefault(key, deque())
+            if coalesce and queue and queue[-1].coalesce:
+                job = queue[-1]
+                job.fn, job.args = fn, args
+                job.futures.append(future)
+            else:
+                queue.append(_Job(fn, args, future, coalesce))
+
+            if key not in self._running:
+                self._running.add(key)
+                self._pool.submit(self._drain, key)
+        return PendingWrite(future)
+
+    def _drain(self, key: str):
+        while True:
+            with self._lock:
+                queue = self._queues.get(key)
+                if not queue:
+                    self._queues.pop(key, None)
+                    self._running.discard(key)
+                    return
+                job = queue.popleft()
+
+            try:
+                result = job.fn(*job.args)
+            except BaseException as e:
+                for f in job.futures:
+                    f.set_exception(e)
+            else:
+                for f in job.futures:
+                    f.set_result(result)
+
+    def flush(self, key: str, timeout: Optional[float] = None):
+        """
+        Block until everything queued for `key` so far has run.
+        Only for shutdown paths and scripts – never call on the event loop.
+        """
+        self.submit(key, lambda: None).result(timeout)
+
+    def pending(self) -> Dict[str, int]:
+        with self._lock:
+            return {k: len(q) for k, q in self._queues.items()}
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+def completed_write(result: Any = None) -> PendingWrite:
+    """
+    An already-finished PendingWrite, for code paths that wrote inline.
+    """
+    future: Future = Future()
+    future.set_result(result)
+    return PendingWrite(future)
+
+
+_DEFAULT_WRITER: Optional[DiskWriter] = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def get_writer() -> DiskWriter:
+    global _DEFAULT_WRITER
+    with _DEFAULT_LOCK:
+        if _DEFAULT_WRITER is None:
+            _DEFAULT_WRITER = DiskWriter()
+        return _DEFAULT_WRITER
+
+
+def _atomic_write_text(path: str, text: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def write_json(path: str, data: Any, **dump_kwargs) -> PendingWrite:
+    """
+    Queue an atomic JSON rewrite of `path`.
+
+    The data is serialised right away on the caller's thread (so later
+    in-memory mutations cannot leak into this write); only the disk I/O
+    runs on the writer.
+    """
+    text = json.dumps(data, **dump_kwargs)
+    return get_writer().submit(path, _atomic_write_text, path, text, coalesce=True)
@@ -0,0 +1,663 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from collections.abc import MutableMapping
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .packed import LazyGuilds, PackedReader, is_packed, write_packed
+from .filelock import StoreLock
+from .io_executor import DiskWriter, PendingWrite, completed_write
+
+if TYPE_CHECKING:
+    # unit_of_work imports this module; the runtime import is in transaction().
+    from .unit_of_work import UnitOfWork
+
+DEFAULT_BOT_STORE: Dict[str, Any] = {"guilds": {}, "characters": {}, "items": {}}
+
+# A deleted value is journaled with this marker instead of "v".
+_DELETE = "d"
+
+# A journal line {"b": [record, ...]} is one transaction (see commit()):
+# it lands whole or, torn, not at all.
+_BATCH = "b"
+
+# A record {"f": "<file path>", "v": <document>, "k": {dump kwargs}} inside
+# a transaction carries a whole side file (havens.json, director state...).
+FILE_KEY = "f"
+
+# Snapshot key holding per-guild versions (stripped from `data` on load).
+VERSIONS_KEY = "_versions"
+
+# Version bucket for records that are not under a guild.
+ROOT_VERSION_KEY = "_root"
+
+
+def player_version_key(guild_id, user_id) -> str:
+    """
+    Key of a character's own counter in `versions` (beside the guild's).
+    """
+    return f"{guild_id}/players/{user_id}"
+
+
+def _walk(root: Dict[str, Any], path: Sequence[str], create: bool = True):
+    """
+    Follow `path` down nested dicts. Returns the parent dict of the last key
+    (or None when `create` is False and a link is missing).
+    """
+    node = root
+    for key in path[:-1]:
+        nxt = node.get(key)
+        if not isinstance(nxt, MutableMapping):
+            if not create:
+                return None
+            nxt = {}
+            node[key] = nxt
+        node = nxt
+    return node
+
+
+def full_path(guild_id: Optional[str], path: Sequence[str]) -> List[str]:
+    if guild_id is None:
+        return [str(p) for p in path]
+    return ["guilds", str(guild_id)] + [str(p) for p in path]
+
+
+def record_guild(record: Dict[str, Any]) -> Optional[str]:
+    """
+    The guild a journal record touches, or None for root-level records.
+    """
+    if record.get("g") is not None:
+        return str(record["g"])
+    p = record.get("p") or []
+    if len(p) > 1 and p[0] == "guilds":
+        return str(p[1])
+    return None
+
+
+def record_player(record: Dict[str, Any]) -> Optional[str]:
+    """
+    player_version_key() of the character a record touches, if any.
+    Whole-guild or whole-"players" records do not count as player writes.
+    """
+    p = [str(x) for x in (record.get("p") or [])]
+    if record.get("g") is None:
+        if len(p) < 2 or p[0] != "guilds":
+            return None
+        gid, p = p[1], p[2:]
+    else:
+        gid = str(record["g"])
+    if len(p) >= 2 and p[0] == "players":
+        return player_version_key(gid, p[1])
+    return None
+
+
+def apply_record(data: Dict[str, Any], record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply one journal record to `data` in place. Returns `data` (a root
+    replacement swaps the contents, not the object). Side-file records do
+    not touch `data`.
+    """
+    if FILE_KEY in record:
+        return data
+    full = full_path(record.get("g"), record.get("p") or [])
+    if not full:
+        if _DELETE not in record:
+            data.clear()
+            data.update(record.get("v") or {})
+        return data
+
+    if record.get(_DELETE):
+        parent = _walk(data, full, create=False)
+        if parent is not None:
+            parent.pop(full[-1], None)
+        return data
+
+    parent = _walk(data, full)
+    parent[full[-1]] = record.get("v")
+    return data
+
+
+def note_record_versions(versions: Dict[str, int], record: Dict[str, Any]):
+    """
+    Raise the guild (and player) counters to what a replayed record carries.
+    """
+    if FILE_KEY in record:
+        return
+    key = record_guild(record) or ROOT_VERSION_KEY
+    n = int(record.get("n") or 0)
+    if n > versions.get(key, 0):
+        versions[key] = n
+    pkey = record_player(record)
+    if pkey is not None:
+        pn = int(record.get("pn") or 0)
+        if pn > versions.get(pkey, 0):
+            versions[pkey] = pn
+
+
+def write_side_file(path: str, text: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_snapshot(
+    path: str,
+    default: Dict[str, Any],
+    lazy_opts: Dict[str, Any],
+) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """
+    Read a JSON or packed snapshot. Returns (data, per-guild versions).
+    """
+    if is_packed(path):
+        reader = PackedReader(path)
+        data = dict(reader.root)
+        data["guilds"] = LazyGuilds(reader, **lazy_opts)
+    elif os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    else:
+        data = json.loads(json.dumps(default))
+
+    versions = {str(k): int(v) for k, v in (data.pop(VERSIONS_KEY, None) or {}).items()}
+    return data, versions
+
+
+def parse_journal_lines(chunk: str) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Decode complete journal lines from `chunk`.
+    Returns (records, number of characters consumed). A torn final line is
+    left unconsumed so a follower can pick it up once the writer finishes.
+    """
+    records: List[Dict[str, Any]] = []
+    consumed = 0
+    for line in chunk.splitlines(keepends=True):
+        if not line.endswith("\n"):
+            break
+        stripped = line.strip()
+        if stripped:
+            try:
+                obj = json.loads(stripped)
+            except json.JSONDecodeError:
+                # A torn line from a crash mid-write; nothing after it landed.
+                break
+            if _BATCH in obj:
+                records.extend(obj[_BATCH])
+            else:
+                records.append(obj)
+        consumed += len(line)
+    return records, consumed
+
+
+class JournaledStore:
+    """
+    Snapshot + write-ahead journal for the JSON data store.
+
+    The snapshot is the familiar bot_data.json. Every mutation after it is
+    appended to <path>.journal as one compact JSON line:
+
+        {"g": "<guild_id>", "p": ["players", "123"], "v": {...}, "n": 17}
+
+    Journal lines are flushed to the OS immediately and fsynced in batches,
+    so a crash loses at most one batch. Every `compact_every` records the
+    journal is folded into a fresh snapshot (tmp file + os.replace) and
+    replaced by an empty one. On startup the snapshot is loaded and the
+    journal replayed.
+
+    Each record also carries its wall-clock time "t", which point-in-time
+    restores (backup.py) use; replay ignores it.
+
+    Records always carry absolute values, so replaying a record twice
+    (e.g. after a crash mid-compaction) is harmless.
+
+    With packed=True snapshots use the indexed format from packed.py:
+    only the header is parsed at startup and each guild is decoded on
+    first use (see LazyGuilds). A packed snapshot is detected on load
+    regardless of the flag.
+
+    Cross-process coherence (see coherence.py): writes hold an exclusive
+    advisory lock on <path>.lock, every record carries the guild's new
+    version "n" (plus "pn", the character's own version, when it writes
+    under players/<user_id>), and `notifier(guild_id, version)` is called after each
+    append so readers in other processes can refresh just that guild.
+
+    Non-blocking persistence (see io_executor.py): with a `writer`, and when
+    called from a running event loop, mutations update memory and encode
+    their journal line immediately, then hand the file I/O to the writer's
+    queue for this path. put()/delete()/record()/compact() return a
+    PendingWrite either way; awaiting it means the record has reached the
+    journal (and is fsynced if its batch was due).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        default: Optional[Dict[str, Any]] = None,
+        fsync_every: int = 32,
+        fsync_interval: float = 1.0,
+        compact_every: int = 2000,
+        packed: bool = False,
+        max_resident_guilds: int = 256,
+        max_resident_bytes: int = 64 * 1024 * 1024,
+        guild_idle_seconds: float = 300.0,
+        notifier: Optional[Callable[[str, int], None]] = None,
+        writer: Optional[DiskWriter] = None,
+    ):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.default = default if default is not None else DEFAULT_BOT_STORE
+        self.fsync_every = max(1, int(fsync_every))
+        self.fsync_interval = float(fsync_interval)
+        self.compact_every = max(1, int(compact_every))
+        self.packed = packed or is_packed(path)
+        self.notifier = notifier
+        self.writer = writer
+        self.lock = StoreLock(path)
+        self._lazy_opts = {
+            "max_resident": max_resident_guilds,
+            "max_bytes": max_resident_bytes,
+            "idle_seconds": guild_idle_seconds,
+        }
+
+        self.data: Dict[str, Any] = {}
+        self.versions: Dict[str, int] = {}
+        self._journal = None
+        self._pending = 0          # records written but not fsynced
+        self._records = 0          # records since last compaction
+        self._last_sync = time.monotonic()
+        self._compacting: Optional[PendingWrite] = None
+        self._touched_while_compacting: set = set()
+        self.load()
+
+    # -------------------------------------------------
+    # Startup: snapshot + journal replay
+    # -------------------------------------------------
+    def load(self):
+        self.close()
+
+        with self.lock.shared():
+            self.data, self.versions = load_snapshot(self.path, self.default, self._lazy_opts)
+
+            self._records = 0
+            files: Dict[str, Dict[str, Any]] = {}
+            for record in self._read_journal():
+                if FILE_KEY in record:
+                    files[record[FILE_KEY]] = record
+                apply_record(self.data, record)
+                self._note_version(record)
+                self._mark_dirty(record)
+                self._records += 1
+
+        self._recover_files(files)
+        self._open_journal()
+
+    def _recover_files(self, files: Dict[str, Dict[str, Any]]):
+        """
+        Finish side-file writes of committed transactions. A file modified
+        after its last transaction was already written (or replaced by
+        something newer), so it is left alone.
+        """
+        for path, record in files.items():
+            try:
+                if os.path.getmtime(path) >= float(record.get("t") or 0):
+                    continue
+            except OSError:
+                pass
+            write_side_file(path, json.dumps(record.get("v"), **(record.get("k") or {})))
+
+    def _read_journal(self) -> Iterable[Dict[str, Any]]:
+        if not os.path.exists(self.journal_path):
+            return []
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            text = f.read()
+        records, consumed = parse_journal_lines(text)
+
+        if consumed < len(text):
+            # Cut the torn tail so new appends start on a clean line.
+            os.truncate(self.journal_path, len(text[:consumed].encode("utf-8")))
+        return records
+
+    def _open_journal(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    # -------------------------------------------------
+    # Versions / residency
+    # -------------------------------------------------
+    def _note_version(self, record: Dict[str, Any]):
+        note_record_versions(self.versions, record)
+
+    def version(self, guild_id: Optional[str]) -> int:
+        return self.versions.get(ROOT_VERSION_KEY if guild_id is None else str(guild_id), 0)
+
+    def player_version(self, guild_id, user_id) -> int:
+        return self.versions.get(player_version_key(guild_id, user_id), 0)
+
+    def _mark_dirty(self, record: Dict[str, Any]):
+        """
+        Pin a lazily loaded guild until the next snapshot contains its change.
+        """
+        guilds = self.data.get("guilds")
+        gid = record_guild(record)
+        if isinstance(guilds, LazyGuilds) and gid is not None:
+            guilds.mark_dirty(gid)
+
+    # -------------------------------------------------
+    # I/O dispatch
+    # -------------------------------------------------
+    def _loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        if self.writer is None:
+            return None
+        try:
+            return asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+
+    def _submit(self, fn: Callable[..., Any], *args) -> PendingWrite:
+        """
+        Run `fn` on the writer when we are on an event loop, inline otherwise
+        (startup, shutdown, scripts). Either way jobs for this store run in
+        call order.
+        """
+        if self._loop() is not None:
+            return self.writer.submit(self.path, fn, *args)
+        if self.writer is not None:
+            self.writer.flush(self.path)
+        return completed_write(fn(*args))
+
+    # -------------------------------------------------
+    # Appending
+    # -------------------------------------------------
+    def _stamp(self, record: Dict[str, Any]) -> Tuple[str, int]:
+        """
+        Give a record its versions and timestamp; returns (key, version)
+        for the change notification.
+        """
+        key = record_guild(record) or ROOT_VERSION_KEY
+        version = self.versions.get(key, 0) + 1
+        self.versions[key] = version
+        record["n"] = version
+        record["t"] = round(time.time(), 3)
+        pkey = record_player(record)
+        if pkey is not None:
+            record["pn"] = self.versions[pkey] = self.versions.get(pkey, 0) + 1
+        self._mark_dirty(record)
+        if self._compacting is not None and key != ROOT_VERSION_KEY:
+            self._touched_while_compacting.add(key)
+        return key, version
+
+    def _appended(self, count: int):
+        self._records += count
+        if self._records >= self.compact_every and self._compacting is None:
+            self.compact()
+
+    def _append(self, record: Dict[str, Any]) -> PendingWrite:
+        note = self._stamp(record)
+        # Encode now: the live dicts may change again before the write runs.
+        line = json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n"
+        pending = self._submit(self._write_line, line, [note])
+        self._appended(1)
+        return pending
+
+    def _write_line(self, line: str, notes: List[Tuple[str, int]], files: Sequence[Tuple[str, str]] = ()):
+        with self.lock.exclusive():
+            if self._journal is None:
+                self._open_journal()
+            self._journal.write(line)
+            self._journal.flush()
+
+            self._pending += 1
+            now = time.monotonic()
+            if files or self._pending >= self.fsync_every or now - self._last_sync >= self.fsync_interval:
+                # A transaction is durable before any side file is touched.
+                self.sync()
+
+            for path, text in files:
+                write_side_file(path, text)
+
+        if self.notifier is not None:
+            for key, version in notes:
+                self.notifier(key, version)
+
+    # -------------------------------------------------
+    # Public mutation API
+    # -------------------------------------------------
+    def put(self, guild_id: Optional[str], path: Sequence[str], value: Any) -> PendingWrite:
+        """
+        Set `value` at guild/path in memory and journal it.
+        guild_id=None addresses the store root.
+        """
+        record = {"g": None if guild_id is None else str(guild_id), "p": [str(p) for p in path], "v": value}
+        apply_record(self.data, record)
+        return self._append(record)
+
+    def delete(self, guild_id: Optional[str], path: Sequence[str]) -> PendingWrite:
+        record = {"g": None if guild_id is None else str(guild_id), "p": [str(p) for p in path], _DELETE: 1}
+        apply_record(self.data, record)
+        return self._append(record)
+
+    def current_record(self, guild_id: Optional[str], *path: str) -> Optional[Dict[str, Any]]:
+        """
+        A record capturing the in-memory value at guild/path (a delete when
+        it is gone), or None when the guild itself does not exist.
+        """
+        node: Any = self.data
+        if guild_id is not None:
+            guilds = self.data.get("guilds", {})
+            node = guilds.get(str(guild_id), guilds.get(guild_id))
+            if node is None:
+                return None
+            if str(guild_id) not in guilds:
+                # int keys from get_guild_data(); normalise to the JSON form
+                guilds[str(guild_id)] = guilds.pop(guild_id)
+
+        base = {"g": None if guild_id is None else str(guild_id), "p": [str(p) for p in path]}
+        for key in path:
+            if not isinstance(node, dict) or str(key) not in node:
+                return {**base, _DELETE: 1}
+            node = node[str(key)]
+        return {**base, "v": node}
+
+    def record(self, guild_id: Optional[str], *path: str) -> PendingWrite:
+        """
+        Journal the current in-memory value at guild/path.
+
+        For callers that mutate the live dicts in place (every cog does)
+        and then just need the change made durable.
+        """
+        record = self.current_record(guild_id, *path)
+        if record is None:
+            return completed_write()
+        if record.get(_DELETE):
+            apply_record(self.data, record)
+        return self._append(record)
+
+    # -------------------------------------------------
+    # Transactions
+    # -------------------------------------------------
+    def transaction(self) -> "UnitOfWork":
+        """
+        Stage changes to this store and to side files, then commit them
+        as one journal line. See unit_of_work.py.
+        """
+        from .unit_of_work import UnitOfWork
+        return UnitOfWork(self)
+
+    def commit(
+        self,
+        records: Sequence[Dict[str, Any]],
+        files: Sequence[Tuple[str, Any, Dict[str, Any]]] = (),
+    ) -> PendingWrite:
+        """
+        Journal `records` (already applied to memory) and the side files
+        [(path, document, json.dump kwargs)] as a single line, fsync it,
+        then rewrite the side files. After a crash the line either replays
+        whole (finishing any side file it did not reach) or not at all.
+        """
+        if not records and not files:
+            return completed_write()
+
+        notes = [self._stamp(r) for r in records]
+        t = round(time.time(), 3)
+        batch = list(records)
+        texts = []
+        for path, document, kwargs in files:
+            batch.append({FILE_KEY: path, "v": document, "k": kwargs, "t": t})
+            texts.append((path, json.dumps(document, **kwargs)))
+
+        line = json.dumps({_BATCH: batch}, separators=(",", ":"), ensure_ascii=False) + "\n"
+        pending = self._submit(self._write_line, line, notes, texts)
+        self._appended(len(batch))
+        return pending
+
+    # -------------------------------------------------
+    # Durability
+    # -------------------------------------------------
+    def sync(self):
+        """
+        fsync the journal; everything appended so far survives a crash.
+        Runs wherever the journal is written (the writer thread, if any).
+        """
+        if self._journal is None:
+            return
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def compact(self) -> PendingWrite:
+        """
+        Fold the journal into a fresh snapshot and start an empty journal.
+
+        The snapshot is encoded here, so it reflects memory at the time of
+        the call; writing it and swapping the journal happen on the writer,
+        queued behind every append made before this call and ahead of every
+        append after it. The new journal is swapped in with os.replace, so
+        followers see a new inode and know to re-read the snapshot.
+
+        Only one compaction is in flight at a time; a second call returns
+        the pending one (the journal still holds anything newer).
+        """
+        if self._compacting is not None:
+            return self._compacting
+
+        self._records = 0
+        self._touched_while_compacting = set()
+        loop = self._loop()
+
+        if self.packed:
+            guilds = self.data.get("guilds") or {}
+            root = {k: v for k, v in self.data.items() if k != "guilds"}
+            root[VERSIONS_KEY] = dict(self.versions)
+            root = json.loads(json.dumps(root))
+            if isinstance(guilds, LazyGuilds):
+                plan = guilds.begin_snapshot()
+            else:
+                plan = [
+                    (str(gid), json.dumps(g, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+                    for gid, g in guilds.items()
+                ]
+            pending = self._submit(self._write_packed_snapshot, root, plan, guilds, loop)
+        else:
+            text = json.dumps({**self.data, VERSIONS_KEY: self.versions}, indent=4)
+            pending = self._submit(self._write_json_snapshot, text, loop)
+
+        # Queued: cleared by _finish_compaction once memory is rebased.
+        self._compacting = pending if loop is not None else None
+        return pending
+
+    def _swap_journal(self):
+        # Snapshot now covers every record queued before it; start a new journal.
+        if self._journal is not None:
+            self._journal.close()
+        tmp = self.journal_path + ".tmp"
+        open(tmp, "w", encoding="utf-8").close()
+        os.replace(tmp, self.journal_path)
+        self._open_journal()
+
+    def _on_owner(self, loop, fn: Callable[..., Any], *args):
+        # In-memory state belongs to the loop thread; the future a caller
+        # awaits is resolved after this callback is queued, so it runs first.
+        if loop is not None:
+            loop.call_soon_threadsafe(fn, *args)
+        else:
+            fn(*args)
+
+    def _write_json_snapshot(self, text: str, loop):
+        try:
+            with self.lock.exclusive():
+                self.sync()
+                tmp = self.path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(text)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+                self._swap_journal()
+        finally:
+            self._on_owner(loop, self._finish_compaction, None, None, None)
+
+    def _write_packed_snapshot(self, root, plan, guilds, loop):
+        reader, sizes = None, None
+        try:
+            with self.lock.exclusive():
+                self.sync()
+                blobs = guilds.resolve_snapshot(plan) if isinstance(guilds, LazyGuilds) else plan
+                sizes = write_packed(self.path, root, blobs)
+                reader = PackedReader(self.path)
+                self._swap_journal()
+        finally:
+            self._on_owner(loop, self._finish_compaction, guilds, reader, sizes)
+
+    def _finish_compaction(self, guilds, reader: Optional[PackedReader], sizes: Optional[Dict[str, int]]):
+        self._compacting = None
+        if not self.packed:
+            return
+        if reader is None:
+            # The write failed; the journal still holds everything.
+            if isinstance(guilds, LazyGuilds):
+                guilds.abort_snapshot()
+            return
+
+        if isinstance(guilds, LazyGuilds):
+            guilds.rebase(reader, sizes)
+        else:
+            # First packed snapshot of a plain-JSON store: switch to lazy
+            # guilds, keeping the already-decoded dicts so live references
+            # stay valid. Anything changed since the snapshot stays pinned.
+            lazy = LazyGuilds(reader, **self._lazy_opts)
+            for gid, g in list(self.data.get("guilds", {}).items()):
+                lazy._admit(str(gid), g, sizes.get(str(gid), 0))
+            for gid in self._touched_while_compacting:
+                lazy.mark_dirty(gid)
+            self.data["guilds"] = lazy
+        self._touched_while_compacting = set()
+
+    def stats(self) -> Dict[str, Any]:
+        guilds = self.data.get("guilds")
+        out = {"journal_records": self._records, "pending_fsync": self._pending}
+        if self.writer is not None:
+            out["queued_writes"] = self.writer.pending().get(self.path, 0)
+        if isinstance(guilds, LazyGuilds):
+            out.update(guilds.stats())
+        else:
+            out["total_guilds"] = len(guilds or {})
+        return out
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.flush(self.path)
+        if self._journal is not None:
+            self.sync()
+            self._journal.close()
+            self._journal = None
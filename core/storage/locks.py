@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Tuple
+
+
+class _KeyStats:
+    __slots__ = ("acquired", "contended", "wait_total", "wait_max", "conflicts")
+
+    def __init__(self):
+        self.acquired = 0
+        self.contended = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.conflicts = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "acquired": self.acquired,
+            "contended": self.contended,
+            "wait_total_ms": round(self.wait_total * 1000, 3),
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+            "cas_conflicts": self.conflicts,
+        }
+
+
+class _GuildGate:
+    """
+    Many player-scoped holders OR one guild-wide holder.
+    """
+
+    __slots__ = ("cond", "players", "exclusive", "waiting_exclusive", "users")
+
+    def __init__(self):
+        self.cond = asyncio.Condition()
+        self.players = 0
+        self.exclusive = False
+        self.waiting_exclusive = 0
+        self.users = 0          # holders + waiters, for cleanup
+
+
+class KeyedLocks:
+    """
+    asyncio locks keyed by guild and by player.
+
+    - player(guild_id, user_id): serialises read-modify-write of one
+      character. Locks are created per exact key, so two different players
+      never wait on each other (no hash striping collisions). Every
+      command that changes a character takes it, even one with no await
+      of its own: a guild() holder (a restore) awaits while it swaps the
+      guild out, and an unlocked edit would land in the old copy.
+    - guild(guild_id): guild-wide work (Director updates, bulk edits).
+      Waits for in-flight player holders in that guild and keeps new ones
+      out until it is released; other guilds are unaffected. Never take
+      guild() while holding player() for the same guild.
+
+    Locks are dropped once nobody holds or waits on them, so memory follows
+    the number of busy keys, not the number of players ever seen.
+
+    Every acquisition records how long it waited; stats()/hot_keys() expose
+    the keys that actually contend.
+    """
+
+    def __init__(self):
+        self._gates: Dict[str, _GuildGate] = {}
+        self._players: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self._player_users: Dict[Tuple[str, str], int] = {}
+        self._stats: Dict[str, _KeyStats] = {}
+
+    # -------------------------------------------------
+    # Metrics
+    # -------------------------------------------------
+    @staticmethod
+    def _player_key(guild_id: str, user_id: str) -> str:
+        return f"player:{guild_id}:{user_id}"
+
+    @staticmethod
+    def _guild_key(guild_id: str) -> str:
+        return f"guild:{guild_id}"
+
+    def _note(self, key: str, waited: float, contended: bool):
+        st = self._stats.get(key)
+        if st is None:
+            st = self._stats[key] = _KeyStats()
+        st.acquired += 1
+        if contended:
+            st.contended += 1
+            st.wait_total += waited
+            st.wait_max = max(st.wait_max, waited)
+
+    def note_conflict(self, guild_id, user_id=None):
+        """
+        Count a failed compare-and-swap against the key it targeted.
+        """
+        gid = str(guild_id)
+        key = self._guild_key(gid) if user_id is None else self._player_key(gid, str(user_id))
+        st = self._stats.get(key)
+        if st is None:
+            st = self._stats[key] = _KeyStats()
+        st.conflicts += 1
+
+    def hot_keys(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Keys ordered by total time spent waiting, then by CAS conflicts.
+        """
+        ranked = sorted(
+            self._stats.items(),
+            key=lambda kv: (kv[1].wait_total, kv[1].conflicts, kv[1].contended),
+            reverse=True,
+        )
+        hot = [(k, st) for k, st in ranked if st.contended or st.conflicts]
+        return [{"key": k, **st.as_dict()} for k, st in hot[:limit]]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "live_guild_gates": len(self._gates),
+            "live_player_locks": len(self._players),
+            "keys_seen": len(self._stats),
+            "acquired": sum(s.acquired for s in self._stats.values()),
+            "contended": sum(s.contended for s in self._stats.values()),
+            "cas_conflicts": sum(s.conflicts for s in self._stats.values()),
+            "hot_keys": self.hot_keys(),
+        }
+
+    def reset_stats(self):
+        self._stats.clear()
+
+    # -------------------------------------------------
+    # Guild gate
+    # -------------------------------------------------
+    def _gate(self, gid: str) -> _GuildGate:
+        gate = self._gates.get(gid)
+        if gate is None:
+            gate = self._gates[gid] = _GuildGate()
+        gate.users += 1
+        return gate
+
+    def _release_gate(self, gid: str, gate: _GuildGate):
+        gate.users -= 1
+        if gate.users == 0 and self._gates.get(gid) is gate:
+            del self._gates[gid]
+
+    @asynccontextmanager
+    async def guild(self, guild_id):
+        gid = str(guild_id)
+        gate = self._gate(gid)
+        start = time.perf_counter()
+        contended = False
+        try:
+            async with gate.cond:
+                gate.waiting_exclusive += 1
+                try:
+                    while gate.exclusive or gate.players:
+                        contended = True
+                        await gate.cond.wait()
+                finally:
+                    gate.waiting_exclusive -= 1
+                gate.exclusive = True
+            self._note(self._guild_key(gid), time.perf_counter() - start, contended)
+
+            try:
+                yield
+            finally:
+                async with gate.cond:
+                    gate.exclusive = False
+                    gate.cond.notify_all()
+        finally:
+            self._release_gate(gid, gate)
+
+    # -------------------------------------------------
+    # Player locks
+    # -------------------------------------------------
+    @asynccontextmanager
+    async def player(self, guild_id, user_id):
+        gid, uid = str(guild_id), str(user_id)
+        key = (gid, uid)
+        gate = self._gate(gid)
+        lock = self._players.get(key)
+        if lock is None:
+            lock = self._players[key] = asyncio.Lock()
+        self._player_users[key] = self._player_users.get(key, 0) + 1
+
+        start = time.perf_counter()
+        contended = False
+        try:
+            # Enter the guild gate as a shared holder. Pending guild-wide
+            # work goes first so it cannot be starved by a stream of commands.
+            async with gate.cond:
+                while gate.exclusive or gate.waiting_exclusive:
+                    contended = True
+                    await gate.cond.wait()
+                gate.players += 1
+
+            try:
+                if lock.locked():
+                    contended = True
+                async with lock:
+                    self._note(self._player_key(gid, uid), time.perf_counter() - start, contended)
+                    yield
+            finally:
+                async with gate.cond:
+                    gate.players -= 1
+                    if gate.players == 0:
+                        gate.cond.notify_all()
+        finally:
+            n = self._player_users[key] - 1
+            if n:
+                self._player_users[key] = n
+            else:
+                del self._player_users[key]
+                if self._players.get(key) is lock:
+                    del self._players[key]
+            self._release_gate(gid, gate)
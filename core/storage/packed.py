@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# -------------------------------------------------
+# File format
+# -------------------------------------------------
+#
+#   VTMPACK1\n
+#   <header length, 10 ascii digits>\n
+#   <header JSON>  {"root": {...}, "guilds": {"<gid>": [offset, length], ...}}
+#   <guild blob><guild blob>...           (compact JSON, one per guild)
+#
+# Offsets are absolute. Only the header is parsed on open; each guild blob
+# is decoded the first time that guild is touched.
+
+PACK_MAGIC = b"VTMPACK1\n"
+_LEN_WIDTH = 10
+
+
+def is_packed(path: str) -> bool:
+    if not os.path.exists(path):
+        return False
+    with open(path, "rb") as f:
+        return f.read(len(PACK_MAGIC)) == PACK_MAGIC
+
+
+def write_packed(
+    path: str,
+    root: Dict[str, Any],
+    blobs: Iterable[Tuple[str, bytes]],
+) -> Dict[str, int]:
+    """
+    Atomically write a packed snapshot. Returns {guild_id: blob length}.
+    """
+    blobs = list(blobs)
+
+    # Header size depends on the offsets it holds, so lay out the blobs
+    # relative to zero first, then shift once the header is encoded.
+    rel: Dict[str, list] = {}
+    pos = 0
+    for gid, raw in blobs:
+        rel[gid] = [pos, len(raw)]
+        pos += len(raw)
+
+    def _encode(shift: int) -> bytes:
+        index = {gid: [off + shift, ln] for gid, (off, ln) in rel.items()}
+        return json.dumps({"root": root, "guilds": index}, separators=(",", ":")).encode("utf-8")
+
+    prefix = len(PACK_MAGIC) + _LEN_WIDTH + 1
+    header = _encode(0)
+    while True:
+        shift = prefix + len(header)
+        candidate = _encode(shift)
+        if len(candidate) == len(header):
+            header = candidate
+            break
+        header = candidate
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(PACK_MAGIC)
+        f.write(str(len(header)).zfill(_LEN_WIDTH).encode("ascii") + b"\n")
+        f.write(header)
+        for _, raw in blobs:
+            f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+    return {gid: ln for gid, (_, ln) in rel.items()}
+
+
+class PackedReader:
+    """
+    Memory-mapped view over a packed snapshot.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.root: Dict[str, Any] = {}
+        self.index: Dict[str, list] = {}
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return
+
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._map[: len(PACK_MAGIC)] != PACK_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a packed store")
+
+        start = len(PACK_MAGIC)
+        header_len = int(self._map[start : start + _LEN_WIDTH])
+        start += _LEN_WIDTH + 1
+        header = json.loads(self._map[start : start + header_len])
+        self.root = header.get("root") or {}
+        self.index = header.get("guilds") or {}
+
+    def guild_ids(self) -> Iterable[str]:
+        return self.index.keys()
+
+    def raw(self, guild_id: str) -> Optional[bytes]:
+        entry = self.index.get(guild_id)
+        if entry is None or self._map is None:
+            return None
+        off, ln = entry
+        return self._map[off : off + ln]
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class LazyGuilds(MutableMapping):
+    """
+    The store's "guilds" mapping, decoded on demand from a PackedReader.
+
+    - Keys are normalised to str (cogs pass int guild ids).
+    - Decoded guilds live in an LRU capped by count and by encoded bytes.
+    - Eviction happens only when a cap is exceeded, least recently used
+      first, and only of clean guilds idle for `idle_seconds`; dirty
+      guilds stay pinned until the next snapshot makes them clean.
+      A snapshot may be written off-thread: begin_snapshot() freezes the
+      set it covers, and only those guilds are released by rebase().
+    """
+
+    def __init__(
+        self,
+        reader: PackedReader,
+        max_resident: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+        idle_seconds: float = 300.0,
+    ):
+        self.reader = reader
+        self.max_resident = max_resident
+        self.max_bytes = max_bytes
+        self.idle_seconds = idle_seconds
+
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._last_used: Dict[str, float] = {}
+        self._dirty: Set[str] = set()
+        self._snapshotting: Set[str] = set()
+        self._deleted: Set[str] = set()
+        self._deleted_in_snapshot: Set[str] = set()
+        self.resident_bytes = 0
+        self.decodes = 0
+        self.evictions = 0
+
+    # -------------------------------------------------
+    # Mapping protocol
+    # -------------------------------------------------
+    def __getitem__(self, key) -> Dict[str, Any]:
+        gid = str(key)
+        if gid in self._cache:
+            self._cache.move_to_end(gid)
+            self._last_used[gid] = time.monotonic()
+            return self._cache[gid]
+
+        if gid in self._deleted:
+            raise KeyError(key)
+
+        raw = self.reader.raw(gid)
+        if raw is None:
+            raise KeyError(key)
+
+        guild = json.loads(raw)
+        self.decodes += 1
+        self._admit(gid, guild, len(raw))
+        return guild
+
+    def __setitem__(self, key, value: Dict[str, Any]):
+        gid = str(key)
+        self._deleted.discard(gid)
+        if gid in self._cache:
+            self._cache[gid] = value
+            self._cache.move_to_end(gid)
+            self._last_used[gid] = time.monotonic()
+        else:
+            self._admit(gid, value, self._sizes.get(gid, 0))
+        self._dirty.add(gid)
+
+    def __delitem__(self, key):
+        gid = str(key)
+        if gid not in self._cache and gid not in self.reader.index:
+            raise KeyError(key)
+        self._drop(gid)
+        self._deleted.add(gid)
+        self._dirty.add(gid)
+
+    def __contains__(self, key) -> bool:
+        gid = str(key)
+        if gid in self._deleted:
+            return False
+        return gid in self._cache or gid in self.reader.index
+
+    def __iter__(self) -> Iterator[str]:
+        seen = set()
+        for gid in list(self._cache):
+            seen.add(gid)
+            yield gid
+        for gid in list(self.reader.guild_ids()):
+            if gid not in seen and gid not in self._deleted:
+                yield gid
+
+    def __len__(self) -> int:
+        extra = sum(1 for gid in self._cache if gid not in self.reader.index)
+        gone = sum(1 for gid in self._deleted if gid in self.reader.index)
+        return len(self.reader.index) + extra - gone
+
+    # -------------------------------------------------
+    # Residency
+    # -------------------------------------------------
+    def _admit(self, gid: str, guild: Dict[str, Any], size: int):
+        self._cache[gid] = guild
+        self._sizes[gid] = size
+        self._last_used[gid] = time.monotonic()
+        self.resident_bytes += size
+        self._evict()
+
+    def _drop(self, gid: str):
+        if self._cache.pop(gid, None) is not None:
+            self.resident_bytes -= self._sizes.pop(gid, 0)
+            self._last_used.pop(gid, None)
+
+    def _evict(self):
+        if len(self._cache) <= self.max_resident and self.resident_bytes <= self.max_bytes:
+            return
+
+        cutoff = time.monotonic() - self.idle_seconds
+        for gid in list(self._cache):
+            if len(self._cache) <= self.max_resident and self.resident_bytes <= self.max_bytes:
+                break
+            if gid in self._dirty or gid in self._snapshotting or self._last_used.get(gid, 0) > cutoff:
+                continue
+            self._drop(gid)
+            self.evictions += 1
+
+    def mark_dirty(self, key):
+        self._dirty.add(str(key))
+
+    def resident(self) -> Iterable[str]:
+        return self._cache.keys()
+
+    # -------------------------------------------------
+    # Snapshotting
+    # -------------------------------------------------
+    def begin_snapshot(self) -> List[Tuple[str, Optional[bytes]]]:
+        """
+        Freeze the current contents for a snapshot.
+
+        Returns [(gid, bytes or None)]: resident guilds are encoded now, on
+        the caller's thread; None means "copy the blob from the current
+        reader", which resolve_snapshot() does wherever the file is written.
+        """
+        self._snapshotting = set(self._dirty)
+        self._dirty = set()
+        self._deleted_in_snapshot = set(self._deleted)
+
+        plan: List[Tuple[str, Optional[bytes]]] = []
+        for gid in self:
+            if gid in self._cache:
+                plan.append((gid, json.dumps(self._cache[gid], separators=(",", ":"), ensure_ascii=False).encode("utf-8")))
+            else:
+                plan.append((gid, None))
+        return plan
+
+    def abort_snapshot(self):
+        """
+        The snapshot was not written; keep its guilds pinned as dirty.
+        """
+        self._dirty |= self._snapshotting
+        self._snapshotting = set()
+        self._deleted_in_snapshot = set()
+
+    def resolve_snapshot(self, plan: List[Tuple[str, Optional[bytes]]]) -> Iterable[Tuple[str, bytes]]:
+        reader = self.reader
+        for gid, raw in plan:
+            if raw is None:
+                raw = reader.raw(gid)
+                if raw is None:
+                    continue
+            yield gid, raw
+
+    def rebase(self, reader: PackedReader, sizes: Dict[str, int]):
+        """
+        Swap to a freshly written snapshot. Guilds it covers are clean now;
+        anything dirtied since begin_snapshot() stays pinned.
+        """
+        old = self.reader
+        self.reader = reader
+        old.close()
+
+        self._snapshotting = set()
+        self._deleted -= self._deleted_in_snapshot
+        self._deleted_in_snapshot = set()
+        for gid in self._cache:
+            self._sizes[gid] = sizes.get(gid, self._sizes.get(gid, 0))
+        self.resident_bytes = sum(self._sizes.get(gid, 0) for gid in self._cache)
+        self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "total_guilds": len(self),
+            "resident_guilds": len(self._cache),
+            "resident_bytes": self.resident_bytes,
+            "dirty_guilds": len(self._dirty | self._snapshotting),
+            "decodes": self.decodes,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .io_executor import PendingWrite, completed_write
+from .journal import _DELETE, apply_record
+
+if TYPE_CHECKING:
+    from .journal import JournaledStore
+
+
+class UnitOfWork:
+    """
+    Stage changes to several documents and commit them as one transaction.
+
+    Participants:
+      - the bot store: put()/delete() stage values, record() stages "journal
+        whatever this path holds at commit time" (for the usual cog pattern
+        of mutating the live dicts in place);
+      - side files: file(path, document) stages a whole-file JSON rewrite
+        (HavenRegistry.save(tx=...), DirectorState.save(tx=...)).
+
+    commit() writes everything as a single journal line with one fsync,
+    then rewrites each side file once, however many times it was staged.
+    A crash can no longer leave havens.json updated and the director state
+    not (or vice versa): recovery replays the line whole or not at all.
+
+        with bot.store.transaction() as tx:
+            engine.apply_raid(guild_id, haven, severity, tx=tx)
+        await tx.result
+
+    Leaving the block with an exception discards everything staged. Only
+    staged operations are undone; in-place mutations of live objects are
+    the caller's to revert.
+    """
+
+    def __init__(self, store: "JournaledStore"):
+        self.store = store
+        self._ops: List[Tuple[str, Optional[str], Tuple[str, ...], Any]] = []
+        self._files: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+        self._on_commit: List[Callable[[], Any]] = []
+        self.result: Optional[PendingWrite] = None
+        self.closed = False
+
+    # -------------------------------------------------
+    # Staging
+    # -------------------------------------------------
+    def _check_open(self):
+        if self.closed:
+            raise RuntimeError("Transaction already committed or rolled back")
+
+    def put(self, guild_id: Optional[str], path: Sequence[str], value: Any):
+        self._check_open()
+        self._ops.append(("put", guild_id, tuple(str(p) for p in path), value))
+
+    def delete(self, guild_id: Optional[str], path: Sequence[str]):
+        self._check_open()
+        self._ops.append(("delete", guild_id, tuple(str(p) for p in path), None))
+
+    def record(self, guild_id: Optional[str], *path: str):
+        self._check_open()
+        key = ("record", guild_id, tuple(str(p) for p in path), None)
+        if key not in self._ops:
+            self._ops.append(key)
+
+    def file(self, path: str, document: Any, **dump_kwargs):
+        """
+        Stage a whole-file JSON rewrite. The document is encoded at commit,
+        so staging the same live object repeatedly costs nothing extra.
+        """
+        self._check_open()
+        self._files[path] = (document, dump_kwargs)
+
+    def on_commit(self, fn: Callable[[], Any]):
+        """
+        Run `fn` after a successful commit (not on rollback).
+        """
+        self._on_commit.append(fn)
+
+    def __len__(self) -> int:
+        return len(self._ops) + len(self._files)
+
+    # -------------------------------------------------
+    # Finishing
+    # -------------------------------------------------
+    def commit(self) -> PendingWrite:
+        self._check_open()
+        self.closed = True
+
+        records: List[Dict[str, Any]] = []
+        for op, guild_id, path, value in self._ops:
+            gid = None if guild_id is None else str(guild_id)
+            if op == "record":
+                record = self.store.current_record(guild_id, *path)
+                if record is None:
+                    continue
+            elif op == "put":
+                record = {"g": gid, "p": list(path), "v": value}
+            else:
+                record = {"g": gid, "p": list(path), _DELETE: 1}
+            apply_record(self.store.data, record)
+            records.append(record)
+
+        files = [(path, doc, kwargs) for path, (doc, kwargs) in self._files.items()]
+        self.result = self.store.commit(records, files)
+
+        for fn in self._on_commit:
+            fn()
+        return self.result
+
+    def rollback(self):
+        self.closed = True
+        self._ops.clear()
+        self._files.clear()
+        self._on_commit.clear()
+        self.result = completed_write()
+
+    def __enter__(self) -> "UnitOfWork":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.closed:
+            return False
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
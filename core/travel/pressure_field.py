@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+from core.travel.zones_loader import Zone
+
+# Per-zone Director pressure.
+#
+# City pressure stays global (DirectorState.*_pressure); on top of it each
+# guild keeps a sparse local field in its Director state:
+#
+#   data["zone_pressure"] = {"margate": {"si": 3.5, "violence": 1.2}, ...}
+#
+# Rules deposit their pressure deltas into the zone an event happened in
+# (events with a zone_key), and the nightly tick spreads and decays the
+# field over the zone graph: one sparse matrix-vector product per night,
+# O(zones + links), so thousands of zones cost milliseconds.
+
+FIELD_KEY = "zone_pressure"
+# Same channels as Zone.base_risk
+CHANNELS = ("violence", "masquerade", "si", "occult")
+# Director pressure key -> local channel (political pressure stays city-wide)
+PRESSURE_CHANNELS: Dict[str, str] = {
+    "violence_pressure": "violence",
+    "masquerade_pressure": "masquerade",
+    "si_pressure": "si",
+    "occult_pressure": "occult",
+}
+
+LOCAL_MAX = 20.0
+# Share of a zone's pressure that flows to its neighbours each night, and
+# the share that fades everywhere.
+SPREAD = 0.25
+DECAY = 0.15
+# Neighbour weight 1 / (1 + km / DISTANCE_KM): nearer zones take more.
+DISTANCE_KM = 50.0
+# Values below this are dropped so the stored field stays sparse.
+EPSILON = 0.05
+# Local points per extra point of zone risk (travel encounters).
+RISK_STEP = 4.0
+# Local masquerade + SI points per extra hunting difficulty (max 2).
+HEAT_STEP = 6.0
+
+
+def _haversine_km(lat1, lng1, lat2, lng2) -> np.ndarray:
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+    return 6371.0 * 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class ZoneGraph:
+    """
+    The zone adjacency as edge arrays (src -> dst), built from each zone's
+    `neighbours` (treated as two-way; unknown keys are ignored). Outgoing
+    weights of a zone sum to 1, favouring near neighbours when both ends
+    have lat/lng.
+    """
+
+    def __init__(self, zones: Iterable[Zone], distance_km: float = DISTANCE_KM):
+        zones = list(zones)
+        self.keys: List[str] = [z.key for z in zones]
+        self.index: Dict[str, int] = {k: i for i, k in enumerate(self.keys)}
+        n = len(self.keys)
+
+        pairs = set()
+        for z in zones:
+            i = self.index[z.key]
+            for nb in z.neighbours:
+                j = self.index.get(nb)
+                if j is not None and j != i:
+                    pairs.add((i, j))
+                    pairs.add((j, i))
+        edges = np.array(sorted(pairs), dtype=np.int64).reshape(-1, 2)
+        self.src, self.dst = edges[:, 0], edges[:, 1]
+
+        lat = np.array([np.nan if z.latitude is None else float(z.latitude) for z in zones])
+        lng = np.array([np.nan if z.longitude is None else float(z.longitude) for z in zones])
+        km = _haversine_km(lat[self.src], lng[self.src], lat[self.dst], lng[self.dst])
+        weight = np.where(np.isnan(km), 1.0, 1.0 / (1.0 + km / distance_km))
+
+        out = np.bincount(self.src, weights=weight, minlength=n)
+        self.weight = weight / out[self.src] if len(weight) else weight
+        self.has_neighbours = out > 0
+
+    @classmethod
+    def from_registry(cls, registry) -> "ZoneGraph":
+        return cls(registry.all())
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def links(self) -> int:
+        return len(self.src)
+
+    def step(self, x: np.ndarray, nights: int = 1, spread: float = SPREAD, decay: float = DECAY) -> np.ndarray:
+        """
+        Advance a (zones × channels) field by `nights`; returns a new array.
+
+        Per night: x' = (1 - decay) * (keep * x + spread * Wᵀ x), where a
+        zone keeps (1 - spread) of its pressure if it has neighbours and
+        W is the row-normalised adjacency.
+        """
+        n, c = x.shape
+        keep = (1.0 - spread * self.has_neighbours)[:, None]
+        flow_w = (spread * self.weight)[:, None]
+        # Flattened (dst, channel) bins: one bincount does every channel.
+        bins = (self.dst[:, None] * c + np.arange(c)).ravel()
+        for _ in range(max(0, nights)):
+            inflow = np.bincount(bins, weights=(x[self.src] * flow_w).ravel(), minlength=n * c)
+            x = (keep * x + inflow.reshape(n, c)) * (1.0 - decay)
+        return x
+
+    # -------------------------------------------------
+    # Sparse dict <-> dense array
+    # -------------------------------------------------
+    def to_array(self, field: Mapping[str, Mapping[str, float]]) -> np.ndarray:
+        x = np.zeros((len(self.keys), len(CHANNELS)))
+        for key, cell in field.items():
+            i = self.index.get(key)
+            if i is None:
+                continue
+            for c, ch in enumerate(CHANNELS):
+                x[i, c] = float(cell.get(ch, 0.0) or 0.0)
+        return x
+
+    def to_field(self, x: np.ndarray) -> Dict[str, Dict[str, float]]:
+        x = np.clip(x, 0.0, LOCAL_MAX)
+        out: Dict[str, Dict[str, float]] = {}
+        for i in np.flatnonzero((x >= EPSILON).any(axis=1)):
+            out[self.keys[i]] = {
+                ch: round(float(x[i, c]), 2) for c, ch in enumerate(CHANNELS) if x[i, c] >= EPSILON
+            }
+        return out
+
+
+def diffuse_field(
+    field: Mapping[str, Mapping[str, float]],
+    graph: ZoneGraph,
+    nights: int = 1,
+) -> Dict[str, Dict[str, float]]:
+    """
+    The field after `nights` of spread and decay. Zones no longer in the
+    graph (removed from zones.json) only decay.
+    """
+    out = graph.to_field(graph.step(graph.to_array(field), nights))
+    fade = (1.0 - DECAY) ** max(0, nights)
+    for key, cell in field.items():
+        if key in graph.index:
+            continue
+        kept = {ch: round(v * fade, 2) for ch, v in cell.items() if v * fade >= EPSILON}
+        if kept:
+            out[key] = kept
+    return out
+
+
+def diffuse_state(state, graph: ZoneGraph, nights: int = 1) -> bool:
+    """
+    Diffuse one guild's field in place (DirectorState); True if it changed.
+    The caller saves.
+    """
+    field = state.data.get(FIELD_KEY)
+    if not field:
+        return False
+    new = diffuse_field(field, graph, nights)
+    if new == field:
+        return False
+    state.data[FIELD_KEY] = new
+    return True
+
+
+# -------------------------------------------------
+# Readers
+# -------------------------------------------------
+def local_risk(zone: Zone, local: Optional[Mapping[str, float]] = None) -> Dict[str, int]:
+    """
+    zone.base_risk plus one point per RISK_STEP of local pressure.
+    """
+    local = local or {}
+    risk = dict(zone.base_risk)
+    for ch in CHANNELS:
+        extra = int(float(local.get(ch, 0.0)) // RISK_STEP)
+        if extra:
+            risk[ch] = int(risk.get(ch, 1)) + extra
+    return risk
+
+
+def local_heat(local: Optional[Mapping[str, float]] = None) -> int:
+    """
+    0–2: how watchful a zone is tonight, from local masquerade + SI.
+    """
+    local = local or {}
+    heat = float(local.get("masquerade", 0.0)) + float(local.get("si", 0.0))
+    return min(2, int(heat // HEAT_STEP))
@@ -8,6 +8,8 @@ from typing import Dict, List, Any
 import gspread
 from dotenv import load_dotenv
 
+from core.storage.io_executor import PendingWrite, write_json
+
 # Load environment variables so this module can be used from
 # bot commands, CLI, or the API server.
 load_dotenv()
@@ -179,15 +181,14 @@ def load_sheet_zones(sheet_id: str | None = None) -> Dict[str, dict]:
     return zones
 
 
-def save_zones_file(zones: Dict[str, dict], path: str = ZONES_JSON_PATH) -> None:
+def save_zones_file(zones: Dict[str, dict], path: str = ZONES_JSON_PATH) -> PendingWrite:
     """
-    Writes zones.json to disk as a flat list[zone].
+    Queues a write of zones.json as a flat list[zone] on the disk writer.
 
-    This is what `ZoneRegistry.load_from_json` expects.
+    This is what `ZoneRegistry.load_from_json` expects. Await the result
+    (or call .result() outside async code) before reloading the registry.
     """
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(list(zones.values()), f, indent=4, ensure_ascii=False)
+    return write_json(path, list(zones.values()), indent=4, ensure_ascii=False)
 
 
 if __name__ == "__main__":
@@ -195,5 +196,5 @@ if __name__ == "__main__":
     #   python -m core.travel.sheets_loader
     # to pull from the configured sheet and write data/zones.json
     zones = load_sheet_zones()
-    save_zones_file(zones)
+    save_zones_file(zones).result()
     print(f"Synced {len(zones)} zones to {ZONES_JSON_PATH}")
\ No newline at end of file
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Mapping, Optional
 
 from core.travel.zones_loader import ZoneRegistry, Zone
 from core.travel.encounters import roll_encounter, is_encounter_triggered
+from core.travel.pressure_field import local_risk
 
 
 class TravelEngine:
@@ -43,9 +44,13 @@ class TravelEngine:
         self,
         player: Dict[str, Any],
         destination_key_or_name: str,
+        pressure: Optional[Callable[[str], Mapping[str, float]]] = None,
     ) -> Dict[str, Any]:
         """
         Travel a PC from current location_key to a new zone.
+
+        pressure(zone_key) gives the guild's local Director pressure
+        (DirectorState.local_pressure); it raises the destination's risk.
         """
         origin_key = player.get("location_key") or self.registry.default_zone_key()
         origin = self.registry.get(origin_key) or self.registry.find(origin_key)
@@ -65,7 +70,8 @@ class TravelEngine:
         time_cost = self._compute_time_cost(origin, dest)
 
         encounter = None
-        if is_encounter_triggered(dest.base_risk):
+        risk = local_risk(dest, pressure(dest.key)) if pressure else dest.base_risk
+        if is_encounter_triggered(risk):
             encounter = roll_encounter(dest.encounter_table)
 
         # Update player location key here
@@ -3,6 +3,8 @@ from __future__ import annotations
 import json
 from typing import Dict, List, Optional
 
+from core.storage.io_executor import PendingWrite, write_json
+
 ZONES_JSON_PATH = "data/zones.json"
 
 
@@ -124,10 +126,9 @@ class ZoneRegistry:
             except Exception:
                 continue
 
-    def save(self):
+    def save(self) -> PendingWrite:
         data = [z.to_dict() for z in self._zones.values()]
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        return write_json(self.path, data, indent=2, ensure_ascii=False)
 
     def all(self) -> List[Zone]:
         return list(self._zones.values())
@@ -1,23 +1,29 @@
-import json
 import os
 
-DATA_FILE = os.getenv("DATA_PATH", "vtm_data.json")
+from core.storage.coherence import JournalFollower
+from core.storage.control import StoreControlClient
+from core.storage.filelock import StoreLock
+from core import utils_shared
+
+# The API reads the bot's store; DATA_PATH only overrides it explicitly.
+DATA_FILE = os.getenv("DATA_PATH", os.getenv("BOT_DATA_PATH", "bot_data.json"))
+STORE_SOCKET = os.getenv("BOT_STORE_SOCKET", DATA_FILE + ".sock")
+STORE_CONTROL = os.getenv("BOT_STORE_CONTROL", DATA_FILE + ".ctl")
 
 def load_data_from_file(path: str = DATA_FILE):
     """Load API-side persistent data store."""
-    if not os.path.exists(path):
-        return {"guilds": {}, "players": {}, "director_state": {}}
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return utils_shared.load_data_from_file(path, {"guilds": {}, "players": {}, "director_state": {}})
 
 def save_data(path: str, data: dict):
-    """Atomic save for API store."""
-    tmp = path + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
-    os.replace(tmp, path)
+    """Atomic save for API store, under the store's file lock."""
+    with StoreLock(path).exclusive():
+        utils_shared.save_data(path, data)
+
+def open_store_follower(path: str = DATA_FILE) -> JournalFollower:
+    """Read-only view of the bot's store, refreshed per changed guild."""
+    return JournalFollower(path)
+
+def open_store_control(path: str = STORE_CONTROL) -> StoreControlClient:
+    """Write channel to the bot: CAS patches applied under its player locks."""
+    return StoreControlClient(path)
 
-def get_guild_data(store: dict, guild_id: str):
-    store.setdefault("guilds", {})
-    store["guilds"].setdefault(guild_id, {"players": {}, "director_state": {}})
-    return store["guilds"][guild_id]
@@ -1,19 +1,42 @@
-import json
 import os
 
+from core.storage.journal import DEFAULT_BOT_STORE, JournaledStore
+from core.storage.coherence import UnixNotifier
+from core.storage.io_executor import get_writer
+from core.utils_shared import load_data_from_file, save_data
+
 BOT_DATA_PATH = os.getenv("BOT_DATA_PATH", "bot_data.json")
+# "packed" = indexed snapshot, guilds decoded lazily on first command
+BOT_STORE_FORMAT = os.getenv("BOT_STORE_FORMAT", "json")
+# Local datagram socket the API listens on for store change notifications
+BOT_STORE_SOCKET = os.getenv("BOT_STORE_SOCKET", BOT_DATA_PATH + ".sock")
+# Incremental backups (core/storage/backup.py); interval 0 disables the
+# in-bot backup task
+BOT_BACKUP_DIR = os.getenv("BOT_BACKUP_DIR", "backups")
+BOT_BACKUP_INTERVAL = float(os.getenv("BOT_BACKUP_INTERVAL", "900"))
+# Local stream socket the API sends compare-and-swap writes to
+BOT_STORE_CONTROL = os.getenv("BOT_STORE_CONTROL", BOT_DATA_PATH + ".ctl")
+# UTC hour of the nightly Director tick for all guilds; -1 disables it.
+BOT_DIRECTOR_TICK_HOUR = int(os.getenv("BOT_DIRECTOR_TICK_HOUR", "12"))
 
 def load_bot_data(path: str = BOT_DATA_PATH):
-    if not os.path.exists(path):
-        return {"guilds": {}, "characters": {}, "items": {}}
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return load_data_from_file(path, DEFAULT_BOT_STORE)
 
 def save_bot_data(path: str, data: dict):
-    tmp = path + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
-    os.replace(tmp, path)
+    save_data(path, data)
+
+def open_bot_store(path: str = BOT_DATA_PATH) -> JournaledStore:
+    """
+    Journaled store: loads the snapshot, replays the journal tail, and
+    makes later saves O(change) via store.record()/store.put().
+    Disk I/O runs on the shared background writer, never on the loop.
+    """
+    return JournaledStore(
+        path,
+        packed=BOT_STORE_FORMAT == "packed",
+        notifier=UnixNotifier(BOT_STORE_SOCKET),
+        writer=get_writer(),
+    )
 
 def ensure_player(store: dict, guild_id: str, user_id: str):
     store.setdefault("guilds", {})
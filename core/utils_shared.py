@@ -1,13 +1,31 @@
-import json import os def load_data_from_file(path: 
-str) -> dict:
-    if not os.path.exists(path): return {} with 
-    open(path, "r", encoding="utf-8") as f:
-        return json.load(f) def save_data(path: str, 
-data: dict):
-    os.makedirs(os.path.dirname(path), 
-    exist_ok=True) with open(path, "w", 
-    encoding="utf-8") as f:
-        json.dump(data, f, indent=4) def 
-get_guild_data(store: dict, guild_id: str):
+import json
+import os
+from typing import Any, Dict, Optional
+
+# Shared persistence helpers. utils_bot and utils_api re-export these with
+# their own default paths; storage backends live in core/storage/backends.py.
+
+
+def load_data_from_file(path: str, default: Optional[Dict[str, Any]] = None) -> dict:
+    """Read a JSON store, or a fresh copy of `default` ({} if None) when missing."""
+    if not os.path.exists(path):
+        return json.loads(json.dumps(default or {}))
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_data(path: str, data: dict):
+    """Atomic JSON save (tmp file + os.replace)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp, path)
+
+
+def get_guild_data(store: dict, guild_id) -> dict:
+    """The guild's dict, created on first use. Keys are always str, as in JSON."""
     guilds = store.setdefault("guilds", {})
-    return guilds.setdefault(str(guild_id), {"players": {}, "state": {}})
+    return guilds.setdefault(str(guild_id), {"players": {}})
@@ -141,4 +141,7 @@ def remorse_roll(player: Dict[str, Any]) -> Dict[str, Any]:
         "previous_humanity": humanity,
         "previous_stains": stains,
         "pool": pool,
-        "base_pool": base_pool,
\ No newline at end of file
+        "base_pool": base_pool,
+        "merits_flaws_modifier": mod_merits_flaws,
+        "touchstones_modifier": mod_touchstones,
+    }
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from typing import Dict, Any
+from typing import Dict, Any, Mapping, Optional
 
 from . import dice, hunger, character_model
+from core.travel.pressure_field import local_heat
 from core.travel.zones_loader import Zone
 
 
@@ -74,9 +75,17 @@ class HuntingEngine:
 
         return max(1, base_pool)
 
-    def hunt(self, player: Dict[str, Any], zone: Zone) -> Dict[str, Any]:
+    def hunt(
+        self,
+        player: Dict[str, Any],
+        zone: Zone,
+        pressure: Optional[Mapping[str, float]] = None,
+    ) -> Dict[str, Any]:
         """
         Perform a full hunting action in a zone.
+
+        pressure: the zone's local Director pressure
+        (DirectorState.local_pressure); local heat makes feeding harder.
         """
         character_model.ensure_character_state(player)
         hunger_val = character_model.get_hunger(player)
@@ -89,6 +98,15 @@ class HuntingEngine:
 
         difficulty = max(2, zone.danger)  # rough rule of thumb
 
+        heat = local_heat(pressure)
+        if heat:
+            difficulty += heat
+            notes.append(
+                "The streets here are watchful tonight: recent trouble has put the kine on edge."
+                if heat == 1 else
+                "This domain is crawling with eyes: every feeding risks the Masquerade."
+            )
+
         roll_result = dice.roll_pool(
             dice_pool=pool,
             hunger=hunger_val,
@@ -153,12 +153,16 @@ function renderSiHeat() {
   const toggle = document.getElementById("toggle_si_heat");
   if (!toggle || !toggle.checked) return;
 
+  const local = (directorState && directorState.zone_pressure) || {};
+
   const points = [];
   zonesData.forEach((z) => {
     if (!z.lat || !z.lng) return;
-    if (z.si_risk && z.si_risk > 0) {
-      // Base intensity from zone si_risk (1–5)
-      let baseIntensity = Math.min(1, z.si_risk / 5);
+    // Local SI pressure from the Director's zone field (0–20)
+    const localSi = (local[z.key] && local[z.key].si) || 0;
+    if ((z.si_risk && z.si_risk > 0) || localSi > 0) {
+      // Base intensity from zone si_risk (1–5), plus 1 per 4 local points
+      let baseIntensity = Math.min(1, ((z.si_risk || 0) + localSi / 4) / 5);
 
       // Optionally scale by global Second Inquisition pressure from Director state
       let globalMultiplier = 1.0;
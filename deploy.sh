@@ -16,6 +16,9 @@ if [ -f "requirements.txt" ]; then
   pip install -r requirements.txt
 fi
 
+echo "Taking a pre-deploy backup of the bot store..."
+python -m core.storage.backup snapshot || echo "WARNING: backup failed, continuing deploy"
+
 deactivate
 
 echo "Restarting vtm.service..."